@@ -1,9 +1,16 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, Response
 from .service import list_alerts
 from backend.core.exceptions import db_error
+from backend.core.paging import PageParams, page_params, page_response
 
 router = APIRouter()
 
 @router.get("")
-def get_alerts():
-    return list_alerts()
+def get_alerts(response: Response, open_only: bool = False, severity: str | None = None,
+               location_id: str | None = None, page: PageParams = Depends(page_params)):
+    try:
+        return page_response(response, list_alerts(open_only, severity, location_id, page))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise db_error(e)
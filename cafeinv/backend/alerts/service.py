@@ -1,16 +1,53 @@
+from typing import Optional
+from backend.core.cache import ref_cache
 from backend.core.db import get_cursor
+from backend.core.paging import PageParams, PageResult, fetch_page
+from backend.core.replicas import read_cursor
 
-def list_alerts():
+ALERT_SORT = {"severity": "severity", "created_at": "created_at", "alert_type": "alert_type"}
+
+# 운영 DB마다 alerts 컬럼이 다르다 (ingredient_id/location_id/resolved_at 이 없는 곳도 있음) → 있는 컬럼만 쓴다
+OPTIONAL_COLUMNS = ("ingredient_id", "location_id", "resolved_at")
+
+@ref_cache("alert_columns")
+def alert_columns() -> frozenset:
     with get_cursor() as cur:
+        cur.execute(
+            """
+            SELECT column_name FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = 'alerts';
+            """
+        )
+        return frozenset(r["column_name"] for r in cur.fetchall())
+
+def list_alerts(open_only: bool = False, severity: Optional[str] = None, location_id: Optional[str] = None,
+                page: Optional[PageParams] = None) -> PageResult:
+    cols = alert_columns()
+    where, params = [], []
+    if open_only and "resolved_at" in cols:        # 해제 개념이 없으면 모든 알림이 미해제
+        where.append("resolved_at IS NULL")
+    if severity:
+        where.append("severity = %s"); params.append(severity)
+    if location_id:
+        if "location_id" in cols:
+            where.append("location_id = %s"); params.append(location_id)
+        else:
+            where.append("FALSE")
+    optional = ",\n".join(c if c in cols else f"NULL AS {c}" for c in OPTIONAL_COLUMNS)
+    with read_cursor() as cur:
         # ✅ message에 포함된 '%' 문자를 안전하게 처리
-        cur.execute("""
-            SELECT 
-                id, 
-                alert_type, 
-                REPLACE(message, '%', '%%') AS message, 
-                severity, 
-                created_at
+        return fetch_page(
+            cur,
+            f"""
+            SELECT
+                id,
+                alert_type,
+                REPLACE(message, '%%', '%%%%') AS message,
+                severity,
+                created_at,
+                {optional}
             FROM alerts
-            ORDER BY severity DESC, created_at DESC;
-        """)
-        return cur.fetchall()
+            """,
+            where, params, page or PageParams(),
+            sortable=ALERT_SORT, default_sort="-severity,-created_at", tiebreak="id DESC", search=("message",)
+        )
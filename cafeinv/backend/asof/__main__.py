@@ -0,0 +1,39 @@
+"""
+배포 시:
+    python -m backend.asof migrate
+cron 등에서 사용 (CHECKPOINT_INTERVAL_MINUTES 보다 자주 불러도 된다):
+    python -m backend.asof checkpoint
+    python -m backend.asof show --location <uuid> --on 2026-10-01
+"""
+import argparse
+from datetime import date, datetime
+
+from backend.core.logger import logger
+from .service import as_of, closing_time, create_checkpoint, migrate_checkpoints
+
+def main():
+    p = argparse.ArgumentParser(prog="python -m backend.asof")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("migrate", help="체크포인트 테이블 설치 + 첫 체크포인트")
+    c = sub.add_parser("checkpoint", help="now() - lag 시점 잔량 체크포인트")
+    c.add_argument("--force", action="store_true", help="간격이 안 됐어도 만든다")
+    s = sub.add_parser("show", help="지점의 시점 재고")
+    s.add_argument("--location", required=True)
+    g = s.add_mutually_exclusive_group(required=True)
+    g.add_argument("--at", type=datetime.fromisoformat)
+    g.add_argument("--on", type=date.fromisoformat, help="이 날 마감 기준")
+    args = p.parse_args()
+
+    if args.cmd == "migrate":
+        logger.info("checkpoint schema installed: %s", migrate_checkpoints())
+    elif args.cmd == "checkpoint":
+        logger.info("checkpoint: %s", create_checkpoint(args.force))
+    else:
+        res = as_of(args.location, args.at or closing_time(args.on), nonzero_only=True)
+        print(f"as of {res['at']} (checkpoint {res['checkpoint_at']}, {res['direction']}, "
+              f"{res['tx_replayed']} tx replayed)")
+        for r in res["items"]:
+            print(f"{r['ingredient_name']:<24} {r['qty']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+from datetime import date, datetime
+
+from fastapi import APIRouter, HTTPException, Query
+from backend.core.exceptions import db_error
+from .service import NoCheckpoint, as_of, closing_time, create_checkpoint, list_checkpoints
+
+router = APIRouter()
+
+@router.get("")
+def get_as_of(
+    location_id: str = Query(...),
+    at: datetime | None = None,
+    on: date | None = Query(default=None, description="이 날 마감(다음 날 00:00) 기준"),
+    ingredient_id: str | None = None,
+    nonzero_only: bool = False,
+):
+    if (at is None) == (on is None):
+        raise HTTPException(status_code=422, detail="give exactly one of at / on")
+    try:
+        return as_of(location_id, at or closing_time(on), ingredient_id, nonzero_only)
+    except NoCheckpoint as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise db_error(e)
+
+@router.get("/checkpoints")
+def get_checkpoints(limit: int = 50):
+    try:
+        return list_checkpoints(limit)
+    except Exception as e:
+        raise db_error(e)
+
+@router.post("/checkpoints")
+def post_checkpoint(force: bool = False):
+    try:
+        return create_checkpoint(force)
+    except Exception as e:
+        raise db_error(e)
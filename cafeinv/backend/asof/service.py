@@ -0,0 +1,200 @@
+"""
+시점 재고(as-of): "그 날 마감 때 이 지점 재고가 얼마였나".
+
+체크포인트
+    create_checkpoint() 가 now() - lag 시점(w)의 (재료, 지점) 잔량을 inventory_checkpoints 에 쓴다.
+    직전 체크포인트 이후 원장이 움직인 키와 아직 체크포인트가 없는 키만 쓰므로 (희소 저장) 비용은 변동량에 비례.
+    잔량(w) = 현재 잔량 - w 이후 원장 합계 (한 문장 = 한 스냅샷이라 둘이 어긋나지 않는다).
+    초기 재고가 원장 없이 들어가 있어도 현재 잔량에서 거꾸로 계산하므로 맞는다.
+    lag 는 created_at 이 w 이전인데 아직 커밋 안 된 트랜잭션을 기다리는 여유 (롤업과 같은 이유).
+
+조회
+    as_of(loc, T): T 에 가장 가까운 체크포인트 c 를 고르고
+        c <= T : 키별 (c 이하 마지막 체크포인트) + (c, T] 원장
+        c >  T : 키별 (c 이하 마지막 체크포인트) - (T, c] 원장
+    원장은 체크포인트 간격의 절반 이하만 읽는다.
+    조회는 쓰지 않는다. 체크포인트가 하나도 없으면 NoCheckpoint (API 409).
+
+배포 시 (테이블 설치 + 첫 체크포인트):
+    python -m backend.asof migrate
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from backend.core.config import CHECKPOINT_LAG_SECONDS, CHECKPOINT_INTERVAL_MINUTES, ROLLUP_TZ
+from backend.core.db import get_cursor, ensure_schema
+from backend.core.logger import logger
+from backend.stripes.service import balance_sql
+
+CHECKPOINTS = "inventory_checkpoints"
+
+CHECKPOINTS_DDL = """
+CREATE TABLE IF NOT EXISTS inventory_checkpoint_runs (
+    at          timestamptz PRIMARY KEY,
+    rows        integer     NOT NULL,
+    created_at  timestamptz NOT NULL DEFAULT now()
+);
+
+-- 키마다 잔량이 바뀐 체크포인트만 (희소). (지점, 재료, 시점 역순) 으로 "c 이하 마지막" 을 바로 찾는다.
+CREATE TABLE IF NOT EXISTS inventory_checkpoints (
+    location_id    uuid        NOT NULL,
+    ingredient_id  uuid        NOT NULL,
+    at             timestamptz NOT NULL,
+    qty            numeric     NOT NULL,
+    PRIMARY KEY (location_id, ingredient_id, at)
+);
+"""
+
+_CHECKPOINT = f"""
+WITH after AS (
+    SELECT ingredient_id, location_id, sum(qty_delta) AS d
+    FROM inventory_tx
+    WHERE created_at > %(w)s
+    GROUP BY 1, 2
+),
+changed AS (
+    SELECT DISTINCT ingredient_id, location_id
+    FROM inventory_tx
+    WHERE created_at > %(last)s AND created_at <= %(w)s
+    UNION
+    SELECT inv.ingredient_id, inv.location_id
+    FROM inventory inv
+    WHERE NOT EXISTS (SELECT 1 FROM inventory_checkpoints c
+                      WHERE c.location_id = inv.location_id AND c.ingredient_id = inv.ingredient_id)
+)
+INSERT INTO inventory_checkpoints (location_id, ingredient_id, at, qty)
+SELECT ch.location_id, ch.ingredient_id, %(w)s, COALESCE({balance_sql("inv")}, 0) - COALESCE(a.d, 0)
+FROM changed ch
+LEFT JOIN inventory inv ON inv.ingredient_id = ch.ingredient_id AND inv.location_id = ch.location_id
+LEFT JOIN after a ON a.ingredient_id = ch.ingredient_id AND a.location_id = ch.location_id;
+"""
+
+_AS_OF = """
+WITH keys AS (
+    SELECT inv.ingredient_id FROM inventory inv
+    WHERE inv.location_id = %(loc)s AND (%(ing)s::uuid IS NULL OR inv.ingredient_id = %(ing)s::uuid)
+),
+base AS (
+    SELECT k.ingredient_id, cp.qty
+    FROM keys k
+    LEFT JOIN LATERAL (
+        SELECT c.qty FROM inventory_checkpoints c
+        WHERE c.location_id = %(loc)s AND c.ingredient_id = k.ingredient_id AND c.at <= %(c)s
+        ORDER BY c.at DESC LIMIT 1
+    ) cp ON true
+),
+d AS (
+    SELECT ingredient_id, sum(qty_delta) AS d, count(*) AS n
+    FROM inventory_tx
+    WHERE location_id = %(loc)s AND created_at > %(lo)s AND created_at <= %(hi)s
+      AND (%(ing)s::uuid IS NULL OR ingredient_id = %(ing)s::uuid)
+    GROUP BY 1
+)
+SELECT b.ingredient_id::text, i.name AS ingredient_name,
+       COALESCE(b.qty, 0) + %(sign)s * COALESCE(d.d, 0) AS qty,
+       COALESCE(d.n, 0) AS tx_replayed
+FROM base b
+JOIN ingredients i ON i.id = b.ingredient_id
+LEFT JOIN d ON d.ingredient_id = b.ingredient_id
+ORDER BY i.name;
+"""
+
+
+class NoCheckpoint(Exception):
+    pass
+
+
+def ensure_checkpoints_schema():
+    ensure_schema(CHECKPOINTS, CHECKPOINTS_DDL)
+
+
+def migrate_checkpoints() -> dict:
+    """테이블을 설치하고 체크포인트가 없으면 첫 체크포인트를 만든다."""
+    ensure_checkpoints_schema()
+    return create_checkpoint()
+
+
+def _installed(cur) -> bool:
+    cur.execute("SELECT to_regclass('inventory_checkpoint_runs') IS NOT NULL AS ok;")
+    return cur.fetchone()["ok"]
+
+
+def create_checkpoint(force: bool = False) -> dict:
+    """
+    now() - lag 시점의 체크포인트. 직전 체크포인트가 CHECKPOINT_INTERVAL_MINUTES 이내면 건너뛴다 (force 제외).
+    여러 워커/cron 이 동시에 불러도 advisory lock 으로 하나만 돈다.
+    """
+    ensure_checkpoints_schema()
+    with get_cursor() as cur:
+        cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s));", (CHECKPOINTS,))
+        cur.execute(
+            """
+            SELECT (SELECT max(at) FROM inventory_checkpoint_runs) AS last,
+                   now() - make_interval(secs => %s) AS w;
+            """,
+            (CHECKPOINT_LAG_SECONDS,)
+        )
+        r = cur.fetchone()
+        last, w = r["last"], r["w"]
+        too_soon = not force and w - last < timedelta(minutes=CHECKPOINT_INTERVAL_MINUTES) if last else False
+        if last is not None and (w <= last or too_soon):
+            return {"skipped": True, "last": last, "at": None, "rows": 0}
+        cur.execute(_CHECKPOINT, {"w": w, "last": last})
+        rows = cur.rowcount
+        cur.execute("INSERT INTO inventory_checkpoint_runs (at, rows) VALUES (%s, %s);", (w, rows))
+    logger.info("inventory checkpoint at %s: %d keys", w, rows)
+    return {"skipped": False, "last": last, "at": w, "rows": rows}
+
+
+def list_checkpoints(limit: int = 50) -> list[dict]:
+    with get_cursor(commit=False) as cur:
+        if not _installed(cur):
+            return []
+        cur.execute(
+            "SELECT at, rows, created_at FROM inventory_checkpoint_runs ORDER BY at DESC LIMIT %s;",
+            (max(1, min(limit, 1000)),)
+        )
+        return cur.fetchall()
+
+
+def closing_time(day: date) -> datetime:
+    """영업일 마감 = 다음 날 00:00 (ROLLUP_TZ)."""
+    return datetime.combine(day + timedelta(days=1), time(), ZoneInfo(ROLLUP_TZ))
+
+
+def _nearest(cur, at: datetime) -> Optional[datetime]:
+    cur.execute(
+        """
+        SELECT (SELECT max(at) FROM inventory_checkpoint_runs WHERE at <= %(t)s) AS before,
+               (SELECT min(at) FROM inventory_checkpoint_runs WHERE at > %(t)s) AS after;
+        """,
+        {"t": at}
+    )
+    r = cur.fetchone()
+    if r["before"] is None or r["after"] is None:
+        return r["before"] or r["after"]
+    return r["before"] if at - r["before"] <= r["after"] - at else r["after"]
+
+
+def as_of(location_id: str, at: datetime, ingredient_id: Optional[str] = None,
+          nonzero_only: bool = False) -> dict:
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=ZoneInfo(ROLLUP_TZ))
+    with get_cursor(commit=False) as cur:
+        c = _nearest(cur, at) if _installed(cur) else None
+    if c is None:
+        raise NoCheckpoint("no inventory checkpoint yet: POST /inventory/as_of/checkpoints "
+                           "or run python -m backend.asof migrate")
+
+    forward = c <= at
+    params = {"loc": location_id, "ing": ingredient_id, "c": c,
+              "lo": c if forward else at, "hi": at if forward else c, "sign": 1 if forward else -1}
+    with get_cursor(commit=False) as cur:
+        cur.execute(_AS_OF, params)
+        items = cur.fetchall()
+    replayed = sum(it["tx_replayed"] for it in items)
+    if nonzero_only:
+        items = [it for it in items if it["qty"]]
+    return {"location_id": location_id, "at": at, "checkpoint_at": c,
+            "direction": "forward" if forward else "backward", "tx_replayed": replayed, "items": items}
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends, HTTPException, Response
+from backend.core.exceptions import db_error
+from backend.core.paging import PageParams, page_params, page_response
+from .service import list_audit_logs
+
+router = APIRouter()
+
+@router.get("/audit_logs")
+def get_audit_logs(response: Response, table_name: str | None = None, record_id: str | None = None,
+                   since: str | None = None, until: str | None = None,
+                   page: PageParams = Depends(page_params)):
+    try:
+        return page_response(response, list_audit_logs(table_name, record_id, since, until, page))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise db_error(e)
@@ -0,0 +1,24 @@
+from typing import Optional
+from backend.core.paging import PageParams, PageResult, fetch_page
+from backend.core.replicas import read_cursor
+
+def list_audit_logs(table_name: Optional[str] = None, record_id: Optional[str] = None,
+                    since: Optional[str] = None, until: Optional[str] = None,
+                    page: Optional[PageParams] = None) -> PageResult:
+    """audit_logs 조회 (created_at 월 파티션 → since/until 을 주면 해당 파티션만 읽는다)."""
+    page = page or PageParams()
+    if page.limit is None:
+        page.limit = 100
+    where, params = [], []
+    if table_name:
+        where.append("table_name=%s"); params.append(table_name)
+    if record_id:
+        where.append("record_id=%s"); params.append(record_id)
+    if since:
+        where.append("created_at >= %s::timestamptz"); params.append(since)
+    if until:
+        where.append("created_at < %s::timestamptz"); params.append(until)
+    with read_cursor() as cur:
+        return fetch_page(cur, "SELECT * FROM audit_logs", where, params, page,
+                          sortable={"created_at": "created_at", "table_name": "table_name", "action": "action"},
+                          default_sort="-created_at", tiebreak="id DESC")
@@ -0,0 +1,399 @@
+"""
+카탈로그 일괄 등록 (매장 오픈 / 메뉴 개편).
+
+    import_catalog({"ingredients": ("csv", text), "recipes": ("ndjson", text)}, dry_run=True)
+
+엔티티별 CSV/NDJSON을 COPY로 임시 테이블(imp_*)에 올린 뒤
+이름 → id 해석(카테고리/단위/위치/담당자/메뉴/재료)과 검증을 집합 단위 UPDATE로 하고,
+오류 없는 행만 한 트랜잭션에서 upsert 한다. 이름이 같은 기존 행이 있으면 갱신, 없으면 생성.
+오류 행은 건너뛰고 {entity, row, error} 로 돌려준다. dry_run 이면 끝에서 롤백.
+
+처리 순서: suppliers → ingredients → menu_items → recipes
+(같은 요청의 재료/메뉴를 레시피에서 이름으로 참조할 수 있다)
+"""
+import csv
+import io
+import json
+
+from backend.core.cache import invalidate
+from backend.core.db import get_cursor
+from backend.core.logger import logger
+
+ORDER = ("suppliers", "ingredients", "menu_items", "recipes")
+
+# 엔티티별 입력 컬럼 (모두 text로 받아 SQL에서 검증/변환)
+COLUMNS = {
+    "suppliers": ("name", "contact", "phone", "email", "address", "is_active"),
+    "ingredients": ("name", "unit", "category", "description", "safety_stock_default",
+                    "reorder_point_default", "cost_per_unit", "responsible_user", "is_active"),
+    "menu_items": ("name", "price", "category", "default_location", "is_active"),
+    "recipes": ("menu_item", "ingredient", "qty_required", "unit"),
+}
+ALIASES = {
+    "unit_id": "unit", "category_id": "category", "default_location_id": "default_location",
+    "responsible_user_id": "responsible_user", "menu_item_id": "menu_item", "ingredient_id": "ingredient",
+    "qty": "qty_required",
+}
+# 엔티티별로 추가로 채우는 해석 결과 컬럼
+RESOLVED = {
+    "suppliers": "",
+    "ingredients": ", unit_id uuid, category_id uuid, responsible_user_id uuid",
+    "menu_items": ", category_id uuid, location_id uuid",
+    "recipes": ", menu_item_id uuid, ingredient_id uuid, unit_id uuid, qty numeric",
+}
+
+_NUM = r"^\s*[-+]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][-+]?[0-9]+)?\s*$"
+_UUID = r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$"
+_BOOLS = "('true','t','1','y','yes','false','f','0','n','no')"
+
+
+def _col(name: str) -> str:
+    key = name.strip().lower().lstrip("﻿")
+    return ALIASES.get(key, key)
+
+
+def _bool(col: str) -> str:
+    return f"lower({col}) IN ('true','t','1','y','yes')"
+
+
+def _resolve(cur, entity: str, col: str, target: str, table: str, cond: str = ""):
+    """
+    text 컬럼(이름 또는 id) → {target}. 입력 값마다가 아니라 고유 값 집합을 한 번에 조인한다.
+    id 형식이면 id 우선, 이름이 여러 행과 맞으면 NULL (모호).
+    """
+    cur.execute(
+        f"""
+        WITH k AS (
+            SELECT DISTINCT {col} AS key FROM imp_{entity} WHERE {col} IS NOT NULL AND error IS NULL
+        ),
+        m AS (
+            SELECT DISTINCT ON (key) key, id FROM (
+                SELECT k.key, r.id, 0 AS pri FROM k
+                JOIN {table} r ON r.id = CASE WHEN k.key ~ '{_UUID}' THEN k.key::uuid END
+                WHERE true{cond}
+                UNION ALL
+                SELECT k.key, CASE WHEN count(*) = 1 THEN min(r.id::text)::uuid END, 1
+                FROM k JOIN {table} r ON r.name = k.key
+                WHERE true{cond}
+                GROUP BY k.key
+            ) x
+            ORDER BY key, pri
+        )
+        UPDATE imp_{entity} s SET {target} = m.id FROM m WHERE s.{col} = m.key AND s.error IS NULL;
+        """
+    )
+
+
+def _stage(cur, entity: str, fmt: str, text: str) -> list[dict]:
+    """임시 테이블을 만들고 COPY. 파싱 단계 오류 목록을 돌려준다."""
+    cols = COLUMNS[entity]
+    cur.execute(
+        f"""
+        CREATE TEMP TABLE imp_{entity} (
+            row int GENERATED BY DEFAULT AS IDENTITY, {", ".join(f"{c} text" for c in cols)},
+            id uuid, existing boolean NOT NULL DEFAULT false, error text{RESOLVED[entity]}
+        ) ON COMMIT DROP;
+        """
+    )
+    errors = []
+    if fmt == "csv":
+        header = next(csv.reader(io.StringIO(text)), None)
+        if not header:
+            return errors
+        names = [_col(h) for h in header]
+        unknown = [h for h, n in zip(header, names) if n not in cols]
+        if unknown:
+            raise ValueError(f"{entity}: unknown column(s) {unknown}, expected {list(cols)}")
+        cur.copy_expert(
+            f"COPY imp_{entity} ({', '.join(names)}) FROM STDIN WITH (FORMAT csv, HEADER true)",
+            io.StringIO(text)
+        )
+    elif fmt == "ndjson":
+        buf = io.StringIO()
+        w = csv.writer(buf)
+        for n, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                doc = json.loads(line)
+                if not isinstance(doc, dict):
+                    raise ValueError("not an object")
+            except ValueError as e:
+                errors.append({"entity": entity, "row": n, "error": f"invalid json: {e}"})
+                continue
+            doc = {_col(k): v for k, v in doc.items()}
+            unknown = [k for k in doc if k not in cols]
+            if unknown:
+                errors.append({"entity": entity, "row": n, "error": f"unknown field(s) {unknown}"})
+                continue
+            w.writerow([n] + [None if doc.get(c) is None else str(doc[c]).lower() if isinstance(doc[c], bool)
+                              else str(doc[c]) for c in cols])
+        buf.seek(0)
+        cur.copy_expert(f"COPY imp_{entity} (row, {', '.join(cols)}) FROM STDIN WITH (FORMAT csv)", buf)
+    else:
+        raise ValueError(f"unsupported format: {fmt}")
+
+    # 앞뒤 공백 제거, 빈 문자열 → NULL
+    cur.execute(f"UPDATE imp_{entity} SET {', '.join(f'{c} = NULLIF(trim({c}), {chr(39) * 2})' for c in cols)};")
+    return errors
+
+
+def _check(cur, entity: str, rules: list[tuple[str, str]]):
+    """rules: (오류 조건 SQL, 메시지). 먼저 걸린 규칙 하나만 기록."""
+    cases = " ".join(f"WHEN {cond} THEN {msg}" for cond, msg in rules)
+    cur.execute(f"UPDATE imp_{entity} s SET error = CASE {cases} END WHERE s.error IS NULL;")
+
+
+def _num_rules(cols: tuple[str, ...], positive: tuple[str, ...] = ()) -> list[tuple[str, str]]:
+    rules = [(f"s.{c} !~ '{_NUM}'", f"'{c}: not a number'") for c in cols]
+    rules += [(f"s.{c}::numeric {'<=' if c in positive else '<'} 0",
+               f"'{c}: must be {'> 0' if c in positive else '>= 0'}'") for c in cols]
+    return rules
+
+
+def _dedupe(cur, entity: str, key: str):
+    cur.execute(
+        f"""
+        UPDATE imp_{entity} s SET error = 'duplicate in file (first at row ' || d.first_row || ')'
+        FROM (SELECT row, min(row) OVER (PARTITION BY {key}) AS first_row
+              FROM imp_{entity} WHERE error IS NULL) d
+        WHERE s.row = d.row AND d.row <> d.first_row;
+        """
+    )
+
+
+def _match_existing(cur, entity: str, table: str):
+    """이름이 같은 기존 행 → id. 기존 행이 여러 개면 오류(어느 것을 갱신할지 모름)."""
+    cur.execute(
+        f"""
+        UPDATE imp_{entity} s
+        SET id = CASE WHEN m.n = 1 THEN m.id END, existing = true,
+            error = CASE WHEN m.n > 1 THEN 'ambiguous name: ' || m.n || ' existing {table}' END
+        FROM (SELECT t.name, count(*) AS n, min(t.id::text)::uuid AS id
+              FROM {table} t JOIN imp_{entity} i ON i.name = t.name GROUP BY t.name) m
+        WHERE s.name = m.name AND s.error IS NULL;
+        """
+    )
+
+
+def _finish(cur, entity: str) -> tuple[dict, list[dict]]:
+    cur.execute(
+        f"""
+        SELECT count(*) AS rows,
+               count(*) FILTER (WHERE error IS NULL AND NOT existing) AS inserted,
+               count(*) FILTER (WHERE error IS NULL AND existing) AS updated
+        FROM imp_{entity};
+        """
+    )
+    res = cur.fetchone()
+    cur.execute(f"SELECT row, error FROM imp_{entity} WHERE error IS NOT NULL ORDER BY row;")
+    return res, [{"entity": entity, **r} for r in cur.fetchall()]
+
+
+def _suppliers(cur):
+    _check(cur, "suppliers", [
+        ("s.name IS NULL", "'name required'"),
+        (f"lower(s.is_active) NOT IN {_BOOLS}", "'is_active: not a boolean'"),
+    ])
+    _dedupe(cur, "suppliers", "name")
+    _match_existing(cur, "suppliers", "suppliers")
+    cur.execute(
+        f"""
+        UPDATE suppliers t
+        SET contact = COALESCE(s.contact, t.contact), phone = COALESCE(s.phone, t.phone),
+            email = COALESCE(s.email, t.email), address = COALESCE(s.address, t.address),
+            is_active = COALESCE({_bool("s.is_active")}, t.is_active)
+        FROM imp_suppliers s
+        WHERE s.id = t.id AND s.error IS NULL;
+
+        INSERT INTO suppliers(name, contact, phone, email, address, is_active)
+        SELECT name, contact, phone, email, address, COALESCE({_bool("is_active")}, TRUE)
+        FROM imp_suppliers WHERE error IS NULL AND NOT existing ORDER BY row;
+        """
+    )
+
+
+def _categories(cur, entity: str, cat_type: str):
+    """카테고리는 이름으로 찾고, 없으면 (id 형식이 아닌 한) 새로 만든다."""
+    cur.execute(
+        f"""
+        INSERT INTO categories(name, type)
+        SELECT DISTINCT s.category, %s FROM imp_{entity} s
+        WHERE s.error IS NULL AND s.category IS NOT NULL AND s.category !~ '{_UUID}'
+          AND NOT EXISTS (SELECT 1 FROM categories c WHERE c.name = s.category AND c.type = %s);
+        """,
+        (cat_type, cat_type)
+    )
+    created = cur.rowcount
+    _resolve(cur, entity, "category", "category_id", "categories", f" AND r.type = '{cat_type}'")
+    return created
+
+
+def _ingredients(cur):
+    _check(cur, "ingredients", [
+        ("s.name IS NULL", "'name required'"),
+        *_num_rules(("safety_stock_default", "reorder_point_default", "cost_per_unit")),
+        (f"lower(s.is_active) NOT IN {_BOOLS}", "'is_active: not a boolean'"),
+    ])
+    _dedupe(cur, "ingredients", "name")
+    _match_existing(cur, "ingredients", "ingredients")
+    created = _categories(cur, "ingredients", "ingredient")
+    _resolve(cur, "ingredients", "unit", "unit_id", "units")
+    _resolve(cur, "ingredients", "responsible_user", "responsible_user_id", "users")
+    _check(cur, "ingredients", [
+        ("s.unit IS NOT NULL AND s.unit_id IS NULL", "'unknown unit: ' || s.unit"),
+        ("s.unit IS NULL AND NOT s.existing", "'unit required'"),
+        ("s.category IS NOT NULL AND s.category_id IS NULL", "'unknown category: ' || s.category"),
+        ("s.responsible_user IS NOT NULL AND s.responsible_user_id IS NULL",
+         "'unknown user: ' || s.responsible_user"),
+        # 재고/레시피 수량이 기존 단위 기준이므로 단위 변경은 받지 않는다
+        ("s.existing AND s.unit_id IS DISTINCT FROM (SELECT unit_id FROM ingredients WHERE id = s.id)"
+         " AND s.unit_id IS NOT NULL", "'unit change not allowed: ' || s.unit"),
+    ])
+    cur.execute(
+        f"""
+        UPDATE ingredients t
+        SET category_id = COALESCE(s.category_id, t.category_id),
+            description = COALESCE(s.description, t.description),
+            safety_stock_default = COALESCE(s.safety_stock_default::numeric, t.safety_stock_default),
+            reorder_point_default = COALESCE(s.reorder_point_default::numeric, t.reorder_point_default),
+            cost_per_unit = COALESCE(s.cost_per_unit::numeric, t.cost_per_unit),
+            responsible_user_id = COALESCE(s.responsible_user_id, t.responsible_user_id),
+            is_active = COALESCE({_bool("s.is_active")}, t.is_active)
+        FROM imp_ingredients s
+        WHERE s.id = t.id AND s.error IS NULL;
+
+        INSERT INTO ingredients
+          (name, unit_id, category_id, description, safety_stock_default, reorder_point_default,
+           responsible_user_id, cost_per_unit, is_active)
+        SELECT name, unit_id, category_id, description, COALESCE(safety_stock_default::numeric, 0),
+               COALESCE(reorder_point_default::numeric, 0), responsible_user_id,
+               COALESCE(cost_per_unit::numeric, 0), COALESCE({_bool("is_active")}, TRUE)
+        FROM imp_ingredients WHERE error IS NULL AND NOT existing ORDER BY row;
+        """
+    )
+    return created
+
+
+def _menu_items(cur):
+    _check(cur, "menu_items", [
+        ("s.name IS NULL", "'name required'"),
+        ("s.price IS NULL AND NOT EXISTS (SELECT 1 FROM menu_items m WHERE m.name = s.name)", "'price required'"),
+        *_num_rules(("price",)),
+        (f"lower(s.is_active) NOT IN {_BOOLS}", "'is_active: not a boolean'"),
+    ])
+    _dedupe(cur, "menu_items", "name")
+    _match_existing(cur, "menu_items", "menu_items")
+    created = _categories(cur, "menu_items", "menu")
+    _resolve(cur, "menu_items", "default_location", "location_id", "locations")
+    _check(cur, "menu_items", [
+        ("s.category IS NOT NULL AND s.category_id IS NULL", "'unknown category: ' || s.category"),
+        ("s.default_location IS NOT NULL AND s.location_id IS NULL", "'unknown location: ' || s.default_location"),
+    ])
+    cur.execute(
+        f"""
+        UPDATE menu_items t
+        SET price = COALESCE(s.price::numeric, t.price),
+            category_id = COALESCE(s.category_id, t.category_id),
+            default_location_id = COALESCE(s.location_id, t.default_location_id),
+            is_active = COALESCE({_bool("s.is_active")}, t.is_active)
+        FROM imp_menu_items s
+        WHERE s.id = t.id AND s.error IS NULL;
+
+        INSERT INTO menu_items(name, price, category_id, default_location_id, is_active)
+        SELECT name, price::numeric, category_id, location_id, COALESCE({_bool("is_active")}, TRUE)
+        FROM imp_menu_items WHERE error IS NULL AND NOT existing ORDER BY row;
+        """
+    )
+    return created
+
+
+def _recipes(cur):
+    _check(cur, "recipes", [
+        ("s.menu_item IS NULL", "'menu_item required'"),
+        ("s.ingredient IS NULL", "'ingredient required'"),
+        ("s.qty_required IS NULL", "'qty_required required'"),
+        *_num_rules(("qty_required",), positive=("qty_required",)),
+    ])
+    # 같은 요청에서 만든 메뉴/재료도 여기서 보인다 (같은 트랜잭션)
+    _resolve(cur, "recipes", "menu_item", "menu_item_id", "menu_items")
+    _resolve(cur, "recipes", "ingredient", "ingredient_id", "ingredients")
+    _resolve(cur, "recipes", "unit", "unit_id", "units")
+    _check(cur, "recipes", [
+        ("s.menu_item_id IS NULL", "'unknown or ambiguous menu_item: ' || s.menu_item"),
+        ("s.ingredient_id IS NULL", "'unknown or ambiguous ingredient: ' || s.ingredient"),
+    ])
+    _dedupe(cur, "recipes", "menu_item_id, ingredient_id")
+    # 단위 환산: qty × 입력단위.to_base / 재료단위.to_base (base 가 같아야 함)
+    cur.execute(
+        """
+        WITH c AS (
+            SELECT s.row, s.unit, su.id AS su_id, su.name AS su_name, su.base AS su_base, su.to_base AS su_tb,
+                   iu.id AS iu_id, iu.name AS iu_name, iu.base AS iu_base, iu.to_base AS iu_tb
+            FROM imp_recipes s
+            JOIN ingredients i ON i.id = s.ingredient_id
+            LEFT JOIN units iu ON iu.id = i.unit_id
+            LEFT JOIN units su ON su.id = s.unit_id
+            WHERE s.error IS NULL
+        )
+        UPDATE imp_recipes s
+        SET qty = CASE
+                WHEN c.unit IS NULL OR c.su_id = c.iu_id THEN s.qty_required::numeric
+                WHEN c.su_base = c.iu_base AND c.su_tb > 0 AND c.iu_tb > 0
+                    THEN round(s.qty_required::numeric * c.su_tb / c.iu_tb, 6)
+            END,
+            error = CASE
+                WHEN c.unit IS NULL OR c.su_id = c.iu_id THEN NULL
+                WHEN c.su_id IS NULL THEN 'unknown unit: ' || c.unit
+                WHEN c.iu_id IS NULL THEN 'UNIT_MISMATCH ingredient without unit'
+                WHEN c.su_base <> c.iu_base OR NOT (c.su_tb > 0 AND c.iu_tb > 0)
+                    THEN 'UNIT_MISMATCH ' || c.su_name || '(' || c.su_base || ') -> '
+                         || c.iu_name || '(' || c.iu_base || ')'
+            END
+        FROM c WHERE s.row = c.row;
+        """
+    )
+    cur.execute(
+        """
+        UPDATE imp_recipes s SET existing = true
+        FROM recipes r
+        WHERE r.menu_item_id = s.menu_item_id AND r.ingredient_id = s.ingredient_id AND s.error IS NULL;
+
+        INSERT INTO recipes(menu_item_id, ingredient_id, qty_required)
+        SELECT menu_item_id, ingredient_id, qty FROM imp_recipes
+        WHERE error IS NULL
+        ORDER BY menu_item_id, ingredient_id
+        ON CONFLICT (menu_item_id, ingredient_id)
+        DO UPDATE SET qty_required = EXCLUDED.qty_required;
+        """
+    )
+
+
+_STEPS = {"suppliers": _suppliers, "ingredients": _ingredients, "menu_items": _menu_items, "recipes": _recipes}
+
+
+def import_catalog(files: dict[str, tuple[str, str]], dry_run: bool = False) -> dict:
+    """
+    files: {entity: (format, text)}  format = csv | ndjson
+    CSV 헤더/NDJSON 키: COLUMNS (…_id 별칭 허용). 참조 컬럼은 이름 또는 id.
+    """
+    unknown = [e for e in files if e not in COLUMNS]
+    if unknown:
+        raise ValueError(f"unknown entity: {unknown}, expected {list(ORDER)}")
+    out = {"dry_run": dry_run, "entities": {}, "categories_created": 0, "errors": []}
+    with get_cursor(commit=not dry_run) as cur:
+        for entity in ORDER:
+            if entity not in files:
+                continue
+            fmt, text = files[entity]
+            parse_errors = _stage(cur, entity, fmt, text)
+            out["categories_created"] += _STEPS[entity](cur) or 0
+            counts, errors = _finish(cur, entity)
+            counts["rows"] += len(parse_errors)
+            counts["errors"] = len(parse_errors) + len(errors)
+            out["entities"][entity] = counts
+            out["errors"] += sorted(parse_errors + errors, key=lambda e: e["row"])
+    if not dry_run:
+        invalidate("categories", "ref_ingredients", "ref_menu_items", "ref_suppliers")
+    logger.info("catalog import%s: %s", " (dry run)" if dry_run else "", out["entities"])
+    return out
@@ -1,23 +1,30 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from backend.core.exceptions import db_error
+from backend.core.paging import PageParams, page_params, page_response
 from .schema import (
-    CategoryIn, SupplierIn, IngredientIn, MenuItemIn, RecipeUpsert
+    CategoryIn, SupplierIn, IngredientIn, MenuItemIn, RecipeUpsert, CatalogImportIn,
+    RecipeReplaceIn, RecipesReplaceIn
 )
+from .bulk import COLUMNS, import_catalog
 from .service import (
-    list_categories, create_category,
+    page_categories, create_category,
     list_suppliers, create_supplier, deactivate_supplier,
-    ref_units, ref_locations, ref_users, ref_ingredients,
+    ref_units, ref_locations, ref_users, ref_ingredients, ref_menu_items, ref_suppliers,
     create_ingredient, list_menu_items, create_menu_item,
-    list_recipes, upsert_recipe, delete_recipe
+    list_recipes, upsert_recipe, delete_recipe, replace_recipe, replace_recipes
 )
 
 router = APIRouter()
 
 # ---- categories ----
 @router.get("/categories")
-def get_categories(type: str | None = Query(default=None, alias="type")):
+def get_categories(response: Response, type: str | None = Query(default=None, alias="type"),
+                   page: PageParams = Depends(page_params)):
     try:
-        return list_categories(type)
+        return page_response(response, page_categories(type, page))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise db_error(e)
 
@@ -30,9 +37,11 @@ def post_category(body: CategoryIn):
 
 # ---- suppliers ----
 @router.get("/suppliers")
-def get_suppliers(active_only: bool = False):
+def get_suppliers(response: Response, active_only: bool = False, page: PageParams = Depends(page_params)):
     try:
-        return list_suppliers(active_only=active_only)
+        return page_response(response, list_suppliers(active_only, page))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise db_error(e)
 
@@ -79,6 +88,20 @@ def get_ref_ingredients(active_only: bool = True):
     except Exception as e:
         raise db_error(e)
 
+@router.get("/ref/menu_items")
+def get_ref_menu_items():
+    try:
+        return ref_menu_items()
+    except Exception as e:
+        raise db_error(e)
+
+@router.get("/ref/suppliers")
+def get_ref_suppliers():
+    try:
+        return ref_suppliers()
+    except Exception as e:
+        raise db_error(e)
+
 # ---- ingredients ----
 @router.post("/ingredients")
 def post_ingredient(body: IngredientIn):
@@ -89,9 +112,11 @@ def post_ingredient(body: IngredientIn):
 
 # ---- menu & recipes ----
 @router.get("/menu_items")
-def get_menu_items(active_only: bool = True):
+def get_menu_items(response: Response, active_only: bool = True, page: PageParams = Depends(page_params)):
     try:
-        return list_menu_items(active_only=active_only)
+        return page_response(response, list_menu_items(active_only, page))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise db_error(e)
 
@@ -112,13 +137,58 @@ def get_recipes(menu_item_id: str):
 @router.post("/recipes")
 def post_recipe(body: RecipeUpsert):
     try:
-        return upsert_recipe(body.menu_item_id, body.ingredient_id, body.qty_required)
+        return upsert_recipe(body.menu_item_id, body.ingredient_id, body.qty_required, body.unit_id)
     except Exception as e:
         raise db_error(e)
 
+def _replace(fn, *args):
+    try:
+        res = fn(*args)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise db_error(e)
+    if res is None:
+        raise HTTPException(status_code=404, detail="menu item not found")
+    return res
+
+@router.put("/recipes/{menu_item_id}")
+def put_recipe(menu_item_id: str, body: RecipeReplaceIn):
+    return _replace(replace_recipe, menu_item_id, [l.model_dump() for l in body.lines])
+
+@router.put("/recipes")
+def put_recipes(body: RecipesReplaceIn):
+    return _replace(replace_recipes, [r.model_dump() for r in body.recipes])
+
 @router.delete("/recipes/{menu_item_id}/{ingredient_id}")
 def del_recipe(menu_item_id: str, ingredient_id: str):
     try:
         return delete_recipe(menu_item_id, ingredient_id)
     except Exception as e:
         raise db_error(e)
+
+# ---- bulk import ----
+def _import(files: dict, dry_run: bool):
+    try:
+        return import_catalog(files, dry_run)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise db_error(e)
+
+@router.post("/catalog/import")
+def post_catalog_import(body: CatalogImportIn):
+    """여러 엔티티를 한 트랜잭션으로 (레시피가 같은 요청의 재료/메뉴를 이름으로 참조 가능)."""
+    files = {e: (body.format, getattr(body, e)) for e in COLUMNS if getattr(body, e)}
+    return _import(files, body.dry_run)
+
+@router.post("/catalog/import/{entity}")
+async def post_catalog_import_entity(entity: str, request: Request,
+                                     format: str | None = Query(default=None, pattern="^(csv|ndjson)$"),
+                                     dry_run: bool = False):
+    """본문 그대로 (text/csv 또는 application/x-ndjson)."""
+    if entity not in COLUMNS:
+        raise HTTPException(status_code=404, detail=f"unknown entity: {entity}")
+    fmt = format or ("ndjson" if "ndjson" in request.headers.get("content-type", "") else "csv")
+    text = (await request.body()).decode("utf-8-sig")
+    return await run_in_threadpool(_import, {entity: (fmt, text)}, dry_run)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Literal, Optional
 
 # Categories
 class CategoryIn(BaseModel):
@@ -45,3 +45,27 @@ class RecipeUpsert(BaseModel):
     menu_item_id: str
     ingredient_id: str
     qty_required: float
+    unit_id: Optional[str] = None   # id 또는 이름 (예: "g"). 없으면 재료 단위
+
+class RecipeLineIn(BaseModel):
+    ingredient_id: str
+    qty_required: float
+    unit_id: Optional[str] = None
+
+class RecipeReplaceIn(BaseModel):
+    lines: List[RecipeLineIn]       # 메뉴의 레시피 전체 (빠진 재료는 삭제)
+
+class MenuRecipeIn(RecipeReplaceIn):
+    menu_item_id: str
+
+class RecipesReplaceIn(BaseModel):
+    recipes: List[MenuRecipeIn]
+
+# Bulk import (엔티티별 CSV 또는 NDJSON 본문)
+class CatalogImportIn(BaseModel):
+    format: Literal["csv", "ndjson"] = "csv"
+    suppliers: Optional[str] = None
+    ingredients: Optional[str] = None
+    menu_items: Optional[str] = None
+    recipes: Optional[str] = None
+    dry_run: bool = False
@@ -1,6 +1,16 @@
+import uuid
+
+from backend.core.cache import ref_cache, invalidate
 from backend.core.db import get_cursor
+from backend.core.paging import PageParams, PageResult, fetch_page
+from backend.core.replicas import read_cursor
+from backend.units.service import normalize_lines
+
+# 기준정보 캐시(@ref_cache)는 primary에서 채운다. 쓰기 직후 invalidate 한 뒤 복제본에서 다시 읽으면
+# 아직 반영 안 된 목록이 REF_CACHE_TTL 동안 캐시에 남는다.
 
 # ---------- Categories ----------
+@ref_cache("categories")
 def list_categories(cat_type: str | None = None):
     with get_cursor() as cur:
         if cat_type:
@@ -9,22 +19,36 @@ def list_categories(cat_type: str | None = None):
             cur.execute("SELECT * FROM categories ORDER BY type, name;")
         return cur.fetchall()
 
+def page_categories(cat_type: str | None, page: PageParams) -> PageResult:
+    # 페이지/정렬/검색 없이 부르면 캐시된 전체 목록 (옵션 목록용)
+    if page == PageParams():
+        rows = list_categories(cat_type)
+        return PageResult(rows, len(rows))
+    where, params = [], []
+    if cat_type:
+        where.append("type=%s"); params.append(cat_type)
+    with read_cursor() as cur:
+        return fetch_page(cur, "SELECT * FROM categories", where, params, page,
+                          sortable={"name": "name", "type": "type"}, default_sort="type,name",
+                          tiebreak="id", search=("name",))
+
 def create_category(name: str, cat_type: str):
     with get_cursor(commit=True) as cur:
         cur.execute(
             "INSERT INTO categories(name, type) VALUES (%s, %s) RETURNING *;",
             (name, cat_type)
         )
-        return cur.fetchone()
+        row = cur.fetchone()
+    invalidate("categories")
+    return row
 
 # ---------- Suppliers ----------
-def list_suppliers(active_only: bool = False):
-    with get_cursor() as cur:
-        if active_only:
-            cur.execute("SELECT * FROM suppliers WHERE is_active=TRUE ORDER BY name;")
-        else:
-            cur.execute("SELECT * FROM suppliers ORDER BY name;")
-        return cur.fetchall()
+def list_suppliers(active_only: bool = False, page: PageParams | None = None) -> PageResult:
+    with read_cursor() as cur:
+        return fetch_page(cur, "SELECT * FROM suppliers", ["is_active=TRUE"] if active_only else [], [],
+                          page or PageParams(),
+                          sortable={"name": "name", "contact": "contact", "is_active": "is_active"},
+                          default_sort="name", tiebreak="id", search=("name", "contact", "phone", "email"))
 
 def create_supplier(data: dict):
     with get_cursor(commit=True) as cur:
@@ -37,29 +61,37 @@ def create_supplier(data: dict):
             (data["name"], data.get("contact"), data.get("phone"),
              data.get("email"), data.get("address"), data.get("is_active"))
         )
-        return cur.fetchone()
+        row = cur.fetchone()
+    invalidate("ref_suppliers")
+    return row
 
 def deactivate_supplier(supplier_id: str):
     with get_cursor(commit=True) as cur:
         cur.execute("UPDATE suppliers SET is_active=FALSE WHERE id=%s RETURNING *;", (supplier_id,))
-        return cur.fetchone()
+        row = cur.fetchone()
+    invalidate("ref_suppliers")
+    return row
 
 # ---------- Units / Locations / Users (ref) ----------
+@ref_cache("ref_units")
 def ref_units():
     with get_cursor() as cur:
         cur.execute("SELECT id, name, base, to_base FROM units ORDER BY name;")
         return cur.fetchall()
 
+@ref_cache("ref_locations")
 def ref_locations():
     with get_cursor() as cur:
         cur.execute("SELECT id, name FROM locations WHERE is_active=TRUE ORDER BY name;")
         return cur.fetchall()
 
+@ref_cache("ref_users")
 def ref_users():
     with get_cursor() as cur:
         cur.execute("SELECT id, name FROM users WHERE is_active=TRUE ORDER BY name;")
         return cur.fetchall()
 
+@ref_cache("ref_ingredients")
 def ref_ingredients(active_only: bool = True):
     with get_cursor() as cur:
         if active_only:
@@ -68,6 +100,18 @@ def ref_ingredients(active_only: bool = True):
             cur.execute("SELECT id, name FROM ingredients ORDER BY name;")
         return cur.fetchall()
 
+@ref_cache("ref_menu_items")
+def ref_menu_items():
+    with get_cursor() as cur:
+        cur.execute("SELECT id, name FROM menu_items WHERE is_active=TRUE ORDER BY name;")
+        return cur.fetchall()
+
+@ref_cache("ref_suppliers")
+def ref_suppliers():
+    with get_cursor() as cur:
+        cur.execute("SELECT id, name FROM suppliers WHERE is_active=TRUE ORDER BY name;")
+        return cur.fetchall()
+
 # ---------- Ingredients ----------
 def create_ingredient(data: dict):
     with get_cursor(commit=True) as cur:
@@ -85,16 +129,17 @@ def create_ingredient(data: dict):
              data.get("reorder_point_default", 0), data.get("responsible_user_id"),
              data.get("cost_per_unit", 0))
         )
-        return cur.fetchone()
+        row = cur.fetchone()
+    invalidate("ref_ingredients")
+    return row
 
 # ---------- Menu & Recipes ----------
-def list_menu_items(active_only: bool = False):
-    with get_cursor() as cur:
-        if active_only:
-            cur.execute("SELECT * FROM menu_items WHERE is_active=TRUE ORDER BY name;")
-        else:
-            cur.execute("SELECT * FROM menu_items ORDER BY name;")
-        return cur.fetchall()
+def list_menu_items(active_only: bool = False, page: PageParams | None = None) -> PageResult:
+    with read_cursor() as cur:
+        return fetch_page(cur, "SELECT * FROM menu_items", ["is_active=TRUE"] if active_only else [], [],
+                          page or PageParams(),
+                          sortable={"name": "name", "price": "price", "is_active": "is_active"},
+                          default_sort="name", tiebreak="id", search=("name",))
 
 def create_menu_item(data: dict):
     with get_cursor(commit=True) as cur:
@@ -106,7 +151,9 @@ def create_menu_item(data: dict):
             (data["name"], data["price"], data.get("category_id"),
              data.get("default_location_id"), data.get("is_active", True))
         )
-        return cur.fetchone()
+        row = cur.fetchone()
+    invalidate("ref_menu_items")
+    return row
 
 def list_recipes(menu_item_id: str):
     with get_cursor() as cur:
@@ -123,7 +170,11 @@ def list_recipes(menu_item_id: str):
         )
         return cur.fetchall()
 
-def upsert_recipe(menu_item_id: str, ingredient_id: str, qty_required: float):
+def upsert_recipe(menu_item_id: str, ingredient_id: str, qty_required: float, unit_id: str | None = None):
+    # unit_id가 있으면 재료의 재고 단위로 환산해 저장 (판매 차감은 재고 단위 기준)
+    line = normalize_lines([{"ingredient_id": ingredient_id, "qty_required": qty_required, "unit_id": unit_id}],
+                           qty_keys=("qty_required",), cost_key=None)[0]
+    qty_required = line["qty_required"]
     with get_cursor(commit=True) as cur:
         cur.execute(
             """
@@ -137,6 +188,97 @@ def upsert_recipe(menu_item_id: str, ingredient_id: str, qty_required: float):
         )
         return cur.fetchone()
 
+def _uuid(v, what: str) -> str:
+    """대소문자/중괄호/하이픈 없는 표기를 DB가 돌려주는 표준 문자열로 맞춘다."""
+    try:
+        return str(uuid.UUID(str(v)))
+    except ValueError:
+        raise ValueError(f"invalid {what}: {v}")
+
+def replace_recipes(recipes: list[dict]) -> dict | None:
+    """
+    메뉴별 레시피 전체를 받아 현재 recipes 와의 차이(추가/수정/삭제)를 한 문장으로 반영한다.
+    recipes: [{menu_item_id, lines: [{ingredient_id, qty_required, unit_id(선택)}]}]
+    lines 가 빈 메뉴는 레시피를 모두 지운다. 메뉴가 하나라도 없으면 None.
+    """
+    menu_ids = [_uuid(r["menu_item_id"], "menu_item_id") for r in recipes]
+    if len(set(menu_ids)) != len(menu_ids):
+        raise ValueError("duplicate menu_item_id")
+    lines = []
+    for menu_id, r in zip(menu_ids, recipes):
+        seen = set()
+        for ln in r["lines"]:
+            ing = _uuid(ln["ingredient_id"], "ingredient_id")
+            if ing in seen:
+                raise ValueError(f"duplicate ingredient {ing} in recipe {menu_id}")
+            if float(ln["qty_required"]) <= 0:
+                raise ValueError(f"qty_required must be > 0 (ingredient {ing})")
+            seen.add(ing)
+            lines.append({**ln, "ingredient_id": ing, "menu_item_id": menu_id})
+    lines = normalize_lines(lines, qty_keys=("qty_required",), cost_key=None)
+
+    with get_cursor(commit=True) as cur:
+        # 같은 메뉴를 동시에 바꾸는 요청은 줄 세운다 (FK 검사용 KEY SHARE 와는 충돌하지 않는 잠금)
+        cur.execute(
+            "SELECT id FROM menu_items WHERE id = ANY(%s::uuid[]) ORDER BY id FOR NO KEY UPDATE;",
+            (menu_ids,)
+        )
+        if cur.rowcount != len(menu_ids):
+            return None
+        cur.execute(
+            """
+            WITH new AS (
+                SELECT * FROM unnest(%s::uuid[], %s::uuid[], %s::numeric[])
+                    AS n(menu_item_id, ingredient_id, qty_required)
+            ),
+            del AS (
+                DELETE FROM recipes r
+                WHERE r.menu_item_id = ANY(%s::uuid[])
+                  AND NOT EXISTS (SELECT 1 FROM new n
+                                  WHERE n.menu_item_id = r.menu_item_id AND n.ingredient_id = r.ingredient_id)
+                RETURNING 1
+            ),
+            up AS (
+                INSERT INTO recipes AS r (menu_item_id, ingredient_id, qty_required)
+                SELECT menu_item_id, ingredient_id, qty_required FROM new
+                ORDER BY menu_item_id, ingredient_id
+                ON CONFLICT (menu_item_id, ingredient_id)
+                DO UPDATE SET qty_required = EXCLUDED.qty_required
+                WHERE r.qty_required IS DISTINCT FROM EXCLUDED.qty_required
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT (SELECT count(*) FROM up WHERE inserted) AS inserted,
+                   (SELECT count(*) FROM up WHERE NOT inserted) AS updated,
+                   (SELECT count(*) FROM del) AS deleted;
+            """,
+            ([ln["menu_item_id"] for ln in lines], [str(ln["ingredient_id"]) for ln in lines],
+             [ln["qty_required"] for ln in lines], menu_ids)
+        )
+        res = cur.fetchone()
+        cur.execute(
+            """
+            SELECT r.menu_item_id, r.ingredient_id, r.qty_required,
+                   i.name AS ingredient_name
+            FROM recipes r
+            JOIN ingredients i ON i.id = r.ingredient_id
+            WHERE r.menu_item_id = ANY(%s::uuid[])
+            ORDER BY r.menu_item_id, ingredient_name;
+            """,
+            (menu_ids,)
+        )
+        by_menu = {m: [] for m in menu_ids}
+        for row in cur.fetchall():
+            by_menu[str(row["menu_item_id"])].append(row)
+    res["recipes"] = [{"menu_item_id": m, "lines": by_menu[m]} for m in menu_ids]
+    return res
+
+def replace_recipe(menu_item_id: str, lines: list[dict]) -> dict | None:
+    res = replace_recipes([{"menu_item_id": menu_item_id, "lines": lines}])
+    if res is None:
+        return None
+    return {"menu_item_id": res["recipes"][0]["menu_item_id"], "inserted": res["inserted"], "updated": res["updated"],
+            "deleted": res["deleted"], "lines": res["recipes"][0]["lines"]}
+
 def delete_recipe(menu_item_id: str, ingredient_id: str):
     with get_cursor(commit=True) as cur:
         cur.execute(
@@ -0,0 +1,64 @@
+"""
+기준정보(단위/매장/사용자/재료 목록) 용 프로세스 내 TTL 캐시.
+
+    @ref_cache("ref_units")
+    def ref_units(): ...
+
+    invalidate("ref_ingredients")   # 쓰기 후 해당 워커 캐시 즉시 무효화
+
+워커마다 따로 들고 있으므로 다른 워커의 쓰기는 최대 REF_CACHE_TTL초 뒤에 반영된다.
+warm_caches()는 인자 없는 기본 호출을 미리 한 번씩 채워 둔다 (lifespan 기동 시).
+무거운 집계처럼 기동 때 돌리면 안 되는 것은 @ref_cache(..., warm=False).
+"""
+import threading
+import time
+from functools import wraps
+
+from backend.core.config import REF_CACHE_TTL
+from backend.core.logger import logger
+
+_caches: dict[str, dict] = {}
+_loaders: dict = {}
+_lock = threading.Lock()
+
+
+def ref_cache(name: str, ttl: float | None = None, warm: bool = True):
+    def deco(fn):
+        store = _caches.setdefault(name, {})
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if REF_CACHE_TTL <= 0:
+                return fn(*args, **kwargs)
+            key = (args, tuple(sorted(kwargs.items())))
+            hit = store.get(key)
+            now = time.monotonic()
+            if hit is not None and hit[0] > now:
+                return hit[1]
+            value = fn(*args, **kwargs)
+            with _lock:
+                store[key] = (now + (ttl if ttl is not None else REF_CACHE_TTL), value)
+            return value
+
+        wrapper.uncached = fn
+        if warm:
+            _loaders[name] = wrapper
+        return wrapper
+    return deco
+
+
+def invalidate(*names: str):
+    with _lock:
+        for name in names or list(_caches):
+            _caches.get(name, {}).clear()
+
+
+def warm_caches() -> list[str]:
+    warmed = []
+    for name, loader in list(_loaders.items()):
+        try:
+            loader()
+            warmed.append(name)
+        except Exception as e:
+            logger.warning("cache warmup failed for %s: %s", name, e)
+    return warmed
@@ -16,3 +16,105 @@ DB_DSN = (
     f"host={DB_HOST} port={DB_PORT} dbname={DB_NAME} "
     f"user={DB_USER} password={DB_PASSWORD}"
 )
+
+# 읽기 전용 복제본 (선택). libpq DSN/URI 를 ';' 로 구분. 비어 있으면 모든 조회가 primary로 간다.
+DB_REPLICA_DSNS = [d.strip() for d in os.getenv("DB_REPLICA_DSNS", "").split(";") if d.strip()]
+DB_REPLICA_POOL_MAX = int(os.getenv("DB_REPLICA_POOL_MAX", os.getenv("DB_POOL_MAX", "10")))
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))   # 쓰기 직후 이 시간 동안은 primary에서 읽기
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))     # 이보다 밀리면 제외
+REPLICA_CHECK_SECONDS = float(os.getenv("REPLICA_CHECK_SECONDS", "2"))
+REPLICA_EJECT_SECONDS = float(os.getenv("REPLICA_EJECT_SECONDS", "30"))         # 조회 중 오류 시 제외 시간
+
+# 사용량 롤업(inventory_tx 집계)
+ROLLUP_TZ = os.getenv("ROLLUP_TZ", "Asia/Seoul")
+ROLLUP_LAG_SECONDS = int(os.getenv("ROLLUP_LAG_SECONDS", "120"))
+ROLLUP_BACKFILL_WORKERS = int(os.getenv("ROLLUP_BACKFILL_WORKERS", "4"))
+ROLLUP_BACKFILL_CHUNK_DAYS = int(os.getenv("ROLLUP_BACKFILL_CHUNK_DAYS", "7"))
+
+# 판매 시간별 롤업(sales_hourly): 추이 조회 기본 기간. 갱신/백필은 위 ROLLUP_* 설정을 같이 쓴다
+SALES_TREND_DAYS = int(os.getenv("SALES_TREND_DAYS", "90"))
+
+# 로트/유통기한 (inventory_tx 를 워터마크 이후부터 로트에 FEFO 반영)
+LOT_LAG_SECONDS = int(os.getenv("LOT_LAG_SECONDS", str(ROLLUP_LAG_SECONDS)))
+LOT_REFRESH_CHUNK_MINUTES = int(os.getenv("LOT_REFRESH_CHUNK_MINUTES", "60"))  # 한 트랜잭션에 반영할 원장 구간
+LOT_EXPIRING_DAYS = int(os.getenv("LOT_EXPIRING_DAYS", "3"))     # 임박 조회 기본 일수
+
+# 시점 재고(as-of) 체크포인트: (재료, 지점) 잔량을 주기적으로 저장해 두고 가까운 체크포인트 ± 원장으로 답한다
+CHECKPOINT_LAG_SECONDS = int(os.getenv("CHECKPOINT_LAG_SECONDS", str(ROLLUP_LAG_SECONDS)))
+CHECKPOINT_INTERVAL_MINUTES = int(os.getenv("CHECKPOINT_INTERVAL_MINUTES", "60"))  # 이보다 자주 호출되면 건너뜀
+
+# 원장 정합성 검사: inventory_tx 를 다시 합산해 inventory 와 비교 (지점 묶음별 프로세스 병렬, 이어서 실행)
+LEDGER_CHECK_WORKERS = int(os.getenv("LEDGER_CHECK_WORKERS", str(ROLLUP_BACKFILL_WORKERS)))
+LEDGER_CHECK_CHUNK_DAYS = int(os.getenv("LEDGER_CHECK_CHUNK_DAYS", "7"))   # 한 트랜잭션에 합산할 원장 구간
+LEDGER_CHECK_LAG_SECONDS = int(os.getenv("LEDGER_CHECK_LAG_SECONDS", str(ROLLUP_LAG_SECONDS)))
+
+# 목록 API 페이지 (backend/core/paging.py)
+PAGE_LIMIT_MAX = int(os.getenv("PAGE_LIMIT_MAX", "500"))
+PAGE_EXACT_COUNT_MAX = int(os.getenv("PAGE_EXACT_COUNT_MAX", "1000"))  # 추정 건수가 이 이하면 정확히 센다
+
+# 대시보드 KPI (GET /dashboard/kpis): 워커별 캐시 시간
+DASHBOARD_CACHE_SECONDS = float(os.getenv("DASHBOARD_CACHE_SECONDS", "15"))
+
+# 타입어헤드 검색 (프로세스 내 접두어 색인 + pg_trgm 유사도 보충)
+SEARCH_LIMIT_MAX = int(os.getenv("SEARCH_LIMIT_MAX", "50"))
+SEARCH_FUZZY_MIN_CHARS = int(os.getenv("SEARCH_FUZZY_MIN_CHARS", "2"))   # 이보다 짧으면 DB 유사도 검색 안 함
+SEARCH_WORD_SIMILARITY = float(os.getenv("SEARCH_WORD_SIMILARITY", "0.3"))
+SEARCH_TRGM_CHECK_SECONDS = float(os.getenv("SEARCH_TRGM_CHECK_SECONDS", "60"))   # pg_trgm/색인 유무 재확인 주기
+
+# inventory_tx / audit_logs 월 단위 파티션 및 아카이브
+PARTITION_TZ = os.getenv("PARTITION_TZ", ROLLUP_TZ)
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "./archive")
+ARCHIVE_AFTER_MONTHS = int(os.getenv("ARCHIVE_AFTER_MONTHS", "12"))
+ARCHIVE_FORMAT = os.getenv("ARCHIVE_FORMAT", "csv")  # csv | parquet
+
+# 요청/DB 계측
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+METRICS_QUERY_WARN = int(os.getenv("METRICS_QUERY_WARN", "50"))  # 요청당 쿼리 수 경고 임계치 (N+1 탐지)
+
+# 슬로우 쿼리 로그 (opt-in)
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", "0") == "1"
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_EXPLAIN_SAMPLE = float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE", "0"))  # 0~1, 느린 SELECT를 EXPLAIN ANALYZE로 재실행할 확률
+SLOW_QUERY_EXPLAIN_INTERVAL = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", "60"))  # 같은 쿼리 EXPLAIN 최소 간격(초)
+SLOW_QUERY_TOP_N = int(os.getenv("SLOW_QUERY_TOP_N", "50"))
+SLOW_QUERY_MAX_FINGERPRINTS = int(os.getenv("SLOW_QUERY_MAX_FINGERPRINTS", "2000"))
+
+# 커넥션 풀 (워커 프로세스마다 하나)
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "2"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))       # 빈 커넥션을 기다리는 최대 시간(초)
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "5"))
+
+# 서버 실행 모드: dev(reload, 1 프로세스) / prod(워커 N개, reload 없음)
+SERVER_MODE = os.getenv("SERVER_MODE", "dev")
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", str(os.cpu_count() or 1)))
+GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", "20"))       # 종료 시 진행 중 요청을 기다리는 시간(초)
+REF_CACHE_TTL = float(os.getenv("REF_CACHE_TTL", "60"))          # 기준정보(단위/매장/사용자/재료) 캐시
+
+# liveness / readiness
+HEALTH_REFRESH_SECONDS = float(os.getenv("HEALTH_REFRESH_SECONDS", "2"))
+READY_MAX_POOL_SATURATION = float(os.getenv("READY_MAX_POOL_SATURATION", "1.0"))  # in_use/size 이 값 이상 + 대기자 있으면 not ready
+
+# Idempotency-Key (POST /sales, /inventory/stock_change)
+IDEMPOTENCY_TTL_HOURS = float(os.getenv("IDEMPOTENCY_TTL_HOURS", "24"))
+IDEMPOTENCY_LRU_SIZE = int(os.getenv("IDEMPOTENCY_LRU_SIZE", "10000"))
+IDEMPOTENCY_CLEANUP_SECONDS = float(os.getenv("IDEMPOTENCY_CLEANUP_SECONDS", "300"))
+
+# 판매 group commit: 창(ms) 안에 들어온 판매를 한 트랜잭션으로 묶는다 (기본 끔)
+# Idempotency-Key 가 있는 판매도 배치로 간다 (키는 배치 트랜잭션에서 기록). 이미 열린 트랜잭션 안의
+# 호출(POST /sales/batch 의 판매별 idempotent() 등)만 배치를 건너뛴다.
+# 재료별 합산 차감은 sale_items 트리거에 조건을 건 뒤에만 켜진다: python -m backend.sales guard-trigger
+SALE_GROUP_COMMIT = os.getenv("SALE_GROUP_COMMIT", "0") == "1"
+SALE_GROUP_COMMIT_WINDOW_MS = float(os.getenv("SALE_GROUP_COMMIT_WINDOW_MS", "3"))
+SALE_GROUP_COMMIT_MAX_BATCH = int(os.getenv("SALE_GROUP_COMMIT_MAX_BATCH", "64"))
+SALE_GROUP_COMMIT_TIMEOUT = float(os.getenv("SALE_GROUP_COMMIT_TIMEOUT", "30"))  # 배치에 들어가기 전 대기 한도 (넘으면 503)
+
+# 매장 오프라인 버퍼 동기화 (POST /sales/batch): 한 번에 받는 판매 수
+SALE_BATCH_MAX = int(os.getenv("SALE_BATCH_MAX", "200"))
+
+# 인기 재료 재고 스트라이프 (재고 행 잠금 경합 분산, 기본 끔)
+STOCK_STRIPES = os.getenv("STOCK_STRIPES", "0") == "1"
+STOCK_STRIPE_COUNT = int(os.getenv("STOCK_STRIPE_COUNT", "8"))
+STOCK_STRIPE_SHARE = float(os.getenv("STOCK_STRIPE_SHARE", "0.8"))
+STOCK_STRIPE_HOT_DAYS = int(os.getenv("STOCK_STRIPE_HOT_DAYS", "7"))
@@ -1,22 +1,339 @@
 import os
+import threading
+import time
+import weakref
+from collections import deque
+from contextvars import ContextVar
+from functools import lru_cache
 import psycopg2
+import psycopg2.errors
+import psycopg2.extensions
 import psycopg2.extras
 from contextlib import contextmanager
+from backend.core.config import (
+    DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASSWORD, DB_CONNECT_TIMEOUT,
+    DB_POOL_MIN, DB_POOL_MAX, DB_POOL_TIMEOUT, SLOW_QUERY_LOG,
+)
+from backend.core.logger import logger
+from backend.core.metrics import record_query
+from backend.core import slowlog
 
-@contextmanager
-def get_cursor():
-    conn = psycopg2.connect(
-        host=os.getenv("DB_HOST", "localhost"),
-        dbname=os.getenv("DB_NAME", "cafeinven"),
-        user=os.getenv("DB_USER", "postgres"),
-        password=os.getenv("DB_PASSWORD", "capstone1234"),
-        port=os.getenv("DB_PORT", 5432),
+# ---------- 계측 커서 ----------
+class InstrumentedCursorMixin:
+    """
+    execute/executemany/copy 시간을 재서 요청 단위 통계(core.metrics)에 누적.
+    SLOW_QUERY_LOG=1 이면 execute/executemany는 슬로우 쿼리 로그(core.slowlog)에도 넘긴다.
+    """
+
+    def execute(self, query, vars=None):
+        t0 = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            elapsed = time.perf_counter() - t0
+            record_query(elapsed, self.rowcount)
+            if SLOW_QUERY_LOG:
+                slowlog.observe(self, query, vars, elapsed, self.rowcount)
+
+    def executemany(self, query, vars_list):
+        t0 = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            elapsed = time.perf_counter() - t0
+            record_query(elapsed, self.rowcount)
+            if SLOW_QUERY_LOG:
+                slowlog.observe(self, query, vars_list, elapsed, self.rowcount, many=True)
+
+    def callproc(self, procname, vars=None):
+        t0 = time.perf_counter()
+        try:
+            return super().callproc(procname, vars)
+        finally:
+            record_query(time.perf_counter() - t0, self.rowcount)
+
+    def copy_expert(self, sql, file, size=8192):
+        t0 = time.perf_counter()
+        try:
+            return super().copy_expert(sql, file, size)
+        finally:
+            record_query(time.perf_counter() - t0, self.rowcount)
+
+
+@lru_cache(maxsize=None)
+def instrumented(factory):
+    if issubclass(factory, InstrumentedCursorMixin):
+        return factory
+    return type(f"Instrumented{factory.__name__}", (InstrumentedCursorMixin, factory), {})
+
+
+class InstrumentedConnection(psycopg2.extensions.connection):
+    """cursor_factory를 지정하든 안 하든 계측 커서를 돌려주는 커넥션."""
+
+    def cursor(self, *args, **kwargs):
+        factory = kwargs.get("cursor_factory") or self.cursor_factory or psycopg2.extensions.cursor
+        kwargs["cursor_factory"] = instrumented(factory)
+        return super().cursor(*args, **kwargs)
+
+
+# ---------- 커넥션 풀 ----------
+def connect(instrumented: bool = True, dsn: str | None = None, **kwargs):
+    """풀을 거치지 않는 단독 커넥션 (헬스 체크 등). dsn이 없으면 primary."""
+    if instrumented:
+        kwargs.setdefault("connection_factory", InstrumentedConnection)
+    if dsn:
+        return psycopg2.connect(dsn, connect_timeout=DB_CONNECT_TIMEOUT, **kwargs)
+    return psycopg2.connect(
+        host=DB_HOST, port=DB_PORT, dbname=DB_NAME, user=DB_USER, password=DB_PASSWORD,
+        connect_timeout=DB_CONNECT_TIMEOUT, **kwargs,
     )
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """
+    워커 프로세스당 하나. 최대 maxconn개, 비어 있으면 timeout초까지 기다렸다가 DB_POOL_EXHAUSTED.
+    반납 시 열린 트랜잭션은 롤백한다 (세션 단위 SET은 쓰지 말고 SET LOCAL로).
+    """
+
+    def __init__(self, minconn: int, maxconn: int, timeout: float, dsn: str | None = None):
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.pid = os.getpid()
+        self.closed = False
+        self.in_use = 0
+        self.waiting = 0
+        self.timeouts = 0
+        self._idle: deque = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(maxconn)
+
+    def getconn(self):
+        with self._lock:
+            self.waiting += 1
+        ok = self._slots.acquire(timeout=self.timeout)
+        with self._lock:
+            self.waiting -= 1
+            if not ok:
+                self.timeouts += 1
+        if not ok:
+            raise PoolTimeout(f"DB_POOL_EXHAUSTED ({self.maxconn} connections busy for {self.timeout}s)")
+        try:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None or conn.closed:
+                conn = connect(dsn=self.dsn)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.in_use += 1
+        return conn
+
+    def putconn(self, conn):
+        try:
+            if not conn.closed:
+                status = conn.info.transaction_status
+                if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                    conn.close()
+                elif status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+                if not conn.closed and conn.autocommit:
+                    conn.autocommit = False
+        except Exception:
+            conn.close()
+        with self._lock:
+            self.in_use -= 1
+            keep = not conn.closed and not self.closed and os.getpid() == self.pid
+            if keep:
+                self._idle.append(conn)
+        if not keep and not conn.closed:
+            conn.close()
+        self._slots.release()
+
+    def warm(self, n: int | None = None) -> int:
+        """기동 시 n개를 미리 열어 둔다 (첫 요청이 connect 비용을 내지 않도록)."""
+        conns = []
+        try:
+            for _ in range(min(n if n is not None else self.minconn, self.maxconn)):
+                conn = self.getconn()
+                conns.append(conn)
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1;")
+        finally:
+            for conn in conns:
+                self.putconn(conn)
+        return len(conns)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": self.maxconn,
+                "in_use": self.in_use,
+                "idle": len(self._idle),
+                "waiting": self.waiting,
+                "timeouts": self.timeouts,
+            }
+
+    def close(self):
+        self.closed = True
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for conn in idle:
+            conn.close()
+
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+_forked_pools: list = []
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    p = _pool
+    if p is not None and p.pid == os.getpid() and not p.closed:
+        return p
+    with _pool_lock:
+        if _pool is not None and _pool.pid != os.getpid():
+            # fork 이전 부모의 풀: 자식에서 닫으면 부모 세션이 끊기므로 참조만 남겨 둔다
+            _forked_pools.append(_pool)
+            _pool = None
+        if _pool is None or _pool.closed:
+            _pool = ConnectionPool(DB_POOL_MIN, DB_POOL_MAX, DB_POOL_TIMEOUT)
+        return _pool
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool.pid == os.getpid():
+            _pool.close()
+        _pool = None
+
+
+class PooledConnection:
+    """
+    get_connection()용 얇은 래퍼. close()하면 풀에 반납하고,
+    close()를 빼먹은 레거시 코드도 객체가 사라질 때(weakref.finalize) 반납된다.
+    """
+
+    def __init__(self, pool: ConnectionPool):
+        self._conn = pool.getconn()
+        self._finalizer = weakref.finalize(self, pool.putconn, self._conn)
+
+    def close(self):
+        self._finalizer()
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._conn.__exit__(*exc)
+
+
+# transaction() 블록 안에서는 get_cursor()가 같은 커서(같은 트랜잭션)를 돌려준다
+_tx_cursor: ContextVar = ContextVar("tx_cursor", default=None)
+
+
+@contextmanager
+def get_cursor(commit: bool = True):
+    ambient = _tx_cursor.get()
+    if ambient is not None:
+        # 커밋/롤백은 바깥 transaction()이 한 번에
+        yield ambient
+        return
+    pool = get_pool()
+    conn = pool.getconn()
+    cur = None
     try:
         # ✅ DictCursor → RealDictCursor 로 변경
         cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
         yield cur
-        conn.commit()
+        if commit:
+            conn.commit()
+    finally:
+        if cur is not None:
+            cur.close()
+        pool.putconn(conn)
+
+
+def in_transaction() -> bool:
+    return _tx_cursor.get() is not None
+
+
+def retry_on_deadlock(fn, attempts: int = 3):
+    """교착으로 롤백된 트랜잭션을 처음부터 다시 실행 (바깥 트랜잭션 안에서는 재시도하지 않는다)."""
+    for n in range(attempts):
+        try:
+            return fn()
+        except psycopg2.errors.DeadlockDetected:
+            if n == attempts - 1 or in_transaction():
+                raise
+            logger.info("deadlock detected, retrying (%d/%d)", n + 1, attempts - 1)
+
+
+@contextmanager
+def transaction():
+    """
+    여러 서비스 호출을 한 트랜잭션으로 묶는다 (예: 멱등 키 기록 + 판매 등록).
+    블록 안의 get_cursor()는 모두 이 커서를 쓰고, 블록이 정상 종료될 때 한 번 커밋한다.
+    """
+    outer = _tx_cursor.get()
+    if outer is not None:
+        yield outer
+        return
+    with get_cursor(commit=True) as cur:
+        token = _tx_cursor.set(cur)
+        try:
+            yield cur
+        finally:
+            _tx_cursor.reset(token)
+
+_ensured: set[str] = set()
+
+def ensure_schema(name: str, ddl: str):
+    """
+    CREATE ... IF NOT EXISTS 형태의 DDL을 프로세스당 한 번만 실행.
+    여러 워커가 동시에 띄워질 때를 대비해 advisory lock으로 직렬화한다.
+    """
+    if name in _ensured:
+        return
+    with get_cursor() as cur:
+        cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s));", (name,))
+        cur.execute(ddl)
+    _ensured.add(name)
+
+
+def create_indexes_concurrently(indexes: list[tuple[str, str]]) -> list[str]:
+    """
+    [(이름, "ON 테이블 (...)")] 를 CREATE INDEX CONCURRENTLY 로 만든다 (쓰기를 막지 않는다). 만든 색인 이름을 돌려준다.
+    CONCURRENTLY 는 트랜잭션 안에서 못 돌리므로 풀 대신 autocommit 연결 하나를 쓴다 (migrate 명령용).
+    중간에 실패해 INVALID 로 남은 색인은 지우고 다시 만든다.
+    """
+    created = []
+    conn = connect()
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            for name, ddl in indexes:
+                cur.execute("SELECT i.indisvalid FROM pg_index i WHERE i.indexrelid = to_regclass(%s);", (name,))
+                row = cur.fetchone()
+                if row and row[0]:
+                    continue
+                if row:
+                    logger.warning("index %s is invalid, rebuilding", name)
+                    cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name};")
+                cur.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {ddl};")
+                created.append(name)
     finally:
-        cur.close()
         conn.close()
+    return created
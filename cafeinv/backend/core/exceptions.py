@@ -6,4 +6,9 @@ def db_error(e: Exception) -> HTTPException:
     code = status.HTTP_500_INTERNAL_SERVER_ERROR
     if "INSUFFICIENT_STOCK" in msg:
         code = status.HTTP_409_CONFLICT
+    elif "DB_POOL_EXHAUSTED" in msg or "SALE_QUEUE_TIMEOUT" in msg:
+        # 커넥션 풀이 꽉 참 → 클라이언트/로드밸런서가 재시도하도록
+        code = status.HTTP_503_SERVICE_UNAVAILABLE
+    elif "IDEMPOTENCY_CONFLICT" in msg or "UNIT_MISMATCH" in msg:
+        code = status.HTTP_422_UNPROCESSABLE_ENTITY
     return HTTPException(status_code=code, detail=msg)
@@ -0,0 +1,229 @@
+"""
+Idempotency-Key 처리 (POST /sales, /inventory/stock_change).
+
+POS가 타임아웃 후 같은 요청을 다시 보내도 판매/재고 변경이 한 번만 반영되게 한다.
+- 키 기록과 실제 쓰기를 한 트랜잭션에서 처리한다. 실패하면 키도 남지 않으므로 그대로 재시도 가능.
+- 같은 키가 동시에 들어오면 두 번째 요청은 PK(scope, key)에서 첫 요청의 커밋을 기다린 뒤 저장된 응답을 돌려준다.
+- 같은 키에 다른 본문 → IDEMPOTENCY_CONFLICT (422).
+- 최근 키는 프로세스 메모리(LRU)에서 바로 재응답하고, 만료된 행은 백그라운드에서 배치로 지운다.
+- 판매 group commit(SALE_GROUP_COMMIT=1)은 idempotent() 대신 배치 트랜잭션 안에서 claim()/save() 로
+  같은 테이블에 키를 기록한다 (backend/sales/group_commit.py). 키 의미는 같다.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+
+from backend.core.config import IDEMPOTENCY_TTL_HOURS, IDEMPOTENCY_LRU_SIZE, IDEMPOTENCY_CLEANUP_SECONDS
+from backend.core.db import get_cursor, ensure_schema, transaction, retry_on_deadlock
+from backend.core.logger import logger
+
+REPLAY_HEADER = "Idempotent-Replayed"
+
+IDEMPOTENCY_DDL = """
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    scope        text        NOT NULL,
+    key          text        NOT NULL,
+    request_hash text        NOT NULL,
+    status_code  int         NOT NULL DEFAULT 200,
+    response     jsonb,
+    created_at   timestamptz NOT NULL DEFAULT now(),
+    expires_at   timestamptz NOT NULL,
+    PRIMARY KEY (scope, key)
+);
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires ON idempotency_keys (expires_at);
+"""
+
+
+class IdempotencyConflict(Exception):
+    pass
+
+
+def request_hash(payload: Any) -> str:
+    raw = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _LRU:
+    """(scope, key) → (request_hash, response, expires_at). 워커 프로세스마다 따로 가진다."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, k):
+        with self._lock:
+            v = self._data.get(k)
+            if v is None:
+                return None
+            if v[2] <= time.time():
+                del self._data[k]
+                return None
+            self._data.move_to_end(k)
+            return v
+
+    def put(self, k, v):
+        if self.size <= 0:
+            return
+        with self._lock:
+            self._data[k] = v
+            self._data.move_to_end(k)
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_lru = _LRU(IDEMPOTENCY_LRU_SIZE)
+_cleanup_lock = threading.Lock()
+_last_cleanup = 0.0
+
+
+def _replay(stored_hash: str, h: str, body, response: Response | None):
+    if stored_hash != h:
+        raise IdempotencyConflict("IDEMPOTENCY_CONFLICT: 같은 Idempotency-Key로 다른 요청이 이미 처리되었습니다")
+    if response is not None:
+        response.headers[REPLAY_HEADER] = "true"
+    return body
+
+
+def normalize_key(key: str) -> str:
+    return key.strip()[:200]
+
+
+def ensure_idempotency_schema():
+    ensure_schema("idempotency", IDEMPOTENCY_DDL)
+    _maybe_cleanup()
+
+
+def lookup(scope: str, key: str, h: str, response: Response | None = None):
+    """프로세스 LRU 에 있는 키면 저장된 응답 (본문이 다르면 IdempotencyConflict), 없으면 None."""
+    hit = _lru.get((scope, key))
+    if hit is None:
+        return None
+    return _replay(hit[0], h, hit[1], response)
+
+
+def claim(cur, scope: str, key: str, h: str) -> dict | None:
+    """
+    키를 이 트랜잭션 몫으로 기록한다 → None. 이미 살아 있는 키면 그 행 (request_hash, response, exp).
+    동시 요청이 같은 키를 쓰고 있으면 INSERT 가 그 커밋까지 기다린 뒤 저장된 행을 본다.
+    """
+    cur.execute(
+        """
+        INSERT INTO idempotency_keys (scope, key, request_hash, expires_at)
+        VALUES (%s, %s, %s, now() + make_interval(secs => %s))
+        ON CONFLICT (scope, key) DO UPDATE
+           SET request_hash = EXCLUDED.request_hash, response = NULL,
+               created_at = now(), expires_at = EXCLUDED.expires_at
+         WHERE idempotency_keys.expires_at <= now()
+        RETURNING key;
+        """,
+        (scope, key, h, IDEMPOTENCY_TTL_HOURS * 3600),
+    )
+    if cur.fetchone() is not None:
+        return None
+    cur.execute(
+        "SELECT request_hash, response, extract(epoch FROM expires_at) AS exp "
+        "FROM idempotency_keys WHERE scope = %s AND key = %s;",
+        (scope, key),
+    )
+    row = cur.fetchone()
+    _lru.put((scope, key), (row["request_hash"], row["response"], float(row["exp"])))
+    return row
+
+
+def save(cur, scope: str, key: str, body) -> Any:
+    """claim() 한 키에 응답을 저장 (같은 트랜잭션). 커밋 후 remember() 로 LRU 에 올린다."""
+    body = jsonable_encoder(body)
+    cur.execute(
+        "UPDATE idempotency_keys SET response = %s::jsonb, status_code = 200 WHERE scope = %s AND key = %s;",
+        (json.dumps(body, default=str), scope, key),
+    )
+    return body
+
+
+def remember(scope: str, key: str, h: str, body):
+    _lru.put((scope, key), (h, body, time.time() + IDEMPOTENCY_TTL_HOURS * 3600))
+
+
+def replay(row: dict, h: str, response: Response | None = None):
+    return _replay(row["request_hash"], h, row["response"], response)
+
+
+def idempotent(scope: str, key: str | None, payload: Any, fn: Callable[[], Any],
+               response: Response | None = None):
+    """
+    key가 없으면 fn()을 그대로 실행. 있으면 (scope, key) 기준으로 한 번만 실행하고 결과를 저장/재응답한다.
+    fn 안의 get_cursor()는 키 기록과 같은 트랜잭션을 쓴다.
+    """
+    if not key:
+        return fn()
+    key = normalize_key(key)
+    h = request_hash(payload)
+    hit = lookup(scope, key, h, response)
+    if hit is not None:
+        return hit
+
+    ensure_idempotency_schema()
+    return retry_on_deadlock(lambda: _run_once(scope, key, h, fn, response))
+
+
+def _run_once(scope: str, key: str, h: str, fn: Callable[[], Any], response: Response | None):
+    with transaction() as cur:
+        row = claim(cur, scope, key, h)
+        if row is not None:
+            return replay(row, h, response)
+        body = save(cur, scope, key, fn())
+    remember(scope, key, h, body)
+    return body
+
+
+def cleanup_expired(batch: int = 5000) -> int:
+    """만료된 키를 batch 단위로 삭제 (긴 락/거대 트랜잭션 방지)."""
+    ensure_schema("idempotency", IDEMPOTENCY_DDL)
+    total = 0
+    while True:
+        with get_cursor() as cur:
+            cur.execute(
+                """
+                DELETE FROM idempotency_keys
+                 WHERE ctid = ANY (ARRAY(
+                       SELECT ctid FROM idempotency_keys
+                        WHERE expires_at <= now()
+                        LIMIT %s));
+                """,
+                (batch,),
+            )
+            n = cur.rowcount
+        total += n
+        if n < batch:
+            return total
+
+
+def _maybe_cleanup():
+    global _last_cleanup
+    now = time.time()
+    if now - _last_cleanup < IDEMPOTENCY_CLEANUP_SECONDS or not _cleanup_lock.acquire(blocking=False):
+        return
+    _last_cleanup = now
+
+    def run():
+        try:
+            n = cleanup_expired()
+            if n:
+                logger.info("idempotency: removed %d expired keys", n)
+        except Exception as e:
+            logger.warning("idempotency cleanup failed: %s", e)
+        finally:
+            _cleanup_lock.release()
+
+    threading.Thread(target=run, name="idempotency-cleanup", daemon=True).start()
@@ -0,0 +1,134 @@
+"""
+요청/DB 계측 → Prometheus 텍스트 포맷(/metrics).
+
+- MetricsMiddleware: 라우트별 지연 히스토그램, 진행 중 요청 수
+- record_query: 커서 실행마다 호출 (core.db의 계측 커서) → 요청당 DB 시간/쿼리 수/행 수
+멀티 워커(프로세스)로 띄울 때는 PROMETHEUS_MULTIPROC_DIR 를 지정하면 워커 합산으로 노출된다.
+"""
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+)
+
+from backend.core.config import METRICS_ENABLED, METRICS_QUERY_WARN
+from backend.core.logger import logger
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency",
+    ["method", "route", "status"], buckets=_LATENCY_BUCKETS,
+)
+HTTP_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests currently being served",
+    ["method"], multiprocess_mode="livesum",
+)
+REQ_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Total DB time spent per request",
+    ["route"], buckets=_LATENCY_BUCKETS,
+)
+REQ_DB_QUERIES = Histogram(
+    "http_request_db_queries", "DB statements executed per request",
+    ["route"], buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250),
+)
+REQ_DB_ROWS = Histogram(
+    "http_request_db_rows", "Rows returned/affected per request",
+    ["route"], buckets=(0, 1, 10, 100, 1000, 10000, 100000),
+)
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds", "Single DB statement latency",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+DB_QUERIES = Counter("db_queries_total", "DB statements executed", ["in_request"])
+
+
+class RequestStats:
+    __slots__ = ("db_seconds", "queries", "rows")
+
+    def __init__(self):
+        self.db_seconds = 0.0
+        self.queries = 0
+        self.rows = 0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+
+def record_query(elapsed: float, rows: int):
+    if not METRICS_ENABLED:
+        return
+    DB_QUERY_SECONDS.observe(elapsed)
+    stats = _request_stats.get()
+    DB_QUERIES.labels("1" if stats is not None else "0").inc()
+    if stats is not None:
+        stats.db_seconds += elapsed
+        stats.queries += 1
+        stats.rows += max(rows, 0)
+
+
+def _route_of(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "<unmatched>"
+
+
+class MetricsMiddleware:
+    """순수 ASGI 미들웨어 (BaseHTTPMiddleware보다 오버헤드가 작다)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status = {"code": 500}
+        t0 = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                # 브라우저 개발자도구에서 바로 보이도록 Server-Timing 헤더 추가
+                timing = f"db;dur={stats.db_seconds * 1000:.1f};desc=\"{stats.queries} queries\", " \
+                         f"app;dur={(time.perf_counter() - t0) * 1000:.1f}"
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"server-timing", timing.encode())]
+            await send(message)
+
+        HTTP_IN_PROGRESS.labels(method).inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_PROGRESS.labels(method).dec()
+            _request_stats.reset(token)
+            elapsed = time.perf_counter() - t0
+            route = _route_of(scope)
+            HTTP_LATENCY.labels(method, route, str(status["code"])).observe(elapsed)
+            REQ_DB_SECONDS.labels(route).observe(stats.db_seconds)
+            REQ_DB_QUERIES.labels(route).observe(stats.queries)
+            REQ_DB_ROWS.labels(route).observe(stats.rows)
+            if stats.queries >= METRICS_QUERY_WARN:
+                logger.warning(
+                    "%s %s ran %d queries (db %.1f ms / total %.1f ms) - possible N+1",
+                    method, route, stats.queries, stats.db_seconds * 1000, elapsed * 1000
+                )
+
+
+def render_metrics() -> tuple[bytes, str]:
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
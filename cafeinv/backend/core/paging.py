@@ -0,0 +1,120 @@
+"""
+목록 API 공통 페이지/정렬/검색 계약.
+
+    GET /suppliers?limit=50&offset=100&sort=-name&q=커피
+
+- limit/offset: 요청한 페이지만. limit 이 없으면 예전처럼 전체 (내부 옵션 목록용)
+- sort: 쉼표로 여러 열, 앞에 - 면 내림차순. 엔드포인트가 허용한 열만 (아니면 422)
+- q: 엔드포인트가 정한 텍스트 열 부분 일치 (ILIKE)
+- 그 밖의 필터는 엔드포인트별 쿼리 파라미터 (location_id, status ...)
+
+본문은 예전과 같은 행 목록이고 전체 건수는 헤더로 준다.
+    X-Total-Count: 1234
+    X-Total-Count-Estimated: true     # 플래너 추정치 (EXPLAIN 의 rows)
+전체 건수는 count(*) 대신
+  1) 마지막 페이지(받은 행 < limit)면 offset + 행 수 (정확)
+  2) 아니면 EXPLAIN 추정치. 추정이 PAGE_EXACT_COUNT_MAX 이하면 그만큼만 세어 정확한 값
+으로 구해 큰 테이블에서도 페이지 하나 비용으로 끝난다.
+
+    page = fetch_page(cur, "SELECT * FROM suppliers s", where, params, page,
+                      sortable={"name": "s.name"}, default_sort="name", tiebreak="s.id", search=("s.name",))
+    return page_response(response, page)
+"""
+from dataclasses import dataclass, field
+from typing import Optional, Sequence
+
+from fastapi import Query, Response
+
+from backend.core.config import PAGE_EXACT_COUNT_MAX, PAGE_LIMIT_MAX
+
+TOTAL_HEADER = "X-Total-Count"
+ESTIMATED_HEADER = "X-Total-Count-Estimated"
+
+
+@dataclass
+class PageParams:
+    limit: Optional[int] = None
+    offset: int = 0
+    sort: Optional[str] = None
+    q: Optional[str] = None
+
+
+@dataclass
+class PageResult:
+    items: list = field(default_factory=list)
+    total: int = 0
+    estimated: bool = False
+
+
+def page_params(
+    limit: Optional[int] = Query(default=None, ge=1, le=PAGE_LIMIT_MAX),
+    offset: int = Query(default=0, ge=0),
+    sort: Optional[str] = Query(default=None, description="열 이름, 내림차순은 -열 (쉼표로 여러 개)"),
+    q: Optional[str] = Query(default=None, description="텍스트 부분 일치"),
+) -> PageParams:
+    return PageParams(limit, offset, sort, q)
+
+
+def order_by(sort: Optional[str], sortable: dict[str, str], default_sort: str, tiebreak: str) -> str:
+    keys = [s.strip() for s in (sort or default_sort).split(",") if s.strip()]
+    parts = []
+    for k in keys:
+        desc = k.startswith("-")
+        col = sortable.get(k.lstrip("-"))
+        if col is None:
+            raise ValueError(f"cannot sort by {k.lstrip('-')!r} (allowed: {', '.join(sortable)})")
+        # NULLS 위치는 기본값 그대로 둬야 (created_at 등) btree 색인 순서를 그대로 쓴다
+        parts.append(f"{col} {'DESC' if desc else 'ASC'}")
+    # 같은 값이 페이지 경계에 걸쳐도 행이 빠지거나 겹치지 않게 유일 키로 마무리
+    parts.append(tiebreak)
+    return ", ".join(parts)
+
+
+def estimate_rows(cur, sql: str, params: Sequence) -> int:
+    cur.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+    plan = cur.fetchone()
+    return int(next(iter(plan.values()))[0]["Plan"]["Plan Rows"])
+
+
+def count_rows(cur, sql: str, params: Sequence) -> tuple[int, bool]:
+    """(건수, 추정 여부). 추정치가 작으면 PAGE_EXACT_COUNT_MAX + 1 까지만 세어 정확히."""
+    est = estimate_rows(cur, sql, params)
+    if est <= PAGE_EXACT_COUNT_MAX:
+        cur.execute(f"SELECT count(*) AS n FROM ({sql} LIMIT %s) t;", [*params, PAGE_EXACT_COUNT_MAX + 1])
+        n = cur.fetchone()["n"]
+        if n <= PAGE_EXACT_COUNT_MAX:
+            return n, False
+    return est, True
+
+
+def fetch_page(cur, select_from: str, where: list[str], params: list, page: PageParams, *,
+               sortable: dict[str, str], default_sort: str, tiebreak: str,
+               search: Sequence[str] = ()) -> PageResult:
+    """select_from(SELECT ... FROM ... JOIN ...) 에 where/q/정렬/페이지를 붙여 실행."""
+    where, params = list(where), list(params)
+    if page.q and search:
+        like = "%" + page.q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        where.append("(" + " OR ".join(f"{c}::text ILIKE %s" for c in search) + ")")
+        params += [like] * len(search)
+    base = select_from + (" WHERE " + " AND ".join(where) if where else "")
+    sql = f"{base} ORDER BY {order_by(page.sort, sortable, default_sort, tiebreak)}"
+    if page.limit is None:
+        cur.execute(sql + ";", params)
+        items = cur.fetchall()
+        return PageResult(items, len(items), False)
+
+    cur.execute(sql + " LIMIT %s OFFSET %s;", [*params, page.limit, page.offset])
+    items = cur.fetchall()
+    if len(items) < page.limit and (items or page.offset == 0):
+        return PageResult(items, page.offset + len(items), False)
+    total, estimated = count_rows(cur, base, params)
+    if estimated:
+        # 추정치가 이미 받은 행보다 작게 나와도 지금 페이지까지는 있다
+        total = max(total, page.offset + len(items))
+    return PageResult(items, total, estimated)
+
+
+def page_response(response: Response, page: PageResult) -> list:
+    response.headers[TOTAL_HEADER] = str(page.total)
+    response.headers[ESTIMATED_HEADER] = "true" if page.estimated else "false"
+    return page.items
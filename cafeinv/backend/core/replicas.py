@@ -0,0 +1,283 @@
+"""
+읽기 복제본 라우팅.
+
+    with read_cursor() as cur:      # 조회 전용 서비스 함수에서 get_cursor() 대신
+        cur.execute("SELECT ...")
+
+- DB_REPLICA_DSNS 가 비어 있으면 get_cursor()와 똑같이 primary를 쓴다.
+- 건강한 복제본이 있으면 라운드로빈으로 고른다. 없으면 primary.
+- read-your-writes: 쓰기 요청(GET/HEAD 외, 2xx/3xx 응답) 뒤 READ_YOUR_WRITES_SECONDS 동안은 같은 클라이언트의 조회를 primary로.
+  여러 워커에 걸쳐도 지켜지도록 마지막 쓰기 시각을 쿠키(와 X-Last-Write 헤더)로 돌려주고, 다음 요청에서 읽는다.
+- transaction() 안(쓰기와 같은 트랜잭션)에서는 항상 primary.
+- 헬스 체크: 백그라운드 스레드가 REPLICA_CHECK_SECONDS마다 풀 밖 커넥션으로 복제 지연을 재고,
+  접속 실패 / 지연 > REPLICA_MAX_LAG_SECONDS 이면 제외, 회복되면 다시 넣는다.
+  받은 WAL 을 다 재생했으면 지연 0 으로 보지만, WAL 수신이 streaming 일 때만이다 (끊긴 복제본은 받은 것도 멈춰 있다).
+  그 밖에는 마지막 재생 트랜잭션 시각으로 재고, 그것도 없으면 제외한다.
+  조회 중 커넥션 오류가 나면 그 복제본은 REPLICA_EJECT_SECONDS 동안 제외한다.
+"""
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import psycopg2
+import psycopg2.extras
+
+from backend.core.config import (
+    DB_REPLICA_DSNS, DB_REPLICA_POOL_MAX, DB_POOL_TIMEOUT, READ_YOUR_WRITES_SECONDS,
+    REPLICA_MAX_LAG_SECONDS, REPLICA_CHECK_SECONDS, REPLICA_EJECT_SECONDS,
+)
+from backend.core.db import ConnectionPool, PooledConnection, connect, get_cursor, get_pool, in_transaction
+from backend.core.logger import logger
+
+LAST_WRITE_COOKIE = "cafeinv_lw"
+LAST_WRITE_HEADER = "x-last-write"
+
+# 요청 단위: 이 클라이언트의 마지막 쓰기 시각(unix초). 없으면 0
+_last_write: ContextVar[float] = ContextVar("last_write", default=0.0)
+
+
+class Replica:
+    def __init__(self, dsn: str, n: int):
+        self.name = f"replica{n}"
+        self.dsn = dsn
+        self.pool = ConnectionPool(0, DB_REPLICA_POOL_MAX, DB_POOL_TIMEOUT, dsn=dsn)
+        self.healthy = False          # 첫 체크 전에는 쓰지 않는다
+        self.lag_s: float | None = None
+        self.error: str | None = None
+        self.ejected_until = 0.0
+        self.reads = 0
+        self._conn = None
+
+    def usable(self) -> bool:
+        return self.healthy and time.monotonic() >= self.ejected_until
+
+    def eject(self, reason: str, seconds: float = REPLICA_EJECT_SECONDS):
+        if self.usable():
+            logger.warning("%s ejected for %.0fs: %s", self.name, seconds, reason)
+        self.error = reason[:200]
+        self.ejected_until = time.monotonic() + seconds
+
+    def check(self):
+        try:
+            if self._conn is None or self._conn.closed:
+                self._conn = connect(instrumented=False, dsn=self.dsn, options="-c statement_timeout=2000")
+                self._conn.autocommit = True
+            with self._conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT pg_is_in_recovery(),
+                           EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming'),
+                           pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn(),
+                           EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp());
+                    """
+                )
+                recovery, streaming, caught_up, replay_lag = cur.fetchone()
+            if not recovery or (streaming and caught_up):
+                # 스트리밍 중 받은 WAL을 다 재생했으면 지연 0 (쓰기가 없을 때 replay_timestamp가 오래돼 보이는 것 방지)
+                lag = 0
+            else:
+                lag = replay_lag
+            if lag is None:
+                self.lag_s = None
+                ok, err = False, "wal receiver not streaming and no replayed transaction"
+            else:
+                self.lag_s = round(float(lag), 3)
+                ok, err = self.lag_s <= REPLICA_MAX_LAG_SECONDS, None
+                if not ok:
+                    err = f"replication lag {self.lag_s}s > {REPLICA_MAX_LAG_SECONDS}s"
+                    if not streaming:
+                        err += " (wal receiver not streaming)"
+        except Exception as e:
+            ok, err = False, str(e).strip()[:200]
+            if self._conn is not None:
+                try:
+                    self._conn.close()
+                except Exception:
+                    pass
+            self._conn = None
+        if ok != self.healthy:
+            (logger.info if ok else logger.warning)("%s healthy=%s %s", self.name, ok, err or "")
+        self.healthy, self.error = ok, err if not ok else self.error
+
+    def close(self):
+        self.pool.close()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def status(self) -> dict:
+        return {
+            "name": self.name, "healthy": self.healthy, "usable": self.usable(), "lag_s": self.lag_s,
+            "error": self.error, "reads": self.reads, "pool": self.pool.stats(),
+        }
+
+
+class ReplicaSet:
+    def __init__(self, dsns: list[str]):
+        self.pid = os.getpid()
+        self.replicas = [Replica(d, i) for i, d in enumerate(dsns)]
+        self.primary_reads = 0
+        self._rr = itertools.count()
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if not self.replicas or (self._thread is not None and self._thread.is_alive()):
+                return
+            for r in self.replicas:
+                r.check()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="replica-health", daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        while not self._stop.wait(REPLICA_CHECK_SECONDS):
+            for r in self.replicas:
+                r.check()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(REPLICA_CHECK_SECONDS + 5)
+        for r in self.replicas:
+            r.close()
+
+    def pick(self) -> Replica | None:
+        if not self.replicas:
+            return None
+        self.start()
+        live = [r for r in self.replicas if r.usable()]
+        if not live:
+            return None
+        return live[next(self._rr) % len(live)]
+
+    def status(self) -> dict:
+        return {"primary_reads": self.primary_reads, "replicas": [r.status() for r in self.replicas]}
+
+
+_set: ReplicaSet | None = None
+_set_lock = threading.Lock()
+
+
+def get_replicas() -> ReplicaSet:
+    global _set
+    s = _set
+    if s is not None and s.pid == os.getpid():
+        return s
+    with _set_lock:
+        if _set is None or _set.pid != os.getpid():
+            # fork 이후에는 부모의 커넥션/스레드를 쓰지 않고 새로 만든다
+            _set = ReplicaSet(DB_REPLICA_DSNS)
+        return _set
+
+
+def close_replicas():
+    global _set
+    with _set_lock:
+        if _set is not None and _set.pid == os.getpid():
+            _set.stop()
+        _set = None
+
+
+def _wants_primary() -> bool:
+    return in_transaction() or time.time() - _last_write.get() < READ_YOUR_WRITES_SECONDS
+
+
+@contextmanager
+def read_cursor():
+    """조회 전용. 조건이 맞으면 복제본, 아니면 primary (get_cursor와 같은 RealDictCursor)."""
+    rs = get_replicas()
+    replica = None if _wants_primary() else rs.pick()
+    conn = None
+    if replica is not None:
+        try:
+            conn = replica.pool.getconn()
+        except psycopg2.OperationalError as e:
+            replica.eject(str(e))
+        except Exception:
+            pass    # 복제본 풀이 꽉 참 → 이번 조회만 primary로
+    if conn is None:
+        rs.primary_reads += 1
+        with get_cursor(commit=False) as cur:
+            yield cur
+        return
+    replica.reads += 1
+    cur = None
+    try:
+        cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        yield cur
+    except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+        replica.eject(str(e))
+        raise
+    finally:
+        if cur is not None and not cur.closed:
+            cur.close()
+        replica.pool.putconn(conn)
+
+
+def read_connection() -> PooledConnection:
+    """레거시 get_connection() 스타일 조회 함수용. 라우팅 규칙은 read_cursor와 같다."""
+    rs = get_replicas()
+    replica = None if _wants_primary() else rs.pick()
+    if replica is not None:
+        try:
+            conn = PooledConnection(replica.pool)
+            replica.reads += 1
+            return conn
+        except psycopg2.OperationalError as e:
+            replica.eject(str(e))
+        except Exception:
+            pass
+    rs.primary_reads += 1
+    return PooledConnection(get_pool())
+
+
+class ReadYourWritesMiddleware:
+    """요청의 마지막 쓰기 시각을 컨텍스트에 올리고, 쓰기 요청이 성공하면 쿠키/헤더로 돌려준다."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not DB_REPLICA_DSNS:
+            await self.app(scope, receive, send)
+            return
+        last = 0.0
+        for k, v in scope.get("headers", []):
+            if k == LAST_WRITE_HEADER.encode():
+                last = max(last, _float(v.decode("latin-1")))
+            elif k == b"cookie":
+                for part in v.decode("latin-1").split(";"):
+                    name, _, val = part.strip().partition("=")
+                    if name == LAST_WRITE_COOKIE:
+                        last = max(last, _float(val))
+        writing = scope["method"] not in ("GET", "HEAD", "OPTIONS")
+        # 쓰기 요청 안의 조회도 primary로
+        token = _last_write.set(time.time() if writing else last)
+
+        async def send_wrapper(message):
+            if writing and message["type"] == "http.response.start" and message["status"] < 400:
+                now = f"{time.time():.3f}"
+                message["headers"] = list(message.get("headers", [])) + [
+                    (LAST_WRITE_HEADER.encode(), now.encode()),
+                    (b"set-cookie", f"{LAST_WRITE_COOKIE}={now}; Path=/; Max-Age="
+                                    f"{int(READ_YOUR_WRITES_SECONDS) + 1}; HttpOnly; SameSite=Lax".encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _last_write.reset(token)
+
+
+def _float(s: str) -> float:
+    try:
+        return float(s)
+    except ValueError:
+        return 0.0
@@ -0,0 +1,214 @@
+"""
+슬로우 쿼리 로그 (SLOW_QUERY_LOG=1 일 때만 동작).
+
+core.db의 계측 커서가 실행마다 observe()를 호출한다.
+- 정규화한 SQL(리터럴/파라미터 → ?) 기준으로 누적 시간·횟수를 집계 → 총 시간 top-N
+- SLOW_QUERY_MS 이상이면 SQL, 파라미터 모양, 소요 시간, 호출한 서비스 함수를 로그로 남김
+- SLOW_QUERY_EXPLAIN_SAMPLE 확률로 느린 SELECT를 별도 커넥션(READ ONLY)에서
+  EXPLAIN (ANALYZE, BUFFERS)로 다시 돌려 실행 계획을 붙여 둔다
+집계는 워커(프로세스)별 메모리에만 있으므로 워커가 여러 개면 /admin/slow_queries 결과도 워커별이다.
+"""
+import random
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Optional
+
+from backend.core.config import (
+    SLOW_QUERY_LOG, SLOW_QUERY_MS, SLOW_QUERY_EXPLAIN_SAMPLE, SLOW_QUERY_EXPLAIN_INTERVAL,
+    SLOW_QUERY_TOP_N, SLOW_QUERY_MAX_FINGERPRINTS,
+)
+from backend.core.logger import logger
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w$.])-?\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"%\(\w+\)s|%s")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACES = re.compile(r"\s+")
+_READ_ONLY = re.compile(r"^\s*(select|with)\b", re.I)
+_WRITES = re.compile(r"\b(insert|update|delete|merge|for\s+update|for\s+share|nextval|setval|pg_advisory)\b", re.I)
+
+# 호출 함수 추적 시 건너뛸 모듈 (계측 계층 자체)
+_SKIP_MODULES = ("backend.core.db", "backend.core.slowlog", "backend.core.metrics", "backend.db")
+
+
+@lru_cache(maxsize=4096)
+def normalize_sql(sql: str) -> str:
+    s = _STRING.sub("?", sql)
+    s = _PARAM.sub("?", s)
+    s = _NUMBER.sub("?", s)
+    s = _IN_LIST.sub("(?...)", s)
+    return _SPACES.sub(" ", s).strip().rstrip(";")
+
+
+def params_shape(vars: Any) -> str:
+    """값은 남기지 않고 타입만 (개인정보/거대한 리스트 로그 방지)."""
+    if vars is None:
+        return "-"
+    if isinstance(vars, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in vars.items()) + "}"
+    if isinstance(vars, (list, tuple)):
+        if len(vars) > 20:
+            return f"{type(vars).__name__}[{len(vars)}]"
+        return "(" + ", ".join(
+            f"{type(v).__name__}[{len(v)}]" if isinstance(v, (list, tuple)) else type(v).__name__
+            for v in vars
+        ) + ")"
+    return type(vars).__name__
+
+
+def _caller() -> str:
+    f = sys._getframe(2)
+    while f is not None:
+        mod = f.f_globals.get("__name__", "")
+        if mod.startswith("backend.") and not mod.startswith(_SKIP_MODULES):
+            return f"{mod}.{f.f_code.co_name}"
+        f = f.f_back
+    return "?"
+
+
+class _Entry:
+    __slots__ = ("sql", "calls", "total_ms", "max_ms", "slow_calls", "rows",
+                 "callers", "params", "last_slow_at", "explain", "explained_at", "explaining")
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.slow_calls = 0
+        self.rows = 0
+        self.callers: set[str] = set()
+        self.params: Optional[str] = None
+        self.last_slow_at: Optional[float] = None
+        self.explain: Optional[str] = None
+        self.explained_at = 0.0
+        self.explaining = False
+
+    def as_dict(self) -> dict:
+        return {
+            "sql": self.sql,
+            "calls": self.calls,
+            "total_ms": round(self.total_ms, 2),
+            "mean_ms": round(self.total_ms / self.calls, 3) if self.calls else 0,
+            "max_ms": round(self.max_ms, 2),
+            "slow_calls": self.slow_calls,
+            "rows": self.rows,
+            "callers": sorted(self.callers),
+            "params": self.params,
+            "last_slow_at": self.last_slow_at,
+            "explain": self.explain,
+            "explained_at": self.explained_at or None,
+        }
+
+
+_lock = threading.Lock()
+_entries: dict[str, _Entry] = {}
+_explainer: Optional[ThreadPoolExecutor] = None
+_local = threading.local()
+_started_at = time.time()
+
+
+def _explain_pool() -> ThreadPoolExecutor:
+    global _explainer
+    if _explainer is None:
+        with _lock:
+            if _explainer is None:
+                _explainer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slowlog-explain")
+    return _explainer
+
+
+def _run_explain(entry: _Entry, sql: str, vars):
+    from backend.core.db import get_cursor   # 순환 import 방지
+    _local.suppress = True
+    try:
+        with get_cursor(commit=False) as cur:
+            # ANALYZE는 실제로 실행되므로 읽기 전용 트랜잭션 + 타임아웃으로 감싼다
+            cur.execute("SET TRANSACTION READ ONLY;")
+            cur.execute("SET LOCAL statement_timeout = %s;", (int(max(SLOW_QUERY_MS, 1) * 20),))
+            cur.execute("EXPLAIN (ANALYZE, BUFFERS) " + sql, vars)
+            plan = "\n".join(r["QUERY PLAN"] for r in cur.fetchall())
+            cur.connection.rollback()
+        entry.explain = plan
+    except Exception as e:
+        entry.explain = f"EXPLAIN failed: {e}"
+    finally:
+        entry.explained_at = time.time()
+        entry.explaining = False
+        _local.suppress = False
+
+
+def _want_explain(entry: _Entry, sql: str) -> bool:
+    if SLOW_QUERY_EXPLAIN_SAMPLE <= 0 or entry.explaining:
+        return False
+    if time.time() - entry.explained_at < SLOW_QUERY_EXPLAIN_INTERVAL:
+        return False
+    if not _READ_ONLY.match(sql) or _WRITES.search(sql):
+        return False
+    return random.random() < SLOW_QUERY_EXPLAIN_SAMPLE
+
+
+def observe(cursor, query, vars, elapsed: float, rows: int, many: bool = False):
+    if getattr(_local, "suppress", False):
+        return
+    if not isinstance(query, str):
+        try:
+            query = query.as_string(cursor) if hasattr(query, "as_string") else query.decode()
+        except Exception:
+            return
+    key = normalize_sql(query)
+    ms = elapsed * 1000
+    slow = ms >= SLOW_QUERY_MS
+
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            if len(_entries) >= SLOW_QUERY_MAX_FINGERPRINTS:
+                # 누적 시간이 가장 적은 항목을 밀어낸다
+                del _entries[min(_entries, key=lambda k: _entries[k].total_ms)]
+            entry = _entries[key] = _Entry(key)
+        entry.calls += 1
+        entry.total_ms += ms
+        entry.max_ms = max(entry.max_ms, ms)
+        entry.rows += max(rows, 0)
+        if not slow:
+            return
+        entry.slow_calls += 1
+        entry.last_slow_at = time.time()
+        caller = _caller()
+        if len(entry.callers) < 10:
+            entry.callers.add(caller)
+        entry.params = params_shape(vars)
+        explain = not many and _want_explain(entry, query)
+        if explain:
+            entry.explaining = True
+
+    logger.warning("slow query %.1f ms | %s | params=%s | %s", ms, caller, entry.params, key[:500])
+    if explain:
+        _explain_pool().submit(_run_explain, entry, query, vars)
+
+
+def top(n: Optional[int] = None, order_by: str = "total_ms") -> dict:
+    n = n or SLOW_QUERY_TOP_N
+    with _lock:
+        items = sorted(_entries.values(), key=lambda e: getattr(e, order_by), reverse=True)[:n]
+        rows = [e.as_dict() for e in items]
+        tracked = len(_entries)
+    return {
+        "enabled": SLOW_QUERY_LOG,
+        "threshold_ms": SLOW_QUERY_MS,
+        "explain_sample": SLOW_QUERY_EXPLAIN_SAMPLE,
+        "since": _started_at,
+        "tracked": tracked,
+        "items": rows,
+    }
+
+
+def reset():
+    global _started_at
+    with _lock:
+        _entries.clear()
+        _started_at = time.time()
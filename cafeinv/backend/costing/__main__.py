@@ -0,0 +1,29 @@
+"""
+    python -m backend.costing migrate                        # 배포 시: 원가 테이블/트리거 설치
+    python -m backend.costing rebuild [--since 2025-01-01]   # 설치 직후: 과거 입고로 평균 단가 채우기
+    python -m backend.costing refresh                        # cron(1분마다): 표시된 메뉴 원가 재계산
+"""
+import argparse
+
+from backend.core.logger import logger
+from .service import ensure_costing_schema, rebuild_ingredient_costs, refresh_menu_costs
+
+def main():
+    p = argparse.ArgumentParser(prog="python -m backend.costing")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("migrate", help="원가 테이블/트리거 설치")
+    r = sub.add_parser("rebuild", help="과거 입고의 가중 평균으로 재료 원가 재설정")
+    r.add_argument("--since", default=None)
+    sub.add_parser("refresh", help="변경된 메뉴만 원가 재계산")
+    args = p.parse_args()
+
+    if args.cmd == "migrate":
+        ensure_costing_schema()
+        logger.info("costing schema installed")
+    elif args.cmd == "rebuild":
+        logger.info("costing rebuild: %s", rebuild_ingredient_costs(args.since))
+    else:
+        logger.info("costing refresh: %d menu items", refresh_menu_costs())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, HTTPException, Query
+from backend.core.exceptions import db_error
+from .schema import CostRebuildIn
+from .service import (
+    list_menu_costs, get_menu_cost, list_ingredient_costs,
+    refresh_menu_costs, rebuild_ingredient_costs
+)
+
+router = APIRouter()
+
+@router.get("/menu_items")
+def get_menu_costs(
+    active_only: bool = True,
+    location_id: str | None = None,
+    order: str = Query("name", pattern="^(name|margin|cost)$"),
+):
+    try:
+        return list_menu_costs(active_only, location_id, order)
+    except Exception as e:
+        raise db_error(e)
+
+@router.get("/menu_items/{menu_item_id}")
+def get_menu_cost_detail(menu_item_id: str):
+    try:
+        row = get_menu_cost(menu_item_id)
+    except Exception as e:
+        raise db_error(e)
+    if not row:
+        raise HTTPException(status_code=404, detail="menu item not found")
+    return row
+
+@router.get("/ingredients")
+def get_ingredient_costs(location_id: str | None = None, ingredient_id: str | None = None):
+    try:
+        return list_ingredient_costs(location_id, ingredient_id)
+    except Exception as e:
+        raise db_error(e)
+
+@router.post("/refresh")
+def post_costing_refresh():
+    try:
+        return {"menu_items": refresh_menu_costs()}
+    except Exception as e:
+        raise db_error(e)
+
+@router.post("/rebuild")
+def post_costing_rebuild(body: CostRebuildIn):
+    try:
+        return rebuild_ingredient_costs(body.since)
+    except Exception as e:
+        raise db_error(e)
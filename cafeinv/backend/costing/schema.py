@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class CostRebuildIn(BaseModel):
+    since: Optional[datetime] = None    # 이 시각 이후 입고만으로 평균 (없으면 전체)
+
+class MenuCostRow(BaseModel):
+    menu_item_id: str
+    name: str
+    location_id: Optional[str] = None
+    price: Optional[float] = None
+    cost: float
+    margin: Optional[float] = None
+    margin_pct: Optional[float] = None
+    lines: int
+    uncosted_lines: int
+    updated_at: datetime
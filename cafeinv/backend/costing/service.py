@@ -0,0 +1,311 @@
+"""
+이동평균 원가와 메뉴 원가/마진.
+
+- ingredient_costs: (재료, 지점)별 이동평균 단가. receipt_items BEFORE INSERT 트리거가 입고 한 줄마다 갱신한다.
+      새 평균 = (입고 전 재고 × 기존 평균 + 입고 수량 × 입고 단가) / (입고 전 재고 + 입고 수량)
+  입고 전 재고는 이 행의 purchase 트리거(AFTER)가 돌기 전 재고를 그대로 읽는다 → 트리거 이름/순서와 무관.
+  입고 전 재고가 0 이하거나 기존 평균이 없으면 입고 단가로 시작한다 (ingredients.cost_per_unit 이 있으면 그것이 기존 평균).
+  재고 행을 먼저 잠그므로 같은 키의 입고는 직렬로 계산된다.
+- menu_item_costs: 메뉴별 이론 원가 = Σ recipes.qty_required × 단가.
+  단가는 메뉴 기본 지점 평균 → 전 지점 평균 → ingredients.cost_per_unit 순으로 쓴다.
+- 증분: 원가가 바뀐 재료를 쓰는 메뉴, 레시피/가격이 바뀐 메뉴만 menu_cost_dirty 에 표시(트리거)하고
+  refresh_menu_costs() 가 표시된 메뉴만 한 문장으로 다시 계산한다 (cron 또는 POST /costing/refresh).
+  조회 API는 테이블을 읽기만 한다 → 원가 변경은 다음 refresh 까지 늦게 보일 수 있다.
+
+설치는 배포 단계에서 한 번 (워커 기동/조회 경로에서는 DDL 을 돌리지 않는다):
+    python -m backend.costing migrate
+
+입고 단가는 재료의 재고 단위 기준이다 (receive_po 등에서 unit_id 환산 후 저장).
+"""
+from typing import Optional
+
+from backend.core.db import get_cursor, ensure_schema
+from backend.core.logger import logger
+from backend.core.replicas import read_cursor
+
+COSTING = "costing"
+
+COSTING_DDL = """
+CREATE TABLE IF NOT EXISTS ingredient_costs (
+    ingredient_id uuid        NOT NULL,
+    location_id   uuid        NOT NULL,
+    avg_cost      numeric     NOT NULL,
+    last_cost     numeric     NOT NULL,
+    qty_basis     numeric     NOT NULL,        -- 마지막 갱신 직후 재고
+    updated_at    timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (ingredient_id, location_id)
+);
+
+CREATE TABLE IF NOT EXISTS menu_item_costs (
+    menu_item_id   uuid        PRIMARY KEY,
+    location_id    uuid,
+    cost           numeric     NOT NULL,
+    price          numeric,
+    margin         numeric,
+    margin_pct     numeric,
+    lines          int         NOT NULL,
+    uncosted_lines int         NOT NULL,       -- 단가를 못 찾은 레시피 줄
+    updated_at     timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS menu_cost_dirty (
+    menu_item_id uuid PRIMARY KEY
+);
+
+-- 스트라이프를 켠 키는 본 행 qty_on_hand 에서 스트라이프 사용량을 빼야 실제 잔량
+CREATE OR REPLACE FUNCTION costing_on_hand(p_ing uuid, p_loc uuid)
+RETURNS numeric LANGUAGE plpgsql STABLE AS $$
+DECLARE v numeric; u numeric := 0;
+BEGIN
+    SELECT qty_on_hand INTO v FROM inventory WHERE ingredient_id = p_ing AND location_id = p_loc;
+    IF to_regclass('inventory_stripes') IS NOT NULL THEN
+        EXECUTE 'SELECT COALESCE(sum(used), 0) FROM inventory_stripes WHERE ingredient_id = $1 AND location_id = $2'
+           INTO u USING p_ing, p_loc;
+    END IF;
+    RETURN COALESCE(v, 0) - u;
+END $$;
+
+-- BEFORE INSERT: 이 행의 입고(AFTER 트리거)가 재고에 들어가기 전이므로 현재고가 곧 입고 전 재고
+CREATE OR REPLACE FUNCTION trg_receipt_items_cost() RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE v_loc uuid; v_before numeric; v_prev numeric; v_avg numeric;
+BEGIN
+    IF NEW.unit_cost IS NULL OR NEW.unit_cost < 0 OR COALESCE(NEW.qty, 0) <= 0 THEN
+        RETURN NEW;
+    END IF;
+    SELECT location_id INTO v_loc FROM receipts WHERE id = NEW.receipt_id;
+    IF v_loc IS NULL THEN
+        RETURN NEW;
+    END IF;
+    PERFORM 1 FROM inventory WHERE ingredient_id = NEW.ingredient_id AND location_id = v_loc FOR UPDATE;
+    v_before := greatest(costing_on_hand(NEW.ingredient_id, v_loc), 0);
+    SELECT avg_cost INTO v_prev FROM ingredient_costs
+     WHERE ingredient_id = NEW.ingredient_id AND location_id = v_loc FOR UPDATE;
+    IF v_prev IS NULL THEN
+        SELECT NULLIF(cost_per_unit, 0) INTO v_prev FROM ingredients WHERE id = NEW.ingredient_id;
+    END IF;
+    v_avg := CASE WHEN v_prev IS NULL OR v_before = 0 THEN NEW.unit_cost
+                  ELSE round((v_before * v_prev + NEW.qty * NEW.unit_cost) / (v_before + NEW.qty), 6) END;
+
+    INSERT INTO ingredient_costs AS c (ingredient_id, location_id, avg_cost, last_cost, qty_basis)
+    VALUES (NEW.ingredient_id, v_loc, v_avg, NEW.unit_cost, v_before + NEW.qty)
+    ON CONFLICT (ingredient_id, location_id) DO UPDATE
+    SET avg_cost = EXCLUDED.avg_cost, last_cost = EXCLUDED.last_cost,
+        qty_basis = EXCLUDED.qty_basis, updated_at = now();
+
+    IF v_prev IS DISTINCT FROM v_avg THEN
+        INSERT INTO menu_cost_dirty (menu_item_id)
+        SELECT DISTINCT menu_item_id FROM recipes WHERE ingredient_id = NEW.ingredient_id
+        ON CONFLICT DO NOTHING;
+    END IF;
+    RETURN NEW;
+END $$;
+DROP TRIGGER IF EXISTS receipt_items_purchase_cost ON receipt_items;    -- 이전 버전 (AFTER, 이름 순서 의존)
+DROP TRIGGER IF EXISTS receipt_items_cost ON receipt_items;
+CREATE TRIGGER receipt_items_cost BEFORE INSERT ON receipt_items
+    FOR EACH ROW EXECUTE FUNCTION trg_receipt_items_cost();
+
+CREATE OR REPLACE FUNCTION trg_recipes_cost_dirty() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        INSERT INTO menu_cost_dirty VALUES (OLD.menu_item_id) ON CONFLICT DO NOTHING;
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        INSERT INTO menu_cost_dirty VALUES (NEW.menu_item_id) ON CONFLICT DO NOTHING;
+    END IF;
+    RETURN NULL;
+END $$;
+DROP TRIGGER IF EXISTS recipes_cost_dirty ON recipes;
+CREATE TRIGGER recipes_cost_dirty AFTER INSERT OR UPDATE OR DELETE ON recipes
+    FOR EACH ROW EXECUTE FUNCTION trg_recipes_cost_dirty();
+
+CREATE OR REPLACE FUNCTION trg_menu_items_cost_dirty() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO menu_cost_dirty VALUES (COALESCE(NEW.id, OLD.id)) ON CONFLICT DO NOTHING;
+    RETURN NULL;
+END $$;
+DROP TRIGGER IF EXISTS menu_items_cost_dirty ON menu_items;
+CREATE TRIGGER menu_items_cost_dirty AFTER INSERT OR DELETE OR UPDATE OF price, default_location_id
+    ON menu_items FOR EACH ROW EXECUTE FUNCTION trg_menu_items_cost_dirty();
+
+CREATE OR REPLACE FUNCTION trg_ingredients_cost_dirty() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO menu_cost_dirty (menu_item_id)
+    SELECT DISTINCT menu_item_id FROM recipes WHERE ingredient_id = NEW.id
+    ON CONFLICT DO NOTHING;
+    RETURN NULL;
+END $$;
+DROP TRIGGER IF EXISTS ingredients_cost_dirty ON ingredients;
+CREATE TRIGGER ingredients_cost_dirty AFTER UPDATE OF cost_per_unit ON ingredients
+    FOR EACH ROW WHEN (OLD.cost_per_unit IS DISTINCT FROM NEW.cost_per_unit)
+    EXECUTE FUNCTION trg_ingredients_cost_dirty();
+
+-- 처음 설치하면 전 메뉴를 한 번 계산
+INSERT INTO menu_cost_dirty (menu_item_id)
+SELECT id FROM menu_items WHERE NOT EXISTS (SELECT 1 FROM menu_item_costs)
+ON CONFLICT DO NOTHING;
+"""
+
+# 표시된 메뉴만 다시 계산. 없어진 메뉴는 지운다.
+_REFRESH = """
+    WITH d AS (
+        DELETE FROM menu_cost_dirty RETURNING menu_item_id
+    ),
+    gone AS (
+        DELETE FROM menu_item_costs c USING d
+        WHERE c.menu_item_id = d.menu_item_id
+          AND NOT EXISTS (SELECT 1 FROM menu_items m WHERE m.id = d.menu_item_id)
+    ),
+    lines AS (
+        SELECT m.id AS menu_item_id, m.default_location_id AS location_id, m.price,
+               r.ingredient_id,
+               r.qty_required * COALESCE(c.avg_cost, a.avg_cost, NULLIF(i.cost_per_unit, 0)) AS line_cost
+        FROM d
+        JOIN menu_items m ON m.id = d.menu_item_id
+        LEFT JOIN recipes r ON r.menu_item_id = m.id
+        LEFT JOIN ingredients i ON i.id = r.ingredient_id
+        LEFT JOIN ingredient_costs c ON c.ingredient_id = r.ingredient_id AND c.location_id = m.default_location_id
+        LEFT JOIN LATERAL (
+            SELECT avg(x.avg_cost) AS avg_cost FROM ingredient_costs x WHERE x.ingredient_id = r.ingredient_id
+        ) a ON TRUE
+    )
+    INSERT INTO menu_item_costs AS t (menu_item_id, location_id, cost, price, margin, margin_pct,
+                                      lines, uncosted_lines, updated_at)
+    SELECT menu_item_id, location_id, round(cost, 4), price, round(price - cost, 4),
+           CASE WHEN price > 0 THEN round((price - cost) / price * 100, 2) END,
+           lines, uncosted, now()
+    FROM (
+        SELECT menu_item_id, location_id, price,
+               COALESCE(sum(line_cost), 0) AS cost,
+               count(ingredient_id) AS lines,
+               count(ingredient_id) FILTER (WHERE line_cost IS NULL) AS uncosted
+        FROM lines GROUP BY menu_item_id, location_id, price
+    ) s
+    ON CONFLICT (menu_item_id) DO UPDATE
+    SET location_id = EXCLUDED.location_id, cost = EXCLUDED.cost, price = EXCLUDED.price,
+        margin = EXCLUDED.margin, margin_pct = EXCLUDED.margin_pct, lines = EXCLUDED.lines,
+        uncosted_lines = EXCLUDED.uncosted_lines, updated_at = EXCLUDED.updated_at;
+"""
+
+
+def ensure_costing_schema():
+    """테이블/트리거 설치 (python -m backend.costing migrate). 다시 돌려도 같은 상태가 된다."""
+    ensure_schema(COSTING, COSTING_DDL)
+
+
+def refresh_menu_costs() -> int:
+    """menu_cost_dirty 에 표시된 메뉴만 재계산. 계산한 메뉴 수를 돌려준다."""
+    with get_cursor() as cur:
+        cur.execute(_REFRESH)
+        return cur.rowcount
+
+
+def list_menu_costs(active_only: bool = True, location_id: Optional[str] = None,
+                    order: str = "name") -> list[dict]:
+    conds, params = [], []
+    if active_only:
+        conds.append("m.is_active")
+    if location_id:
+        conds.append("c.location_id = %s::uuid"); params.append(location_id)
+    where = ("WHERE " + " AND ".join(conds)) if conds else ""
+    order_by = {"name": "m.name", "margin": "c.margin_pct NULLS FIRST, m.name",
+                "cost": "c.cost DESC, m.name"}.get(order, "m.name")
+    with read_cursor() as cur:
+        cur.execute(f"""
+            SELECT c.menu_item_id::text, m.name, c.location_id::text, c.price, c.cost,
+                   c.margin, c.margin_pct, c.lines, c.uncosted_lines, c.updated_at
+            FROM menu_item_costs c
+            JOIN menu_items m ON m.id = c.menu_item_id
+            {where}
+            ORDER BY {order_by};
+        """, tuple(params))
+        return cur.fetchall()
+
+
+def get_menu_cost(menu_item_id: str) -> Optional[dict]:
+    """메뉴 원가와 레시피 줄별 단가/원가."""
+    with read_cursor() as cur:
+        cur.execute(
+            """
+            SELECT c.menu_item_id::text, m.name, c.location_id::text, c.price, c.cost,
+                   c.margin, c.margin_pct, c.lines, c.uncosted_lines, c.updated_at
+            FROM menu_item_costs c JOIN menu_items m ON m.id = c.menu_item_id
+            WHERE c.menu_item_id = %s::uuid;
+            """,
+            (menu_item_id,)
+        )
+        head = cur.fetchone()
+        if not head:
+            return None
+        cur.execute(
+            """
+            SELECT r.ingredient_id::text, i.name AS ingredient_name, r.qty_required,
+                   COALESCE(c.avg_cost, a.avg_cost, NULLIF(i.cost_per_unit, 0)) AS unit_cost,
+                   CASE WHEN c.avg_cost IS NOT NULL THEN 'location'
+                        WHEN a.avg_cost IS NOT NULL THEN 'all_locations'
+                        WHEN NULLIF(i.cost_per_unit, 0) IS NOT NULL THEN 'catalog' END AS cost_source,
+                   r.qty_required * COALESCE(c.avg_cost, a.avg_cost, NULLIF(i.cost_per_unit, 0)) AS line_cost
+            FROM recipes r
+            JOIN menu_items m ON m.id = r.menu_item_id
+            JOIN ingredients i ON i.id = r.ingredient_id
+            LEFT JOIN ingredient_costs c ON c.ingredient_id = r.ingredient_id AND c.location_id = m.default_location_id
+            LEFT JOIN LATERAL (
+                SELECT avg(x.avg_cost) AS avg_cost FROM ingredient_costs x WHERE x.ingredient_id = r.ingredient_id
+            ) a ON TRUE
+            WHERE r.menu_item_id = %s::uuid
+            ORDER BY i.name;
+            """,
+            (menu_item_id,)
+        )
+        head["lines_detail"] = cur.fetchall()
+        return head
+
+
+def list_ingredient_costs(location_id: Optional[str] = None,
+                          ingredient_id: Optional[str] = None) -> list[dict]:
+    conds, params = [], []
+    if location_id:
+        conds.append("c.location_id = %s::uuid"); params.append(location_id)
+    if ingredient_id:
+        conds.append("c.ingredient_id = %s::uuid"); params.append(ingredient_id)
+    where = ("WHERE " + " AND ".join(conds)) if conds else ""
+    with read_cursor() as cur:
+        cur.execute(f"""
+            SELECT c.ingredient_id::text, i.name AS ingredient_name, c.location_id::text,
+                   c.avg_cost, c.last_cost, c.qty_basis, i.cost_per_unit AS catalog_cost, c.updated_at
+            FROM ingredient_costs c JOIN ingredients i ON i.id = c.ingredient_id
+            {where}
+            ORDER BY i.name, c.location_id;
+        """, tuple(params))
+        return cur.fetchall()
+
+
+def rebuild_ingredient_costs(since: Optional[str] = None) -> dict:
+    """
+    설치 직후 등: 과거 입고(since 이후)의 수량 가중 평균 단가로 ingredient_costs 를 다시 채우고
+    전 메뉴를 재계산 대상으로 표시한다. 이후는 트리거가 증분으로 갱신한다.
+    """
+    ensure_costing_schema()
+    with get_cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO ingredient_costs AS c (ingredient_id, location_id, avg_cost, last_cost, qty_basis)
+            SELECT ri.ingredient_id, r.location_id,
+                   round(sum(ri.qty * ri.unit_cost) / sum(ri.qty), 6),
+                   (array_agg(ri.unit_cost ORDER BY r.received_at DESC))[1],
+                   costing_on_hand(ri.ingredient_id, r.location_id)
+            FROM receipt_items ri
+            JOIN receipts r ON r.id = ri.receipt_id
+            WHERE ri.unit_cost IS NOT NULL AND ri.unit_cost >= 0 AND ri.qty > 0 AND r.location_id IS NOT NULL
+              AND (%s::timestamptz IS NULL OR r.received_at >= %s::timestamptz)
+            GROUP BY ri.ingredient_id, r.location_id
+            ON CONFLICT (ingredient_id, location_id) DO UPDATE
+            SET avg_cost = EXCLUDED.avg_cost, last_cost = EXCLUDED.last_cost,
+                qty_basis = EXCLUDED.qty_basis, updated_at = now();
+            """,
+            (since, since)
+        )
+        n = cur.rowcount
+        cur.execute("INSERT INTO menu_cost_dirty SELECT id FROM menu_items ON CONFLICT DO NOTHING;")
+    menus = refresh_menu_costs()
+    logger.info("ingredient costs rebuilt: %d keys, %d menu items", n, menus)
+    return {"ingredient_costs": n, "menu_items": menus}
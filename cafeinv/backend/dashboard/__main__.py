@@ -0,0 +1,19 @@
+"""
+배포 단계에서 사용:
+    python -m backend.dashboard migrate      # 대시보드 조회용 색인 (CREATE INDEX CONCURRENTLY)
+"""
+import argparse
+
+from backend.core.logger import logger
+from .service import migrate_indexes
+
+def main():
+    p = argparse.ArgumentParser(prog="python -m backend.dashboard")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("migrate", help="대시보드 색인을 잠금 없이 생성")
+    p.parse_args()
+
+    logger.info("dashboard indexes created: %s", migrate_indexes() or "none (already present)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+from datetime import date
+from fastapi import APIRouter
+from backend.core.exceptions import db_error
+from .service import kpis
+
+router = APIRouter()
+
+@router.get("/kpis")
+def get_kpis(location_id: str | None = None, day: date | None = None):
+    try:
+        return kpis(location_id, day)
+    except Exception as e:
+        raise db_error(e)
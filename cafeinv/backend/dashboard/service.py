@@ -0,0 +1,182 @@
+"""
+대시보드 첫 화면 KPI: 한 번의 요청, 한 문장.
+
+    kpis()                      # 전체 지점
+    kpis(location_id=..., day=date(2026, 10, 1))
+
+지점별
+    재고: 품목 수, 재고 금액(잔량 × 이동평균 단가, 없으면 ingredients.cost_per_unit), 단가 없는 품목 수,
+          발주점 이하(low_stock), 안전재고 미만(below_safety), 품절(out_of_stock)
+    판매: day(ROLLUP_TZ) 판매 건수/금액. 판매에 지점이 없으면 메뉴의 기본 지점으로 라인별 배분
+          (여러 지점에 걸친 판매는 지점마다 한 건으로 센다)
+    알림: 미해제 알림 심각도별 건수
+    이동: 보낼 것(draft) / 보낸 것(shipped, 출발지) / 받을 것(shipped, 도착지)
+전체
+    위 합계 + 미입고 발주(ordered/partially_received, 예정일 지난 건수)
+
+jsonb 를 DB 에서 바로 만들어 한 번에 돌려받는다. 워커마다 DASHBOARD_CACHE_SECONDS 동안 캐시 (기동 워밍업에서는 빠진다).
+alerts 컬럼(location_id/resolved_at)과 원가 테이블(ingredient_costs)은 있는 것만 쓴다.
+
+조회용 색인은 배포 단계에서 잠금 없이 만든다 (CREATE INDEX CONCURRENTLY, 조회 경로에서는 DDL 을 돌리지 않는다):
+    python -m backend.dashboard migrate
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from backend.alerts.service import alert_columns
+from backend.core.cache import ref_cache
+from backend.core.config import DASHBOARD_CACHE_SECONDS, ROLLUP_TZ
+from backend.core.db import create_indexes_concurrently, get_cursor
+from backend.core.replicas import read_cursor
+from backend.stripes.service import balance_sql
+
+
+def _indexes(alert_cols: frozenset) -> list[tuple[str, str]]:
+    idx = [
+        ("sales_created_at_idx", "ON sales (created_at)"),
+        ("sale_items_sale_id_idx", "ON sale_items (sale_id)"),
+        ("transfers_open_idx", "ON transfers (status) WHERE status IN ('draft', 'shipped')"),
+    ]
+    if "resolved_at" in alert_cols:
+        cols = "location_id, severity" if "location_id" in alert_cols else "severity"
+        idx.append(("alerts_open_idx", f"ON alerts ({cols}) WHERE resolved_at IS NULL"))
+    return idx
+
+
+def migrate_indexes() -> list[str]:
+    """대시보드 색인을 CREATE INDEX CONCURRENTLY 로 만든다 (판매 INSERT 를 막지 않는다). 만든 색인 이름을 돌려준다."""
+    return create_indexes_concurrently(_indexes(alert_columns.uncached()))
+
+
+@ref_cache("dashboard_shape")
+def _shape() -> tuple[frozenset, bool]:
+    """(alerts 컬럼, ingredient_costs 유무). 원가 테이블은 python -m backend.costing migrate 로 생긴다."""
+    with get_cursor() as cur:
+        cur.execute("SELECT to_regclass('ingredient_costs') IS NOT NULL AS costed;")
+        return alert_columns(), cur.fetchone()["costed"]
+
+
+def _kpis_sql(alert_cols: frozenset, costed: bool) -> str:
+    if costed:
+        cost_join = ("LEFT JOIN ingredient_costs c "
+                     "ON c.ingredient_id = inv.ingredient_id AND c.location_id = inv.location_id")
+        unit_cost = "COALESCE(c.avg_cost, NULLIF(i.cost_per_unit, 0))"
+    else:
+        cost_join, unit_cost = "", "NULLIF(i.cost_per_unit, 0)"
+    open_alert = "resolved_at IS NULL" if "resolved_at" in alert_cols else "TRUE"
+    if "location_id" in alert_cols:
+        alert_loc, alert_loc_filter = "location_id", "(%(loc)s::uuid IS NULL OR location_id = %(loc)s::uuid)"
+    else:
+        # 지점이 없는 알림은 전체 조회에서만 (지점 없음 행으로) 센다
+        alert_loc, alert_loc_filter = "NULL::uuid AS location_id", "%(loc)s::uuid IS NULL"
+    return f"""
+WITH stock AS (
+    SELECT inv.location_id,
+           count(*) AS items,
+           round(sum(st.qty * st.unit_cost), 2) AS stock_value,
+           count(*) FILTER (WHERE st.unit_cost IS NULL AND st.qty <> 0) AS uncosted_items,
+           count(*) FILTER (WHERE inv.reorder_point > 0 AND st.qty <= inv.reorder_point) AS low_stock,
+           count(*) FILTER (WHERE inv.safety_stock > 0 AND st.qty < inv.safety_stock) AS below_safety,
+           count(*) FILTER (WHERE st.qty <= 0) AS out_of_stock
+    FROM inventory inv
+    JOIN ingredients i ON i.id = inv.ingredient_id
+    {cost_join}
+    CROSS JOIN LATERAL (
+        SELECT {balance_sql("inv")} AS qty, {unit_cost} AS unit_cost
+    ) st
+    WHERE %(loc)s::uuid IS NULL OR inv.location_id = %(loc)s::uuid
+    GROUP BY 1
+),
+sale_lines AS (
+    SELECT s.id, COALESCE(s.location_id, m.default_location_id) AS location_id,
+           si.qty * COALESCE(si.unit_price, 0) - COALESCE(si.discount, 0) AS amount
+    FROM sales s
+    JOIN sale_items si ON si.sale_id = s.id
+    LEFT JOIN menu_items m ON m.id = si.menu_item_id
+    WHERE s.created_at >= %(lo)s AND s.created_at < %(hi)s AND s.status = 'paid'
+),
+sales AS (
+    SELECT location_id, count(DISTINCT id) AS sales, round(sum(amount), 2) AS amount
+    FROM sale_lines
+    WHERE %(loc)s::uuid IS NULL OR location_id = %(loc)s::uuid
+    GROUP BY 1
+),
+alerts AS (
+    SELECT location_id, jsonb_object_agg(COALESCE(severity, 'unknown'), n) AS by_severity
+    FROM (SELECT {alert_loc}, severity, count(*) AS n
+          FROM alerts
+          WHERE {open_alert} AND {alert_loc_filter}
+          GROUP BY 1, 2) a
+    GROUP BY 1
+),
+moves AS (
+    SELECT loc AS location_id,
+           count(*) FILTER (WHERE dir = 'out' AND status = 'draft') AS to_ship,
+           count(*) FILTER (WHERE dir = 'out' AND status = 'shipped') AS in_transit_out,
+           count(*) FILTER (WHERE dir = 'in' AND status = 'shipped') AS to_receive
+    FROM transfers t
+    CROSS JOIN LATERAL (VALUES ('out', t.from_location_id), ('in', t.to_location_id)) d(dir, loc)
+    WHERE t.status IN ('draft', 'shipped') AND (%(loc)s::uuid IS NULL OR d.loc = %(loc)s::uuid)
+    GROUP BY 1
+),
+locs AS (
+    SELECT location_id FROM stock UNION SELECT location_id FROM sales
+    UNION SELECT location_id FROM alerts UNION SELECT location_id FROM moves
+)
+SELECT jsonb_build_object(
+    'locations', COALESCE((
+        SELECT jsonb_agg(jsonb_build_object(
+                   'location_id', k.location_id, 'location_name', l.name,
+                   'items', COALESCE(st.items, 0), 'stock_value', COALESCE(st.stock_value, 0),
+                   'uncosted_items', COALESCE(st.uncosted_items, 0),
+                   'low_stock', COALESCE(st.low_stock, 0), 'below_safety', COALESCE(st.below_safety, 0),
+                   'out_of_stock', COALESCE(st.out_of_stock, 0),
+                   'sales', COALESCE(sa.sales, 0), 'sales_amount', COALESCE(sa.amount, 0),
+                   'alerts', COALESCE(al.by_severity, '{{}}'::jsonb),
+                   'transfers_to_ship', COALESCE(mv.to_ship, 0),
+                   'transfers_in_transit', COALESCE(mv.in_transit_out, 0),
+                   'transfers_to_receive', COALESCE(mv.to_receive, 0)
+               ) ORDER BY l.name NULLS LAST)
+        FROM locs k
+        LEFT JOIN locations l ON l.id = k.location_id
+        LEFT JOIN stock st ON st.location_id IS NOT DISTINCT FROM k.location_id
+        LEFT JOIN sales sa ON sa.location_id IS NOT DISTINCT FROM k.location_id
+        LEFT JOIN alerts al ON al.location_id IS NOT DISTINCT FROM k.location_id
+        LEFT JOIN moves mv ON mv.location_id IS NOT DISTINCT FROM k.location_id
+    ), '[]'::jsonb),
+    'purchase_orders', (
+        SELECT jsonb_build_object(
+                   'open', count(*),
+                   'overdue', count(*) FILTER (WHERE expected_date < %(day)s))
+        FROM purchase_orders
+        WHERE status IN ('ordered', 'partially_received')
+    )
+) AS kpis;
+"""
+
+_SUM_KEYS = ("items", "stock_value", "uncosted_items", "low_stock", "below_safety", "out_of_stock",
+             "sales", "sales_amount", "transfers_to_ship", "transfers_in_transit", "transfers_to_receive")
+
+
+@ref_cache("dashboard_kpis", ttl=DASHBOARD_CACHE_SECONDS, warm=False)
+def kpis(location_id: Optional[str] = None, day: Optional[date] = None) -> dict:
+    sql = _kpis_sql(*_shape())
+    tz = ZoneInfo(ROLLUP_TZ)
+    day = day or datetime.now(tz).date()
+    lo = datetime.combine(day, time(), tz)
+    with read_cursor() as cur:
+        cur.execute(sql, {"loc": location_id, "day": day, "lo": lo, "hi": lo + timedelta(days=1)})
+        res = cur.fetchone()["kpis"]
+
+    totals = {k: sum(loc[k] for loc in res["locations"]) for k in _SUM_KEYS}
+    # 같은 이동이 출발지/도착지 양쪽에 잡히므로 전체 합계에서는 받을 것만 센다
+    totals.pop("transfers_in_transit")
+    alerts: dict = {}
+    for loc in res["locations"]:
+        for sev, n in loc["alerts"].items():
+            alerts[sev] = alerts.get(sev, 0) + n
+    totals["alerts"] = alerts
+    return {"day": day, "location_id": location_id, "totals": totals,
+            "purchase_orders": res["purchase_orders"], "locations": res["locations"],
+            "computed_at": datetime.now(tz)}
@@ -1,16 +1,13 @@
-import os
-import psycopg2
-from psycopg2.extras import RealDictCursor
 from dotenv import load_dotenv
+from backend.core.db import PooledConnection, get_pool
+from backend.core.replicas import read_connection
 
 load_dotenv()
 
 def get_connection():
-    conn = psycopg2.connect(
-        host=os.getenv("DB_HOST", "capstonecafe.cxeowumkgzt3.ap-northeast-2.rds.amazonaws.com"),
-        port=os.getenv("DB_PORT", "5432"),
-        dbname=os.getenv("DB_NAME", "cafeinven"),
-        user=os.getenv("DB_USER", "hwjang"),
-        password=os.getenv("DB_PASSWORD")
-    )
-    return conn
+    # 워커 공용 커넥션 풀에서 빌려 온다. conn.close()는 풀 반납.
+    return PooledConnection(get_pool())
+
+def get_read_connection():
+    # 조회 전용 함수용: 복제본이 설정돼 있고 건강하면 복제본에서 (core.replicas 참고)
+    return read_connection()
@@ -0,0 +1,27 @@
+"""
+운영 실행 (cafeinv 디렉터리에서):
+    gunicorn -c backend/gunicorn.conf.py backend.main:app
+
+- preload_app: 마스터가 앱을 한 번 import 한 뒤 fork → 워커 기동이 빠르고 메모리 공유.
+  DB 커넥션은 import 시점에 열지 않고 각 워커의 lifespan에서 연다 (fork 이후).
+- 워커 수는 WEB_WORKERS (기본 CPU 수). 워커당 DB 커넥션 최대 DB_POOL_MAX개이므로
+  WEB_WORKERS * DB_POOL_MAX 가 Postgres max_connections 보다 충분히 작아야 한다.
+- SIGTERM → 새 연결 중단, 진행 중 요청을 GRACEFUL_TIMEOUT초까지 마무리 후 종료.
+
+워커 수별 처리량은 bench.scaling 으로 측정한다 (해당 모듈 설명 참고).
+"""
+import os
+
+from backend.core.config import APP_HOST, APP_PORT, WEB_WORKERS, GRACEFUL_TIMEOUT
+
+bind = f"{os.getenv('APP_HOST', APP_HOST)}:{os.getenv('APP_PORT', APP_PORT)}"
+workers = WEB_WORKERS
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = True
+graceful_timeout = GRACEFUL_TIMEOUT
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+keepalive = 5
+# 장시간 돌면서 생기는 메모리 단편화 대비 (0이면 끔)
+max_requests = int(os.getenv("WORKER_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+accesslog = None
@@ -1,17 +1,21 @@
 from fastapi import APIRouter
-from backend.core.db import get_cursor
+from fastapi.responses import JSONResponse
+from .service import monitor
 
 router = APIRouter()
 
+# 프로브는 async 로: 스레드풀이 밀려 있어도 이벤트 루프만 살아 있으면 응답한다
+@router.get("/livez")
+async def livez():
+    return {"ok": True}
+
+@router.get("/readyz")
+async def readyz():
+    status = monitor.snapshot()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
 @router.get("/health")
-def health():
-    ok = True
-    db_ok = None
-    try:
-        with get_cursor() as cur:
-            cur.execute("SELECT 1 AS ok;")
-            db_ok = cur.fetchone()["ok"] == 1
-    except Exception:
-        ok = False
-        db_ok = False
-    return {"ok": ok, "db": db_ok}
+async def health():
+    # 기존 형태 유지. DB 상태는 백그라운드에서 갱신한 값
+    status = monitor.snapshot()
+    return {"ok": status["ready"], "db": status["db"]["ok"]}
@@ -0,0 +1,102 @@
+"""
+프로브용 상태. 요청마다 DB에 붙지 않고, 백그라운드 스레드가 HEALTH_REFRESH_SECONDS마다
+풀 밖의 전용 커넥션 하나로 SELECT 1 을 돌려 결과만 갱신한다 (풀이 꽉 차도 체크는 계속 된다).
+"""
+import threading
+import time
+
+from backend.core.config import HEALTH_REFRESH_SECONDS, READY_MAX_POOL_SATURATION
+from backend.core.db import connect, get_pool
+from backend.core.replicas import get_replicas
+from backend.core.logger import logger
+
+
+class HealthMonitor:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.db_ok: bool | None = None
+        self.db_latency_ms: float | None = None
+        self.db_error: str | None = None
+        self.checked_at: float | None = None
+        self.draining = False
+        self._conn = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="health-monitor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.interval + 5)
+        self._close()
+
+    def _close(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+        self._conn = None
+
+    def refresh(self):
+        t0 = time.perf_counter()
+        try:
+            if self._conn is None or self._conn.closed:
+                self._conn = connect(instrumented=False, options="-c statement_timeout=2000")
+                self._conn.autocommit = True
+            with self._conn.cursor() as cur:
+                cur.execute("SELECT 1;")
+                cur.fetchone()
+            ok, err = True, None
+        except Exception as e:
+            ok, err = False, str(e).strip()[:200]
+            self._close()
+        if ok != self.db_ok:
+            (logger.info if ok else logger.warning)("db health changed: %s %s", ok, err or "")
+        self.db_ok, self.db_error = ok, err
+        self.db_latency_ms = round((time.perf_counter() - t0) * 1000, 2)
+        self.checked_at = time.time()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval)
+
+    def snapshot(self) -> dict:
+        if not self.draining:
+            self.start()   # lifespan 없이 뜬 경우(테스트 등) 첫 호출 때 시작
+        pool = get_pool().stats()
+        saturation = pool["in_use"] / pool["size"] if pool["size"] else 1.0
+        age = None if self.checked_at is None else round(time.time() - self.checked_at, 1)
+        stale = age is None or age > self.interval * 3 + 1
+        reasons = []
+        if self.draining:
+            reasons.append("draining")
+        if stale:
+            reasons.append("db status stale")
+        elif not self.db_ok:
+            reasons.append("db down")
+        if saturation >= READY_MAX_POOL_SATURATION and pool["waiting"] > 0:
+            reasons.append("db pool exhausted")
+        status = {
+            "ready": not reasons,
+            "reasons": reasons,
+            "db": {"ok": self.db_ok, "latency_ms": self.db_latency_ms, "error": self.db_error, "age_s": age},
+            "pool": {**pool, "saturation": round(saturation, 2)},
+        }
+        replicas = get_replicas()
+        if replicas.replicas:
+            # 복제본이 모두 빠져도 primary로 읽으므로 readiness에는 넣지 않는다
+            status["replicas"] = replicas.status()
+        return status
+
+
+monitor = HealthMonitor(HEALTH_REFRESH_SECONDS)
@@ -1,5 +1,7 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from backend.core.exceptions import db_error
+from backend.core.idempotency import idempotent
+from backend.core.paging import PageParams, page_params, page_response
 from .schema import StockChangeIn
 from .service import (
     list_inventory, list_tx, apply_stock_change,
@@ -10,30 +12,40 @@ router = APIRouter()
 
 # ----- inventory -----
 @router.get("")
-def get_inventory(location_id: str | None = Query(default=None)):
+def get_inventory(response: Response, location_id: str | None = Query(default=None),
+                  page: PageParams = Depends(page_params)):
     try:
-        return list_inventory(location_id)
+        return page_response(response, list_inventory(location_id, page))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise db_error(e)
 
 # ----- tx history -----
 @router.get("/inventory_tx")
 def get_inventory_tx(
+    response: Response,
     ingredient_id: str | None = None,
     location_id: str | None = None,
     since: str | None = None,
-    limit: int = 50
+    until: str | None = None,
+    tx_type: str | None = None,
+    page: PageParams = Depends(page_params),
 ):
     try:
-        return list_tx(ingredient_id, location_id, since, limit)
+        return page_response(response, list_tx(ingredient_id, location_id, since, until, tx_type, page))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise db_error(e)
 
 # ----- stock change (manual) -----
 @router.post("/stock_change")
-def post_stock_change(body: StockChangeIn):
+def post_stock_change(body: StockChangeIn, response: Response,
+                      idempotency_key: str | None = Header(default=None, alias="Idempotency-Key")):
     try:
-        return apply_stock_change(body.model_dump())
+        data = body.model_dump()
+        return idempotent("stock_change", idempotency_key, data, lambda: apply_stock_change(data), response)
     except Exception as e:
         raise db_error(e)
 
@@ -52,7 +64,8 @@ def post_po_item(body: dict):
             purchase_order_id=body["purchase_order_id"],
             ingredient_id=body["ingredient_id"],
             qty_ordered=body["qty_ordered"],
-            unit_cost=body.get("unit_cost", 0)
+            unit_cost=body.get("unit_cost", 0),
+            unit_id=body.get("unit_id"),
         )
     except Exception as e:
         raise db_error(e)
@@ -1,30 +1,65 @@
 from typing import Optional
+from backend.core.config import STOCK_STRIPES
 from backend.core.db import get_cursor
+from backend.core.paging import PageParams, PageResult, fetch_page
+from backend.core.replicas import read_cursor
+from backend.stripes.service import balance_sql
+from backend.units.service import normalize_lines
 
-def list_inventory(location_id: Optional[str] = None):
-    with get_cursor() as cur:
-        if location_id:
-            cur.execute(
-                "SELECT * FROM inventory WHERE location_id=%s ORDER BY ingredient_id;",
-                (location_id,)
-            )
-        else:
-            cur.execute("SELECT * FROM inventory ORDER BY ingredient_id, location_id;")
-        return cur.fetchall()
+INVENTORY_SORT = {
+    "ingredient_id": "inv.ingredient_id", "location_id": "inv.location_id",
+    "ingredient_name": "i.name", "location_name": "l.name",
+    "qty_on_hand": balance_sql("inv"), "reorder_point": "inv.reorder_point",
+    "safety_stock": "inv.safety_stock", "updated_at": "inv.updated_at",
+}
+
+def list_inventory(location_id: Optional[str] = None, page: Optional[PageParams] = None) -> PageResult:
+    # 스트라이프 모드에서는 qty_on_hand 를 실제 잔량(스트라이프 사용량 반영)으로 바꿔서 돌려준다
+    cols = f"inv.*, {balance_sql('inv')} AS qty_balance" if STOCK_STRIPES else "inv.*"
+    where, params = [], []
+    if location_id:
+        where.append("inv.location_id = %s"); params.append(location_id)
+    with read_cursor() as cur:
+        res = fetch_page(
+            cur,
+            f"""
+            SELECT {cols}, i.name AS ingredient_name, l.name AS location_name
+            FROM inventory inv
+            JOIN ingredients i ON i.id = inv.ingredient_id
+            JOIN locations l ON l.id = inv.location_id
+            """,
+            where, params, page or PageParams(),
+            sortable=INVENTORY_SORT, default_sort="ingredient_id,location_id",
+            tiebreak="inv.ingredient_id, inv.location_id", search=("i.name",)
+        )
+    if STOCK_STRIPES:
+        for r in res.items:
+            r["qty_on_hand"] = r.pop("qty_balance")
+    return res
+
+TX_SORT = {"created_at": "created_at", "qty_delta": "qty_delta", "tx_type": "tx_type::text"}
 
-def list_tx(ingredient_id: Optional[str], location_id: Optional[str], since: Optional[str], limit: int = 50):
-    q = "SELECT * FROM inventory_tx WHERE 1=1"
-    args = []
+def list_tx(ingredient_id: Optional[str], location_id: Optional[str], since: Optional[str],
+            until: Optional[str] = None, tx_type: Optional[str] = None,
+            page: Optional[PageParams] = None) -> PageResult:
+    page = page or PageParams()
+    if page.limit is None:
+        page.limit = 50     # 원장은 전체를 돌려주지 않는다
+    where, args = [], []
     if ingredient_id:
-        q += " AND ingredient_id=%s"; args.append(ingredient_id)
+        where.append("ingredient_id=%s"); args.append(ingredient_id)
     if location_id:
-        q += " AND location_id=%s"; args.append(location_id)
+        where.append("location_id=%s"); args.append(location_id)
     if since:
-        q += " AND created_at >= %s"; args.append(since)
-    q += " ORDER BY created_at DESC LIMIT %s"; args.append(limit)
-    with get_cursor() as cur:
-        cur.execute(q, tuple(args))
-        return cur.fetchall()
+        where.append("created_at >= %s::timestamptz"); args.append(since)
+    if until:
+        where.append("created_at < %s::timestamptz"); args.append(until)
+    if tx_type:
+        where.append("tx_type::text = %s"); args.append(tx_type)
+    with read_cursor() as cur:
+        return fetch_page(cur, "SELECT * FROM inventory_tx", where, args, page,
+                          sortable=TX_SORT, default_sort="-created_at", tiebreak="id",
+                          search=("note", "ref_table"))
 
 def apply_stock_change(data: dict):
     # inventory_tx에 INSERT → 트리거가 inv_stock 갱신
@@ -52,7 +87,11 @@ def create_po(data: dict):
         )
         return cur.fetchone()
 
-def add_po_item(purchase_order_id: str, ingredient_id: str, qty_ordered: float, unit_cost: float):
+def add_po_item(purchase_order_id: str, ingredient_id: str, qty_ordered: float, unit_cost: float,
+                unit_id: str | None = None):
+    line = normalize_lines([{"ingredient_id": ingredient_id, "qty_ordered": qty_ordered,
+                             "unit_cost": unit_cost, "unit_id": unit_id}], qty_keys=("qty_ordered",))[0]
+    qty_ordered, unit_cost = line["qty_ordered"], line["unit_cost"]
     with get_cursor(commit=True) as cur:
         cur.execute(
             """
@@ -65,6 +104,8 @@ def add_po_item(purchase_order_id: str, ingredient_id: str, qty_ordered: float,
 
 def receive_po(po_id: str, location_id: str, items: list[dict]):
     # receipts + receipt_items 생성 → 트리거가 inventory_tx('purchase') 생성
+    # 라인에 unit_id가 있으면 수량/단가를 재료 단위로 환산
+    items = normalize_lines(items, qty_keys=("qty_received", "qty"))
     with get_cursor(commit=True) as cur:
         cur.execute(
             "INSERT INTO receipts(purchase_order_id, location_id) VALUES (%s,%s) RETURNING id;",
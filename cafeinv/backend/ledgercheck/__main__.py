@@ -0,0 +1,72 @@
+"""
+점검 시간/cron 에서 사용 (끊겨도 다시 부르면 이어서 한다):
+    python -m backend.ledgercheck run --workers 8 --plan repair.jsonl
+    python -m backend.ledgercheck plan > repair.jsonl
+    python -m backend.ledgercheck apply --plan repair.jsonl [--dry-run]
+    python -m backend.ledgercheck accept --plan opening.jsonl     # 원장 밖 초기 재고 인정
+"""
+import argparse
+import json
+import sys
+
+from backend.core.config import LEDGER_CHECK_CHUNK_DAYS, LEDGER_CHECK_WORKERS
+from backend.core.logger import logger
+from .service import accept_opening, apply_repairs, repair_plan, reset, run_check
+
+def _write_plan(path, rows):
+    out = open(path, "w", encoding="utf-8") if path and path != "-" else sys.stdout
+    try:
+        for r in rows:
+            out.write(json.dumps(r, ensure_ascii=False, default=str) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+def _read_plan(path):
+    if not path:
+        return None
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def main():
+    p = argparse.ArgumentParser(prog="python -m backend.ledgercheck")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run", help="원장 합산 + 잔량 비교")
+    r.add_argument("--workers", type=int, default=LEDGER_CHECK_WORKERS)
+    r.add_argument("--chunk-days", type=int, default=LEDGER_CHECK_CHUNK_DAYS)
+    r.add_argument("--location")
+    r.add_argument("--plan", help="수정안을 JSON lines 로 저장할 경로")
+    s = sub.add_parser("plan", help="마지막 검사의 수정안 (JSON lines)")
+    s.add_argument("--location")
+    s.add_argument("--out", default="-")
+    a = sub.add_parser("apply", help="잔량을 원장에 맞춘다")
+    a.add_argument("--plan", help="검토한 수정안 파일 (없으면 마지막 검사 전체)")
+    a.add_argument("--location")
+    a.add_argument("--dry-run", action="store_true")
+    c = sub.add_parser("accept", help="차이를 기초 잔량으로 인정")
+    c.add_argument("--plan")
+    c.add_argument("--location")
+    x = sub.add_parser("reset", help="누적합/진행 상태 삭제")
+    x.add_argument("--location")
+    args = p.parse_args()
+
+    if args.cmd == "run":
+        logger.info("ledger check: %s", run_check(args.workers, args.chunk_days, args.location))
+        if args.plan:
+            _write_plan(args.plan, repair_plan(args.location))
+    elif args.cmd == "plan":
+        _write_plan(args.out, repair_plan(args.location))
+    elif args.cmd == "apply":
+        res = apply_repairs(_read_plan(args.plan), args.location, args.dry_run)
+        logger.info("ledger repair: %d applied, %d skipped%s", res["applied"], len(res["skipped"]),
+                    " (dry run)" if res["dry_run"] else "")
+        for k in res["skipped"]:
+            logger.warning("skipped %s/%s: drift %s -> %s", k["location_id"], k["ingredient_id"],
+                           k["drift"], k["live_drift"])
+    elif args.cmd == "accept":
+        logger.info("accepted %d opening balances", accept_opening(_read_plan(args.plan), args.location))
+    else:
+        reset(args.location)
+
+if __name__ == "__main__":
+    main()
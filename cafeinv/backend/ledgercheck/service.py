@@ -0,0 +1,358 @@
+"""
+원장 정합성 검사: inventory_tx 를 다시 합산해 inventory(잔량)와 비교하고 수정안을 만든다.
+
+    run_check(workers=4)       # 지점 묶음별로 프로세스 병렬 합산 → ledger_check_drift
+    repair_plan()              # 차이가 난 (재료, 지점) 과 맞추려면 필요한 조정량
+    apply_repairs(plan)        # 잔량을 원장에 맞춘다 (검사 이후 차이가 바뀐 키는 건너뜀)
+    accept_opening(plan)       # 원장 없이 들어간 초기 재고 등, 차이를 기초 잔량으로 인정
+
+합산 (이어서 실행)
+    ledger_check_sums 에 키별 원장 누적합을, ledger_check_progress 에 지점별 "어디까지 더했나"(through) 를 둔다.
+    실행마다 through 이후 ~ w(= now() - lag) 구간만 LEDGER_CHECK_CHUNK_DAYS 단위로 더하고 구간마다 커밋하므로
+    중간에 끊겨도 다음 실행이 이어서 하고, 정기 실행 비용은 그 사이 쌓인 원장에 비례한다.
+    지점은 워커 수만큼 묶음으로 나눠 묶음마다 프로세스 하나가 자기 연결로 처리한다
+    (지점마다 따로 읽으면 같은 파티션을 지점 수만큼 훑게 되므로 묶음 단위).
+    아카이브로 떼어 낸 파티션의 합도 누적합에 남아 있으므로 첫 실행은 아카이브 전에 돌린다.
+
+비교
+    잔량(w)   = 현재 잔량 - w 이후 원장 합계 (한 문장 = 한 스냅샷)
+    기대값(w) = 기초 잔량(opening_qty) + 누적합
+    drift     = 잔량(w) - 기대값(w). 0 이 아닌 키만 ledger_check_drift 에 남는다.
+
+수정
+    apply_stock_change 조정은 잔량과 원장을 같이 움직여 차이가 그대로이므로,
+    수정안은 원장을 기준으로 inventory.qty_on_hand 만 -drift 만큼 고친다 (원장 행은 쓰지 않음).
+    스트라이프가 있는 키는 같은 트랜잭션에서 사용량을 먼저 접고 고친 뒤 할당을 다시 나눈다 (stripes.balance_sql 불변식).
+    원장이 틀린 쪽(초기 재고, 원장 없이 들어간 이관 등)이면 accept_opening 으로 기초 잔량에 넣는다.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional
+
+from backend.core.config import LEDGER_CHECK_CHUNK_DAYS, LEDGER_CHECK_LAG_SECONDS, LEDGER_CHECK_WORKERS
+from backend.core.db import get_cursor, ensure_schema
+from backend.core.logger import logger
+from backend.stripes.service import balance_sql, fold_for_write, reallot
+
+LEDGER_CHECK = "ledger_check"
+
+LEDGER_CHECK_DDL = """
+CREATE TABLE IF NOT EXISTS ledger_check_progress (
+    location_id  uuid PRIMARY KEY,
+    through      timestamptz,               -- 이 시점까지의 원장이 ledger_check_sums 에 더해져 있다
+    updated_at   timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS ledger_check_sums (
+    location_id    uuid    NOT NULL,
+    ingredient_id  uuid    NOT NULL,
+    ledger_qty     numeric NOT NULL DEFAULT 0,
+    tx_count       bigint  NOT NULL DEFAULT 0,
+    opening_qty    numeric NOT NULL DEFAULT 0,   -- accept_opening 으로 인정한 원장 밖 잔량
+    PRIMARY KEY (location_id, ingredient_id)
+);
+
+CREATE TABLE IF NOT EXISTS ledger_check_drift (
+    location_id    uuid        NOT NULL,
+    ingredient_id  uuid        NOT NULL,
+    stock_qty      numeric     NOT NULL,
+    expected_qty   numeric     NOT NULL,
+    drift          numeric     NOT NULL,
+    checked_at     timestamptz NOT NULL,      -- 비교 시점 w
+    PRIMARY KEY (location_id, ingredient_id)
+);
+"""
+
+_ADD_CHUNK = """
+WITH agg AS (
+    SELECT t.location_id, t.ingredient_id, sum(t.qty_delta) AS qty, count(*) AS n
+    FROM inventory_tx t
+    JOIN ledger_check_progress p ON p.location_id = t.location_id
+    WHERE t.location_id = ANY(%(locs)s::uuid[])
+      AND t.created_at > %(lo)s AND t.created_at <= %(hi)s
+      AND (p.through IS NULL OR t.created_at > p.through)
+    GROUP BY 1, 2
+),
+up AS (
+    INSERT INTO ledger_check_sums AS s (location_id, ingredient_id, ledger_qty, tx_count)
+    SELECT location_id, ingredient_id, qty, n FROM agg
+    ON CONFLICT (location_id, ingredient_id) DO UPDATE
+       SET ledger_qty = s.ledger_qty + EXCLUDED.ledger_qty,
+           tx_count = s.tx_count + EXCLUDED.tx_count
+)
+SELECT COALESCE(sum(n), 0)::bigint AS n FROM agg;
+"""
+
+_COMPARE = f"""
+WITH after AS (
+    SELECT location_id, ingredient_id, sum(qty_delta) AS d
+    FROM inventory_tx
+    WHERE created_at > %(w)s AND location_id = ANY(%(locs)s::uuid[])
+    GROUP BY 1, 2
+),
+stock AS (
+    SELECT inv.location_id, inv.ingredient_id, {balance_sql("inv")} AS qty
+    FROM inventory inv
+    WHERE inv.location_id = ANY(%(locs)s::uuid[])
+),
+sums AS (
+    SELECT location_id, ingredient_id, opening_qty + ledger_qty AS qty
+    FROM ledger_check_sums
+    WHERE location_id = ANY(%(locs)s::uuid[])
+),
+cmp AS (
+    SELECT location_id, ingredient_id,
+           COALESCE(st.qty, 0) - COALESCE(a.d, 0) AS stock_qty,
+           COALESCE(su.qty, 0) AS expected_qty
+    FROM stock st
+    FULL JOIN sums su USING (location_id, ingredient_id)
+    LEFT JOIN after a USING (location_id, ingredient_id)
+)
+INSERT INTO ledger_check_drift (location_id, ingredient_id, stock_qty, expected_qty, drift, checked_at)
+SELECT location_id, ingredient_id, stock_qty, expected_qty, stock_qty - expected_qty, %(w)s
+FROM cmp
+WHERE stock_qty <> expected_qty;
+"""
+
+# plan 키의 검사 이후 원장까지 더해 지금 시점 drift 를 다시 구한다
+_LIVE = f"""
+WITH plan AS (
+    SELECT d.location_id, d.ingredient_id, d.drift, d.checked_at
+    FROM ledger_check_drift d
+    JOIN unnest(%(locs)s::uuid[], %(ings)s::uuid[]) AS k(location_id, ingredient_id)
+      USING (location_id, ingredient_id)
+),
+after AS (
+    SELECT t.location_id, t.ingredient_id, sum(t.qty_delta) AS d
+    FROM inventory_tx t
+    JOIN plan p ON p.location_id = t.location_id AND p.ingredient_id = t.ingredient_id
+    WHERE t.created_at > (SELECT min(checked_at) FROM plan) AND t.created_at > p.checked_at
+    GROUP BY 1, 2
+)
+SELECT p.location_id::text, p.ingredient_id::text, p.drift,
+       COALESCE({balance_sql("inv")}, 0) - COALESCE(s.opening_qty, 0) - COALESCE(s.ledger_qty, 0)
+           - COALESCE(a.d, 0) AS live_drift
+FROM plan p
+LEFT JOIN inventory inv ON inv.location_id = p.location_id AND inv.ingredient_id = p.ingredient_id
+LEFT JOIN ledger_check_sums s ON s.location_id = p.location_id AND s.ingredient_id = p.ingredient_id
+LEFT JOIN after a ON a.location_id = p.location_id AND a.ingredient_id = p.ingredient_id;
+"""
+
+
+class LedgerCheckBusy(Exception):
+    """다른 검사가 실행 중."""
+
+
+def ensure_ledger_check_schema():
+    ensure_schema(LEDGER_CHECK, LEDGER_CHECK_DDL)
+
+
+def _buckets(locations: list[str], n: int) -> list[list[str]]:
+    n = max(1, min(n, len(locations)))
+    return [locations[i::n] for i in range(n)]
+
+
+def _check_bucket(locs: list[str], first: datetime, w: datetime, chunk_days: int) -> dict:
+    """워커 프로세스: 지점 묶음의 원장을 through 이후 ~ w 까지 구간별로 더하고 w 기준으로 비교."""
+    with get_cursor(commit=False) as cur:
+        cur.execute("SELECT min(through) AS lo FROM ledger_check_progress WHERE location_id = ANY(%s::uuid[]);",
+                    (locs,))
+        lo = cur.fetchone()["lo"] or first
+    step = timedelta(days=max(1, chunk_days))
+    chunks = tx_rows = 0
+    while lo < w:
+        hi = min(lo + step, w)
+        with get_cursor() as cur:
+            cur.execute(_ADD_CHUNK, {"locs": locs, "lo": lo, "hi": hi})
+            tx_rows += cur.fetchone()["n"]
+            cur.execute(
+                """
+                UPDATE ledger_check_progress SET through = %(hi)s, updated_at = now()
+                WHERE location_id = ANY(%(locs)s::uuid[]) AND (through IS NULL OR through < %(hi)s);
+                """,
+                {"locs": locs, "hi": hi}
+            )
+        chunks += 1
+        lo = hi
+
+    with get_cursor() as cur:
+        cur.execute("DELETE FROM ledger_check_drift WHERE location_id = ANY(%s::uuid[]);", (locs,))
+        cur.execute(_COMPARE, {"locs": locs, "w": w})
+        drift_rows = cur.rowcount
+    return {"locations": len(locs), "chunks": chunks, "tx_rows": tx_rows, "drift_rows": drift_rows}
+
+
+def run_check(workers: int = LEDGER_CHECK_WORKERS, chunk_days: int = LEDGER_CHECK_CHUNK_DAYS,
+              location_id: Optional[str] = None) -> dict:
+    """
+    지점 묶음을 프로세스 풀로 나눠 합산·비교한다. 실행 중인 검사가 있으면 LedgerCheckBusy.
+    끊긴 실행은 다시 부르면 지점별 through 부터 이어서 한다.
+    """
+    ensure_ledger_check_schema()
+    with get_cursor(commit=False) as lock:
+        # 트랜잭션 락: 검사가 끝나 이 커서가 반환(롤백)될 때 풀린다
+        lock.execute("SELECT pg_try_advisory_xact_lock(hashtext(%s)) AS ok;", (LEDGER_CHECK,))
+        if not lock.fetchone()["ok"]:
+            raise LedgerCheckBusy("ledger check already running")
+
+        with get_cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO ledger_check_progress (location_id)
+                SELECT id FROM locations WHERE %(loc)s::uuid IS NULL OR id = %(loc)s::uuid
+                ON CONFLICT (location_id) DO NOTHING;
+                """,
+                {"loc": location_id}
+            )
+            cur.execute(
+                """
+                SELECT (SELECT min(created_at) - interval '1 microsecond' FROM inventory_tx) AS first,
+                       now() - make_interval(secs => %s) AS w;
+                """,
+                (LEDGER_CHECK_LAG_SECONDS,)
+            )
+            r = cur.fetchone()
+            w, first = r["w"], r["first"] or r["w"]
+            cur.execute(
+                """
+                SELECT location_id::text FROM ledger_check_progress
+                WHERE %(loc)s::uuid IS NULL OR location_id = %(loc)s::uuid
+                ORDER BY location_id;
+                """,
+                {"loc": location_id}
+            )
+            locations = [x["location_id"] for x in cur.fetchall()]
+
+        buckets = _buckets(locations, workers)
+        totals = {"locations": 0, "chunks": 0, "tx_rows": 0, "drift_rows": 0}
+        if buckets:
+            # fork 하면 부모의 풀/락 연결 상태가 자식에 복사되므로 spawn 으로 새로 띄운다
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=len(buckets), mp_context=ctx) as pool:
+                futures = [pool.submit(_check_bucket, b, first, w, chunk_days) for b in buckets]
+                for f in futures:
+                    for k, v in f.result().items():
+                        totals[k] += v
+
+    logger.info("ledger check at %s: %d locations, %d chunks, %d tx rows, %d drifted keys",
+                w, totals["locations"], totals["chunks"], totals["tx_rows"], totals["drift_rows"])
+    return {"checked_at": w, "workers": len(buckets), **totals}
+
+
+def repair_plan(location_id: Optional[str] = None) -> list[dict]:
+    """
+    마지막 검사에서 차이가 난 키. adjustment 는 잔량을 원장에 맞추는 qty_on_hand 조정량 (= -drift).
+    """
+    ensure_ledger_check_schema()
+    with get_cursor(commit=False) as cur:
+        cur.execute(
+            """
+            SELECT d.location_id::text, l.name AS location_name,
+                   d.ingredient_id::text, i.name AS ingredient_name, u.name AS unit,
+                   d.stock_qty, d.expected_qty, d.drift, -d.drift AS adjustment, d.checked_at
+            FROM ledger_check_drift d
+            LEFT JOIN locations l ON l.id = d.location_id
+            LEFT JOIN ingredients i ON i.id = d.ingredient_id
+            LEFT JOIN units u ON u.id = i.unit_id
+            WHERE %(loc)s::uuid IS NULL OR d.location_id = %(loc)s::uuid
+            ORDER BY l.name, abs(d.drift) DESC, i.name;
+            """,
+            {"loc": location_id}
+        )
+        return cur.fetchall()
+
+
+def _keys(plan: Optional[list[dict]], location_id: Optional[str]) -> tuple[list[str], list[str]]:
+    if plan is None:
+        plan = repair_plan(location_id)
+    return [p["location_id"] for p in plan], [p["ingredient_id"] for p in plan]
+
+
+def apply_repairs(plan: Optional[list[dict]] = None, location_id: Optional[str] = None,
+                  dry_run: bool = False) -> dict:
+    """
+    plan(없으면 마지막 검사 전체)의 키마다 qty_on_hand 를 -drift 만큼 고친다.
+    검사 이후 drift 가 달라진 키는 건너뛴다 (다시 검사 후 적용).
+    """
+    ensure_ledger_check_schema()
+    locs, ings = _keys(plan, location_id)
+    if not locs:
+        return {"applied": 0, "skipped": [], "dry_run": dry_run}
+    with get_cursor(commit=not dry_run) as cur:
+        # 잔량 행을 먼저 잠가 다시 구한 drift 와 수정 사이에 판매가 끼어들지 않게 한다
+        cur.execute(
+            """
+            SELECT 1 FROM inventory inv
+            JOIN unnest(%s::uuid[], %s::uuid[]) AS k(location_id, ingredient_id)
+              ON inv.location_id = k.location_id AND inv.ingredient_id = k.ingredient_id
+            ORDER BY inv.ingredient_id, inv.location_id
+            FOR UPDATE OF inv;
+            """,
+            (locs, ings)
+        )
+        # 스트라이프 할당이 고치기 전 잔량 기준으로 남지 않게 접어 둔다 (잔량식은 그대로)
+        folded = fold_for_write(cur, list(zip(ings, locs)))
+        cur.execute(_LIVE, {"locs": locs, "ings": ings})
+        rows = cur.fetchall()
+        ok = [r for r in rows if r["live_drift"] == r["drift"]]
+        skipped = [r for r in rows if r["live_drift"] != r["drift"]]
+        if ok:
+            cur.execute(
+                """
+                INSERT INTO inventory AS inv (ingredient_id, location_id, qty_on_hand)
+                SELECT ingredient_id, location_id, -drift
+                FROM unnest(%s::uuid[], %s::uuid[], %s::numeric[]) AS k(location_id, ingredient_id, drift)
+                ON CONFLICT (ingredient_id, location_id) DO UPDATE
+                   SET qty_on_hand = inv.qty_on_hand + EXCLUDED.qty_on_hand, updated_at = now();
+                """,
+                ([r["location_id"] for r in ok], [r["ingredient_id"] for r in ok], [r["drift"] for r in ok])
+            )
+            cur.execute(
+                """
+                DELETE FROM ledger_check_drift d
+                USING unnest(%s::uuid[], %s::uuid[]) AS k(location_id, ingredient_id)
+                WHERE d.location_id = k.location_id AND d.ingredient_id = k.ingredient_id;
+                """,
+                ([r["location_id"] for r in ok], [r["ingredient_id"] for r in ok])
+            )
+        reallot(cur, folded)
+    if not dry_run:
+        logger.info("ledger repair: %d keys adjusted, %d skipped (drift changed)", len(ok), len(skipped))
+    return {"applied": len(ok), "skipped": skipped, "dry_run": dry_run}
+
+
+def accept_opening(plan: Optional[list[dict]] = None, location_id: Optional[str] = None) -> int:
+    """plan(없으면 마지막 검사 전체)의 drift 를 기초 잔량으로 인정한다. 다음 검사부터 차이로 나오지 않는다."""
+    ensure_ledger_check_schema()
+    locs, ings = _keys(plan, location_id)
+    if not locs:
+        return 0
+    with get_cursor() as cur:
+        cur.execute(
+            """
+            WITH acc AS (
+                DELETE FROM ledger_check_drift d
+                USING unnest(%s::uuid[], %s::uuid[]) AS k(location_id, ingredient_id)
+                WHERE d.location_id = k.location_id AND d.ingredient_id = k.ingredient_id
+                RETURNING d.location_id, d.ingredient_id, d.drift
+            )
+            INSERT INTO ledger_check_sums AS s (location_id, ingredient_id, opening_qty)
+            SELECT location_id, ingredient_id, drift FROM acc
+            ON CONFLICT (location_id, ingredient_id) DO UPDATE
+               SET opening_qty = s.opening_qty + EXCLUDED.opening_qty;
+            """,
+            (locs, ings)
+        )
+        n = cur.rowcount
+    logger.info("ledger check: %d drifts accepted as opening balance", n)
+    return n
+
+
+def reset(location_id: Optional[str] = None):
+    """누적합/진행 상태를 지운다 (다음 검사는 처음부터). 인정한 기초 잔량도 지워진다."""
+    ensure_ledger_check_schema()
+    with get_cursor() as cur:
+        for table in ("ledger_check_drift", "ledger_check_sums", "ledger_check_progress"):
+            cur.execute(f"DELETE FROM {table} WHERE %(loc)s::uuid IS NULL OR location_id = %(loc)s::uuid;",
+                        {"loc": location_id})
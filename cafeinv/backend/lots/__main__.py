@@ -0,0 +1,38 @@
+"""
+배포 시:
+    python -m backend.lots migrate
+cron 등에서 사용:
+    python -m backend.lots refresh
+    python -m backend.lots expiring --location <uuid> --days 3 [--refresh]
+"""
+import argparse
+
+from backend.core.config import LOT_EXPIRING_DAYS
+from backend.core.logger import logger
+from .service import ensure_lots_schema, refresh_lots, expiring_lots
+
+def main():
+    p = argparse.ArgumentParser(prog="python -m backend.lots")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("migrate", help="로트 테이블 설치")
+    sub.add_parser("refresh", help="워터마크 이후 원장을 로트에 FEFO 반영")
+    e = sub.add_parser("expiring", help="지점의 유통기한 임박 로트")
+    e.add_argument("--location", required=True)
+    e.add_argument("--days", type=int, default=LOT_EXPIRING_DAYS)
+    e.add_argument("--refresh", action="store_true", help="조회 전에 먼저 반영")
+    args = p.parse_args()
+
+    if args.cmd == "migrate":
+        ensure_lots_schema()
+        logger.info("lots schema installed")
+    elif args.cmd == "refresh":
+        logger.info("lots refresh: %s", refresh_lots())
+    else:
+        if args.refresh:
+            logger.info("lots refresh: %s", refresh_lots())
+        for r in expiring_lots(args.location, args.days):
+            print(f"{r['expiry_date']}  D{r['days_left']:+d}  {r['ingredient_name']:<20} "
+                  f"{r['lot_code'] or '-':<12} {r['qty_remaining']}")
+
+if __name__ == "__main__":
+    main()
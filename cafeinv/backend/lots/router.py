@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Query
+from backend.core.config import LOT_EXPIRING_DAYS
+from backend.core.exceptions import db_error
+from .service import expiring_lots, list_lots, lots_status, refresh_lots
+
+router = APIRouter()
+
+@router.get("")
+def get_lots(location_id: str | None = None, ingredient_id: str | None = None, limit: int = 200):
+    try:
+        return list_lots(location_id, ingredient_id, limit)
+    except Exception as e:
+        raise db_error(e)
+
+@router.get("/expiring")
+def get_expiring_lots(
+    location_id: str = Query(...),
+    days: int = Query(LOT_EXPIRING_DAYS, ge=0, le=365),
+    ingredient_id: str | None = None,
+    include_expired: bool = True,
+):
+    """마지막 POST /lots/refresh (또는 cron) 기준. 조회만 하고 로트를 다시 배분하지 않는다."""
+    try:
+        return expiring_lots(location_id, days, ingredient_id, include_expired)
+    except Exception as e:
+        raise db_error(e)
+
+@router.get("/status")
+def get_lots_status():
+    try:
+        return lots_status()
+    except Exception as e:
+        raise db_error(e)
+
+@router.post("/refresh")
+def post_lots_refresh():
+    try:
+        return refresh_lots()
+    except Exception as e:
+        raise db_error(e)
@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date, datetime
+
+class LotRow(BaseModel):
+    lot_id: int
+    ingredient_id: str
+    location_id: str
+    lot_code: Optional[str] = None
+    expiry_date: Optional[date] = None
+    qty_received: float
+    qty_remaining: float
+    parent_lot_id: Optional[int] = None
+    received_at: datetime
+
+class ExpiringLotRow(BaseModel):
+    lot_id: int
+    ingredient_id: str
+    ingredient_name: str
+    location_id: str
+    lot_code: Optional[str] = None
+    expiry_date: date
+    days_left: int
+    qty_remaining: float
+    received_at: datetime
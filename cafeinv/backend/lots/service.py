@@ -0,0 +1,288 @@
+"""
+로트(입고 단위) 잔량과 FEFO(유통기한 빠른 것부터) 차감.
+
+판매/이동 경로(apply_stock_change, sale_items 트리거)는 건드리지 않는다. 대신 inventory_tx 원장을
+워터마크 이후부터 읽어 로트에 반영한다 (사용량 롤업과 같은 방식, rollup_watermarks 공유).
+
+1. 입고 등 증가분 → 로트 생성. receipt_items 에서 온 행은 lot_code / expiry_date 를 가져온다.
+2. 모든 차감(판매 소모, 이동 출고, 폐기, 조정 등) → 시간 순서대로 FEFO 배분.
+3. 이동 입고(transfer_in) → 짝이 되는 출고가 가져간 로트를 그대로(같은 lot_code/유통기한) 도착지에 만든다.
+4. 같은 청크에서 이동 입고 뒤에 도착지에서 빠진 분량 중 2에서 못 채운 것을 새 로트로 다시 배분.
+
+배분은 (재료, 지점)마다 차감 누적합 구간과 로트 누적합 구간을 겹쳐 한 문장으로 계산한다
+(판매 여러 줄 / 이동 여러 품목이어도 행 단위 루프 없음). 로트 잔량보다 많이 빠진 분량은
+로트 없는 재고(unallocated)로 남기고 결과에만 보고한다.
+로트는 이 모듈만 고치고 워터마크 행 잠금으로 직렬화하므로 별도 행 잠금은 필요 없다.
+
+FEFO 배분은 refresh_lots() 에서만 일어난다 (POST /lots/refresh, cron). 조회(GET)는 쓰지 않으므로
+마지막 반영 시점만큼만 최신이다. 테이블은 배포 단계에서 설치한다:
+    python -m backend.lots migrate
+"""
+from datetime import timedelta
+from typing import Optional
+
+from backend.core.config import LOT_LAG_SECONDS, LOT_REFRESH_CHUNK_MINUTES
+from backend.core.db import get_cursor, ensure_schema
+from backend.core.logger import logger
+
+LOTS = "inventory_lots"
+
+LOTS_DDL = """
+CREATE TABLE IF NOT EXISTS rollup_watermarks (
+    name        text PRIMARY KEY,
+    watermark   timestamptz,
+    updated_at  timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS inventory_lots (
+    id             bigserial   PRIMARY KEY,
+    ingredient_id  uuid        NOT NULL,
+    location_id    uuid        NOT NULL,
+    lot_code       text,
+    expiry_date    date,
+    qty_received   numeric     NOT NULL,
+    qty_remaining  numeric     NOT NULL CHECK (qty_remaining >= 0),
+    source_tx_id   uuid,                       -- 로트를 만든 inventory_tx 행
+    parent_lot_id  bigint,                     -- 이동 입고: 출발지 로트
+    received_at    timestamptz NOT NULL
+);
+-- FEFO 순서 (유통기한 없는 로트는 마지막)
+CREATE INDEX IF NOT EXISTS inventory_lots_fefo_idx
+    ON inventory_lots (ingredient_id, location_id, expiry_date, received_at, id) WHERE qty_remaining > 0;
+-- 지점별 유통기한 임박 조회
+CREATE INDEX IF NOT EXISTS inventory_lots_expiring_idx
+    ON inventory_lots (location_id, expiry_date) WHERE qty_remaining > 0 AND expiry_date IS NOT NULL;
+
+CREATE TABLE IF NOT EXISTS inventory_lot_allocations (
+    tx_id   uuid    NOT NULL,
+    lot_id  bigint  NOT NULL REFERENCES inventory_lots(id),
+    qty     numeric NOT NULL,
+    PRIMARY KEY (tx_id, lot_id)
+);
+CREATE INDEX IF NOT EXISTS inventory_lot_allocations_lot_idx ON inventory_lot_allocations (lot_id);
+
+INSERT INTO rollup_watermarks (name) VALUES ('inventory_lots') ON CONFLICT (name) DO NOTHING;
+"""
+
+_WINDOW = "it.created_at > %(lo)s::timestamptz AND it.created_at <= %(hi)s::timestamptz"
+
+# 1. 증가분 → 로트 (transfer_in 제외)
+_CREATE_LOTS = f"""
+    INSERT INTO inventory_lots (ingredient_id, location_id, lot_code, expiry_date,
+                                qty_received, qty_remaining, source_tx_id, received_at)
+    SELECT it.ingredient_id, it.location_id, ri.lot_code, COALESCE(ri.expiry_date, it.expiry_date),
+           it.qty_delta, it.qty_delta, it.id, it.created_at
+    FROM inventory_tx it
+    LEFT JOIN receipt_items ri ON it.ref_table = 'receipt_items' AND ri.id = it.ref_id
+    WHERE {_WINDOW} AND it.qty_delta > 0 AND it.tx_type <> 'transfer_in';
+"""
+
+# 2, 4. FEFO 배분: 차감 구간 (hi - qty, hi] 과 로트 구간 (hi - qty_remaining, hi] 의 겹침
+_ALLOCATE = f"""
+    WITH tx AS (
+        SELECT it.id AS tx_id, it.ingredient_id, it.location_id, it.created_at, {{qty}} AS qty
+        FROM inventory_tx it
+        WHERE {_WINDOW} AND it.qty_delta < 0{{where}}
+    ),
+    need AS (
+        SELECT tx_id, ingredient_id, location_id, qty,
+               sum(qty) OVER (PARTITION BY ingredient_id, location_id ORDER BY created_at, tx_id) AS hi
+        FROM tx WHERE qty > 0
+    ),
+    lots AS (
+        SELECT l.id, l.ingredient_id, l.location_id, l.qty_remaining,
+               sum(l.qty_remaining) OVER (PARTITION BY l.ingredient_id, l.location_id
+                                          ORDER BY l.expiry_date, l.received_at, l.id) AS hi
+        FROM inventory_lots l
+        WHERE l.qty_remaining > 0
+          AND (l.ingredient_id, l.location_id) IN (SELECT DISTINCT ingredient_id, location_id FROM need)
+    ),
+    alloc AS (
+        INSERT INTO inventory_lot_allocations (tx_id, lot_id, qty)
+        SELECT n.tx_id, l.id, LEAST(n.hi, l.hi) - GREATEST(n.hi - n.qty, l.hi - l.qty_remaining)
+        FROM need n
+        JOIN lots l ON l.ingredient_id = n.ingredient_id AND l.location_id = n.location_id
+                   AND l.hi - l.qty_remaining < n.hi AND n.hi - n.qty < l.hi
+        RETURNING lot_id, qty
+    ),
+    upd AS (
+        UPDATE inventory_lots l SET qty_remaining = l.qty_remaining - a.qty
+        FROM (SELECT lot_id, sum(qty) AS qty FROM alloc GROUP BY lot_id) a
+        WHERE l.id = a.lot_id
+    )
+    SELECT (SELECT count(*) FROM alloc) AS allocations,
+           (SELECT COALESCE(sum(qty), 0) FROM need) AS needed,
+           (SELECT COALESCE(sum(qty), 0) FROM alloc) AS allocated;
+"""
+_ALLOCATE_ALL = _ALLOCATE.format(qty="-it.qty_delta", where="")
+# 이동 입고가 있었던 (재료, 지점)만, 이미 배분된 만큼 빼고
+_ALLOCATE_AFTER_TRANSFER_IN = _ALLOCATE.format(
+    qty="-it.qty_delta - COALESCE((SELECT sum(x.qty) FROM inventory_lot_allocations x WHERE x.tx_id = it.id), 0)",
+    where=f"""
+          AND (it.ingredient_id, it.location_id) IN (
+              SELECT it.ingredient_id, it.location_id FROM inventory_tx it
+              WHERE {_WINDOW} AND it.tx_type = 'transfer_in')""",
+)
+
+# 3. 이동 입고 → 출고가 가져간 로트별로 도착지 로트, 배분 못 받은 나머지는 유통기한 없는 로트
+_CREATE_TRANSFER_LOTS = f"""
+    WITH tin AS (
+        SELECT it.id, it.ingredient_id, it.location_id, it.qty_delta, it.ref_id, it.created_at
+        FROM inventory_tx it
+        WHERE {_WINDOW} AND it.qty_delta > 0 AND it.tx_type = 'transfer_in'
+    ),
+    src AS (
+        SELECT t.id AS tx_id, l.id AS lot_id, l.lot_code, l.expiry_date, sum(a.qty) AS qty
+        FROM tin t
+        JOIN inventory_tx o ON o.ref_table = 'transfer_items' AND o.ref_id = t.ref_id
+                           AND o.tx_type = 'transfer_out' AND o.ingredient_id = t.ingredient_id
+        JOIN inventory_lot_allocations a ON a.tx_id = o.id
+        JOIN inventory_lots l ON l.id = a.lot_id
+        GROUP BY t.id, l.id, l.lot_code, l.expiry_date
+    )
+    INSERT INTO inventory_lots (ingredient_id, location_id, lot_code, expiry_date,
+                                qty_received, qty_remaining, source_tx_id, parent_lot_id, received_at)
+    SELECT t.ingredient_id, t.location_id, s.lot_code, s.expiry_date, s.qty, s.qty, t.id, s.lot_id, t.created_at
+    FROM tin t JOIN src s ON s.tx_id = t.id
+    UNION ALL
+    SELECT t.ingredient_id, t.location_id, NULL, NULL, r.qty, r.qty, t.id, NULL, t.created_at
+    FROM tin t
+    CROSS JOIN LATERAL (
+        SELECT t.qty_delta - COALESCE((SELECT sum(s.qty) FROM src s WHERE s.tx_id = t.id), 0) AS qty
+    ) r
+    WHERE r.qty > 0;
+"""
+
+
+def ensure_lots_schema():
+    """python -m backend.lots migrate 와 refresh_lots() 에서만 부른다."""
+    ensure_schema(LOTS, LOTS_DDL)
+
+
+def _refresh_chunk(cur) -> dict:
+    cur.execute("SELECT watermark FROM rollup_watermarks WHERE name=%s FOR UPDATE;", (LOTS,))
+    lo = cur.fetchone()["watermark"]
+    cur.execute(
+        """
+        SELECT now() - make_interval(secs => %s) AS hi,
+               (SELECT min(created_at) - interval '1 microsecond' FROM inventory_tx) AS first
+        """,
+        (LOT_LAG_SECONDS,)
+    )
+    row = cur.fetchone()
+    hi, lo = row["hi"], lo if lo is not None else row["first"]
+    res = {"from": lo, "to": lo, "lots_created": 0, "allocations": 0, "unallocated": 0, "done": True}
+    if lo is None or hi <= lo:
+        return res
+    # 구간이 길면 청크로 잘라 시간 순서를 지킨다 (청크 안에서는 입고를 먼저 반영)
+    res["to"] = min(hi, lo + timedelta(minutes=LOT_REFRESH_CHUNK_MINUTES))
+    res["done"] = res["to"] >= hi
+
+    args = {"lo": lo, "hi": res["to"]}
+    cur.execute(_CREATE_LOTS, args)
+    created = cur.rowcount
+    cur.execute(_ALLOCATE_ALL, args)
+    a = cur.fetchone()
+    cur.execute(_CREATE_TRANSFER_LOTS, args)
+    created += cur.rowcount
+    b = {"allocations": 0, "allocated": 0}
+    if cur.rowcount:
+        cur.execute(_ALLOCATE_AFTER_TRANSFER_IN, args)
+        b = cur.fetchone()
+    cur.execute(
+        "UPDATE rollup_watermarks SET watermark=%s, updated_at=now() WHERE name=%s;",
+        (res["to"], LOTS)
+    )
+    res.update(lots_created=created, allocations=a["allocations"] + b["allocations"],
+               unallocated=a["needed"] - a["allocated"] - b["allocated"])
+    return res
+
+
+def refresh_lots() -> dict:
+    """
+    워터마크 이후(now() - lag 까지)의 inventory_tx를 로트에 반영. 청크마다 커밋한다.
+    처음 실행(워터마크 없음)이면 원장 전체를 재생해 과거 입고 로트부터 만든다.
+    """
+    ensure_lots_schema()
+    total = {"from": None, "to": None, "lots_created": 0, "allocations": 0, "unallocated": 0, "chunks": 0}
+    while True:
+        with get_cursor() as cur:
+            r = _refresh_chunk(cur)
+        if total["chunks"] == 0:
+            total["from"] = r["from"]
+        total["to"] = r["to"]
+        total["chunks"] += 1
+        for k in ("lots_created", "allocations", "unallocated"):
+            total[k] += r[k]
+        if r["done"]:
+            break
+    total["unallocated"] = float(total["unallocated"])
+    if total["unallocated"] > 0:
+        # 로트 도입 전 재고 / 원장 없이 넣은 초기 재고에서 빠진 분량
+        logger.info("lots refresh: %s qty deducted without lot stock", total["unallocated"])
+    return total
+
+
+def expiring_lots(location_id: str, days: int,
+                  ingredient_id: Optional[str] = None,
+                  include_expired: bool = True) -> list[dict]:
+    """지점의 유통기한 today + days 이내 로트 (잔량 있는 것만, 임박 순).
+
+    마지막 refresh_lots() 까지 반영된 잔량이다. 그 뒤의 판매/이동은 다음 반영 때 로트에서 빠진다.
+    """
+    conds, params = [], [location_id, days]
+    if not include_expired:
+        conds.append("l.expiry_date >= current_date")
+    if ingredient_id:
+        conds.append("l.ingredient_id = %s::uuid"); params.append(ingredient_id)
+    where = "".join(f" AND {c}" for c in conds)
+    with get_cursor() as cur:
+        cur.execute(f"""
+            SELECT l.id AS lot_id, l.ingredient_id::text, ing.name AS ingredient_name,
+                   l.location_id::text, l.lot_code, l.expiry_date,
+                   l.expiry_date - current_date AS days_left,
+                   l.qty_remaining, l.received_at
+            FROM inventory_lots l
+            JOIN ingredients ing ON ing.id = l.ingredient_id
+            WHERE l.location_id = %s::uuid
+              AND l.qty_remaining > 0
+              AND l.expiry_date IS NOT NULL
+              AND l.expiry_date <= current_date + %s{where}
+            ORDER BY l.expiry_date, ing.name, l.id;
+        """, tuple(params))
+        return cur.fetchall()
+
+
+def list_lots(location_id: Optional[str] = None,
+              ingredient_id: Optional[str] = None,
+              limit: int = 200) -> list[dict]:
+    """잔량 있는 로트를 FEFO 순서로 (마지막 반영 기준)."""
+    limit = max(1, min(limit, 1000))
+    conds, params = ["l.qty_remaining > 0"], []
+    if location_id:
+        conds.append("l.location_id = %s::uuid"); params.append(location_id)
+    if ingredient_id:
+        conds.append("l.ingredient_id = %s::uuid"); params.append(ingredient_id)
+    with get_cursor() as cur:
+        cur.execute(f"""
+            SELECT l.id AS lot_id, l.ingredient_id::text, l.location_id::text, l.lot_code, l.expiry_date,
+                   l.qty_received, l.qty_remaining, l.parent_lot_id, l.received_at
+            FROM inventory_lots l
+            WHERE {" AND ".join(conds)}
+            ORDER BY l.ingredient_id, l.location_id, l.expiry_date, l.received_at, l.id
+            LIMIT %s;
+        """, (*params, limit))
+        return cur.fetchall()
+
+
+def lots_status() -> dict:
+    with get_cursor() as cur:
+        cur.execute(
+            """
+            SELECT w.watermark, w.updated_at,
+                   (SELECT count(*) FROM inventory_lots WHERE qty_remaining > 0) AS open_lots
+            FROM rollup_watermarks w WHERE w.name=%s;
+            """,
+            (LOTS,)
+        )
+        return cur.fetchone()
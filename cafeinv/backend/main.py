@@ -1,28 +1,109 @@
 import os
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 from backend.health.router import router as health_router
+from backend.health.service import monitor as health_monitor
+from backend.metrics.router import router as metrics_router
 from backend.alerts.router import router as alerts_router
+from backend.audit.router import router as audit_router
 from backend.catalog.router import router as catalog_router
 from backend.inventory.router import router as inventory_router
-from backend.core.config import APP_HOST, APP_PORT
+from backend.sales.router import router as sales_router
+from backend.transfers.router import router as transfers_router
+from backend.rollups.router import router as rollups_router
+from backend.salesrollups.router import router as sales_trends_router
+from backend.partitions.router import router as partitions_router
+from backend.stripes.router import router as stripes_router
+from backend.lots.router import router as lots_router
+from backend.units.router import router as units_router
+from backend.costing.router import router as costing_router
+from backend.stocktake.router import router as stocktake_router
+from backend.search.router import router as search_router
+from backend.asof.router import router as asof_router
+from backend.dashboard.router import router as dashboard_router
+from backend.core.config import (
+    APP_HOST, APP_PORT, SERVER_MODE, WEB_WORKERS, GRACEFUL_TIMEOUT, DB_POOL_MIN, SALE_GROUP_COMMIT
+)
+from backend.core.cache import warm_caches
+from backend.core.db import get_pool, close_pool
+from backend.core.logger import logger
+from backend.core.metrics import MetricsMiddleware
+from backend.core.replicas import ReadYourWritesMiddleware, get_replicas, close_replicas
+from backend.sales.group_commit import log_startup as log_group_commit
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 워커마다 실행 (fork 이후). 트래픽을 받기 전에 커넥션/기준정보 캐시를 채워 둔다.
+    try:
+        opened = get_pool().warm(DB_POOL_MIN)
+        get_replicas().start()
+        cached = warm_caches()
+        if SALE_GROUP_COMMIT:
+            log_group_commit()
+        logger.info("worker %s warmed: %d db connections, caches=%s", os.getpid(), opened, cached)
+    except Exception as e:
+        # DB가 늦게 뜨는 경우에도 프로세스는 올라와야 readiness로 판단할 수 있다
+        logger.warning("worker %s warmup failed: %s", os.getpid(), e)
+    health_monitor.refresh()
+    health_monitor.start()
+    yield
+    # 서버가 새 연결을 끊고 진행 중 요청을 GRACEFUL_TIMEOUT까지 기다린 뒤 여기로 온다
+    health_monitor.draining = True
+    health_monitor.stop()
+    close_replicas()
+    close_pool()
+    logger.info("worker %s stopped", os.getpid())
 
-app = FastAPI(title="Cafe Inventory API")
+app = FastAPI(title="Cafe Inventory API", lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ReadYourWritesMiddleware)
 
 # 라우터
 app.include_router(health_router, tags=["Health"])
+app.include_router(metrics_router, tags=["Health"])
 app.include_router(alerts_router, prefix="/alerts", tags=["Alerts"])
+app.include_router(dashboard_router, prefix="/dashboard", tags=["Dashboard"])
 app.include_router(catalog_router, tags=["Catalog"])
+app.include_router(units_router, prefix="/units", tags=["Catalog"])
+app.include_router(search_router, prefix="/search", tags=["Catalog"])
+app.include_router(costing_router, prefix="/costing", tags=["Costing"])
+app.include_router(asof_router, prefix="/inventory/as_of", tags=["Inventory"])
 app.include_router(inventory_router, prefix="/inventory", tags=["Inventory"])
+app.include_router(sales_trends_router, prefix="/sales/trends", tags=["Sales"])
+app.include_router(sales_router, prefix="/sales", tags=["Sales"])
+app.include_router(transfers_router, tags=["Transfers"])
+app.include_router(audit_router, tags=["Audit"])
+app.include_router(rollups_router, prefix="/usage", tags=["Usage"])
+app.include_router(lots_router, prefix="/lots", tags=["Inventory"])
+app.include_router(stocktake_router, prefix="/stocktakes", tags=["Inventory"])
+app.include_router(partitions_router, prefix="/admin/partitions", tags=["Admin"])
+app.include_router(stripes_router, prefix="/admin/stock_stripes", tags=["Admin"])
 
 # 선택: /inventory_tx 호환 경로 (Streamlit에서 고정 경로일 경우 활성화)
 # from inventory.router import get_inventory_tx_compat
 # app.add_api_route("/inventory_tx", get_inventory_tx_compat, methods=["GET"], tags=["Inventory"])
 
 if __name__ == "__main__":
-    uvicorn.run(
-        app,
-        host=os.getenv("APP_HOST", APP_HOST),
-        port=int(os.getenv("APP_PORT", APP_PORT)),
-        reload=True,
-    )
+    # 개발: python -m backend.main
+    # 운영: SERVER_MODE=prod WEB_WORKERS=4 python -m backend.main
+    #      (또는 preload가 필요하면 gunicorn -c backend/gunicorn.conf.py backend.main:app)
+    if SERVER_MODE == "prod":
+        uvicorn.run(
+            "backend.main:app",
+            host=os.getenv("APP_HOST", APP_HOST),
+            port=int(os.getenv("APP_PORT", APP_PORT)),
+            workers=WEB_WORKERS,
+            reload=False,
+            access_log=False,
+            proxy_headers=True,
+            timeout_graceful_shutdown=GRACEFUL_TIMEOUT,
+        )
+    else:
+        uvicorn.run(
+            "backend.main:app",
+            host=os.getenv("APP_HOST", APP_HOST),
+            port=int(os.getenv("APP_PORT", APP_PORT)),
+            reload=True,
+        )
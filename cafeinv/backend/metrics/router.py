@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Response
+from backend.core.metrics import render_metrics
+from backend.core import slowlog
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+# ---------- 슬로우 쿼리 (SLOW_QUERY_LOG=1) ----------
+@router.get("/admin/slow_queries", tags=["Admin"])
+def slow_queries(limit: int | None = None, order_by: str = "total_ms"):
+    if order_by not in ("total_ms", "max_ms", "calls", "slow_calls"):
+        order_by = "total_ms"
+    return slowlog.top(limit, order_by)
+
+@router.delete("/admin/slow_queries", tags=["Admin"])
+def reset_slow_queries():
+    slowlog.reset()
+    return {"ok": True}
@@ -0,0 +1,48 @@
+"""
+    python -m backend.partitions convert inventory_tx      # 1회 전환 (점검 시간)
+    python -m backend.partitions ensure                    # 매일: 앞으로 N개월 파티션 생성
+    python -m backend.partitions archive --format parquet  # 매월: 오래된 파티션 아카이브
+    python -m backend.partitions restore inventory_tx inventory_tx_p202401
+"""
+import argparse
+import json
+
+from backend.core.config import PARTITION_MONTHS_AHEAD, ARCHIVE_AFTER_MONTHS, ARCHIVE_FORMAT
+from .service import (
+    MANAGED_TABLES, convert_to_partitioned, ensure_partitions,
+    archive_partitions, restore_partition, list_partitions
+)
+
+def main():
+    p = argparse.ArgumentParser(prog="python -m backend.partitions")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    c = sub.add_parser("convert")
+    c.add_argument("table", choices=list(MANAGED_TABLES))
+    c.add_argument("--months-ahead", type=int, default=PARTITION_MONTHS_AHEAD)
+    c.add_argument("--drop-legacy", action="store_true")
+    e = sub.add_parser("ensure")
+    e.add_argument("--months-ahead", type=int, default=PARTITION_MONTHS_AHEAD)
+    a = sub.add_parser("archive")
+    a.add_argument("--older-than-months", type=int, default=ARCHIVE_AFTER_MONTHS)
+    a.add_argument("--format", choices=["csv", "parquet"], default=ARCHIVE_FORMAT)
+    a.add_argument("--keep", action="store_true", help="분리만 하고 테이블은 남김")
+    r = sub.add_parser("restore")
+    r.add_argument("table", choices=list(MANAGED_TABLES))
+    r.add_argument("partition")
+    sub.add_parser("list")
+    args = p.parse_args()
+
+    if args.cmd == "convert":
+        out = convert_to_partitioned(args.table, args.months_ahead, args.drop_legacy)
+    elif args.cmd == "ensure":
+        out = ensure_partitions(args.months_ahead)
+    elif args.cmd == "archive":
+        out = archive_partitions(args.older_than_months, args.format, drop=not args.keep)
+    elif args.cmd == "restore":
+        out = restore_partition(args.table, args.partition)
+    else:
+        out = list_partitions()
+    print(json.dumps(out, ensure_ascii=False, indent=2, default=str))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+from fastapi import APIRouter
+from backend.core.config import PARTITION_MONTHS_AHEAD, ARCHIVE_AFTER_MONTHS, ARCHIVE_FORMAT
+from backend.core.exceptions import db_error
+from .schema import PartitionEnsureIn, PartitionArchiveIn, PartitionRestoreIn
+from .service import (
+    list_partitions, ensure_partitions, archive_partitions, list_archives, restore_partition
+)
+
+router = APIRouter()
+
+@router.get("")
+def get_partitions(table: str | None = None):
+    try:
+        return list_partitions(table)
+    except Exception as e:
+        raise db_error(e)
+
+@router.post("/ensure")
+def post_ensure_partitions(body: PartitionEnsureIn):
+    try:
+        return {"created": ensure_partitions(body.months_ahead or PARTITION_MONTHS_AHEAD)}
+    except Exception as e:
+        raise db_error(e)
+
+@router.get("/archives")
+def get_archives():
+    try:
+        return list_archives()
+    except Exception as e:
+        raise db_error(e)
+
+@router.post("/archive")
+def post_archive_partitions(body: PartitionArchiveIn):
+    try:
+        return archive_partitions(
+            body.older_than_months or ARCHIVE_AFTER_MONTHS,
+            body.format or ARCHIVE_FORMAT,
+            drop=body.drop,
+        )
+    except Exception as e:
+        raise db_error(e)
+
+@router.post("/restore")
+def post_restore_partition(body: PartitionRestoreIn):
+    try:
+        return restore_partition(body.table, body.partition)
+    except Exception as e:
+        raise db_error(e)
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class PartitionEnsureIn(BaseModel):
+    months_ahead: Optional[int] = None
+
+class PartitionArchiveIn(BaseModel):
+    older_than_months: Optional[int] = None
+    format: Optional[str] = None  # csv | parquet
+    drop: bool = True
+
+class PartitionRestoreIn(BaseModel):
+    table: str
+    partition: str
@@ -0,0 +1,498 @@
+"""
+inventory_tx / audit_logs 월 단위 RANGE 파티션 관리.
+
+- convert_to_partitioned: 기존 일반 테이블을 파티션 테이블로 1회 전환 (점검 시간에 실행)
+- ensure_partitions: 이번 달 + N개월 파티션을 미리 생성
+- archive_partitions: 오래된 파티션을 분리(DETACH)해 압축 파일(csv.gz / parquet)로 내보내고 삭제
+- restore_partition: 아카이브 파일을 다시 파티션으로 붙임(ATTACH)
+"""
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+from datetime import datetime, timezone
+from typing import Optional
+
+from backend.core.config import (
+    PARTITION_TZ, PARTITION_MONTHS_AHEAD, ARCHIVE_DIR, ARCHIVE_AFTER_MONTHS, ARCHIVE_FORMAT
+)
+from backend.core.db import get_cursor
+from backend.core.logger import logger
+
+# 관리 대상 테이블 → 파티션 키
+MANAGED_TABLES = {
+    "inventory_tx": "created_at",
+    "audit_logs": "created_at",
+}
+
+_PART_RE = re.compile(r"^(?P<table>[a-z_]+)_p(?P<y>\d{4})(?P<m>\d{2})$")
+
+
+def _check_table(table: str) -> str:
+    if table not in MANAGED_TABLES:
+        raise ValueError(f"unmanaged table: {table}")
+    return MANAGED_TABLES[table]
+
+
+def _part_name(table: str, y: int, m: int) -> str:
+    return f"{table}_p{y:04d}{m:02d}"
+
+
+def _add_months(y: int, m: int, n: int) -> tuple[int, int]:
+    idx = y * 12 + (m - 1) + n
+    return idx // 12, idx % 12 + 1
+
+
+def _relkind(cur, name: str) -> Optional[str]:
+    cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s);", (name,))
+    row = cur.fetchone()
+    return row["relkind"] if row else None
+
+
+def _current_month(cur) -> tuple[int, int]:
+    cur.execute(
+        """
+        SELECT EXTRACT(year  FROM now() AT TIME ZONE %s)::int AS y,
+               EXTRACT(month FROM now() AT TIME ZONE %s)::int AS m;
+        """,
+        (PARTITION_TZ, PARTITION_TZ)
+    )
+    row = cur.fetchone()
+    return row["y"], row["m"]
+
+
+def _bounds(cur, y: int, m: int) -> tuple[str, str]:
+    # PARTITION_TZ 기준 월 경계를 UTC 리터럴로 (DDL에는 파라미터를 쓸 수 없음)
+    ny, nm = _add_months(y, m, 1)
+    cur.execute(
+        """
+        SELECT to_char(make_timestamp(%s, %s, 1, 0, 0, 0) AT TIME ZONE %s AT TIME ZONE 'UTC',
+                       'YYYY-MM-DD HH24:MI:SS') || '+00' AS lo,
+               to_char(make_timestamp(%s, %s, 1, 0, 0, 0) AT TIME ZONE %s AT TIME ZONE 'UTC',
+                       'YYYY-MM-DD HH24:MI:SS') || '+00' AS hi;
+        """,
+        (y, m, PARTITION_TZ, ny, nm, PARTITION_TZ)
+    )
+    row = cur.fetchone()
+    return row["lo"], row["hi"]
+
+
+def _create_month(cur, table: str, y: int, m: int) -> bool:
+    key = MANAGED_TABLES[table]
+    name = _part_name(table, y, m)
+    if _relkind(cur, name):
+        return False
+    lo, hi = _bounds(cur, y, m)
+    default = f"{table}_default"
+    stray = False
+    if _relkind(cur, default):
+        cur.execute(
+            f"SELECT 1 FROM {default} WHERE {key} >= %s AND {key} < %s LIMIT 1;", (lo, hi)
+        )
+        stray = cur.fetchone() is not None
+    if stray:
+        # default 파티션에 이미 들어간 행이 있으면 옮긴 뒤 ATTACH 해야 한다
+        cur.execute(
+            f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS);"
+        )
+        cur.execute(
+            f"""
+            WITH moved AS (
+                DELETE FROM {default} WHERE {key} >= %s AND {key} < %s RETURNING *
+            )
+            INSERT INTO {name} SELECT * FROM moved;
+            """,
+            (lo, hi)
+        )
+        cur.execute(
+            f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM ('{lo}') TO ('{hi}');"
+        )
+    else:
+        cur.execute(
+            f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM ('{lo}') TO ('{hi}');"
+        )
+    return True
+
+
+def convert_to_partitioned(table: str, months_ahead: int = PARTITION_MONTHS_AHEAD,
+                           drop_legacy: bool = False) -> dict:
+    """
+    일반 테이블 → 월 파티션 테이블 전환. 한 트랜잭션에서 ACCESS EXCLUSIVE로 진행한다.
+    기존 테이블은 {table}_unpartitioned 로 남기며(drop_legacy=False), 검증 후 직접 삭제.
+    - PK/UNIQUE에는 파티션 키가 추가된다 (예: PRIMARY KEY (id, created_at))
+    - 인덱스/FK/트리거/시퀀스 소유권을 새 테이블로 옮긴다
+    - 이 테이블을 참조하는 FK나 뷰가 있으면 중단한다
+    """
+    key = _check_table(table)
+    legacy = f"{table}_unpartitioned"
+    with get_cursor() as cur:
+        kind = _relkind(cur, table)
+        if kind == "p":
+            return {"table": table, "converted": False, "reason": "already partitioned"}
+        if kind != "r":
+            raise ValueError(f"{table} is not a regular table")
+        cur.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE;")
+
+        cur.execute(
+            """
+            SELECT conname, conrelid::regclass::text AS src FROM pg_constraint
+            WHERE confrelid = %s::regclass AND contype = 'f';
+            """,
+            (table,)
+        )
+        refs = cur.fetchall()
+        if refs:
+            raise ValueError(f"{table} is referenced by foreign keys: {[r['conname'] for r in refs]}")
+        cur.execute(
+            """
+            SELECT DISTINCT v.oid::regclass::text AS view
+            FROM pg_depend d
+            JOIN pg_rewrite r ON r.oid = d.objid
+            JOIN pg_class v   ON v.oid = r.ev_class
+            WHERE d.refobjid = %s::regclass AND v.oid <> d.refobjid;
+            """,
+            (table,)
+        )
+        views = cur.fetchall()
+        if views:
+            raise ValueError(f"{table} is used by views: {[v['view'] for v in views]}")
+
+        # 기존 정의 수집 (rename 전에 읽어야 원래 이름이 def에 들어간다)
+        cur.execute(
+            """
+            SELECT i.relname AS name, ix.indisunique AS is_unique,
+                   pg_get_indexdef(ix.indexrelid) AS def,
+                   con.conname, con.contype,
+                   ARRAY(
+                       SELECT a.attname::text
+                       FROM unnest(ix.indkey) WITH ORDINALITY k(attnum, ord)
+                       JOIN pg_attribute a ON a.attrelid = ix.indrelid AND a.attnum = k.attnum
+                       ORDER BY k.ord
+                   ) AS cols
+            FROM pg_index ix
+            JOIN pg_class i ON i.oid = ix.indexrelid
+            LEFT JOIN pg_constraint con ON con.conindid = ix.indexrelid AND con.conrelid = ix.indrelid
+            WHERE ix.indrelid = %s::regclass;
+            """,
+            (table,)
+        )
+        indexes = cur.fetchall()
+        cur.execute(
+            "SELECT conname, pg_get_constraintdef(oid) AS def FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f';",
+            (table,)
+        )
+        fkeys = cur.fetchall()
+        cur.execute(
+            "SELECT tgname, pg_get_triggerdef(oid) AS def FROM pg_trigger "
+            "WHERE tgrelid = %s::regclass AND NOT tgisinternal;",
+            (table,)
+        )
+        triggers = cur.fetchall()
+        cur.execute(
+            """
+            SELECT attname, attidentity <> '' AS is_identity,
+                   pg_get_serial_sequence(%s, attname) AS seq
+            FROM pg_attribute
+            WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped;
+            """,
+            (table, table)
+        )
+        sequences = [r for r in cur.fetchall() if r["seq"]]
+
+        cur.execute(f"ALTER TABLE {table} RENAME TO {legacy};")
+        for ix in indexes:
+            cur.execute(f'ALTER INDEX "{ix["name"]}" RENAME TO "{ix["name"][:50]}_unpart";')
+
+        cur.execute(
+            f"""
+            CREATE TABLE {table} (
+                LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING IDENTITY
+                              INCLUDING GENERATED INCLUDING STORAGE INCLUDING COMMENTS
+            ) PARTITION BY RANGE ({key});
+            """
+        )
+
+        # 파티션 생성: 가장 오래된 데이터의 달 ~ 이번 달 + months_ahead, 그리고 default
+        cur.execute(
+            f"""
+            SELECT EXTRACT(year  FROM min({key}) AT TIME ZONE %s)::int AS y,
+                   EXTRACT(month FROM min({key}) AT TIME ZONE %s)::int AS m
+            FROM {legacy};
+            """,
+            (PARTITION_TZ, PARTITION_TZ)
+        )
+        first = cur.fetchone()
+        cy, cm = _current_month(cur)
+        y, m = (first["y"], first["m"]) if first["y"] else (cy, cm)
+        ey, em = _add_months(cy, cm, months_ahead)
+        created = 0
+        while (y, m) <= (ey, em):
+            created += _create_month(cur, table, y, m)
+            y, m = _add_months(y, m, 1)
+        cur.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT;")
+
+        # 트리거를 옮기기 전에 데이터를 복사해야 INSERT 트리거가 다시 돌지 않는다
+        cur.execute(f"INSERT INTO {table} SELECT * FROM {legacy};")
+        copied = cur.rowcount
+
+        for ix in indexes:
+            if ix["contype"] in ("p", "u"):
+                cols = list(ix["cols"])
+                if key not in cols:
+                    cols.append(key)
+                kind_sql = "PRIMARY KEY" if ix["contype"] == "p" else "UNIQUE"
+                cur.execute(
+                    f'ALTER TABLE {table} ADD CONSTRAINT "{ix["conname"]}" {kind_sql} ({", ".join(cols)});'
+                )
+            elif ix["is_unique"] and key not in ix["cols"]:
+                logger.warning("skip unique index %s: partition key not included", ix["name"])
+            else:
+                cur.execute(ix["def"] + ";")
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {table}_{key}_idx ON {table} ({key});")
+
+        for fk in fkeys:
+            cur.execute(f'ALTER TABLE {table} ADD CONSTRAINT "{fk["conname"]}" {fk["def"]};')
+
+        for tg in triggers:
+            cur.execute(f'DROP TRIGGER "{tg["tgname"]}" ON {legacy};')
+            cur.execute(tg["def"] + ";")
+
+        for sq in sequences:
+            col = sq["attname"]
+            if sq["is_identity"]:
+                # IDENTITY는 새 시퀀스가 생기므로 기존 최댓값 이후로 맞춘다
+                cur.execute(
+                    f"SELECT setval(pg_get_serial_sequence(%s, %s), max({col})) FROM {table} HAVING max({col}) IS NOT NULL;",
+                    (table, col)
+                )
+            else:
+                cur.execute(f"ALTER SEQUENCE {sq['seq']} OWNED BY {table}.{col};")
+
+        if drop_legacy:
+            cur.execute(f"DROP TABLE {legacy};")
+
+    logger.info("converted %s to partitioned table: %d partitions, %d rows", table, created, copied)
+    return {"table": table, "converted": True, "partitions": created, "rows": copied,
+            "legacy_table": None if drop_legacy else legacy}
+
+
+def ensure_partitions(months_ahead: int = PARTITION_MONTHS_AHEAD) -> list[str]:
+    """이번 달부터 months_ahead 개월 뒤까지 없는 파티션을 만든다 (cron으로 매일 실행)."""
+    created = []
+    with get_cursor() as cur:
+        cy, cm = _current_month(cur)
+        for table in MANAGED_TABLES:
+            if _relkind(cur, table) != "p":
+                continue
+            for n in range(months_ahead + 1):
+                y, m = _add_months(cy, cm, n)
+                if _create_month(cur, table, y, m):
+                    created.append(_part_name(table, y, m))
+    if created:
+        logger.info("created partitions: %s", created)
+    return created
+
+
+def list_partitions(table: Optional[str] = None) -> list[dict]:
+    tables = [table] if table else list(MANAGED_TABLES)
+    for t in tables:
+        _check_table(t)
+    with get_cursor() as cur:
+        cur.execute(
+            """
+            SELECT p.relname AS parent, c.relname AS partition,
+                   pg_get_expr(c.relpartbound, c.oid) AS bound,
+                   GREATEST(c.reltuples, 0)::bigint AS approx_rows,
+                   pg_total_relation_size(c.oid) AS bytes
+            FROM pg_inherits h
+            JOIN pg_class c ON c.oid = h.inhrelid
+            JOIN pg_class p ON p.oid = h.inhparent
+            WHERE p.relname = ANY(%s)
+            ORDER BY p.relname, c.relname;
+            """,
+            (tables,)
+        )
+        return cur.fetchall()
+
+
+# ---------- archive / restore ----------
+def _manifest_path(archive_dir: str, table: str, name: str) -> str:
+    return os.path.join(archive_dir, table, f"{name}.json")
+
+
+def _sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise RuntimeError("parquet archive requires pyarrow (pip install pyarrow)") from e
+
+
+def _csv_to_parquet(csv_path: str, parquet_path: str, columns: list[str]):
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+
+    # 타입 추론 없이 전부 문자열로 보관 → 복원 시 COPY가 원래 타입으로 해석
+    convert = pacsv.ConvertOptions(
+        column_types={c: pa.string() for c in columns},
+        strings_can_be_null=True,
+        quoted_strings_can_be_null=False,
+    )
+    reader = pacsv.open_csv(pa.input_stream(csv_path, compression="gzip"), convert_options=convert)
+    with pq.ParquetWriter(parquet_path, reader.schema, compression="zstd") as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+
+
+def _csv_field(v) -> str:
+    if v is None:
+        return ""
+    return '"' + str(v).replace('"', '""') + '"'
+
+
+def _parquet_copy_chunks(parquet_path: str, columns: list[str]):
+    import pyarrow.parquet as pq
+
+    for batch in pq.ParquetFile(parquet_path).iter_batches(columns=columns, batch_size=50_000):
+        buf = io.StringIO()
+        for row in zip(*(batch.column(c).to_pylist() for c in columns)):
+            buf.write(",".join(_csv_field(v) for v in row))
+            buf.write("\n")
+        buf.seek(0)
+        yield buf
+
+
+def _archive_one(table: str, name: str, fmt: str, archive_dir: str, drop: bool) -> dict:
+    m = _PART_RE.match(name)
+    y, mo = int(m["y"]), int(m["m"])
+    out_dir = os.path.join(archive_dir, table)
+    os.makedirs(out_dir, exist_ok=True)
+    csv_path = os.path.join(out_dir, f"{name}.csv.gz")
+    final_path = csv_path if fmt == "csv" else os.path.join(out_dir, f"{name}.parquet")
+    tmp_path = csv_path + ".tmp"
+
+    with get_cursor() as cur:
+        lo, hi = _bounds(cur, y, mo)
+        # 분리 후 내보내므로 내보내는 동안 새 행이 끼어들 수 없다. 실패하면 전부 롤백.
+        cur.execute(f"ALTER TABLE {table} DETACH PARTITION {name};")
+        cur.execute(
+            "SELECT attname FROM pg_attribute WHERE attrelid = %s::regclass "
+            "AND attnum > 0 AND NOT attisdropped ORDER BY attnum;",
+            (name,)
+        )
+        columns = [r["attname"] for r in cur.fetchall()]
+        cur.execute(f"SELECT count(*) AS n FROM {name};")
+        rows = cur.fetchone()["n"]
+        try:
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                cur.copy_expert(f"COPY (SELECT * FROM {name}) TO STDOUT WITH (FORMAT csv, HEADER true)", f)
+            if fmt == "parquet":
+                _csv_to_parquet(tmp_path, final_path, columns)
+                os.remove(tmp_path)
+            else:
+                os.replace(tmp_path, final_path)
+        except BaseException:
+            # DETACH 는 롤백되지만 쓰다 만 .tmp 는 남으므로 지운다
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        manifest = {
+            "table": table, "partition": name, "from": lo, "to": hi,
+            "rows": rows, "columns": columns, "format": fmt,
+            "file": os.path.basename(final_path), "sha256": _sha256(final_path),
+            "archived_at": datetime.now(timezone.utc).isoformat(),
+        }
+        with open(_manifest_path(archive_dir, table, name), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+        if drop:
+            cur.execute(f"DROP TABLE {name};")
+    logger.info("archived %s (%d rows) -> %s", name, rows, final_path)
+    return manifest
+
+
+def archive_partitions(older_than_months: int = ARCHIVE_AFTER_MONTHS,
+                       fmt: str = ARCHIVE_FORMAT,
+                       archive_dir: str = ARCHIVE_DIR,
+                       drop: bool = True) -> list[dict]:
+    """이번 달 기준 older_than_months 개월보다 오래된 월 파티션을 아카이브."""
+    if fmt not in ("csv", "parquet"):
+        raise ValueError("format must be csv or parquet")
+    if fmt == "parquet":
+        _require_pyarrow()
+    with get_cursor() as cur:
+        cy, cm = _current_month(cur)
+    cutoff = _add_months(cy, cm, -older_than_months)
+
+    done = []
+    for p in list_partitions():
+        m = _PART_RE.match(p["partition"])
+        if not m or m["table"] != p["parent"]:
+            continue
+        if (int(m["y"]), int(m["m"])) < cutoff:
+            done.append(_archive_one(p["parent"], p["partition"], fmt, archive_dir, drop))
+    return done
+
+
+def list_archives(archive_dir: str = ARCHIVE_DIR) -> list[dict]:
+    out = []
+    for table in MANAGED_TABLES:
+        d = os.path.join(archive_dir, table)
+        if not os.path.isdir(d):
+            continue
+        for fn in sorted(os.listdir(d)):
+            if fn.endswith(".json"):
+                with open(os.path.join(d, fn), encoding="utf-8") as f:
+                    out.append(json.load(f))
+    return out
+
+
+def restore_partition(table: str, partition: str, archive_dir: str = ARCHIVE_DIR) -> dict:
+    """아카이브된 월 파티션을 다시 붙인다. 조회가 끝나면 archive_partitions로 다시 내보내면 된다."""
+    _check_table(table)
+    m = _PART_RE.match(partition)
+    if not m or m["table"] != table:
+        raise ValueError(f"invalid partition name: {partition}")
+    with open(_manifest_path(archive_dir, table, partition), encoding="utf-8") as f:
+        manifest = json.load(f)
+    path = os.path.join(archive_dir, table, manifest["file"])
+    if _sha256(path) != manifest["sha256"]:
+        raise ValueError(f"checksum mismatch: {path}")
+    if manifest["format"] == "parquet":
+        _require_pyarrow()
+
+    cols = ", ".join(manifest["columns"])
+    with get_cursor() as cur:
+        if _relkind(cur, partition):
+            raise ValueError(f"{partition} already exists")
+        cur.execute(
+            f"CREATE TABLE {partition} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS);"
+        )
+        if manifest["format"] == "parquet":
+            for chunk in _parquet_copy_chunks(path, manifest["columns"]):
+                cur.copy_expert(f"COPY {partition} ({cols}) FROM STDIN WITH (FORMAT csv)", chunk)
+        else:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                cur.copy_expert(f"COPY {partition} ({cols}) FROM STDIN WITH (FORMAT csv, HEADER true)", f)
+        cur.execute(f"SELECT count(*) AS n FROM {partition};")
+        rows = cur.fetchone()["n"]
+        if rows != manifest["rows"]:
+            raise ValueError(f"row count mismatch: {rows} != {manifest['rows']}")
+        cur.execute(
+            f"ALTER TABLE {table} ATTACH PARTITION {partition} "
+            f"FOR VALUES FROM ('{manifest['from']}') TO ('{manifest['to']}');"
+        )
+    logger.info("restored %s (%d rows)", partition, rows)
+    return {"table": table, "partition": partition, "rows": rows}
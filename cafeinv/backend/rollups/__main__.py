@@ -0,0 +1,34 @@
+"""
+배포 시:
+    python -m backend.rollups migrate
+cron 등에서 사용:
+    python -m backend.rollups refresh
+    python -m backend.rollups backfill --since 2025-01-01 --workers 8
+"""
+import argparse
+from datetime import date
+
+from backend.core.config import ROLLUP_BACKFILL_WORKERS
+from backend.core.logger import logger
+from .service import ensure_usage_schema, refresh_usage_rollups, backfill_usage_rollups
+
+def main():
+    p = argparse.ArgumentParser(prog="python -m backend.rollups")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("migrate", help="사용량 롤업 테이블 설치")
+    sub.add_parser("refresh", help="워터마크 이후 증분 반영")
+    b = sub.add_parser("backfill", help="과거 구간 병렬 재계산")
+    b.add_argument("--since", type=date.fromisoformat, default=None)
+    b.add_argument("--workers", type=int, default=ROLLUP_BACKFILL_WORKERS)
+    args = p.parse_args()
+
+    if args.cmd == "migrate":
+        ensure_usage_schema()
+        logger.info("usage rollup schema installed")
+    elif args.cmd == "refresh":
+        logger.info("usage rollup refresh: %s", refresh_usage_rollups())
+    else:
+        logger.info("usage rollup backfill: %s", backfill_usage_rollups(args.since, workers=args.workers))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+from datetime import date, datetime, timedelta
+from fastapi import APIRouter, Query
+from backend.core.exceptions import db_error
+from .schema import UsageBackfillIn, UsageBucketRow, UsageSummaryRow
+from .service import (
+    usage_summary, usage_series, usage_status,
+    refresh_usage_rollups, backfill_usage_rollups
+)
+
+router = APIRouter()
+
+# ----- 조회 (롤업 테이블) -----
+@router.get("/summary", response_model=list[UsageSummaryRow])
+def get_usage_summary(
+    since: date | None = None,
+    until: date | None = None,
+    location_id: str | None = None,
+    ingredient_id: str | None = None,
+    tx_type: str | None = None,
+    fresh: bool = True,
+    base_units: bool = False,
+):
+    until = until or date.today()
+    since = since or (until - timedelta(days=30))
+    try:
+        return usage_summary(since, until, location_id, ingredient_id, tx_type, fresh, base_units)
+    except Exception as e:
+        raise db_error(e)
+
+@router.get("/daily", response_model=list[UsageBucketRow])
+def get_usage_daily(
+    since: date = Query(...),
+    until: date | None = None,
+    location_id: str | None = None,
+    ingredient_id: str | None = None,
+    tx_type: str | None = None,
+):
+    try:
+        return usage_series("day", since, until or date.today(), location_id, ingredient_id, tx_type)
+    except Exception as e:
+        raise db_error(e)
+
+@router.get("/hourly", response_model=list[UsageBucketRow])
+def get_usage_hourly(
+    since: datetime = Query(...),
+    until: datetime | None = None,
+    location_id: str | None = None,
+    ingredient_id: str | None = None,
+    tx_type: str | None = None,
+):
+    try:
+        return usage_series("hour", since, until or datetime.now().astimezone(),
+                            location_id, ingredient_id, tx_type)
+    except Exception as e:
+        raise db_error(e)
+
+# ----- 집계 갱신 -----
+@router.get("/status")
+def get_usage_status():
+    try:
+        return usage_status()
+    except Exception as e:
+        raise db_error(e)
+
+@router.post("/refresh")
+def post_usage_refresh():
+    try:
+        return refresh_usage_rollups()
+    except Exception as e:
+        raise db_error(e)
+
+@router.post("/backfill")
+def post_usage_backfill(body: UsageBackfillIn):
+    try:
+        if body.workers:
+            return backfill_usage_rollups(body.since, workers=body.workers)
+        return backfill_usage_rollups(body.since)
+    except Exception as e:
+        raise db_error(e)
@@ -0,0 +1,34 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date, datetime
+
+class UsageSummaryRow(BaseModel):
+    ingredient_id: str
+    ingredient_name: str
+    unit_id: Optional[str] = None
+    location_id: str
+    location_name: str
+    tx_type: str
+    qty_in: float
+    qty_out: float
+    qty_net: float
+    tx_count: int
+    # base_units=True 일 때만
+    base: Optional[str] = None
+    qty_in_base: Optional[float] = None
+    qty_out_base: Optional[float] = None
+    qty_net_base: Optional[float] = None
+
+class UsageBucketRow(BaseModel):
+    bucket: date | datetime
+    ingredient_id: str
+    location_id: str
+    tx_type: str
+    qty_in: float
+    qty_out: float
+    qty_net: float
+    tx_count: int
+
+class UsageBackfillIn(BaseModel):
+    since: Optional[date] = None
+    workers: Optional[int] = None
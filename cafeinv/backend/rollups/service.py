@@ -0,0 +1,304 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+import numpy as np
+
+from backend.core.config import (
+    DB_POOL_MAX, ROLLUP_TZ, ROLLUP_LAG_SECONDS, ROLLUP_BACKFILL_WORKERS, ROLLUP_BACKFILL_CHUNK_DAYS
+)
+from backend.core.db import get_cursor, ensure_schema
+from backend.core.logger import logger
+from backend.units.service import unit_table
+
+USAGE = "inventory_usage"
+
+# 일/시간 단위 사용량 집계 + 증분 워터마크
+USAGE_DDL = """
+CREATE TABLE IF NOT EXISTS rollup_watermarks (
+    name        text PRIMARY KEY,
+    watermark   timestamptz,
+    updated_at  timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS inventory_usage_daily (
+    bucket        date    NOT NULL,
+    ingredient_id uuid    NOT NULL,
+    location_id   uuid    NOT NULL,
+    tx_type       text    NOT NULL,
+    qty_in        numeric NOT NULL DEFAULT 0,
+    qty_out       numeric NOT NULL DEFAULT 0,
+    tx_count      bigint  NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket, ingredient_id, location_id, tx_type)
+);
+CREATE INDEX IF NOT EXISTS inventory_usage_daily_loc_idx ON inventory_usage_daily (location_id, bucket);
+CREATE INDEX IF NOT EXISTS inventory_usage_daily_ing_idx ON inventory_usage_daily (ingredient_id, bucket);
+
+CREATE TABLE IF NOT EXISTS inventory_usage_hourly (
+    bucket        timestamptz NOT NULL,
+    ingredient_id uuid        NOT NULL,
+    location_id   uuid        NOT NULL,
+    tx_type       text        NOT NULL,
+    qty_in        numeric     NOT NULL DEFAULT 0,
+    qty_out       numeric     NOT NULL DEFAULT 0,
+    tx_count      bigint      NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket, ingredient_id, location_id, tx_type)
+);
+CREATE INDEX IF NOT EXISTS inventory_usage_hourly_loc_idx ON inventory_usage_hourly (location_id, bucket);
+CREATE INDEX IF NOT EXISTS inventory_usage_hourly_ing_idx ON inventory_usage_hourly (ingredient_id, bucket);
+
+INSERT INTO rollup_watermarks (name) VALUES ('inventory_usage') ON CONFLICT (name) DO NOTHING;
+"""
+
+# (lo, hi] 구간의 inventory_tx를 집계해 기존 버킷에 더한다.
+_MERGE_SELECT = """
+    SELECT {bucket} AS bucket, it.ingredient_id, it.location_id, it.tx_type::text,
+           COALESCE(SUM(it.qty_delta) FILTER (WHERE it.qty_delta > 0), 0),
+           COALESCE(-SUM(it.qty_delta) FILTER (WHERE it.qty_delta < 0), 0),
+           COUNT(*)
+    FROM inventory_tx it
+    WHERE it.created_at {lo_op} %(lo)s::timestamptz AND it.created_at {hi_op} %(hi)s::timestamptz
+    GROUP BY 1, 2, 3, 4
+"""
+_DAILY_BUCKET = "(it.created_at AT TIME ZONE %(tz)s)::date"
+_HOURLY_BUCKET = "date_trunc('hour', it.created_at)"
+
+_UPSERT = """
+    INSERT INTO {table} AS r (bucket, ingredient_id, location_id, tx_type, qty_in, qty_out, tx_count)
+    {select}
+    ON CONFLICT (bucket, ingredient_id, location_id, tx_type) DO UPDATE
+    SET qty_in   = r.qty_in   + EXCLUDED.qty_in,
+        qty_out  = r.qty_out  + EXCLUDED.qty_out,
+        tx_count = r.tx_count + EXCLUDED.tx_count;
+"""
+
+def _merge_sql(table: str, bucket: str, lo_op: str = ">", hi_op: str = "<=") -> str:
+    return _UPSERT.format(
+        table=table,
+        select=_MERGE_SELECT.format(bucket=bucket, lo_op=lo_op, hi_op=hi_op),
+    )
+
+_MERGE_DAILY = _merge_sql("inventory_usage_daily", _DAILY_BUCKET)
+_MERGE_HOURLY = _merge_sql("inventory_usage_hourly", _HOURLY_BUCKET)
+# 백필 청크는 [lo, hi) 반열린 구간 (현지 자정 경계)
+_CHUNK_DAILY = _merge_sql("inventory_usage_daily", _DAILY_BUCKET, ">=", "<")
+_CHUNK_HOURLY = _merge_sql("inventory_usage_hourly", _HOURLY_BUCKET, ">=", "<")
+
+
+def ensure_usage_schema():
+    """배포 단계(python -m backend.rollups migrate)와 refresh/backfill 에서만 부른다. 조회 경로에서는 DDL 을 돌리지 않는다."""
+    ensure_schema(USAGE, USAGE_DDL)
+
+
+def _local_midnight(cur, day: date) -> datetime:
+    cur.execute("SELECT (%s::date)::timestamp AT TIME ZONE %s AS ts;", (day, ROLLUP_TZ))
+    return cur.fetchone()["ts"]
+
+
+def refresh_usage_rollups() -> dict:
+    """
+    워터마크 이후(now() - lag 까지)의 inventory_tx만 읽어 일/시간 집계에 누적.
+    lag는 created_at(트랜잭션 시작 시각)보다 늦게 커밋되는 행을 놓치지 않기 위한 여유분.
+    """
+    ensure_usage_schema()
+    with get_cursor() as cur:
+        cur.execute("SELECT watermark FROM rollup_watermarks WHERE name=%s FOR UPDATE;", (USAGE,))
+        lo = cur.fetchone()["watermark"]
+        cur.execute("SELECT now() - make_interval(secs => %s) AS hi;", (ROLLUP_LAG_SECONDS,))
+        hi = cur.fetchone()["hi"]
+        if lo is not None and hi <= lo:
+            return {"from": lo, "to": lo, "daily_rows": 0, "hourly_rows": 0}
+
+        args = {"lo": lo if lo is not None else "-infinity", "hi": hi, "tz": ROLLUP_TZ}
+        cur.execute(_MERGE_DAILY, args)
+        daily_rows = cur.rowcount
+        cur.execute(_MERGE_HOURLY, args)
+        hourly_rows = cur.rowcount
+        cur.execute(
+            "UPDATE rollup_watermarks SET watermark=%s, updated_at=now() WHERE name=%s;",
+            (hi, USAGE)
+        )
+    return {"from": lo, "to": hi, "daily_rows": daily_rows, "hourly_rows": hourly_rows}
+
+
+def _rebuild_chunk(start: date, end: date) -> int:
+    # [start, end) 현지 일자 구간을 지우고 원본에서 다시 계산 (재실행해도 결과 동일)
+    with get_cursor() as cur:
+        lo = _local_midnight(cur, start)
+        hi = _local_midnight(cur, end)
+        cur.execute(
+            "DELETE FROM inventory_usage_daily WHERE bucket >= %s AND bucket < %s;",
+            (start, end)
+        )
+        cur.execute(
+            "DELETE FROM inventory_usage_hourly WHERE bucket >= %s AND bucket < %s;",
+            (lo, hi)
+        )
+        args = {"lo": lo, "hi": hi, "tz": ROLLUP_TZ}
+        cur.execute(_CHUNK_DAILY, args)
+        rows = cur.rowcount
+        cur.execute(_CHUNK_HOURLY, args)
+        return rows
+
+
+def backfill_usage_rollups(since: Optional[date] = None,
+                           workers: int = ROLLUP_BACKFILL_WORKERS,
+                           chunk_days: int = ROLLUP_BACKFILL_CHUNK_DAYS) -> dict:
+    """
+    since(없으면 가장 오래된 tx)부터 어제까지를 청크 단위로 병렬 재계산한 뒤
+    워터마크를 오늘 자정으로 맞춘다. 오늘치는 다음 refresh에서 증분으로 채워진다.
+    워터마크 행을 잠근 채 진행하므로 그 사이 refresh는 대기한다.
+    워커는 풀에서 청크마다 연결을 하나씩 빌리므로 DB_POOL_MAX - 2 개로 자른다
+    (워터마크 연결 하나 + 여유 하나, 나머지가 DB_POOL_EXHAUSTED 로 실패하지 않게).
+    """
+    ensure_usage_schema()
+    workers = max(1, min(workers, DB_POOL_MAX - 2))
+    with get_cursor() as cur:
+        cur.execute("SELECT watermark FROM rollup_watermarks WHERE name=%s FOR UPDATE;", (USAGE,))
+        wm = cur.fetchone()["watermark"]
+        cur.execute(
+            """
+            SELECT (min(created_at) AT TIME ZONE %(tz)s)::date AS first_day,
+                   ((now() - make_interval(secs => %(lag)s)) AT TIME ZONE %(tz)s)::date AS end_day,
+                   (%(wm)s::timestamptz AT TIME ZONE %(tz)s)::date AS wm_day
+            FROM inventory_tx;
+            """,
+            {"tz": ROLLUP_TZ, "lag": ROLLUP_LAG_SECONDS, "wm": wm}
+        )
+        row = cur.fetchone()
+        start = since or row["first_day"]
+        end = row["end_day"]
+        if start is None:
+            return {"chunks": 0, "since": None, "until": None}
+        # 기존 워터마크보다 뒤에서 시작하면 그 사이가 비므로 앞으로 당긴다
+        if row["wm_day"] is not None and row["wm_day"] < start:
+            start = row["wm_day"]
+
+        chunks = []
+        day = start
+        while day < end:
+            nxt = min(day + timedelta(days=max(1, chunk_days)), end)
+            chunks.append((day, nxt))
+            day = nxt
+
+        daily_rows = 0
+        if chunks:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for n in pool.map(lambda c: _rebuild_chunk(*c), chunks):
+                    daily_rows += n
+
+        # end(오늘) 이후 버킷은 워터마크를 되돌리면서 다시 쌓이므로 비운다
+        new_wm = _local_midnight(cur, end)
+        cur.execute("DELETE FROM inventory_usage_daily WHERE bucket >= %s;", (end,))
+        cur.execute("DELETE FROM inventory_usage_hourly WHERE bucket >= %s;", (new_wm,))
+        cur.execute(
+            "UPDATE rollup_watermarks SET watermark=%s, updated_at=now() WHERE name=%s;",
+            (new_wm, USAGE)
+        )
+    logger.info("usage rollup backfill %s..%s: %d chunks, %d daily rows", start, end, len(chunks), daily_rows)
+    return {"chunks": len(chunks), "since": start, "until": end, "daily_rows": daily_rows}
+
+
+def _filters(alias: str, location_id, ingredient_id, tx_type) -> tuple[str, list]:
+    conds, params = [], []
+    if location_id:
+        conds.append(f"{alias}.location_id = %s::uuid"); params.append(location_id)
+    if ingredient_id:
+        conds.append(f"{alias}.ingredient_id = %s::uuid"); params.append(ingredient_id)
+    if tx_type:
+        conds.append(f"{alias}.tx_type::text = %s"); params.append(tx_type)
+    return "".join(f" AND {c}" for c in conds), params
+
+
+def usage_summary(since: date, until: date,
+                  location_id: Optional[str] = None,
+                  ingredient_id: Optional[str] = None,
+                  tx_type: Optional[str] = None,
+                  fresh: bool = True,
+                  base_units: bool = False) -> list[dict]:
+    """
+    [since, until] 현지 일자 구간의 (품목, 위치, tx_type)별 합계.
+    fresh=True면 워터마크 이후 아직 집계되지 않은 tx를 원본에서 더한다(보통 수 분치).
+    base_units=True면 재료 단위(kg, L …)를 base(g, ml …)로 환산한 qty_*_base 와 base 를 덧붙인다.
+    """
+    where_r, params_r = _filters("d", location_id, ingredient_id, tx_type)
+    parts = [f"""
+        SELECT d.ingredient_id, d.location_id, d.tx_type, d.qty_in, d.qty_out, d.tx_count
+        FROM inventory_usage_daily d
+        WHERE d.bucket >= %s AND d.bucket <= %s{where_r}
+    """]
+    params = [since, until, *params_r]
+    if fresh:
+        where_t, params_t = _filters("it", location_id, ingredient_id, tx_type)
+        parts.append(f"""
+        SELECT it.ingredient_id, it.location_id, it.tx_type::text,
+               GREATEST(it.qty_delta, 0), GREATEST(-it.qty_delta, 0), 1
+        FROM inventory_tx it
+        WHERE it.created_at > (SELECT COALESCE(watermark, '-infinity') FROM rollup_watermarks WHERE name=%s)
+          AND (it.created_at AT TIME ZONE %s)::date BETWEEN %s AND %s{where_t}
+        """)
+        params += [USAGE, ROLLUP_TZ, since, until, *params_t]
+
+    union_sql = " UNION ALL ".join(parts)
+    with get_cursor() as cur:
+        cur.execute(f"""
+            SELECT u.ingredient_id::text, ing.name AS ingredient_name, ing.unit_id::text AS unit_id,
+                   u.location_id::text, loc.name AS location_name,
+                   u.tx_type,
+                   SUM(u.qty_in)  AS qty_in,
+                   SUM(u.qty_out) AS qty_out,
+                   SUM(u.qty_in) - SUM(u.qty_out) AS qty_net,
+                   SUM(u.tx_count) AS tx_count
+            FROM ({union_sql}) AS u(ingredient_id, location_id, tx_type, qty_in, qty_out, tx_count)
+            JOIN ingredients ing ON ing.id = u.ingredient_id
+            JOIN locations   loc ON loc.id = u.location_id
+            GROUP BY u.ingredient_id, ing.name, ing.unit_id, u.location_id, loc.name, u.tx_type
+            ORDER BY loc.name, ing.name, u.tx_type;
+        """, tuple(params))
+        rows = cur.fetchall()
+    if base_units and rows:
+        _with_base_units(rows, ("qty_in", "qty_out", "qty_net"))
+    return rows
+
+
+def _with_base_units(rows: list[dict], keys: tuple[str, ...]):
+    # 단위 없는 재료는 환산 계수 1, base 없음
+    t = unit_table()
+    known = [n for n, r in enumerate(rows) if r["unit_id"]]
+    factor = np.ones(len(rows))
+    base = [None] * len(rows)
+    if known:
+        f, b = t.to_base(np.ones(len(known)), [rows[n]["unit_id"] for n in known])
+        factor[known] = f
+        for n, v in zip(known, b):
+            base[n] = v
+    for key in keys:
+        vals = np.round(np.array([float(r[key]) for r in rows]) * factor, 6).tolist()
+        for r, v in zip(rows, vals):
+            r[f"{key}_base"] = v
+    for r, b in zip(rows, base):
+        r["base"] = b
+
+
+def usage_series(granularity: str, since: datetime, until: datetime,
+                 location_id: Optional[str] = None,
+                 ingredient_id: Optional[str] = None,
+                 tx_type: Optional[str] = None) -> list[dict]:
+    """버킷별 시계열. granularity: 'day' | 'hour'"""
+    table = "inventory_usage_hourly" if granularity == "hour" else "inventory_usage_daily"
+    where, params = _filters("r", location_id, ingredient_id, tx_type)
+    with get_cursor() as cur:
+        cur.execute(f"""
+            SELECT r.bucket, r.ingredient_id::text, r.location_id::text, r.tx_type,
+                   r.qty_in, r.qty_out, r.qty_in - r.qty_out AS qty_net, r.tx_count
+            FROM {table} r
+            WHERE r.bucket >= %s AND r.bucket <= %s{where}
+            ORDER BY r.bucket, r.location_id, r.ingredient_id, r.tx_type;
+        """, (since, until, *params))
+        return cur.fetchall()
+
+
+def usage_status() -> dict:
+    with get_cursor() as cur:
+        cur.execute("SELECT name, watermark, updated_at FROM rollup_watermarks WHERE name=%s;", (USAGE,))
+        return cur.fetchone()
@@ -0,0 +1,30 @@
+"""
+판매 group commit(SALE_GROUP_COMMIT=1) 설치. 점검 시간에 한 번:
+    python -m backend.sales guard-trigger             # sale_items 차감 트리거에 배치 조건 추가
+    python -m backend.sales guard-trigger --remove    # 되돌리기
+    python -m backend.sales status
+조건을 건 뒤에는 배치로 들어온 판매의 차감을 (재료, 지점)마다 합계로 한 번씩 한다.
+일반 판매(배치 밖)는 조건과 무관하게 예전처럼 트리거가 줄마다 차감한다.
+"""
+import argparse
+
+from backend.core.db import get_cursor
+from backend.core.logger import logger
+from .group_commit import guard_trigger, trigger_guarded
+
+def main():
+    p = argparse.ArgumentParser(prog="python -m backend.sales")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    g = sub.add_parser("guard-trigger", help="sale_items 차감 트리거에 배치 조건(WHEN)을 건다")
+    g.add_argument("--remove", action="store_true")
+    sub.add_parser("status", help="배치 조건 설치 여부")
+    args = p.parse_args()
+
+    if args.cmd == "guard-trigger":
+        guard_trigger(remove=args.remove)
+    else:
+        with get_cursor() as cur:
+            logger.info("sale_items trigger batch guard: %s", "installed" if trigger_guarded(cur) else "missing")
+
+if __name__ == "__main__":
+    main()
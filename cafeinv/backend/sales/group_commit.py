@@ -0,0 +1,401 @@
+"""
+판매 group commit.
+
+피크 때 판매 한 건마다 커밋(fsync)하고 우유/원두 같은 인기 재료 행을 매번 새로 잠그는 대신,
+SALE_GROUP_COMMIT_WINDOW_MS 안에 들어온 판매(최대 SALE_GROUP_COMMIT_MAX_BATCH건)를 한 트랜잭션으로 처리한다.
+
+1. Idempotency-Key 가 있는 판매는 같은 트랜잭션에서 키를 기록한다 (idempotency.claim). 이미 처리된 키는
+   저장된 응답으로 돌려주고 배치에서 뺀다. 실패한 판매의 키는 지워서 다시 보낼 수 있게 한다.
+2. 배치 전체에 필요한 (재료, 지점) 차감량을 한 쿼리로 합산하고, 해당 재고 행을 키 순서로 한 번만 잠근다.
+3. 잠근 잔량으로 도착 순서대로 판매별 차감을 시뮬레이션 → 모자라는 판매만 INSUFFICIENT_STOCK 으로 돌려보낸다.
+4. 통과한 판매는 sales / sale_items 를 한 번에 INSERT 하고, 차감은 (재료, 지점)마다 합계로
+   apply_stock_change 를 한 번씩 부른다 (원장도 키마다 한 줄, ref_table='sales').
+   sale_items 트리거가 줄마다 또 차감하지 않도록 트리거에 cafeinv.sale_batch 조건을 걸어 둬야 한다:
+       python -m backend.sales guard-trigger
+   조건이 없으면 (설치 전) 차감은 예전처럼 트리거가 줄마다 한다. 배치마다 INSERT 뒤(테이블 잠금 보유 중)에
+   확인하므로 조건을 걸거나 풀어도 이중 차감/누락은 없다.
+   예상 못 한 오류(없는 메뉴 등)가 나면 판매별 SAVEPOINT 로 다시 돌려 해당 판매만 실패시킨다.
+5. 커밋 한 번 후 호출자마다 자기 결과 또는 예외를 받는다.
+
+대기: SALE_GROUP_COMMIT_TIMEOUT 안에 배치에 들어가지 못한 판매는 취소하고 SALE_QUEUE_TIMEOUT(503)을 돌려준다
+(아무것도 반영되지 않았으므로 그대로 다시 보내면 된다). 배치에 들어간 판매는 커밋/롤백이 끝날 때까지 기다린다.
+"""
+import queue
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from dataclasses import dataclass
+from typing import Optional
+
+from psycopg2.extras import execute_values
+
+from backend.core.config import (
+    SALE_GROUP_COMMIT_WINDOW_MS, SALE_GROUP_COMMIT_MAX_BATCH, SALE_GROUP_COMMIT_TIMEOUT,
+)
+from backend.core.db import get_cursor
+from backend.core.idempotency import (
+    IdempotencyConflict, claim, ensure_idempotency_schema, lookup, normalize_key, remember, replay,
+    request_hash, save,
+)
+from backend.core.logger import logger
+from backend.stripes.service import balance_sql
+
+SCOPE = "sales"
+GUARD_SETTING = "cafeinv.sale_batch"
+GUARD = f"current_setting('{GUARD_SETTING}', true) IS DISTINCT FROM 'on'"
+
+# sale_items 에 걸린 재고 차감 트리거 (함수 본문에서 apply_stock_change 를 부르는 행 트리거)
+_CONSUME_TRIGGERS = """
+    SELECT t.tgname, pg_get_triggerdef(t.oid) AS def
+    FROM pg_trigger t
+    JOIN pg_proc p ON p.oid = t.tgfoid
+    WHERE t.tgrelid = 'sale_items'::regclass AND NOT t.tgisinternal
+      AND p.prosrc ILIKE '%apply_stock_change%';
+"""
+
+
+class SaleRejected(Exception):
+    pass
+
+
+class SaleQueueTimeout(Exception):
+    pass
+
+
+def _uuid_or_none(v):
+    return str(uuid.UUID(str(v))) if v else None
+
+
+def sale_total(items: list[dict]) -> float:
+    return sum(it["qty"] * it["unit_price"] - it.get("discount", 0) for it in items)
+
+
+@dataclass
+class _Sale:
+    data: dict
+    key: Optional[str]
+    hash: Optional[str]
+    fut: Future
+    sale_id: str = ""
+    location_id: Optional[str] = None
+    total: float = 0
+    needs: tuple = ()
+    claimed: bool = False
+    result: object = None
+    replayed: bool = False
+    leader: Optional["_Sale"] = None     # 같은 배치에 같은 키가 두 번 오면 앞의 판매
+
+
+def trigger_guarded(cur) -> bool:
+    cur.execute(_CONSUME_TRIGGERS)
+    rows = cur.fetchall()
+    return bool(rows) and all(GUARD_SETTING in r["def"] for r in rows)
+
+
+def log_startup() -> bool:
+    """워커 시작 시 group commit 동작 방식을 로그로 남긴다 (트리거 조건이 없으면 경고)."""
+    with get_cursor() as cur:
+        guarded = trigger_guarded(cur)
+    if guarded:
+        logger.info("sale group commit on: window=%gms max_batch=%d, idempotency keys recorded in batch",
+                    SALE_GROUP_COMMIT_WINDOW_MS, SALE_GROUP_COMMIT_MAX_BATCH)
+    else:
+        logger.warning("sale group commit on but sale_items trigger has no batch guard: stock is deducted "
+                       "per line (python -m backend.sales guard-trigger)")
+    return guarded
+
+
+def guard_trigger(remove: bool = False) -> list[str]:
+    """
+    sale_items 차감 트리거에 배치 조건(WHEN)을 걸거나(remove=False) 뗀다. 같은 트리거를 다시 만든다.
+    sale_items 를 잠깐 잠그므로 점검 시간에 한 번 실행 (python -m backend.sales guard-trigger [--remove]).
+    """
+    changed = []
+    with get_cursor() as cur:
+        cur.execute("SET LOCAL lock_timeout = '5s';")
+        cur.execute("LOCK TABLE sale_items IN SHARE ROW EXCLUSIVE MODE;")
+        cur.execute(_CONSUME_TRIGGERS)
+        for r in cur.fetchall():
+            ddl = r["def"]
+            if remove:
+                if GUARD not in ddl:
+                    continue
+                ddl = ddl.replace(f"WHEN ({GUARD}) ", "")
+            else:
+                if GUARD_SETTING in ddl:
+                    continue
+                if " WHEN (" in ddl:
+                    raise RuntimeError(f"trigger {r['tgname']} already has a WHEN condition: {ddl}")
+                ddl = ddl.replace(" EXECUTE FUNCTION ", f" WHEN ({GUARD}) EXECUTE FUNCTION ", 1)
+            cur.execute(f'DROP TRIGGER "{r["tgname"]}" ON sale_items;')
+            cur.execute(ddl)
+            changed.append(r["tgname"])
+    logger.info("sale_items trigger batch guard %s: %s", "removed" if remove else "installed", changed or "no change")
+    return changed
+
+
+class SaleBatcher:
+    def __init__(self, window_ms: float, max_batch: int, timeout: float = SALE_GROUP_COMMIT_TIMEOUT):
+        self.window = window_ms / 1000.0
+        self.max_batch = max(1, max_batch)
+        self.timeout = timeout
+        self._q: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._warned = False
+        self.batches = 0
+        self.sales = 0
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="sale-group-commit", daemon=True)
+                self._thread.start()
+
+    def submit(self, data: dict, key: str | None = None) -> tuple[dict, bool]:
+        """판매 1건을 다음 배치에 넣고 결과를 기다린다 → (결과, 저장된 응답을 돌려준 것인지)."""
+        h = None
+        if key:
+            key = normalize_key(key)
+            h = request_hash(data)
+            hit = lookup(SCOPE, key, h)
+            if hit is not None:
+                return hit, True
+            ensure_idempotency_schema()
+        self._ensure_thread()
+        fut: Future = Future()
+        self._q.put(_Sale(data, key, h, fut))
+        try:
+            return fut.result(timeout=self.timeout)
+        except FutureTimeout:
+            if fut.cancel():
+                # 아직 배치에 들어가지 않았다 → 반영된 것 없음
+                raise SaleQueueTimeout(f"SALE_QUEUE_TIMEOUT: 판매가 {self.timeout:g}s 안에 처리되지 못했습니다")
+            # 이미 배치 트랜잭션 안: 나중에 커밋될 수 있으므로 결과를 끝까지 기다린다
+            return fut.result()
+
+    def _loop(self):
+        while True:
+            batch = [self._q.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    break
+                try:
+                    batch.append(self._q.get(timeout=left))
+                except queue.Empty:
+                    break
+            # 대기 중 타임아웃으로 취소된 판매는 뺀다 (여기서부터는 취소할 수 없다)
+            batch = [s for s in batch if s.fut.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                self._flush(batch)
+            except Exception as e:
+                # 커넥션/커밋 실패 → 배치 전체 실패
+                logger.warning("sale group commit failed (%d sales): %s", len(batch), e)
+                for s in batch:
+                    if not s.fut.done():
+                        s.fut.set_exception(e)
+
+    def _flush(self, batch: list):
+        pending = []
+        for s in batch:
+            try:
+                items = s.data["items"]
+                for it in items:
+                    it["menu_item_id"] = _uuid_or_none(it["menu_item_id"])
+                s.sale_id = str(uuid.uuid4())
+                s.location_id = _uuid_or_none(s.data.get("location_id"))
+                s.total = sale_total(items)
+                pending.append(s)
+            except (ValueError, KeyError, TypeError) as e:
+                s.fut.set_exception(e)
+        if not pending:
+            return
+
+        with get_cursor(commit=True) as cur:
+            cur.execute("SELECT set_config(%s, 'on', true);", (GUARD_SETTING,))
+            live = self._claim(cur, pending)
+            accepted = self._reserve(cur, live)
+            if accepted:
+                cur.execute("SAVEPOINT batch;")
+                try:
+                    self._apply(cur, accepted)
+                    cur.execute("RELEASE SAVEPOINT batch;")
+                except Exception as e:
+                    logger.info("sale group commit: bulk insert failed, retrying per sale: %s", e)
+                    cur.execute("ROLLBACK TO SAVEPOINT batch;")
+                    ok = []
+                    for s in accepted:
+                        cur.execute("SAVEPOINT one;")
+                        try:
+                            self._apply(cur, [s])
+                            cur.execute("RELEASE SAVEPOINT one;")
+                            ok.append(s)
+                        except Exception as e1:
+                            cur.execute("ROLLBACK TO SAVEPOINT one;")
+                            s.result = e1
+                    accepted = ok
+            for s in accepted:
+                s.result = {"sale_id": s.sale_id, "total_amount": float(s.total)}
+                if s.claimed:
+                    s.result = save(cur, SCOPE, s.key, s.result)
+            # 실패한 판매의 키는 남기지 않는다 (같은 키로 다시 보낼 수 있게)
+            failed = [s.key for s in live if s.claimed and isinstance(s.result, Exception)]
+            if failed:
+                cur.execute("DELETE FROM idempotency_keys WHERE scope = %s AND key = ANY(%s);", (SCOPE, failed))
+        # 커밋이 끝난 뒤에 결과를 알린다
+        self.batches += 1
+        self.sales += len(pending)
+        for s in pending:
+            if s.leader is not None:
+                s.result, s.replayed = s.leader.result, True
+            if isinstance(s.result, Exception):
+                s.fut.set_exception(s.result)
+                continue
+            if s.claimed:
+                remember(SCOPE, s.key, s.hash, s.result)
+            s.fut.set_result((s.result, s.replayed))
+
+    def _claim(self, cur, pending: list) -> list:
+        """키 있는 판매의 키를 기록. 처리할 판매만 돌려준다 (재응답/키 충돌/배치 안 중복은 빠진다)."""
+        if not any(s.key for s in pending):
+            return pending
+        live, seen = [], {}
+        for s in pending:
+            if not s.key:
+                live.append(s)
+                continue
+            first = seen.get(s.key)
+            if first is not None:
+                if first.hash == s.hash:
+                    s.leader = first
+                else:
+                    s.result = IdempotencyConflict(
+                        "IDEMPOTENCY_CONFLICT: 같은 Idempotency-Key로 다른 요청이 이미 처리되었습니다")
+                continue
+            seen[s.key] = s
+            row = claim(cur, SCOPE, s.key, s.hash)
+            if row is None:
+                s.claimed = True
+                live.append(s)
+                continue
+            try:
+                s.result, s.replayed = replay(row, s.hash), True
+            except IdempotencyConflict as e:
+                s.result = e
+        return live
+
+    def _reserve(self, cur, pending: list) -> list:
+        """배치 전체 차감량 기준으로 재고 행을 한 번에 잠그고, 잔량이 모자라는 판매를 걸러낸다."""
+        if not pending:
+            return []
+        idx, menu, qty, loc = [], [], [], []
+        for n, s in enumerate(pending):
+            for it in s.data["items"]:
+                idx.append(n)
+                menu.append(it["menu_item_id"])
+                qty.append(it["qty"])
+                loc.append(s.location_id)
+        cur.execute(
+            """
+            SELECT l.idx, r.ingredient_id::text AS ingredient_id,
+                   COALESCE(l.loc, m.default_location_id)::text AS location_id,
+                   sum(r.qty_required * l.qty) AS need
+            FROM unnest(%s::int[], %s::uuid[], %s::numeric[], %s::uuid[]) AS l(idx, menu_item_id, qty, loc)
+            JOIN menu_items m ON m.id = l.menu_item_id
+            JOIN recipes r ON r.menu_item_id = l.menu_item_id
+            WHERE COALESCE(l.loc, m.default_location_id) IS NOT NULL
+            GROUP BY 1, 2, 3;
+            """,
+            (idx, menu, qty, loc),
+        )
+        needs: dict[int, list] = {}
+        keys = set()
+        for r in cur.fetchall():
+            key = (r["ingredient_id"], r["location_id"])
+            needs.setdefault(r["idx"], []).append((key, r["need"]))
+            keys.add(key)
+
+        balance = {}
+        if keys:
+            ordered = sorted(keys)
+            cur.execute(
+                f"""
+                SELECT i.ingredient_id::text AS ingredient_id, i.location_id::text AS location_id,
+                       {balance_sql("i")} AS qty_on_hand
+                FROM inventory i
+                JOIN unnest(%s::uuid[], %s::uuid[]) AS k(ingredient_id, location_id)
+                  ON k.ingredient_id = i.ingredient_id AND k.location_id = i.location_id
+                ORDER BY i.ingredient_id, i.location_id
+                FOR UPDATE OF i;
+                """,
+                ([k[0] for k in ordered], [k[1] for k in ordered]),
+            )
+            balance = {(r["ingredient_id"], r["location_id"]): r["qty_on_hand"] for r in cur.fetchall()}
+
+        accepted = []
+        for n, s in enumerate(pending):
+            lines = needs.get(n, [])
+            short = next((k for k, need in lines if balance.get(k, 0) - need < 0), None)
+            if short is not None:
+                s.result = SaleRejected(f"INSUFFICIENT_STOCK ingredient={short[0]} location={short[1]}")
+                continue
+            for k, need in lines:
+                balance[k] = balance.get(k, 0) - need
+            s.needs = tuple(lines)
+            accepted.append(s)
+        return accepted
+
+    def _apply(self, cur, accepted: list):
+        self._insert(cur, accepted)
+        # INSERT 로 sale_items 를 잠근 뒤에 확인 → 커밋까지 트리거 정의가 바뀌지 않는다
+        if trigger_guarded(cur):
+            self._deduct(cur, accepted)
+        elif not self._warned:
+            self._warned = True
+            logger.warning("sale group commit: sale_items trigger has no batch guard, deducting per line "
+                           "(python -m backend.sales guard-trigger)")
+
+    def _insert(self, cur, accepted: list):
+        execute_values(
+            cur,
+            "INSERT INTO sales(id, location_id, channel, total_amount, status) VALUES %s",
+            [(s.sale_id, s.location_id, s.data.get("channel") or "POS", s.total, "paid") for s in accepted],
+            template="(%s, %s, %s, %s, %s)",
+        )
+        execute_values(
+            cur,
+            "INSERT INTO sale_items(sale_id, menu_item_id, qty, unit_price, discount) VALUES %s",
+            [(s.sale_id, it["menu_item_id"], it["qty"], it["unit_price"], it.get("discount", 0))
+             for s in accepted for it in s.data["items"]],
+            page_size=1000,
+        )
+
+    def _deduct(self, cur, accepted: list):
+        """(재료, 지점)마다 배치 합계로 한 번씩 차감 (행은 _reserve 에서 이미 잠갔다)."""
+        total = defaultdict(int)
+        for s in accepted:
+            for k, need in s.needs:
+                total[k] += need
+        keys = sorted(k for k, v in total.items() if v)
+        if not keys:
+            return
+        cur.execute(
+            """
+            SELECT count(apply_stock_change(k.ingredient_id, k.location_id, -k.need, 'recipe_consume',
+                                            'sales', %s::uuid, %s, NULL)) AS n
+            FROM unnest(%s::uuid[], %s::uuid[], %s::numeric[]) AS k(ingredient_id, location_id, need);
+            """,
+            (accepted[0].sale_id if len(accepted) == 1 else None, f"group commit: {len(accepted)} sales",
+             [k[0] for k in keys], [k[1] for k in keys], [total[k] for k in keys]),
+        )
+
+
+batcher = SaleBatcher(SALE_GROUP_COMMIT_WINDOW_MS, SALE_GROUP_COMMIT_MAX_BATCH)
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Header, HTTPException, Response
+from pydantic import ValidationError
+from backend.core.config import SALE_BATCH_MAX
+from backend.core.exceptions import db_error
+from .schema import SaleCreateIn, SaleCreateOut, SaleBatchIn, SaleBatchOut
+from .service import create_sale, create_sales_batch
+
+router = APIRouter()
+
+@router.post("", response_model=SaleCreateOut)
+def post_sale(body: SaleCreateIn, response: Response,
+              idempotency_key: str | None = Header(default=None, alias="Idempotency-Key")):
+    try:
+        return create_sale(body.model_dump(), idempotency_key, response)
+    except Exception as e:
+        raise db_error(e)
+
+def _validation_detail(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in err['loc']) or 'sale'}: {err['msg']}" for err in e.errors())
+
+@router.post("/batch", response_model=SaleBatchOut)
+def post_sales_batch(body: SaleBatchIn):
+    if len(body.sales) > SALE_BATCH_MAX:
+        raise HTTPException(status_code=422, detail=f"too many sales (max {SALE_BATCH_MAX})")
+    keys = [it.key for it in body.sales]
+    if len(set(keys)) != len(keys):
+        raise HTTPException(status_code=422, detail="duplicate key in batch")
+    # 판매 본문은 하나씩 검증한다: 잘못된 판매 하나 때문에 배치 전체가 422 로 막히지 않게 (해당 판매만 rejected)
+    sales = []
+    for it in body.sales:
+        try:
+            sales.append({"key": it.key, "sale": SaleCreateIn.model_validate(it.sale).model_dump()})
+        except ValidationError as e:
+            sales.append({"key": it.key, "sale": it.sale, "error": _validation_detail(e)})
+    try:
+        return create_sales_batch(sales)
+    except Exception as e:
+        raise db_error(e)
@@ -0,0 +1,36 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+class SaleLineIn(BaseModel):
+    menu_item_id: str
+    qty: float = Field(gt=0)
+    unit_price: float = 0
+    discount: float = 0
+
+class SaleCreateIn(BaseModel):
+    items: list[SaleLineIn] = Field(min_length=1)
+    channel: str = "POS"
+    location_id: Optional[str] = None   # 없으면 메뉴의 default_location_id (트리거)
+
+class SaleCreateOut(BaseModel):
+    sale_id: str
+    total_amount: float
+
+class SaleBatchItemIn(BaseModel):
+    key: str = Field(min_length=1, max_length=200)   # 판매마다 고정된 Idempotency-Key
+    sale: dict                          # SaleCreateIn 형태. 판매별로 검증해 틀린 판매만 rejected
+
+class SaleBatchIn(BaseModel):
+    sales: list[SaleBatchItemIn] = Field(min_length=1)
+
+class SaleBatchResultOut(BaseModel):
+    key: str
+    status: str                         # ok | replayed | conflict | rejected
+    sale_id: Optional[str] = None
+    total_amount: Optional[float] = None
+    error: Optional[str] = None
+
+class SaleBatchOut(BaseModel):
+    results: list[SaleBatchResultOut]   # 보낸 순서대로. 처리 못 한 나머지는 빠진다
+    processed: int
+    error: Optional[str] = None         # 중간에 멈춘 이유 (DB 장애 등 → 남은 건 나중에 다시)
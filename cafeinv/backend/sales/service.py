@@ -0,0 +1,96 @@
+import psycopg2
+from fastapi import Response
+from psycopg2.extras import execute_values
+from backend.core.config import SALE_GROUP_COMMIT, STOCK_STRIPES
+from backend.core.db import get_cursor, in_transaction, retry_on_deadlock
+from backend.core.exceptions import db_error
+from backend.core.idempotency import REPLAY_HEADER, idempotent
+from .group_commit import batcher, sale_total
+
+def create_sale(data: dict, key: str | None = None, response: Response | None = None):
+    """
+    sales 1건 + sale_items N건을 한 트랜잭션으로.
+    sale_items 트리거가 레시피대로 재고를 차감하고, 부족하면 INSUFFICIENT_STOCK 예외 → 전체 롤백.
+    key(Idempotency-Key)가 있으면 같은 키로 한 번만 반영한다.
+    SALE_GROUP_COMMIT=1 이면 동시에 들어온 판매와 묶어서 커밋하고, 키도 그 배치 트랜잭션에서 기록한다 (group_commit 참고).
+    바깥 트랜잭션(멱등 키 기록 등) 안에서 호출되면 그 트랜잭션에 그대로 참여한다.
+    """
+    if SALE_GROUP_COMMIT and not in_transaction():
+        out, replayed = batcher.submit(data, key)
+        if replayed and response is not None:
+            response.headers[REPLAY_HEADER] = "true"
+        return out
+    if key:
+        return idempotent("sales", key, data, lambda: create_sale(data), response)
+    # 스트라이프 느린 경로끼리는 드물게 교착될 수 있다 → 트랜잭션째 재시도
+    return retry_on_deadlock(lambda: _create_sale(data))
+
+def _create_sale(data: dict):
+    items = data["items"]
+    total = sale_total(items)
+    with get_cursor(commit=True) as cur:
+        cur.execute(
+            """
+            INSERT INTO sales(location_id, channel, total_amount, status)
+            VALUES (%s, %s, %s, 'paid') RETURNING id;
+            """,
+            (data.get("location_id"), data.get("channel") or "POS", total)
+        )
+        sale_id = cur.fetchone()["id"]
+        # 트리거가 라인 순서대로 재고 행을 잠그므로, 동시 판매끼리 교착되지 않게 필요한 행을 먼저 정렬해서 잠근다
+        # (스트라이프를 켠 재료는 재고 행 대신 스트라이프에서 차감하므로 잠그지 않는다)
+        cur.execute(
+            """
+            SELECT 1
+            FROM inventory i
+            JOIN (SELECT DISTINCT r.ingredient_id, COALESCE(%s::uuid, m.default_location_id) AS location_id
+                  FROM recipes r JOIN menu_items m ON m.id = r.menu_item_id
+                  WHERE r.menu_item_id = ANY(%s::uuid[])) n
+              ON n.ingredient_id = i.ingredient_id AND n.location_id = i.location_id
+            """ + ("""
+            WHERE NOT EXISTS (SELECT 1 FROM inventory_stripes s
+                              WHERE s.ingredient_id = i.ingredient_id AND s.location_id = i.location_id)
+            """ if STOCK_STRIPES else "") + """
+            ORDER BY i.ingredient_id, i.location_id
+            FOR UPDATE OF i;
+            """,
+            (data.get("location_id"), [it["menu_item_id"] for it in items])
+        )
+        execute_values(
+            cur,
+            "INSERT INTO sale_items(sale_id, menu_item_id, qty, unit_price, discount) VALUES %s",
+            [(sale_id, it["menu_item_id"], it["qty"], it["unit_price"], it.get("discount", 0)) for it in items]
+        )
+        return {"sale_id": str(sale_id), "total_amount": float(total)}
+
+def create_sales_batch(sales: list[dict]) -> dict:
+    """
+    매장 오프라인 버퍼가 모아 둔 판매를 보낸 순서대로 한 건씩 반영한다 (판매마다 자기 트랜잭션 + 멱등 키).
+    - 이미 반영된 키는 저장된 응답을 돌려준다 (replayed) → 응답을 못 받고 다시 보내도 한 번만 반영.
+    - 재고 부족(409)은 conflict 로 기록하고 다음 판매로 넘어간다.
+    - 다시 보내도 같은 결과인 판매는 rejected: 본문 검증 실패(it["error"], 라우터에서 채움),
+      멱등 키 충돌/단위 오류(422), 잘못된 uuid·없는 메뉴 같은 데이터 오류(DataError/IntegrityError).
+    - 그 밖의 오류(DB 장애 등)에서는 멈춘다. 뒤의 판매가 앞의 판매를 앞질러 반영되지 않도록
+      나머지는 결과에서 빼고, 클라이언트가 같은 순서로 다시 보낸다.
+    """
+    results = []
+    for it in sales:
+        if it.get("error"):
+            results.append({"key": it["key"], "status": "rejected", "error": it["error"]})
+            continue
+        data = it["sale"]
+        resp = Response()
+        try:
+            out = idempotent("sales", it["key"], data, lambda: create_sale(data), resp)
+        except Exception as e:
+            err = db_error(e)
+            if err.status_code == 409:
+                results.append({"key": it["key"], "status": "conflict", "error": err.detail})
+            elif err.status_code == 422 or isinstance(e, (psycopg2.DataError, psycopg2.IntegrityError)):
+                results.append({"key": it["key"], "status": "rejected", "error": err.detail.strip()})
+            else:
+                return {"results": results, "processed": len(results), "error": err.detail}
+            continue
+        results.append({"key": it["key"], "status": "replayed" if resp.headers.get(REPLAY_HEADER) else "ok",
+                        "sale_id": out["sale_id"], "total_amount": out["total_amount"]})
+    return {"results": results, "processed": len(results), "error": None}
@@ -0,0 +1,33 @@
+"""
+배포 시:
+    python -m backend.salesrollups migrate
+cron 등에서 사용:
+    python -m backend.salesrollups refresh
+    python -m backend.salesrollups backfill --since 2025-01-01 --workers 8
+"""
+import argparse
+from datetime import date
+
+from backend.core.config import ROLLUP_BACKFILL_WORKERS
+from backend.core.logger import logger
+from .service import migrate_sales_rollups, refresh_sales_rollups, backfill_sales_rollups
+
+def main():
+    p = argparse.ArgumentParser(prog="python -m backend.salesrollups")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("migrate", help="롤업 테이블 설치 + 판매 색인(CONCURRENTLY)")
+    sub.add_parser("refresh", help="워터마크 이후 증분 반영")
+    b = sub.add_parser("backfill", help="과거 구간 병렬 재계산")
+    b.add_argument("--since", type=date.fromisoformat, default=None)
+    b.add_argument("--workers", type=int, default=ROLLUP_BACKFILL_WORKERS)
+    args = p.parse_args()
+
+    if args.cmd == "migrate":
+        logger.info("sales rollup schema installed, indexes created: %s", migrate_sales_rollups() or "none")
+    elif args.cmd == "refresh":
+        logger.info("sales rollup refresh: %s", refresh_sales_rollups())
+    else:
+        logger.info("sales rollup backfill: %s", backfill_sales_rollups(args.since, workers=args.workers))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+from typing import Literal
+from fastapi import APIRouter, HTTPException, Query
+from backend.core.config import SALES_TREND_DAYS
+from backend.core.exceptions import db_error
+from .schema import SalesBackfillIn
+from .service import (
+    sales_series, sales_top_items, sales_rollup_status,
+    refresh_sales_rollups, backfill_sales_rollups
+)
+
+router = APIRouter()
+
+def _range(since: datetime | None, until: datetime | None) -> tuple[datetime, datetime]:
+    until = until or datetime.now().astimezone()
+    return since or (until - timedelta(days=SALES_TREND_DAYS)), until
+
+# ----- 조회 (롤업 테이블) -----
+@router.get("/hourly")
+def get_sales_hourly(
+    since: datetime | None = None,
+    until: datetime | None = None,
+    location_id: str | None = None,
+    menu_item_id: str | None = None,
+    channel: str | None = None,
+    by: Literal["menu_item", "location", "channel"] | None = None,
+    fresh: bool = True,
+):
+    since, until = _range(since, until)
+    try:
+        return sales_series("hour", since, until, location_id, menu_item_id, channel, by, fresh)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise db_error(e)
+
+@router.get("/daily")
+def get_sales_daily(
+    since: datetime | None = None,
+    until: datetime | None = None,
+    location_id: str | None = None,
+    menu_item_id: str | None = None,
+    channel: str | None = None,
+    by: Literal["menu_item", "location", "channel"] | None = None,
+    fresh: bool = True,
+):
+    since, until = _range(since, until)
+    try:
+        return sales_series("day", since, until, location_id, menu_item_id, channel, by, fresh)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise db_error(e)
+
+@router.get("/menu_items")
+def get_sales_top_items(
+    since: datetime | None = None,
+    until: datetime | None = None,
+    location_id: str | None = None,
+    channel: str | None = None,
+    limit: int = Query(default=20, ge=1, le=500),
+    fresh: bool = True,
+):
+    since, until = _range(since, until)
+    try:
+        return sales_top_items(since, until, location_id, channel, limit, fresh)
+    except Exception as e:
+        raise db_error(e)
+
+# ----- 집계 갱신 -----
+@router.get("/status")
+def get_sales_rollup_status():
+    try:
+        return sales_rollup_status()
+    except Exception as e:
+        raise db_error(e)
+
+@router.post("/refresh")
+def post_sales_refresh():
+    try:
+        return refresh_sales_rollups()
+    except Exception as e:
+        raise db_error(e)
+
+@router.post("/backfill")
+def post_sales_backfill(body: SalesBackfillIn):
+    try:
+        if body.workers:
+            return backfill_sales_rollups(body.since, workers=body.workers)
+        return backfill_sales_rollups(body.since)
+    except Exception as e:
+        raise db_error(e)
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date
+
+class SalesBackfillIn(BaseModel):
+    since: Optional[date] = None
+    workers: Optional[int] = None
@@ -0,0 +1,301 @@
+"""
+판매 시간별 롤업: (시간, 메뉴, 지점, 채널)별 수량/매출. 사용량 롤업(backend.rollups)과 같은 방식.
+
+    refresh_sales_rollups()                 # 워터마크 이후 판매만 누적 (cron/수동)
+    backfill_sales_rollups(since, workers)  # 과거 구간을 현지 일자 청크로 병렬 재계산
+    sales_series("hour", since, until)      # 최근 90일 시간별 → 롤업 약 2천 버킷 합산
+
+- 판매 지점이 없으면 메뉴의 기본 지점으로 (대시보드와 같은 규칙). 그래도 지점을 모르는 줄은 뺀다.
+- 매출 = qty × unit_price − discount, 'paid' 판매만. 판매는 만든 뒤 고치지 않는다고 보고 더하기만 한다
+  (과거 판매를 고쳤다면 그 구간을 backfill).
+- 판매 건수는 줄(메뉴) 단위 행끼리 더하면 중복되므로 롤업에 두지 않고 줄 수(lines)만 둔다.
+
+설치는 배포 단계에서 (조회 API는 DDL 없이 읽기만 한다):
+    python -m backend.salesrollups migrate   # 롤업 테이블 + sales/sale_items 색인(CONCURRENTLY)
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from backend.core.config import (
+    DB_POOL_MAX, ROLLUP_TZ, ROLLUP_LAG_SECONDS, ROLLUP_BACKFILL_WORKERS, ROLLUP_BACKFILL_CHUNK_DAYS
+)
+from backend.core.db import create_indexes_concurrently, get_cursor, ensure_schema
+from backend.core.logger import logger
+from backend.core.replicas import read_cursor
+
+SALES = "sales_hourly"
+
+SALES_DDL = """
+CREATE TABLE IF NOT EXISTS rollup_watermarks (
+    name        text PRIMARY KEY,
+    watermark   timestamptz,
+    updated_at  timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS sales_hourly (
+    bucket        timestamptz NOT NULL,
+    menu_item_id  uuid        NOT NULL,
+    location_id   uuid        NOT NULL,
+    channel       text        NOT NULL,
+    qty           numeric     NOT NULL DEFAULT 0,
+    revenue       numeric     NOT NULL DEFAULT 0,
+    discount      numeric     NOT NULL DEFAULT 0,
+    lines         bigint      NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket, menu_item_id, location_id, channel)
+);
+CREATE INDEX IF NOT EXISTS sales_hourly_loc_idx ON sales_hourly (location_id, bucket);
+CREATE INDEX IF NOT EXISTS sales_hourly_menu_idx ON sales_hourly (menu_item_id, bucket);
+
+INSERT INTO rollup_watermarks (name) VALUES ('sales_hourly') ON CONFLICT (name) DO NOTHING;
+"""
+
+# 원본 판매 테이블 색인: 판매 INSERT 를 막지 않도록 migrate 에서 CONCURRENTLY 로 (대시보드와 같은 색인)
+SALES_INDEXES = [
+    ("sales_created_at_idx", "ON sales (created_at)"),
+    ("sale_items_sale_id_idx", "ON sale_items (sale_id)"),
+]
+
+# 판매 줄 → (버킷, 메뉴, 지점, 채널). {lo_op}/{hi_op} 로 구간 경계를 정한다
+_LINES = """
+    SELECT date_trunc('hour', s.created_at) AS bucket, si.menu_item_id,
+           COALESCE(s.location_id, m.default_location_id) AS location_id,
+           COALESCE(s.channel, 'POS') AS channel,
+           si.qty,
+           si.qty * COALESCE(si.unit_price, 0) - COALESCE(si.discount, 0) AS revenue,
+           COALESCE(si.discount, 0) AS discount
+    FROM sales s
+    JOIN sale_items si ON si.sale_id = s.id
+    LEFT JOIN menu_items m ON m.id = si.menu_item_id
+    WHERE s.created_at {lo_op} %(lo)s::timestamptz AND s.created_at {hi_op} %(hi)s::timestamptz
+      AND s.status = 'paid' AND si.menu_item_id IS NOT NULL
+      AND COALESCE(s.location_id, m.default_location_id) IS NOT NULL
+"""
+
+_UPSERT = """
+    INSERT INTO sales_hourly AS r (bucket, menu_item_id, location_id, channel, qty, revenue, discount, lines)
+    SELECT bucket, menu_item_id, location_id, channel, SUM(qty), SUM(revenue), SUM(discount), COUNT(*)
+    FROM ({lines}) l
+    GROUP BY 1, 2, 3, 4
+    ON CONFLICT (bucket, menu_item_id, location_id, channel) DO UPDATE
+    SET qty      = r.qty      + EXCLUDED.qty,
+        revenue  = r.revenue  + EXCLUDED.revenue,
+        discount = r.discount + EXCLUDED.discount,
+        lines    = r.lines    + EXCLUDED.lines;
+"""
+
+_MERGE = _UPSERT.format(lines=_LINES.format(lo_op=">", hi_op="<="))
+# 백필 청크는 [lo, hi) 반열린 구간 (현지 자정 경계)
+_CHUNK = _UPSERT.format(lines=_LINES.format(lo_op=">=", hi_op="<"))
+
+
+def ensure_sales_rollup_schema():
+    ensure_schema(SALES, SALES_DDL)
+
+
+def migrate_sales_rollups() -> list[str]:
+    """롤업 테이블 설치 + 원본 색인 생성. 새로 만든 색인 이름을 돌려준다."""
+    ensure_sales_rollup_schema()
+    return create_indexes_concurrently(SALES_INDEXES)
+
+
+def _local_midnight(cur, day: date) -> datetime:
+    cur.execute("SELECT (%s::date)::timestamp AT TIME ZONE %s AS ts;", (day, ROLLUP_TZ))
+    return cur.fetchone()["ts"]
+
+
+def refresh_sales_rollups() -> dict:
+    """
+    워터마크 이후(now() - lag 까지)의 판매만 읽어 시간별 집계에 누적.
+    lag는 created_at(트랜잭션 시작 시각)보다 늦게 커밋되는 판매(묶음 커밋 등)를 놓치지 않기 위한 여유분.
+    """
+    ensure_sales_rollup_schema()
+    with get_cursor() as cur:
+        cur.execute("SELECT watermark FROM rollup_watermarks WHERE name=%s FOR UPDATE;", (SALES,))
+        lo = cur.fetchone()["watermark"]
+        cur.execute("SELECT now() - make_interval(secs => %s) AS hi;", (ROLLUP_LAG_SECONDS,))
+        hi = cur.fetchone()["hi"]
+        if lo is not None and hi <= lo:
+            return {"from": lo, "to": lo, "hourly_rows": 0}
+
+        cur.execute(_MERGE, {"lo": lo if lo is not None else "-infinity", "hi": hi})
+        rows = cur.rowcount
+        cur.execute(
+            "UPDATE rollup_watermarks SET watermark=%s, updated_at=now() WHERE name=%s;",
+            (hi, SALES)
+        )
+    return {"from": lo, "to": hi, "hourly_rows": rows}
+
+
+def _rebuild_chunk(start: date, end: date) -> int:
+    # [start, end) 현지 일자 구간을 지우고 원본에서 다시 계산 (재실행해도 결과 동일)
+    with get_cursor() as cur:
+        lo = _local_midnight(cur, start)
+        hi = _local_midnight(cur, end)
+        cur.execute("DELETE FROM sales_hourly WHERE bucket >= %s AND bucket < %s;", (lo, hi))
+        cur.execute(_CHUNK, {"lo": lo, "hi": hi})
+        return cur.rowcount
+
+
+def backfill_sales_rollups(since: Optional[date] = None,
+                           workers: int = ROLLUP_BACKFILL_WORKERS,
+                           chunk_days: int = ROLLUP_BACKFILL_CHUNK_DAYS) -> dict:
+    """
+    since(없으면 가장 오래된 판매)부터 어제까지를 청크 단위로 병렬 재계산한 뒤
+    워터마크를 오늘 자정으로 맞춘다. 오늘치는 다음 refresh에서 증분으로 채워진다.
+    워터마크 행을 잠근 채 진행하므로 그 사이 refresh는 대기한다.
+    워커 수는 사용량 롤업과 같이 DB_POOL_MAX - 2 개로 자른다 (워터마크 연결 + 여유).
+    """
+    ensure_sales_rollup_schema()
+    workers = max(1, min(workers, DB_POOL_MAX - 2))
+    with get_cursor() as cur:
+        cur.execute("SELECT watermark FROM rollup_watermarks WHERE name=%s FOR UPDATE;", (SALES,))
+        wm = cur.fetchone()["watermark"]
+        cur.execute(
+            """
+            SELECT (min(created_at) AT TIME ZONE %(tz)s)::date AS first_day,
+                   ((now() - make_interval(secs => %(lag)s)) AT TIME ZONE %(tz)s)::date AS end_day,
+                   (%(wm)s::timestamptz AT TIME ZONE %(tz)s)::date AS wm_day
+            FROM sales;
+            """,
+            {"tz": ROLLUP_TZ, "lag": ROLLUP_LAG_SECONDS, "wm": wm}
+        )
+        row = cur.fetchone()
+        start = since or row["first_day"]
+        end = row["end_day"]
+        if start is None:
+            return {"chunks": 0, "since": None, "until": None}
+        # 기존 워터마크보다 뒤에서 시작하면 그 사이가 비므로 앞으로 당긴다
+        if row["wm_day"] is not None and row["wm_day"] < start:
+            start = row["wm_day"]
+
+        chunks = []
+        day = start
+        while day < end:
+            nxt = min(day + timedelta(days=max(1, chunk_days)), end)
+            chunks.append((day, nxt))
+            day = nxt
+
+        rows = 0
+        if chunks:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for n in pool.map(lambda c: _rebuild_chunk(*c), chunks):
+                    rows += n
+
+        # end(오늘) 이후 버킷은 워터마크를 되돌리면서 다시 쌓이므로 비운다
+        new_wm = _local_midnight(cur, end)
+        cur.execute("DELETE FROM sales_hourly WHERE bucket >= %s;", (new_wm,))
+        cur.execute(
+            "UPDATE rollup_watermarks SET watermark=%s, updated_at=now() WHERE name=%s;",
+            (new_wm, SALES)
+        )
+    logger.info("sales rollup backfill %s..%s: %d chunks, %d hourly rows", start, end, len(chunks), rows)
+    return {"chunks": len(chunks), "since": start, "until": end, "hourly_rows": rows}
+
+
+def _filters(alias: str, location_id, menu_item_id, channel) -> str:
+    conds = []
+    if location_id:
+        conds.append(f"{alias}.location_id = %(location_id)s::uuid")
+    if menu_item_id:
+        conds.append(f"{alias}.menu_item_id = %(menu_item_id)s::uuid")
+    if channel:
+        conds.append(f"{alias}.channel = %(channel)s")
+    return "".join(f" AND {c}" for c in conds)
+
+
+def _rows_sql(location_id, menu_item_id, channel, fresh: bool) -> str:
+    """
+    [since, until) 구간의 롤업 행. fresh=True면 워터마크 이후 아직 집계되지 않은 판매 줄을
+    원본에서 더한다(보통 수 분치). 인자: since, until, wm(+ 필터)
+    """
+    parts = [f"""
+        SELECT r.bucket, r.menu_item_id, r.location_id, r.channel, r.qty, r.revenue, r.discount, r.lines
+        FROM sales_hourly r
+        WHERE r.bucket >= date_trunc('hour', %(since)s::timestamptz) AND r.bucket < %(until)s
+              {_filters("r", location_id, menu_item_id, channel)}
+    """]
+    if fresh:
+        lines = _LINES.format(lo_op=">", hi_op="<").replace(
+            "%(lo)s", "GREATEST(%(wm)s::timestamptz, %(since)s::timestamptz - interval '1 hour')"
+        ).replace("%(hi)s", "%(until)s")
+        parts.append(f"""
+        SELECT l.bucket, l.menu_item_id, l.location_id, l.channel, l.qty, l.revenue, l.discount, 1
+        FROM ({lines}) l
+        WHERE l.bucket >= date_trunc('hour', %(since)s::timestamptz)
+              {_filters("l", location_id, menu_item_id, channel)}
+        """)
+    return " UNION ALL ".join(parts)
+
+
+_GROUPS = {
+    "menu_item": ("u.menu_item_id::text AS menu_item_id, mi.name AS menu_item_name", "u.menu_item_id, mi.name"),
+    "location": ("u.location_id::text AS location_id, loc.name AS location_name", "u.location_id, loc.name"),
+    "channel": ("u.channel", "u.channel"),
+}
+
+
+def sales_series(granularity: str, since: datetime, until: datetime,
+                 location_id: Optional[str] = None,
+                 menu_item_id: Optional[str] = None,
+                 channel: Optional[str] = None,
+                 by: Optional[str] = None,
+                 fresh: bool = True) -> list[dict]:
+    """
+    버킷별 수량/매출 시계열. granularity: 'hour' | 'day'(ROLLUP_TZ 현지 일자)
+    by: None(전체 합) | 'menu_item' | 'location' | 'channel' 로 나눠서.
+    """
+    if by is not None and by not in _GROUPS:
+        raise ValueError(f"by must be one of {', '.join(_GROUPS)}")
+    bucket = "u.bucket" if granularity == "hour" else "(u.bucket AT TIME ZONE %(tz)s)::date"
+    cols, group = _GROUPS[by] if by else ("", "")
+    with read_cursor() as cur:
+        wm = _watermark(cur) if fresh else None
+        cur.execute(f"""
+            SELECT {bucket} AS bucket, {cols + ',' if cols else ''}
+                   SUM(u.qty) AS qty, SUM(u.revenue) AS revenue, SUM(u.discount) AS discount,
+                   SUM(u.lines) AS lines
+            FROM ({_rows_sql(location_id, menu_item_id, channel, fresh)})
+                 AS u(bucket, menu_item_id, location_id, channel, qty, revenue, discount, lines)
+            {"LEFT JOIN menu_items mi ON mi.id = u.menu_item_id" if by == "menu_item" else ""}
+            {"LEFT JOIN locations loc ON loc.id = u.location_id" if by == "location" else ""}
+            GROUP BY 1{', ' + group if group else ''}
+            ORDER BY 1{', ' + group if group else ''};
+        """, {"since": since, "until": until, "wm": wm, "tz": ROLLUP_TZ,
+              "location_id": location_id, "menu_item_id": menu_item_id, "channel": channel})
+        return cur.fetchall()
+
+
+def sales_top_items(since: datetime, until: datetime,
+                    location_id: Optional[str] = None,
+                    channel: Optional[str] = None,
+                    limit: int = 20,
+                    fresh: bool = True) -> list[dict]:
+    """[since, until) 구간 메뉴별 합계, 매출 큰 순."""
+    with read_cursor() as cur:
+        wm = _watermark(cur) if fresh else None
+        cur.execute(f"""
+            SELECT u.menu_item_id::text AS menu_item_id, mi.name AS menu_item_name,
+                   SUM(u.qty) AS qty, SUM(u.revenue) AS revenue, SUM(u.discount) AS discount,
+                   SUM(u.lines) AS lines
+            FROM ({_rows_sql(location_id, None, channel, fresh)})
+                 AS u(bucket, menu_item_id, location_id, channel, qty, revenue, discount, lines)
+            LEFT JOIN menu_items mi ON mi.id = u.menu_item_id
+            GROUP BY u.menu_item_id, mi.name
+            ORDER BY revenue DESC, qty DESC, u.menu_item_id
+            LIMIT %(limit)s;
+        """, {"since": since, "until": until, "wm": wm, "limit": limit,
+              "location_id": location_id, "channel": channel})
+        return cur.fetchall()
+
+
+def _watermark(cur):
+    cur.execute("SELECT COALESCE(watermark, '-infinity') AS wm FROM rollup_watermarks WHERE name=%s;", (SALES,))
+    row = cur.fetchone()
+    return row["wm"] if row else "-infinity"
+
+
+def sales_rollup_status() -> dict:
+    with read_cursor() as cur:
+        cur.execute("SELECT name, watermark, updated_at FROM rollup_watermarks WHERE name=%s;", (SALES,))
+        return cur.fetchone()
@@ -0,0 +1,19 @@
+"""
+배포 시:
+    python -m backend.search migrate
+"""
+import argparse
+
+from backend.core.logger import logger
+from .service import migrate_search
+
+def main():
+    p = argparse.ArgumentParser(prog="python -m backend.search")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("migrate", help="pg_trgm 확장 + 이름 trigram 색인(CONCURRENTLY)")
+    p.parse_args()
+
+    logger.info("search indexes created: %s", migrate_search() or "none")
+
+if __name__ == "__main__":
+    main()
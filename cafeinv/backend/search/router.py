@@ -0,0 +1,21 @@
+from fastapi import APIRouter, HTTPException, Query
+from backend.core.config import SEARCH_LIMIT_MAX
+from backend.core.exceptions import db_error
+from .service import ENTITIES, search
+
+router = APIRouter()
+
+@router.get("/{entity}")
+def get_search(
+    entity: str,
+    q: str = "",
+    limit: int = Query(20, ge=1, le=SEARCH_LIMIT_MAX),
+    offset: int = Query(0, ge=0, le=10000),
+    fuzzy: bool = True,
+):
+    if entity not in ENTITIES:
+        raise HTTPException(status_code=404, detail=f"unknown entity: {entity}")
+    try:
+        return search(entity, q, limit, offset, fuzzy)
+    except Exception as e:
+        raise db_error(e)
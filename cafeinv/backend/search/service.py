@@ -0,0 +1,236 @@
+"""
+타입어헤드 검색 (재료/메뉴/공급사).
+
+    search("ingredients", "원ㄷ", limit=20)     # → {"items": [{id, name, match}], "has_more": ...}
+    search("menu_items", "ㅇㅁㄹ")             # 초성 검색 → 아메리카노 ...
+
+1. 프로세스 내 접두어 색인: 이름을 자모로 풀어(원두 → ㅇㅜㅓㄴㄷㅜ) 정렬해 두고 bisect 로 찾는다.
+   조합 중인 글자("원ㄷ", "많" → 만화)와 초성("ㅇㄷ")도 잡힌다.
+   순위: 이름 접두어 > 단어 접두어 > 초성 접두어, 같은 순위 안에서는 가나다순.
+2. 모자라면 DB에서 부분 문자열/유사도(pg_trgm word_similarity, GIN 색인)로 보충한다.
+   pg_trgm 과 테이블의 GIN 색인(valid)이 없으면 ILIKE 로만 보충. 유무는 카탈로그만 읽어
+   SEARCH_TRGM_CHECK_SECONDS 마다 다시 확인한다 (나중에 migrate 하면 재시작 없이 켜진다).
+
+확장과 색인은 배포 단계에서 만든다 (CREATE INDEX CONCURRENTLY, 워커 기동/조회 경로에서는 DDL 을 돌리지 않는다):
+    python -m backend.search migrate
+
+색인 원본은 ref_cache(ref_ingredients/ref_menu_items/ref_suppliers) 라서
+카탈로그 쓰기의 invalidate() 뒤 다음 검색에서 다시 만들어진다 (다른 워커는 REF_CACHE_TTL 이내).
+"""
+import threading
+import unicodedata
+from bisect import bisect_left
+from typing import Callable
+
+from backend.catalog.service import ref_ingredients, ref_menu_items, ref_suppliers
+from backend.core.cache import ref_cache
+from backend.core.config import SEARCH_FUZZY_MIN_CHARS, SEARCH_TRGM_CHECK_SECONDS, SEARCH_WORD_SIMILARITY
+from backend.core.db import create_indexes_concurrently, get_cursor
+from backend.core.logger import logger
+from backend.core.replicas import read_cursor
+
+# 테이블 → 이름 trigram 색인
+TRGM_INDEXES = {
+    "ingredients": "ingredients_name_trgm_idx",
+    "menu_items": "menu_items_name_trgm_idx",
+    "suppliers": "suppliers_name_trgm_idx",
+}
+
+# entity → (색인 원본 로더, 테이블)
+ENTITIES: dict[str, tuple[Callable[[], list[dict]], str]] = {
+    "ingredients": (lambda: ref_ingredients(active_only=True), "ingredients"),
+    "menu_items": (ref_menu_items, "menu_items"),
+    "suppliers": (ref_suppliers, "suppliers"),
+}
+
+# ---------- 한글 자모 ----------
+_CHO = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_JONG = ("", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ", "ㄿ", "ㅀ",
+         "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ")
+# 겹받침/겹모음은 입력 순서대로 쪼갠다 (만 + ㅎ 을 치는 중에 보이는 "많" 이 "만화" 에 걸리도록)
+_SPLIT = {
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+    "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ",
+    "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+}
+_CHO_SET = set(_CHO)
+
+
+def _norm(s: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", s).casefold().split())
+
+
+def _jamo(s: str) -> str:
+    out = []
+    for ch in s:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            out.append(_CHO[code // 588])
+            out.append(_SPLIT.get(_JUNG[(code % 588) // 28], _JUNG[(code % 588) // 28]))
+            jong = _JONG[code % 28]
+            out.append(_SPLIT.get(jong, jong))
+        else:
+            out.append(_SPLIT.get(ch, ch))
+    return "".join(out)
+
+
+def _choseong(s: str) -> str:
+    out = []
+    for ch in s:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            out.append(_CHO[code // 588])
+        elif not ch.isspace():
+            out.append(ch)
+    return "".join(out)
+
+
+def _is_choseong_query(q: str) -> bool:
+    return any(ch in _CHO_SET for ch in q) and all(ch in _CHO_SET or ch.isspace() or ch.isdigit() for ch in q)
+
+
+class PrefixIndex:
+    """순위별로 (키, 행 번호)를 정렬해 둔 접두어 색인."""
+    NAME, WORD, CHOSEONG = range(3)
+
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+        tiers: list[list[tuple[str, int]]] = [[], [], []]
+        for n, r in enumerate(rows):
+            name = _norm(r["name"] or "")
+            tiers[self.NAME].append((_jamo(name), n))
+            words = name.split(" ")
+            for w in words[1:]:
+                tiers[self.WORD].append((_jamo(w), n))
+            tiers[self.CHOSEONG].append((_choseong(name), n))
+            for w in words[1:]:
+                tiers[self.CHOSEONG].append((_choseong(w), n))
+        for t in tiers:
+            t.sort()
+        self._keys = [[k for k, _ in t] for t in tiers]
+        self._rows = [[n for _, n in t] for t in tiers]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def search(self, q: str, want: int) -> list[tuple[int, int]]:
+        """(행 번호, 순위) 를 최대 want 개. q 는 _norm 된 값."""
+        tiers = [(self.NAME, _jamo(q)), (self.WORD, _jamo(q))]
+        if _is_choseong_query(q):
+            tiers.append((self.CHOSEONG, q.replace(" ", "")))
+        out, seen = [], set()
+        for tier, key in tiers:
+            keys, rows = self._keys[tier], self._rows[tier]
+            i = bisect_left(keys, key)
+            while i < len(keys) and keys[i].startswith(key) and len(out) < want:
+                n = rows[i]
+                if n not in seen:
+                    seen.add(n)
+                    out.append((n, tier))
+                i += 1
+            if len(out) >= want:
+                break
+        return out
+
+
+_MATCH = {PrefixIndex.NAME: "prefix", PrefixIndex.WORD: "word", PrefixIndex.CHOSEONG: "choseong"}
+
+_indexes: dict[str, PrefixIndex] = {}
+_lock = threading.Lock()
+
+
+def _index(entity: str) -> PrefixIndex:
+    rows = ENTITIES[entity][0]()
+    idx = _indexes.get(entity)
+    # TTL 만료로 같은 내용이 다시 로드된 경우는 다시 만들지 않는다
+    if idx is None or (idx.rows is not rows and idx.rows != rows):
+        with _lock:
+            idx = _indexes.get(entity)
+            if idx is None or (idx.rows is not rows and idx.rows != rows):
+                idx = _indexes[entity] = PrefixIndex(rows)
+    return idx
+
+
+def migrate_search() -> list[str]:
+    """pg_trgm 확장 + 이름 GIN 색인(CONCURRENTLY). 만든 색인 이름을 돌려준다.
+    확장을 못 만들면 (권한/미설치) 색인 없이 넘어가고 검색은 ILIKE 보충으로 동작한다."""
+    try:
+        with get_cursor() as cur:
+            cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    except Exception as e:
+        logger.warning("pg_trgm unavailable, search falls back to ILIKE: %s", e)
+        return []
+    return create_indexes_concurrently(
+        [(idx, f"ON {table} USING gin (name gin_trgm_ops)") for table, idx in TRGM_INDEXES.items()])
+
+
+@ref_cache("search_trgm", ttl=SEARCH_TRGM_CHECK_SECONDS, warm=False)
+def trgm_tables() -> frozenset:
+    """pg_trgm 이 있고 이름 trigram 색인이 valid 인 테이블. 조회 실패도 TTL 동안만 ILIKE 로 둔다."""
+    try:
+        with read_cursor() as cur:
+            cur.execute(
+                """
+                SELECT t.relname AS table_name
+                FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                JOIN pg_class t ON t.oid = i.indrelid
+                WHERE c.relname = ANY(%s) AND i.indisvalid AND pg_table_is_visible(c.oid)
+                  AND EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm');
+                """,
+                (list(TRGM_INDEXES.values()),)
+            )
+            found = frozenset(r["table_name"] for r in cur.fetchall())
+    except Exception as e:
+        logger.warning("pg_trgm check failed, search falls back to ILIKE: %s", e)
+        return frozenset()
+    if len(found) < len(TRGM_INDEXES):
+        logger.info("pg_trgm search off for %s (run python -m backend.search migrate)",
+                    sorted(set(TRGM_INDEXES) - found))
+    return found
+
+
+def _fuzzy(table: str, q: str, exclude: list[str], n: int) -> list[dict]:
+    like = "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    params = {"q": q, "like": like, "ex": exclude, "n": n, "th": SEARCH_WORD_SIMILARITY}
+    trgm = table in trgm_tables()
+    with read_cursor() as cur:
+        if trgm:
+            cur.execute("SELECT set_config('pg_trgm.word_similarity_threshold', %(th)s::text, true);", params)
+            cur.execute(
+                f"""
+                SELECT id::text, name, CASE WHEN name ILIKE %(like)s THEN 'contains' ELSE 'fuzzy' END AS match
+                FROM {table}
+                WHERE is_active AND (name ILIKE %(like)s OR %(q)s <%% name)
+                  AND NOT (id = ANY(%(ex)s::uuid[]))
+                ORDER BY name ILIKE %(like)s DESC, word_similarity(%(q)s, name) DESC, name
+                LIMIT %(n)s;
+                """,
+                params
+            )
+        else:
+            cur.execute(
+                f"""
+                SELECT id::text, name, 'contains' AS match
+                FROM {table}
+                WHERE is_active AND name ILIKE %(like)s AND NOT (id = ANY(%(ex)s::uuid[]))
+                ORDER BY strpos(lower(name), lower(%(q)s)), name
+                LIMIT %(n)s;
+                """,
+                params
+            )
+        return cur.fetchall()
+
+
+def search(entity: str, q: str = "", limit: int = 20, offset: int = 0, fuzzy: bool = True) -> dict:
+    table = ENTITIES[entity][1]
+    qn = _norm(q or "")
+    want = offset + limit + 1
+    idx = _index(entity)
+    items = [{"id": str(idx.rows[n]["id"]), "name": idx.rows[n]["name"], "match": _MATCH[tier]}
+             for n, tier in idx.search(qn, want)]
+    if fuzzy and len(items) < want and len(qn) >= SEARCH_FUZZY_MIN_CHARS:
+        items += _fuzzy(table, qn, [it["id"] for it in items], want - len(items))
+    return {"items": items[offset:offset + limit], "offset": offset, "limit": limit,
+            "has_more": len(items) > offset + limit}
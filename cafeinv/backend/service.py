@@ -1,5 +1,6 @@
 from backend.db import get_connection
 from backend.models import SaleCreateIn, SaleCreateOut, InventoryRow, AlertRow
+from backend.stripes.service import balance_sql
 import uuid
 
 INSUFFICIENT_ERR = "INSUFFICIENT_STOCK"
@@ -7,23 +8,23 @@ INSUFFICIENT_ERR = "INSUFFICIENT_STOCK"
 # ✅ 재고 조회
 # 맨 위에 필요한 import (없으면 추가)
 import psycopg2.extras
-from .db import get_connection  # 절대/상대 중 프로젝트에서 쓰는 방식 유지
+from .db import get_connection, get_read_connection  # 절대/상대 중 프로젝트에서 쓰는 방식 유지
 
 def list_inventory(location_id: str | None = None) -> list[dict]:
     """
     재고 스냅샷 조회. location_id가 있으면 해당 위치만 필터.
     """
-    with get_connection() as conn:
+    with get_read_connection() as conn:
         with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
             if location_id:
                 cur.execute(
-                    """
+                    f"""
                     SELECT
                         inv.ingredient_id::text,
                         inv.location_id::text,
                         ing.name         AS ingredient,
                         loc.name         AS location,
-                        COALESCE(inv.qty_on_hand, 0) AS qty,
+                        {balance_sql("inv")} AS qty,
                         inv.reorder_point,
                         inv.safety_stock,
                         ing.unit_id::text AS unit_id,
@@ -39,13 +40,13 @@ def list_inventory(location_id: str | None = None) -> list[dict]:
                 )
             else:
                 cur.execute(
-                    """
+                    f"""
                     SELECT
                         inv.ingredient_id::text,
                         inv.location_id::text,
                         ing.name         AS ingredient,
                         loc.name         AS location,
-                        COALESCE(inv.qty_on_hand, 0) AS qty,
+                        {balance_sql("inv")} AS qty,
                         inv.reorder_point,
                         inv.safety_stock,
                         ing.unit_id::text AS unit_id,
@@ -67,7 +68,7 @@ from psycopg2.extras import RealDictCursor
 
 def list_alerts():
     # 1) alerts 테이블 컬럼 셋 파악
-    with get_connection() as conn:
+    with get_read_connection() as conn:
         with conn.cursor() as cur:
             cur.execute("""
                 SELECT column_name
@@ -132,7 +133,7 @@ def list_alerts():
     """
 
     # 5) 실행 및 모델 매핑
-    with get_connection() as conn:
+    with get_read_connection() as conn:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute(sql)
             rows = cur.fetchall() or []
@@ -201,9 +202,9 @@ def apply_stock_change_service(inp: StockChangeIn) -> StockChangeOut:
         inp.note, inp.created_by
     ))
     # 현재 잔액 조회
-    cur.execute("""
-        SELECT qty_on_hand
-        FROM inventory
+    cur.execute(f"""
+        SELECT {balance_sql("inv")}
+        FROM inventory inv
         WHERE ingredient_id=%s AND location_id=%s
     """, (inp.ingredient_id, inp.location_id))
     row = cur.fetchone()
@@ -213,8 +214,9 @@ def apply_stock_change_service(inp: StockChangeIn) -> StockChangeOut:
 
 
 def list_inventory_tx(ingredient_id: str|None, location_id: str|None,
-                      since_iso: str|None, limit: int=50) -> list[InventoryTxRow]:
-    conn = get_connection()
+                      since_iso: str|None, limit: int=50,
+                      until_iso: str|None = None) -> list[InventoryTxRow]:
+    conn = get_read_connection()
     cur = conn.cursor()
     conds, params = [], []
     if ingredient_id:
@@ -223,9 +225,13 @@ def list_inventory_tx(ingredient_id: str|None, location_id: str|None,
     if location_id:
         conds.append("it.location_id = %s::uuid")
         params.append(location_id)
+    # created_at 범위 조건은 월 파티션 pruning에 그대로 쓰인다
     if since_iso:
         conds.append("it.created_at >= %s::timestamptz")
         params.append(since_iso)
+    if until_iso:
+        conds.append("it.created_at < %s::timestamptz")
+        params.append(until_iso)
 
     where = ("WHERE " + " AND ".join(conds)) if conds else ""
     cur.execute(f"""
@@ -266,7 +272,7 @@ def add_po_item(inp: POItemAddIn) -> dict:
     item_id = str(uuid.uuid4())
     cur.execute("""
         INSERT INTO po_items (id, purchase_order_id, ingredient_id, qty_ordered, unit_cost, qty_received)
-        VALUES (%s, %s::uuid, %s::uuid, %s, %s, COALESCE(qty_received,0))
+        VALUES (%s, %s::uuid, %s::uuid, %s, %s, 0)
     """, (item_id, inp.purchase_order_id, inp.ingredient_id, inp.qty_ordered, inp.unit_cost))
     conn.commit()
     conn.close()
@@ -418,19 +424,20 @@ def list_recipes(menu_id: str) -> list[RecipeRow]:
 
 def upsert_recipe(inp: RecipeUpsert) -> RecipeRow:
     conn = get_connection(); cur = conn.cursor()
+    # 재료명은 같은 문장에서 조인 (커넥션 하나, 왕복 하나)
     cur.execute("""
-        INSERT INTO recipes (menu_item_id, ingredient_id, qty_required)
-        VALUES (%s::uuid, %s::uuid, %s)
-        ON CONFLICT (menu_item_id, ingredient_id)
-        DO UPDATE SET qty_required=EXCLUDED.qty_required
-        RETURNING menu_item_id, ingredient_id, %s
-    """, (inp.menu_item_id, inp.ingredient_id, inp.qty_required, inp.qty_required))
+        WITH up AS (
+            INSERT INTO recipes (menu_item_id, ingredient_id, qty_required)
+            VALUES (%s::uuid, %s::uuid, %s)
+            ON CONFLICT (menu_item_id, ingredient_id)
+            DO UPDATE SET qty_required=EXCLUDED.qty_required
+            RETURNING menu_item_id, ingredient_id, qty_required
+        )
+        SELECT up.menu_item_id, up.ingredient_id, i.name, up.qty_required
+        FROM up JOIN ingredients i ON i.id = up.ingredient_id
+    """, (inp.menu_item_id, inp.ingredient_id, inp.qty_required))
     row = cur.fetchone(); conn.commit(); conn.close()
-    # ingredient_name은 별도 조회
-    conn = get_connection(); cur = conn.cursor()
-    cur.execute("SELECT name FROM ingredients WHERE id=%s::uuid", (inp.ingredient_id,))
-    ing_name = cur.fetchone()[0]; conn.close()
-    return RecipeRow(menu_item_id=row[0], ingredient_id=row[1], ingredient_name=ing_name, qty_required=float(row[2]))
+    return RecipeRow(menu_item_id=row[0], ingredient_id=row[1], ingredient_name=row[2], qty_required=float(row[3]))
 
 def delete_recipe(menu_id: str, ingredient_id: str) -> dict:
     conn = get_connection(); cur = conn.cursor()
@@ -589,13 +596,16 @@ def receive_transfer(inp: TransferAction) -> dict:
     conn.commit(); conn.close()
     return {"ok": True, "status": "received"}
 
-def list_audit_logs(table_name: str | None, since: str | None, limit: int = 100) -> list[AuditLogRow]:
-    conn = get_connection(); cur = conn.cursor()
+def list_audit_logs(table_name: str | None, since: str | None, limit: int = 100,
+                    until: str | None = None) -> list[AuditLogRow]:
+    conn = get_read_connection(); cur = conn.cursor()
     conds, params = [], []
     if table_name:
         conds.append("table_name=%s"); params.append(table_name)
     if since:
         conds.append("created_at >= %s::timestamptz"); params.append(since)
+    if until:
+        conds.append("created_at < %s::timestamptz"); params.append(until)
     where = ("WHERE " + " AND ".join(conds)) if conds else ""
     cur.execute(f"""
         SELECT created_at, table_name, record_id::text, action, user_id::text, before, after
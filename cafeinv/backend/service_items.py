@@ -1,5 +1,6 @@
 from typing import Optional
 from backend.db import get_connection
+from backend.units.service import normalize_lines
 import uuid
 
 # ---------- 공통 조회 ----------
@@ -100,13 +101,15 @@ def create_receipt_with_items(payload: dict) -> dict:
     """
     payload:
       supplier_id (uuid|None), location_id (uuid, required), received_at (iso|None), note (str|None), created_by (uuid|None),
-      items: [ { ingredient_id, qty, unit_cost, expiry_date (YYYY-MM-DD|None), lot_code } ...]
+      items: [ { ingredient_id, qty, unit_cost, expiry_date (YYYY-MM-DD|None), lot_code, unit_id (선택) } ...]
+      unit_id가 있는 라인은 수량/단가를 재료 단위로 환산해 저장
     """
     items = payload.get("items") or []
     if not payload.get("location_id"):
         raise ValueError("location_id required")
     if not items:
         raise ValueError("items required")
+    items = normalize_lines(items)
 
     conn = get_connection(); cur = conn.cursor()
     rid = str(uuid.uuid4())
@@ -0,0 +1,20 @@
+"""
+배포 시:
+    python -m backend.stocktake migrate
+"""
+import argparse
+
+from backend.core.logger import logger
+from .service import ensure_stocktake_schema
+
+def main():
+    p = argparse.ArgumentParser(prog="python -m backend.stocktake")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("migrate", help="실사 테이블 설치")
+    p.parse_args()
+
+    ensure_stocktake_schema()
+    logger.info("stocktake schema installed")
+
+if __name__ == "__main__":
+    main()
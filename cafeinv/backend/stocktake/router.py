@@ -0,0 +1,75 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from backend.core.exceptions import db_error
+from .schema import StocktakeIn, CountUploadIn, StocktakePostIn
+from .service import (
+    StocktakeStateError,
+    open_session, list_sessions, get_session, list_lines,
+    upload_counts, upload_counts_csv, post_session, cancel_session
+)
+
+router = APIRouter()
+
+def _found(res):
+    if res is None:
+        raise HTTPException(status_code=404, detail="stocktake not found")
+    return res
+
+def _run(fn, *args):
+    try:
+        res = fn(*args)
+    except StocktakeStateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise db_error(e)
+    return _found(res)
+
+@router.post("")
+def post_stocktake(body: StocktakeIn):
+    return _run(open_session, body.model_dump())
+
+@router.get("")
+def get_stocktakes(location_id: str | None = None, status: str | None = None, limit: int = 50):
+    try:
+        return list_sessions(location_id, status, limit)
+    except Exception as e:
+        raise db_error(e)
+
+@router.get("/{session_id}")
+def get_stocktake(session_id: str):
+    try:
+        res = get_session(session_id)
+    except Exception as e:
+        raise db_error(e)
+    return _found(res)
+
+@router.get("/{session_id}/lines")
+def get_stocktake_lines(session_id: str, only_variance: bool = False, uncounted: bool = False):
+    try:
+        return list_lines(session_id, only_variance, uncounted)
+    except Exception as e:
+        raise db_error(e)
+
+@router.post("/{session_id}/counts")
+def post_stocktake_counts(session_id: str, body: CountUploadIn):
+    if body.mode not in ("replace", "add"):
+        raise HTTPException(status_code=422, detail="mode must be replace or add")
+    return _run(upload_counts, session_id, [l.model_dump() for l in body.lines], body.mode)
+
+@router.post("/{session_id}/counts.csv")
+async def post_stocktake_counts_csv(session_id: str, request: Request,
+                                    mode: str = Query("replace", pattern="^(replace|add)$")):
+    """본문은 text/csv 그대로 (헤더: ingredient_id|ingredient, counted|qty, unit_id)."""
+    text = (await request.body()).decode("utf-8-sig")
+    return await run_in_threadpool(_run, upload_counts_csv, session_id, text, mode)
+
+@router.post("/{session_id}/post")
+def post_stocktake_post(session_id: str, body: StocktakePostIn | None = None):
+    body = body or StocktakePostIn()
+    return _run(post_session, session_id, body.posted_by, body.zero_uncounted)
+
+@router.post("/{session_id}/cancel")
+def post_stocktake_cancel(session_id: str):
+    return _run(cancel_session, session_id)
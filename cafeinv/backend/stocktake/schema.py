@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+class StocktakeIn(BaseModel):
+    location_id: str
+    ingredient_ids: Optional[List[str]] = None   # 없으면 지점 재고 전체
+    note: Optional[str] = None
+    created_by: Optional[str] = None
+
+class CountLineIn(BaseModel):
+    ingredient_id: Optional[str] = None
+    ingredient: Optional[str] = None              # 재료명 (ingredient_id 대신)
+    counted: float
+    unit_id: Optional[str] = None                 # 없으면 재료의 재고 단위
+
+class CountUploadIn(BaseModel):
+    lines: List[CountLineIn]
+    mode: str = "replace"                         # replace | add
+
+class StocktakePostIn(BaseModel):
+    posted_by: Optional[str] = None
+    zero_uncounted: bool = False                  # 세지 않은 재료를 0으로 본다
@@ -0,0 +1,329 @@
+"""
+재고 실사(stocktake).
+
+1. open_session: 지점의 (재료별) 현재 잔량을 한 문장으로 스냅샷 → stocktake_lines.expected.
+   지점당 열린 세션은 하나.
+2. upload_counts: 실사 수량을 JSON/CSV로 수천 줄씩 한 번에 올린다 (unnest 한 문장).
+   올리는 순간의 잔량을 balance_at_count 로 같이 기록한다.
+   스냅샷 이후 실사 전까지 팔린 양 = expected - balance_at_count, 차이(variance) = counted - balance_at_count.
+   즉 실사 중 판매가 있어도 그 판매를 차이로 잘못 잡지 않는다.
+3. post_session: 차이가 있는 줄을 한 트랜잭션, 한 문장으로 'adjustment' 반영 (apply_stock_change).
+   실사 이후 추가 판매로 잔량이 차이보다 작아졌으면 0까지만 뺀다.
+
+테이블은 배포 단계에서 설치한다 (조회 경로에서는 DDL 을 돌리지 않는다):
+    python -m backend.stocktake migrate
+"""
+import csv
+import io
+import uuid
+from typing import Optional
+
+from backend.core.db import get_cursor, ensure_schema
+from backend.stripes.service import balance_sql
+from backend.units.service import normalize_lines
+
+STOCKTAKE = "stocktake"
+
+STOCKTAKE_DDL = """
+CREATE TABLE IF NOT EXISTS stocktake_sessions (
+    id           uuid        PRIMARY KEY DEFAULT gen_random_uuid(),
+    location_id  uuid        NOT NULL,
+    status       text        NOT NULL DEFAULT 'open',    -- open | posted | cancelled
+    note         text,
+    created_by   uuid,
+    snapshot_at  timestamptz NOT NULL DEFAULT now(),
+    posted_at    timestamptz,
+    posted_by    uuid
+);
+CREATE UNIQUE INDEX IF NOT EXISTS stocktake_sessions_open_uq
+    ON stocktake_sessions (location_id) WHERE status = 'open';
+
+CREATE TABLE IF NOT EXISTS stocktake_lines (
+    session_id        uuid    NOT NULL REFERENCES stocktake_sessions(id) ON DELETE CASCADE,
+    ingredient_id     uuid    NOT NULL,
+    expected          numeric NOT NULL DEFAULT 0,   -- 스냅샷 잔량
+    counted           numeric,
+    balance_at_count  numeric,                      -- 실사 수량을 올린 시점의 잔량
+    counted_at        timestamptz,
+    posted_delta      numeric,
+    PRIMARY KEY (session_id, ingredient_id)
+);
+"""
+
+
+class StocktakeStateError(Exception):
+    pass
+
+
+def ensure_stocktake_schema():
+    ensure_schema(STOCKTAKE, STOCKTAKE_DDL)
+
+
+def open_session(data: dict) -> dict:
+    ensure_stocktake_schema()
+    ingredient_ids = data.get("ingredient_ids") or None
+    with get_cursor(commit=True) as cur:
+        cur.execute(
+            """
+            INSERT INTO stocktake_sessions(location_id, note, created_by)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (location_id) WHERE status = 'open' DO NOTHING
+            RETURNING id, location_id, status, note, snapshot_at;
+            """,
+            (data["location_id"], data.get("note"), data.get("created_by"))
+        )
+        session = cur.fetchone()
+        if session is None:
+            raise StocktakeStateError("location already has an open stocktake")
+        cur.execute(
+            f"""
+            INSERT INTO stocktake_lines(session_id, ingredient_id, expected)
+            SELECT %s, inv.ingredient_id, {balance_sql("inv")}
+            FROM inventory inv
+            WHERE inv.location_id = %s
+              AND (%s::uuid[] IS NULL OR inv.ingredient_id = ANY(%s::uuid[]));
+            """,
+            (session["id"], data["location_id"], ingredient_ids, ingredient_ids)
+        )
+        session["lines"] = cur.rowcount
+        return session
+
+
+def _session(cur, session_id: str, lock: bool = False) -> Optional[dict]:
+    cur.execute(
+        f"SELECT id, location_id, status FROM stocktake_sessions WHERE id = %s{' FOR UPDATE' if lock else ''};",
+        (session_id,)
+    )
+    return cur.fetchone()
+
+
+def _parse_csv(text: str) -> list[dict]:
+    """헤더 필수: ingredient_id 또는 ingredient(이름), counted(또는 qty), 선택 unit_id."""
+    rows = []
+    reader = csv.DictReader(io.StringIO(text.lstrip("﻿")))
+    cols = {c.strip().lower() for c in (reader.fieldnames or [])}
+    if not ({"ingredient_id", "ingredient"} & cols) or not ({"counted", "qty"} & cols):
+        raise ValueError("CSV header needs ingredient_id|ingredient and counted|qty")
+    for n, r in enumerate(reader, start=2):
+        r = {(k or "").strip().lower(): (v or "").strip() for k, v in r.items()}
+        qty = r.get("counted") or r.get("qty")
+        if not qty:
+            continue
+        rows.append({"ingredient_id": r.get("ingredient_id") or None, "ingredient": r.get("ingredient") or None,
+                     "counted": qty, "unit_id": r.get("unit_id") or None, "line": n})
+    return rows
+
+
+def upload_counts(session_id: str, lines: list[dict], mode: str = "replace") -> Optional[dict]:
+    """
+    lines: [{ingredient_id | ingredient(이름), counted, unit_id(선택)}]
+    mode: replace = 덮어쓰기 / add = 기존 수량에 더하기 (여러 명이 구역을 나눠 셀 때)
+    잘못된 줄은 건너뛰고 errors 로 돌려준다.
+    """
+    ensure_stocktake_schema()
+    errors, good = [], []
+    for n, it in enumerate(lines):
+        try:
+            v = float(it["counted"])
+            if v < 0:
+                raise ValueError("negative")
+            good.append({**it, "counted": v, "line": it.get("line", n + 1)})
+        except (KeyError, TypeError, ValueError):
+            errors.append({"line": it.get("line", n + 1), "error": f"invalid counted: {it.get('counted')!r}"})
+
+    with get_cursor(commit=True) as cur:
+        s = _session(cur, session_id)
+        if s is None:
+            return None
+        if s["status"] != "open":
+            raise StocktakeStateError(f"stocktake is {s['status']}")
+
+        # 이름으로 온 줄은 한 번에 id로
+        names = list({it["ingredient"] for it in good if not it.get("ingredient_id") and it.get("ingredient")})
+        by_name = {}
+        if names:
+            cur.execute("SELECT name, id::text AS id FROM ingredients WHERE name = ANY(%s);", (names,))
+            by_name = {r["name"]: r["id"] for r in cur.fetchall()}
+        resolved = []
+        for it in good:
+            ing = it.get("ingredient_id") or by_name.get(it.get("ingredient"))
+            try:
+                resolved.append({**it, "ingredient_id": str(uuid.UUID(str(ing)))})
+            except ValueError:
+                errors.append({"line": it["line"], "error": f"unknown ingredient: {ing or it.get('ingredient')!r}"})
+        resolved = normalize_lines(resolved, qty_keys=("counted",), cost_key=None)
+
+        # 같은 재료가 여러 줄이면 합친다
+        merged: dict[str, float] = {}
+        first_line: dict[str, int] = {}
+        for it in resolved:
+            merged[it["ingredient_id"]] = merged.get(it["ingredient_id"], 0.0) + it["counted"]
+            first_line.setdefault(it["ingredient_id"], it["line"])
+        if not merged:
+            return {"session_id": session_id, "updated": 0, "errors": errors}
+
+        counted = "COALESCE(l.counted, 0) + EXCLUDED.counted" if mode == "add" else "EXCLUDED.counted"
+        cur.execute(
+            f"""
+            WITH u AS (
+                SELECT x.ingredient_id, x.counted
+                FROM unnest(%s::uuid[], %s::numeric[]) AS x(ingredient_id, counted)
+                JOIN ingredients ing ON ing.id = x.ingredient_id
+            )
+            INSERT INTO stocktake_lines AS l (session_id, ingredient_id, expected, counted, balance_at_count, counted_at)
+            SELECT %s, u.ingredient_id, 0, u.counted, COALESCE({balance_sql("inv")}, 0), now()
+            FROM u
+            LEFT JOIN inventory inv ON inv.ingredient_id = u.ingredient_id AND inv.location_id = %s
+            ON CONFLICT (session_id, ingredient_id) DO UPDATE
+            SET counted = {counted},
+                balance_at_count = EXCLUDED.balance_at_count,
+                counted_at = EXCLUDED.counted_at
+            RETURNING ingredient_id::text;
+            """,
+            (list(merged), list(merged.values()), session_id, s["location_id"])
+        )
+        done = {r["ingredient_id"] for r in cur.fetchall()}
+    for ing in merged:
+        if ing not in done:
+            errors.append({"line": first_line[ing], "error": f"unknown ingredient: {ing}"})
+    return {"session_id": session_id, "updated": len(done), "errors": sorted(errors, key=lambda e: e["line"])}
+
+
+def upload_counts_csv(session_id: str, text: str, mode: str = "replace") -> Optional[dict]:
+    return upload_counts(session_id, _parse_csv(text), mode)
+
+
+def _summary(cur, session_id: str) -> dict:
+    cur.execute(
+        """
+        SELECT s.id, s.location_id, s.status, s.note, s.snapshot_at, s.posted_at,
+               count(l.*) AS lines,
+               count(l.counted) AS counted_lines,
+               COALESCE(sum(l.expected - l.balance_at_count) FILTER (WHERE l.counted IS NOT NULL), 0)
+                   AS moved_since_snapshot,
+               count(*) FILTER (WHERE l.counted IS NOT NULL AND l.counted <> l.balance_at_count) AS variance_lines,
+               COALESCE(sum(l.counted - l.balance_at_count), 0) AS variance_qty,
+               COALESCE(sum((l.counted - l.balance_at_count) * i.cost_per_unit), 0) AS variance_value
+        FROM stocktake_sessions s
+        LEFT JOIN stocktake_lines l ON l.session_id = s.id
+        LEFT JOIN ingredients i ON i.id = l.ingredient_id
+        WHERE s.id = %s
+        GROUP BY s.id;
+        """,
+        (session_id,)
+    )
+    return cur.fetchone()
+
+
+def get_session(session_id: str) -> Optional[dict]:
+    with get_cursor() as cur:
+        return _summary(cur, session_id)
+
+
+def list_sessions(location_id: Optional[str] = None, status: Optional[str] = None, limit: int = 50) -> list[dict]:
+    limit = max(1, min(limit, 500))
+    conds, params = [], []
+    if location_id:
+        conds.append("location_id = %s::uuid"); params.append(location_id)
+    if status:
+        conds.append("status = %s"); params.append(status)
+    where = ("WHERE " + " AND ".join(conds)) if conds else ""
+    with get_cursor() as cur:
+        cur.execute(
+            f"""
+            SELECT id, location_id, status, note, snapshot_at, posted_at
+            FROM stocktake_sessions {where}
+            ORDER BY snapshot_at DESC LIMIT %s;
+            """,
+            (*params, limit)
+        )
+        return cur.fetchall()
+
+
+def list_lines(session_id: str, only_variance: bool = False, uncounted: bool = False) -> list[dict]:
+    cond = ""
+    if only_variance:
+        cond = " AND l.counted IS NOT NULL AND l.counted <> l.balance_at_count"
+    elif uncounted:
+        cond = " AND l.counted IS NULL"
+    with get_cursor() as cur:
+        cur.execute(
+            f"""
+            SELECT l.ingredient_id::text, i.name AS ingredient_name, l.expected, l.counted,
+                   l.balance_at_count, l.expected - l.balance_at_count AS moved_since_snapshot,
+                   l.counted - l.balance_at_count AS variance, l.counted_at, l.posted_delta
+            FROM stocktake_lines l
+            JOIN ingredients i ON i.id = l.ingredient_id
+            WHERE l.session_id = %s{cond}
+            ORDER BY i.name;
+            """,
+            (session_id,)
+        )
+        return cur.fetchall()
+
+
+def post_session(session_id: str, posted_by: Optional[str] = None, zero_uncounted: bool = False) -> Optional[dict]:
+    """
+    차이를 'adjustment' 로 한 트랜잭션에 반영. zero_uncounted=True면 세지 않은 재료를 0으로 본다
+    (실사 대상 전체를 셌을 때).
+    """
+    ensure_stocktake_schema()
+    with get_cursor(commit=True) as cur:
+        s = _session(cur, session_id, lock=True)
+        if s is None:
+            return None
+        if s["status"] != "open":
+            raise StocktakeStateError(f"stocktake is {s['status']}")
+        if zero_uncounted:
+            cur.execute(
+                f"""
+                UPDATE stocktake_lines l
+                SET counted = 0, balance_at_count = {balance_sql("inv")}, counted_at = now()
+                FROM inventory inv
+                WHERE l.session_id = %s AND l.counted IS NULL
+                  AND inv.ingredient_id = l.ingredient_id AND inv.location_id = %s;
+                """,
+                (session_id, s["location_id"])
+            )
+        # 실사 이후 판매로 잔량이 줄었으면 0 아래로 내리지 않는다
+        cur.execute(
+            f"""
+            WITH d AS (
+                SELECT l.ingredient_id,
+                       GREATEST(l.counted - l.balance_at_count, -GREATEST(COALESCE({balance_sql("inv")}, 0), 0))
+                           AS delta
+                FROM stocktake_lines l
+                LEFT JOIN inventory inv ON inv.ingredient_id = l.ingredient_id AND inv.location_id = %(loc)s
+                WHERE l.session_id = %(sid)s AND l.counted IS NOT NULL
+            ),
+            applied AS (
+                SELECT d.ingredient_id, d.delta,
+                       apply_stock_change(d.ingredient_id, %(loc)s::uuid, d.delta, 'adjustment'::tx_type,
+                                          'stocktake_sessions', %(sid)s::uuid, %(note)s, %(by)s::uuid)
+                FROM d WHERE d.delta <> 0
+                ORDER BY d.ingredient_id
+            )
+            UPDATE stocktake_lines l SET posted_delta = a.delta
+            FROM applied a
+            WHERE l.session_id = %(sid)s AND l.ingredient_id = a.ingredient_id;
+            """,
+            {"loc": s["location_id"], "sid": session_id, "note": f"STOCKTAKE={session_id}", "by": posted_by}
+        )
+        adjusted = cur.rowcount
+        cur.execute(
+            "UPDATE stocktake_sessions SET status='posted', posted_at=now(), posted_by=%s WHERE id=%s;",
+            (posted_by, session_id)
+        )
+        return {"ok": True, "status": "posted", "adjusted": adjusted, **_summary(cur, session_id)}
+
+
+def cancel_session(session_id: str) -> Optional[dict]:
+    ensure_stocktake_schema()
+    with get_cursor(commit=True) as cur:
+        s = _session(cur, session_id, lock=True)
+        if s is None:
+            return None
+        if s["status"] != "open":
+            raise StocktakeStateError(f"stocktake is {s['status']}")
+        cur.execute("UPDATE stocktake_sessions SET status='cancelled' WHERE id=%s;", (session_id,))
+        return {"ok": True, "status": "cancelled"}
@@ -0,0 +1,48 @@
+"""
+    STOCK_STRIPES=1 python -m backend.stripes enable --top 10          # 최근 판매 차감이 많은 (재료, 지점) 10개
+    STOCK_STRIPES=1 python -m backend.stripes enable --key <ingredient_id>:<location_id> --stripes 16
+    STOCK_STRIPES=1 python -m backend.stripes compact                   # cron: 1~5분마다
+    STOCK_STRIPES=1 python -m backend.stripes disable                   # 전체 해제 (사용량을 본 행에 반영)
+    STOCK_STRIPES=1 python -m backend.stripes status
+"""
+import argparse
+import json
+
+from backend.core.config import STOCK_STRIPE_COUNT
+from backend.core.logger import logger
+from .service import hot_keys, enable_stripes, disable_stripes, compact, stripes_status
+
+def _key(s: str) -> tuple[str, str]:
+    ing, _, loc = s.partition(":")
+    if not loc:
+        raise argparse.ArgumentTypeError("ingredient_id:location_id 형식")
+    return ing, loc
+
+def main():
+    p = argparse.ArgumentParser(prog="python -m backend.stripes")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    e = sub.add_parser("enable")
+    e.add_argument("--key", type=_key, action="append", default=[])
+    e.add_argument("--top", type=int, default=None)
+    e.add_argument("--location-id", default=None)
+    e.add_argument("--stripes", type=int, default=STOCK_STRIPE_COUNT)
+    d = sub.add_parser("disable")
+    d.add_argument("--key", type=_key, action="append", default=None)
+    sub.add_parser("compact")
+    sub.add_parser("status")
+    args = p.parse_args()
+
+    if args.cmd == "enable":
+        keys = list(args.key)
+        if args.top:
+            keys += hot_keys(args.top, args.location_id)
+        logger.info("stripes enable: %s", enable_stripes(keys, args.stripes))
+    elif args.cmd == "disable":
+        logger.info("stripes disable: %s", disable_stripes(args.key))
+    elif args.cmd == "compact":
+        logger.info("stripes compact: %d keys", compact())
+    else:
+        print(json.dumps(stripes_status(), indent=2, default=str))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+from fastapi import APIRouter
+from backend.core.config import STOCK_STRIPE_COUNT
+from backend.core.exceptions import db_error
+from .schema import StripeEnableIn, StripeDisableIn
+from .service import hot_keys, enable_stripes, disable_stripes, compact, stripes_status
+
+router = APIRouter()
+
+@router.get("")
+def get_stripes():
+    try:
+        return stripes_status()
+    except Exception as e:
+        raise db_error(e)
+
+@router.post("/enable")
+def post_enable_stripes(body: StripeEnableIn):
+    try:
+        keys = [(k.ingredient_id, k.location_id) for k in body.keys]
+        if body.top:
+            keys += hot_keys(body.top, body.location_id)
+        return enable_stripes(keys, body.stripes or STOCK_STRIPE_COUNT)
+    except Exception as e:
+        raise db_error(e)
+
+@router.post("/disable")
+def post_disable_stripes(body: StripeDisableIn):
+    try:
+        keys = None if body.keys is None else [(k.ingredient_id, k.location_id) for k in body.keys]
+        return disable_stripes(keys)
+    except Exception as e:
+        raise db_error(e)
+
+@router.post("/compact")
+def post_compact_stripes():
+    try:
+        return {"compacted": compact()}
+    except Exception as e:
+        raise db_error(e)
@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+class StripeKey(BaseModel):
+    ingredient_id: str
+    location_id: str
+
+class StripeEnableIn(BaseModel):
+    keys: list[StripeKey] = []
+    top: Optional[int] = Field(default=None, gt=0)      # keys 대신 최근 판매 차감이 많은 상위 N개
+    location_id: Optional[str] = None                   # top 과 함께: 해당 지점만
+    stripes: Optional[int] = Field(default=None, gt=0, le=64)
+
+class StripeDisableIn(BaseModel):
+    keys: Optional[list[StripeKey]] = None              # 없으면 전체
@@ -0,0 +1,272 @@
+"""
+인기 재료 재고 스트라이프 (STOCK_STRIPES=1).
+
+라떼가 팔릴 때마다 같은 지점의 우유 inventory 행 하나를 갱신하므로 동시 판매가 그 행 잠금에서 줄을 선다.
+스트라이프를 켠 (재료, 지점)은 차감을 inventory 행 대신 작은 하위 카운터 N개로 나눠 받는다.
+
+- inventory_stripes(stripe별 allot, used): compaction 때 현재고의 STOCK_STRIPE_SHARE 만큼을 N등분해 할당(allot).
+  차감은 잠기지 않은 스트라이프 하나에서 used + 차감량 <= allot 인 경우에만 처리 (SKIP LOCKED → 서로 기다리지 않음).
+  동시 판매가 스트라이프 수보다 많으면 여유 있는 스트라이프 하나를 기다린다.
+- 할당 합계가 항상 (현재고 - 사용량) 이하이므로 빠른 경로만으로는 재고가 음수가 될 수 없다.
+- 어느 스트라이프에도 여유가 없으면 느린 경로: 본 행과 스트라이프를 모두 잠그고 사용량을 본 행에 접은 뒤
+  기존 apply_stock_change(→ apply_stock_change_base)로 처리 → INSUFFICIENT_STOCK 판정과 저재고 알림은 기존 그대로.
+  처리 후 새 잔량으로 할당을 다시 나눈다. 입고 등 양수 변경도 같은 경로라 본 행 기준 잔량이 정확하다.
+  (빠른 경로 차감에는 저재고 알림이 없다. 재고가 줄면 할당도 작아져 곧 느린 경로에서 알림이 난다)
+- 실제 잔량 = inventory.qty_on_hand - sum(used). 조회는 balance_sql() 로 이 값을 쓴다.
+- compact(): 사용량을 본 행에 접고 할당을 다시 나눈다 (cron: python -m backend.stripes compact).
+  재고 화면의 qty_on_hand 와 실제 잔량 차이를 줄이는 용도.
+- 할당은 본 행 잔량 기준이므로 inventory.qty_on_hand 를 apply_stock_change 없이 직접 고치는 쓰기는
+  같은 트랜잭션에서 fold_for_write() → 쓰기 → reallot() 순서를 지켜야 한다 (balance_sql 참고).
+
+설치 시 운영 DB의 apply_stock_change 를 apply_stock_change_base 로 이름만 바꾸고, 같은 시그니처의 분기 함수를 올린다.
+트리거/입고/이동 등 기존 호출부는 그대로 분기 함수를 타며, 스트라이프가 없는 재료는 기존 함수로 바로 넘어간다.
+"""
+from backend.core.config import (
+    STOCK_STRIPES, STOCK_STRIPE_COUNT, STOCK_STRIPE_SHARE, STOCK_STRIPE_HOT_DAYS,
+)
+from backend.core.db import get_cursor, ensure_schema
+from backend.core.logger import logger
+
+STRIPES = "inventory_stripes"
+
+_SIG = "uuid, uuid, numeric, tx_type, text, uuid, text, uuid"
+
+STRIPES_DDL = """
+CREATE TABLE IF NOT EXISTS inventory_stripes (
+    ingredient_id uuid     NOT NULL,
+    location_id   uuid     NOT NULL,
+    stripe        smallint NOT NULL,
+    allot         numeric  NOT NULL DEFAULT 0,
+    used          numeric  NOT NULL DEFAULT 0,
+    PRIMARY KEY (ingredient_id, location_id, stripe),
+    CHECK (used <= allot)
+);
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_proc WHERE proname = 'apply_stock_change_base') THEN
+        ALTER FUNCTION apply_stock_change({sig}) RENAME TO apply_stock_change_base;
+    END IF;
+END $$;
+
+-- 본 행과 스트라이프를 잠그고 사용량을 본 행에 반영, 할당은 회수
+CREATE OR REPLACE FUNCTION inventory_stripes_fold(p_ing uuid, p_loc uuid)
+RETURNS void LANGUAGE plpgsql AS $$
+DECLARE v_used numeric;
+BEGIN
+    PERFORM 1 FROM inventory WHERE ingredient_id = p_ing AND location_id = p_loc FOR UPDATE;
+    PERFORM 1 FROM inventory_stripes WHERE ingredient_id = p_ing AND location_id = p_loc
+     ORDER BY stripe FOR UPDATE;
+    SELECT COALESCE(sum(used), 0) INTO v_used
+      FROM inventory_stripes WHERE ingredient_id = p_ing AND location_id = p_loc;
+    UPDATE inventory_stripes
+       SET allot = 0, used = 0
+     WHERE ingredient_id = p_ing AND location_id = p_loc;
+    IF v_used <> 0 THEN
+        UPDATE inventory SET qty_on_hand = qty_on_hand - v_used, updated_at = now()
+         WHERE ingredient_id = p_ing AND location_id = p_loc;
+    END IF;
+END $$;
+
+-- 접은 직후(잠금 보유 중) 본 행 잔량의 share 만큼을 스트라이프에 N등분
+CREATE OR REPLACE FUNCTION inventory_stripes_allot(p_ing uuid, p_loc uuid)
+RETURNS void LANGUAGE sql AS $$
+    UPDATE inventory_stripes s
+       SET allot = trunc(greatest(i.qty_on_hand, 0) * {share} / n.cnt, 3)
+      FROM inventory i,
+           (SELECT count(*) AS cnt FROM inventory_stripes WHERE ingredient_id = p_ing AND location_id = p_loc) n
+     WHERE s.ingredient_id = p_ing AND s.location_id = p_loc
+       AND i.ingredient_id = p_ing AND i.location_id = p_loc;
+$$;
+
+CREATE OR REPLACE FUNCTION apply_stock_change(p_ing uuid, p_loc uuid, p_delta numeric, p_type tx_type,
+                                              p_ref_table text, p_ref_id uuid, p_note text, p_user uuid)
+RETURNS numeric LANGUAGE plpgsql AS $$
+DECLARE v_stripe smallint; v_bal numeric;
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM inventory_stripes WHERE ingredient_id = p_ing AND location_id = p_loc) THEN
+        RETURN apply_stock_change_base(p_ing, p_loc, p_delta, p_type, p_ref_table, p_ref_id, p_note, p_user);
+    END IF;
+
+    IF p_delta < 0 THEN
+        -- 빠른 경로: 여유 있는 스트라이프 하나 (세션마다 시작 위치를 달리해서 분산)
+        SELECT stripe INTO v_stripe FROM inventory_stripes
+         WHERE ingredient_id = p_ing AND location_id = p_loc AND used - p_delta <= allot
+         ORDER BY (stripe + pg_backend_pid()) % 1024
+         LIMIT 1
+         FOR UPDATE SKIP LOCKED;
+        IF NOT FOUND THEN
+            -- 여유 있는 스트라이프가 모두 잠겨 있으면 그중 하나를 기다린다 (잠금이 풀린 뒤 조건을 다시 확인)
+            SELECT stripe INTO v_stripe FROM inventory_stripes
+             WHERE ingredient_id = p_ing AND location_id = p_loc AND used - p_delta <= allot
+             ORDER BY (stripe + pg_backend_pid()) % 1024
+             LIMIT 1
+             FOR UPDATE;
+        END IF;
+        IF FOUND THEN
+            UPDATE inventory_stripes SET used = used - p_delta
+             WHERE ingredient_id = p_ing AND location_id = p_loc AND stripe = v_stripe;
+            INSERT INTO inventory_tx(ingredient_id, location_id, tx_type, qty_delta, ref_table, ref_id, note, created_by)
+            VALUES (p_ing, p_loc, p_type, p_delta, p_ref_table, p_ref_id, p_note, p_user);
+            RETURN (SELECT i.qty_on_hand - COALESCE((SELECT sum(s.used) FROM inventory_stripes s
+                                                     WHERE s.ingredient_id = p_ing AND s.location_id = p_loc), 0)
+                      FROM inventory i WHERE i.ingredient_id = p_ing AND i.location_id = p_loc);
+        END IF;
+    END IF;
+
+    -- 느린 경로: 접어서 본 행을 정확하게 만든 뒤 기존 함수로 (잔량 검사/알림 포함), 새 잔량으로 다시 할당
+    PERFORM inventory_stripes_fold(p_ing, p_loc);
+    v_bal := apply_stock_change_base(p_ing, p_loc, p_delta, p_type, p_ref_table, p_ref_id, p_note, p_user);
+    PERFORM inventory_stripes_allot(p_ing, p_loc);
+    RETURN v_bal;
+END $$;
+"""
+
+
+def _ensure():
+    if not STOCK_STRIPES:
+        # 조회 쪽(balance_sql)이 스트라이프를 더하지 않으므로 플래그 없이 켜면 잔량이 틀어진다
+        raise RuntimeError("STOCK_STRIPES=1 로 설정한 뒤에 사용하세요")
+    ensure_schema(STRIPES, STRIPES_DDL.replace("{sig}", _SIG).replace("{share}", repr(float(STOCK_STRIPE_SHARE))))
+
+
+def balance_sql(alias: str = "inv") -> str:
+    """
+    조회용 실제 잔량 식. 스트라이프를 안 쓰면 기존 qty_on_hand 그대로.
+
+    불변식: sum(allot) <= (qty_on_hand - sum(used)) 의 STOCK_STRIPE_SHARE 몫. 빠른 경로는 이것만 믿고 차감하므로
+    qty_on_hand 를 직접 줄이면 (apply_stock_change 를 거치지 않는 수정/일괄 반영) 잔량이 음수가 될 수 있다.
+    그런 쓰기는 apply_stock_change 를 거치거나, 같은 트랜잭션에서 fold_for_write() 로 접은 뒤 쓰고 reallot() 한다.
+    """
+    if not STOCK_STRIPES:
+        return f"COALESCE({alias}.qty_on_hand, 0)"
+    return (
+        f"(COALESCE({alias}.qty_on_hand, 0) - COALESCE((SELECT sum(s.used) FROM inventory_stripes s "
+        f"WHERE s.ingredient_id = {alias}.ingredient_id AND s.location_id = {alias}.location_id), 0))"
+    )
+
+
+def fold_for_write(cur, keys: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    """
+    qty_on_hand 를 직접 고치기 전에 (같은 트랜잭션, cur) keys 중 스트라이프가 있는 키의 사용량을 본 행에 접고
+    할당을 0 으로 회수한다. 접은 키를 돌려준다 → 쓰기가 끝나면 reallot(cur, 접은 키).
+    """
+    if not STOCK_STRIPES or not keys:
+        return []
+    cur.execute("SELECT to_regclass('inventory_stripes') IS NOT NULL AS ok;")
+    if not cur.fetchone()["ok"]:
+        return []
+    cur.execute(
+        """
+        SELECT k.ingredient_id::text AS ingredient_id, k.location_id::text AS location_id,
+               inventory_stripes_fold(k.ingredient_id, k.location_id)
+        FROM (SELECT DISTINCT s.ingredient_id, s.location_id
+              FROM inventory_stripes s
+              JOIN unnest(%s::uuid[], %s::uuid[]) AS u(ingredient_id, location_id)
+                ON u.ingredient_id = s.ingredient_id AND u.location_id = s.location_id
+              ORDER BY 1, 2) k;
+        """,
+        ([k[0] for k in keys], [k[1] for k in keys]),
+    )
+    return [(r["ingredient_id"], r["location_id"]) for r in cur.fetchall()]
+
+
+def reallot(cur, keys: list[tuple[str, str]]):
+    """fold_for_write() 로 접은 키에 바뀐 본 행 잔량 기준으로 할당을 다시 나눈다."""
+    for ing, loc in keys:
+        cur.execute("SELECT inventory_stripes_allot(%s, %s);", (ing, loc))
+
+
+def hot_keys(top: int, location_id: str | None = None, days: int = STOCK_STRIPE_HOT_DAYS) -> list[tuple[str, str]]:
+    """최근 days일 판매 차감 건수가 많은 (재료, 지점)."""
+    q = """
+        SELECT ingredient_id::text AS ingredient_id, location_id::text AS location_id
+        FROM inventory_tx
+        WHERE tx_type = 'recipe_consume' AND created_at >= now() - make_interval(days => %s)
+    """
+    args: list = [days]
+    if location_id:
+        q += " AND location_id = %s::uuid"
+        args.append(location_id)
+    q += " GROUP BY 1, 2 ORDER BY count(*) DESC LIMIT %s;"
+    args.append(top)
+    with get_cursor() as cur:
+        cur.execute(q, args)
+        return [(r["ingredient_id"], r["location_id"]) for r in cur.fetchall()]
+
+
+def enable_stripes(keys: list[tuple[str, str]], stripes: int = STOCK_STRIPE_COUNT) -> dict:
+    _ensure()
+    stripes = max(1, stripes)
+    with get_cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO inventory_stripes (ingredient_id, location_id, stripe)
+            SELECT i.ingredient_id, i.location_id, g
+            FROM inventory i
+            JOIN unnest(%s::uuid[], %s::uuid[]) AS k(ingredient_id, location_id)
+              ON k.ingredient_id = i.ingredient_id AND k.location_id = i.location_id
+            CROSS JOIN generate_series(0, %s - 1) AS g
+            ON CONFLICT DO NOTHING;
+            """,
+            ([k[0] for k in keys], [k[1] for k in keys], stripes),
+        )
+    striped = set(_striped_keys())
+    keys = [k for k in keys if k in striped]
+    compact(keys)
+    logger.info("stock stripes enabled for %d keys (%d stripes)", len(keys), stripes)
+    return {"enabled": len(keys), "stripes": stripes, "keys": [{"ingredient_id": i, "location_id": l} for i, l in keys]}
+
+
+def disable_stripes(keys: list[tuple[str, str]] | None = None) -> dict:
+    """사용량을 본 행에 접고 스트라이프를 지운다. keys가 없으면 전체."""
+    _ensure()
+    keys = keys if keys is not None else _striped_keys()
+    for ing, loc in keys:
+        with get_cursor() as cur:
+            cur.execute("SELECT inventory_stripes_fold(%s, %s);", (ing, loc))
+            cur.execute("DELETE FROM inventory_stripes WHERE ingredient_id = %s AND location_id = %s;", (ing, loc))
+    return {"disabled": len(keys)}
+
+
+def _striped_keys() -> list[tuple[str, str]]:
+    with get_cursor() as cur:
+        cur.execute(
+            "SELECT DISTINCT ingredient_id::text AS ingredient_id, location_id::text AS location_id "
+            "FROM inventory_stripes ORDER BY 1, 2;"
+        )
+        return [(r["ingredient_id"], r["location_id"]) for r in cur.fetchall()]
+
+
+def compact(keys: list[tuple[str, str]] | None = None) -> int:
+    """
+    키마다 짧은 트랜잭션으로: 사용량을 본 행에 접고, 남은 재고의 STOCK_STRIPE_SHARE 만큼을 스트라이프에 다시 나눈다.
+    (한 번에 여러 키를 잠그지 않으므로 판매는 해당 재료에서만 잠깐 기다린다)
+    """
+    _ensure()
+    keys = keys if keys is not None else _striped_keys()
+    for ing, loc in keys:
+        with get_cursor() as cur:
+            cur.execute("SELECT inventory_stripes_fold(%s, %s);", (ing, loc))
+            cur.execute("SELECT inventory_stripes_allot(%s, %s);", (ing, loc))
+    return len(keys)
+
+
+def stripes_status() -> list[dict]:
+    if not STOCK_STRIPES:
+        return []
+    _ensure()
+    with get_cursor() as cur:
+        cur.execute(
+            """
+            SELECT s.ingredient_id::text AS ingredient_id, s.location_id::text AS location_id,
+                   count(*) AS stripes, i.qty_on_hand AS base,
+                   sum(s.allot) AS allot, sum(s.used) AS used,
+                   i.qty_on_hand - sum(s.used) AS balance
+            FROM inventory_stripes s
+            JOIN inventory i ON i.ingredient_id = s.ingredient_id AND i.location_id = s.location_id
+            GROUP BY s.ingredient_id, s.location_id, i.qty_on_hand
+            ORDER BY sum(s.used) DESC;
+            """
+        )
+        return cur.fetchall()
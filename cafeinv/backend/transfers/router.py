@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends, HTTPException, Response
+from backend.core.exceptions import db_error
+from backend.core.paging import PageParams, page_params, page_response
+from .schema import TransferIn, TransferItemIn, TransferActionIn
+from .service import (
+    TransferStateError,
+    create_transfer, list_transfers, add_transfer_item, list_transfer_items,
+    ship_transfer, receive_transfer
+)
+
+router = APIRouter()
+
+@router.post("/transfers")
+def post_transfer(body: TransferIn):
+    try:
+        return create_transfer(body.model_dump())
+    except Exception as e:
+        raise db_error(e)
+
+@router.get("/transfers")
+def get_transfers(response: Response, status: str | None = None, location_id: str | None = None,
+                  page: PageParams = Depends(page_params)):
+    try:
+        return page_response(response, list_transfers(status, location_id, page))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise db_error(e)
+
+@router.post("/transfer_items")
+def post_transfer_item(body: TransferItemIn):
+    try:
+        return add_transfer_item(body.model_dump())
+    except Exception as e:
+        raise db_error(e)
+
+@router.get("/transfer_items")
+def get_transfer_items(transfer_id: str):
+    try:
+        return list_transfer_items(transfer_id)
+    except Exception as e:
+        raise db_error(e)
+
+def _run(fn, transfer_id: str, body: TransferActionIn | None):
+    try:
+        res = fn(transfer_id, body.acted_by if body else None)
+    except TransferStateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise db_error(e)
+    if res is None:
+        raise HTTPException(status_code=404, detail="transfer not found")
+    return res
+
+@router.post("/transfers/{transfer_id}/ship")
+def post_transfer_ship(transfer_id: str, body: TransferActionIn | None = None):
+    return _run(ship_transfer, transfer_id, body)
+
+@router.post("/transfers/{transfer_id}/receive")
+def post_transfer_receive(transfer_id: str, body: TransferActionIn | None = None):
+    return _run(receive_transfer, transfer_id, body)
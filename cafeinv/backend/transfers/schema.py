@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class TransferIn(BaseModel):
+    from_location_id: Optional[str] = None
+    to_location_id: Optional[str] = None
+    status: Optional[str] = "draft"   # draft | shipped | received | canceled
+    created_by: Optional[str] = None
+
+class TransferItemIn(BaseModel):
+    transfer_id: str
+    ingredient_id: str
+    qty: float
+
+class TransferActionIn(BaseModel):
+    acted_by: Optional[str] = None
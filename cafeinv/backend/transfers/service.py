@@ -0,0 +1,114 @@
+from typing import Optional
+from backend.core.db import get_cursor
+from backend.core.paging import PageParams, PageResult, fetch_page
+
+class TransferStateError(Exception):
+    pass
+
+def create_transfer(data: dict):
+    with get_cursor(commit=True) as cur:
+        cur.execute(
+            """
+            INSERT INTO transfers(from_location_id, to_location_id, status, created_by)
+            VALUES (%s,%s,%s,%s)
+            RETURNING id, from_location_id, to_location_id, status, created_at;
+            """,
+            (data.get("from_location_id"), data.get("to_location_id"),
+             data.get("status") or "draft", data.get("created_by"))
+        )
+        return cur.fetchone()
+
+def list_transfers(status: Optional[str] = None, location_id: Optional[str] = None,
+                   page: Optional[PageParams] = None) -> PageResult:
+    page = page or PageParams()
+    if page.limit is None:
+        page.limit = 100
+    where, params = [], []
+    if status:
+        where.append("t.status=%s"); params.append(status)
+    if location_id:
+        where.append("(t.from_location_id=%s OR t.to_location_id=%s)"); params += [location_id, location_id]
+    with get_cursor() as cur:
+        return fetch_page(
+            cur,
+            """
+            SELECT t.id, t.from_location_id, fl.name AS from_location_name,
+                   t.to_location_id, tl.name AS to_location_name, t.status, t.created_at
+            FROM transfers t
+            LEFT JOIN locations fl ON fl.id = t.from_location_id
+            LEFT JOIN locations tl ON tl.id = t.to_location_id
+            """,
+            where, params, page,
+            sortable={"created_at": "t.created_at", "status": "t.status"},
+            default_sort="-created_at", tiebreak="t.id"
+        )
+
+def add_transfer_item(data: dict):
+    with get_cursor(commit=True) as cur:
+        cur.execute(
+            """
+            INSERT INTO transfer_items(transfer_id, ingredient_id, qty)
+            VALUES (%s,%s,%s) RETURNING id, transfer_id, ingredient_id, qty;
+            """,
+            (data["transfer_id"], data["ingredient_id"], data["qty"])
+        )
+        return cur.fetchone()
+
+def list_transfer_items(transfer_id: str):
+    with get_cursor() as cur:
+        cur.execute(
+            """
+            SELECT ti.id, ti.transfer_id, ti.ingredient_id, i.name AS ingredient_name, ti.qty
+            FROM transfer_items ti
+            JOIN ingredients i ON i.id = ti.ingredient_id
+            WHERE ti.transfer_id = %s
+            ORDER BY i.name;
+            """,
+            (transfer_id,)
+        )
+        return cur.fetchall()
+
+# ship: from에서 transfer_out / receive: to에 transfer_in
+_ACTIONS = {
+    "ship":    {"from_status": ("draft",),   "to_status": "shipped",  "loc": "from_location_id",
+                "sign": -1, "tx_type": "transfer_out", "note": "TR_SHIP"},
+    "receive": {"from_status": ("shipped",), "to_status": "received", "loc": "to_location_id",
+                "sign": 1,  "tx_type": "transfer_in",  "note": "TR_RECV"},
+}
+
+def _act(transfer_id: str, action: str, acted_by: Optional[str]):
+    a = _ACTIONS[action]
+    with get_cursor(commit=True) as cur:
+        # 같은 이동을 동시에 두 번 ship/receive 하지 않도록 행 잠금
+        cur.execute(
+            "SELECT id, status, from_location_id, to_location_id FROM transfers WHERE id=%s FOR UPDATE;",
+            (transfer_id,)
+        )
+        tr = cur.fetchone()
+        if not tr:
+            return None
+        if tr["status"] not in a["from_status"]:
+            raise TransferStateError(f"transfer is {tr['status']}, cannot {action}")
+        # 라인별 apply_stock_change를 한 문장으로 (왕복 N회 → 1회)
+        cur.execute(
+            """
+            SELECT count(*) AS n FROM (
+                SELECT apply_stock_change(
+                    ti.ingredient_id, %s::uuid, ti.qty * %s,
+                    %s::tx_type, 'transfer_items', ti.id, %s, %s::uuid)
+                FROM transfer_items ti
+                WHERE ti.transfer_id = %s
+                ORDER BY ti.ingredient_id
+            ) x;
+            """,
+            (tr[a["loc"]], a["sign"], a["tx_type"], f"{a['note']}={transfer_id}", acted_by, transfer_id)
+        )
+        n = cur.fetchone()["n"]
+        cur.execute("UPDATE transfers SET status=%s WHERE id=%s;", (a["to_status"], transfer_id))
+        return {"ok": True, "status": a["to_status"], "items": n}
+
+def ship_transfer(transfer_id: str, acted_by: Optional[str] = None):
+    return _act(transfer_id, "ship", acted_by)
+
+def receive_transfer(transfer_id: str, acted_by: Optional[str] = None):
+    return _act(transfer_id, "receive", acted_by)
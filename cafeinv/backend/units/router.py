@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from backend.core.exceptions import db_error
+from .schema import ConvertIn
+from .service import convert, to_base
+
+router = APIRouter()
+
+@router.post("/convert")
+def post_convert(body: ConvertIn):
+    try:
+        if body.to_unit is None:
+            return to_base(body.qty, body.from_unit)
+        return convert(body.qty, body.from_unit, body.to_unit)
+    except Exception as e:
+        raise db_error(e)
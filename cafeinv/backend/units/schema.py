@@ -0,0 +1,14 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional
+
+class ConvertIn(BaseModel):
+    qty: list[float] = Field(..., min_length=1)
+    from_unit: str | list[str]                  # id 또는 이름. 목록이면 qty와 같은 길이
+    to_unit: Optional[str | list[str]] = None   # 없으면 각 단위의 base로
+
+    @model_validator(mode="after")
+    def _same_length(self):
+        for u in (self.from_unit, self.to_unit):
+            if isinstance(u, list) and len(u) != len(self.qty):
+                raise ValueError("unit list length must match qty")
+        return self
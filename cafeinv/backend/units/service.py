@@ -0,0 +1,153 @@
+"""
+단위 환산.
+
+    t = unit_table()
+    t.convert([500, 2], ["g", "kg"], "kg")     # → array([0.5, 2. ])
+    t.to_base([1.5], ["L"])                    # → (array([1500.]), ["ml"])
+
+units(name, base, to_base) 전체를 한 번 읽어 n×n 환산 계수 행렬로 만든다.
+factor[i, j] = to_base[i] / to_base[j] (i → j), base가 다르면 NaN → UNIT_MISMATCH.
+단위는 id 또는 이름으로 지정하고, 배열 단위로 한 번에 환산한다 (행마다 DB 조회 없음).
+ref_units 캐시가 새로 로드될 때만 행렬을 다시 만든다.
+"""
+import threading
+from typing import Iterable, Optional
+
+import numpy as np
+
+from backend.core.db import get_cursor
+
+
+class UnitMismatch(ValueError):
+    pass
+
+
+class UnitTable:
+    def __init__(self, rows: list[dict]):
+        self.ids = [str(r["id"]) for r in rows]
+        self.names = [r["name"] for r in rows]
+        self.bases = [r["base"] for r in rows]
+        self._index: dict[str, int] = {}
+        for i, r in enumerate(rows):
+            self._index[str(r["id"])] = i
+            self._index.setdefault(r["name"], i)
+        for i, r in enumerate(rows):
+            self._index.setdefault(r["name"].lower(), i)
+
+        self.to_base_factor = np.array([float(r["to_base"] or 0) for r in rows], dtype=np.float64)
+        codes = np.unique(np.array(self.bases, dtype=object), return_inverse=True)[1] if rows else np.zeros(0, int)
+        valid = self.to_base_factor > 0
+        # to_base 가 0/음수인 단위는 어떤 단위와도 환산하지 않는다
+        same = (codes[:, None] == codes[None, :]) & valid[:, None] & valid[None, :]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            factor = self.to_base_factor[:, None] / self.to_base_factor[None, :]
+        self.factor = np.where(same, factor, np.nan)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def index(self, units) -> np.ndarray:
+        """id/이름 (하나 또는 목록) → 행렬 인덱스 배열."""
+        if isinstance(units, str):
+            units = [units]
+        out = np.empty(len(units), dtype=np.intp)
+        for n, u in enumerate(units):
+            i = self._index.get(str(u))
+            if i is None:
+                i = self._index.get(str(u).lower())
+            if i is None:
+                raise UnitMismatch(f"UNIT_MISMATCH unknown unit {u!r}")
+            out[n] = i
+        return out
+
+    def factors(self, src, dst) -> np.ndarray:
+        """src → dst 환산 계수. 한쪽이 단일 단위면 다른 쪽 길이에 맞춰 브로드캐스트."""
+        s, d = self.index(src), self.index(dst)
+        f = self.factor[s, d]
+        bad = np.flatnonzero(np.isnan(f))
+        if bad.size:
+            k = bad[0]
+            si, di = s[k if s.size > 1 else 0], d[k if d.size > 1 else 0]
+            raise UnitMismatch(
+                f"UNIT_MISMATCH {self.names[si]}({self.bases[si]}) -> {self.names[di]}({self.bases[di]})"
+                + (f" and {bad.size - 1} more" if bad.size > 1 else "")
+            )
+        return f
+
+    def convert(self, qty, src, dst) -> np.ndarray:
+        return np.asarray(qty, dtype=np.float64) * self.factors(src, dst)
+
+    def to_base(self, qty, src) -> tuple[np.ndarray, list[str]]:
+        """각 수량을 자기 단위의 base로. (환산값, base 이름 목록)"""
+        s = self.index(src)
+        return np.asarray(qty, dtype=np.float64) * self.to_base_factor[s], [self.bases[i] for i in s]
+
+    def compatible(self, a, b) -> bool:
+        return not np.isnan(self.factor[self.index(a)[0], self.index(b)[0]])
+
+
+_table: Optional[UnitTable] = None
+_rows = None
+_lock = threading.Lock()
+
+
+def unit_table() -> UnitTable:
+    global _table, _rows
+    from backend.catalog.service import ref_units   # catalog 이 normalize_lines 를 쓰므로 순환 import 회피
+    rows = ref_units()
+    if rows is not _rows:
+        with _lock:
+            if rows is not _rows:
+                _table, _rows = UnitTable(rows), rows
+    return _table
+
+
+def _round(a: np.ndarray) -> list[float]:
+    # numeric 컬럼에 float 오차(0.30000000000000004 등)를 남기지 않는다
+    return np.round(a, 6).tolist()
+
+
+def normalize_lines(lines: list[dict], qty_keys: Iterable[str] = ("qty",),
+                    cost_key: Optional[str] = "unit_cost") -> list[dict]:
+    """
+    unit_id(id 또는 이름)가 붙은 라인의 수량/단가를 재료의 재고 단위로 바꾼 사본을 돌려준다.
+    unit_id 없는 라인은 그대로. 재료 단위는 배치당 한 번 조회한다 (transaction() 안이면 같은 트랜잭션).
+    """
+    todo = [n for n, it in enumerate(lines) if it.get("unit_id")]
+    if not todo:
+        return lines
+    with get_cursor(commit=False) as cur:
+        cur.execute(
+            "SELECT id::text AS id, unit_id::text AS unit_id FROM ingredients WHERE id = ANY(%s::uuid[]);",
+            (list({str(lines[n]["ingredient_id"]) for n in todo}),)
+        )
+        ing_unit = {r["id"]: r["unit_id"] for r in cur.fetchall()}
+    missing = [lines[n]["ingredient_id"] for n in todo if not ing_unit.get(str(lines[n]["ingredient_id"]))]
+    if missing:
+        raise UnitMismatch(f"UNIT_MISMATCH ingredient without unit: {missing[0]}")
+
+    f = unit_table().factors([lines[n]["unit_id"] for n in todo],
+                             [ing_unit[str(lines[n]["ingredient_id"])] for n in todo])
+    out = [dict(it) for it in lines]
+    # 수량은 곱하고, 단가(원/단위)는 나눈다
+    ops = [(key, np.multiply) for key in qty_keys] + ([(cost_key, np.divide)] if cost_key else [])
+    for key, op in ops:
+        ks = [k for k, n in enumerate(todo) if out[n].get(key) is not None]
+        if ks:
+            vals = _round(op(np.array([float(out[todo[k]][key]) for k in ks]), f[ks]))
+            for k, v in zip(ks, vals):
+                out[todo[k]][key] = v
+    for n in todo:
+        out[n]["unit_id"] = ing_unit[str(out[n]["ingredient_id"])]
+    return out
+
+
+def convert(qty: list[float], from_unit, to_unit) -> dict:
+    t = unit_table()
+    return {"qty": _round(t.convert(qty, from_unit, to_unit))}
+
+
+def to_base(qty: list[float], unit) -> dict:
+    t = unit_table()
+    vals, bases = t.to_base(qty, unit if not isinstance(unit, str) else [unit] * len(qty))
+    return {"qty": _round(vals), "base": bases}
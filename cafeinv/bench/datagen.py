@@ -0,0 +1,328 @@
+"""
+벤치마크용 합성 카페 데이터 생성기 (로컬/일회용 DB 전용).
+
+    python -m bench.datagen --reset                              # 기본: 10개 매장, 100만 판매
+    python -m bench.datagen --reset --locations 50 --sales 5000000 --days 365
+    python -m bench.datagen --reset --small                      # 빠른 확인용
+
+- 모든 행은 DB 안에서 generate_series + random()으로 만든다 (파이썬 왕복 없음).
+  setseed(--seed) + 병렬 쿼리 off 라서 같은 인자면 같은 분포/건수가 나온다 (uuid 값은 매번 다름).
+- 원장(inventory_tx)은 판매 → 레시피 차감 → 주간 발주 입고 → 폐기 순으로 만들고,
+  inventory.qty_on_hand는 마지막에 원장 합계로 맞춘다 (원장과 재고가 항상 일치).
+- 트리거(판매 차감, audit)가 데이터를 이중으로 만들지 않도록 session_replication_role=replica(SET LOCAL)로
+  실행하므로 superuser 권한이 필요하다. 운영 DB에는 절대 돌리지 말 것.
+- inventory_tx / audit_logs가 월 파티션이면 범위 밖 행은 default 파티션으로 들어간다.
+  생성 후 `python -m backend.partitions ensure` 를 돌리면 월 파티션으로 옮겨진다.
+"""
+import argparse
+import time
+from contextlib import contextmanager
+
+from backend.core.config import ROLLUP_TZ
+from backend.core.db import get_cursor
+from backend.core.logger import logger
+
+# reset 시 비우는 테이블 (존재하는 것만)
+APP_TABLES = [
+    "sale_items", "sales", "inventory_tx", "inventory", "alerts", "audit_logs",
+    "receipt_items", "receipts", "po_items", "purchase_order_items", "purchase_orders",
+    "transfer_items", "transfers", "recipes", "menu_items", "ingredients", "suppliers",
+    "locations", "categories",
+    "inventory_usage_daily", "inventory_usage_hourly", "rollup_watermarks",
+]
+
+ING_WORDS = ["우유", "원두", "시럽", "컵", "뚜껑", "빨대", "생크림", "설탕", "파우더", "소스",
+             "과일청", "빵", "치즈", "버터", "초콜릿", "얼음", "티백", "요거트", "견과", "쿠키"]
+ING_CATEGORIES = ["유제품", "원두", "시럽/소스", "포장재", "베이커리", "과일", "기타"]
+MENU_WORDS = ["아메리카노", "카페라떼", "바닐라라떼", "카푸치노", "콜드브루", "에이드", "스무디",
+              "밀크티", "프라페", "케이크", "샌드위치", "베이글", "스콘", "마카롱"]
+MENU_CATEGORIES = ["커피", "라떼", "티", "음료", "디저트", "베이커리"]
+# 카페 시간대 분포 (출근/점심 피크)
+HOURS = [7, 8, 8, 8, 9, 9, 10, 11, 12, 12, 12, 13, 13, 14, 15, 15, 16, 17, 18, 19, 20]
+CHANNELS = ["POS", "POS", "POS", "POS", "kiosk", "kiosk", "delivery"]
+DEFAULT_UNITS = [("g", "g", 1), ("kg", "g", 1000), ("ml", "ml", 1), ("L", "ml", 1000), ("ea", "ea", 1)]
+
+
+@contextmanager
+def _step(name: str):
+    t0 = time.perf_counter()
+    yield
+    logger.info("datagen: %-22s %.1fs", name, time.perf_counter() - t0)
+
+
+def _existing(cur, tables):
+    cur.execute("SELECT t FROM unnest(%s::text[]) t WHERE to_regclass(t) IS NOT NULL;", (tables,))
+    return [r["t"] for r in cur.fetchall()]
+
+
+def _prepare_session(cur, seed: int):
+    try:
+        cur.execute("SET LOCAL session_replication_role = replica;")
+    except Exception as e:
+        raise RuntimeError("datagen은 superuser로 실행해야 합니다 (트리거 비활성화 필요)") from e
+    cur.execute("SET LOCAL max_parallel_workers_per_gather = 0;")
+    cur.execute("SET LOCAL synchronous_commit = off;")
+    cur.execute("SET LOCAL work_mem = '256MB';")
+    cur.execute("SELECT setseed(%s);", ((seed % 10000) / 10000.0,))
+
+
+def _reset(cur):
+    tables = _existing(cur, APP_TABLES)
+    if tables:
+        cur.execute(f"TRUNCATE {', '.join(tables)} RESTART IDENTITY CASCADE;")
+
+
+def _reference(cur, args):
+    cur.execute("SELECT count(*) AS n FROM units;")
+    if cur.fetchone()["n"] == 0:
+        cur.executemany("INSERT INTO units(name, base, to_base) VALUES (%s,%s,%s);", DEFAULT_UNITS)
+
+    cur.execute(
+        """
+        INSERT INTO categories(name, type)
+        SELECT c, t FROM unnest(%s::text[], %s::text[]) AS x(c, t)
+        WHERE NOT EXISTS (SELECT 1 FROM categories WHERE name = x.c AND type = x.t);
+        """,
+        (ING_CATEGORIES + MENU_CATEGORIES,
+         ["ingredient"] * len(ING_CATEGORIES) + ["menu"] * len(MENU_CATEGORIES)),
+    )
+    cur.execute(
+        """
+        INSERT INTO locations(name)
+        SELECT format('매장 %%s', lpad(g::text, 3, '0')) FROM generate_series(1, %s) g;
+        INSERT INTO suppliers(name, phone, is_active)
+        SELECT format('공급사 %%s', lpad(g::text, 3, '0')), format('02-000-%%s', lpad(g::text, 4, '0')), TRUE
+        FROM generate_series(1, %s) g;
+        """,
+        (args.locations, args.suppliers),
+    )
+    cur.execute(
+        """
+        CREATE TEMP TABLE g_unit ON COMMIT DROP AS
+            SELECT row_number() OVER (ORDER BY name) - 1 AS n, id FROM units;
+        CREATE TEMP TABLE g_icat ON COMMIT DROP AS
+            SELECT row_number() OVER (ORDER BY name) - 1 AS n, id FROM categories WHERE type = 'ingredient';
+        CREATE TEMP TABLE g_mcat ON COMMIT DROP AS
+            SELECT row_number() OVER (ORDER BY name) - 1 AS n, id FROM categories WHERE type = 'menu';
+        CREATE TEMP TABLE g_loc ON COMMIT DROP AS
+            SELECT row_number() OVER (ORDER BY name) - 1 AS n, id FROM locations;
+        """
+    )
+
+
+def _catalog(cur, args):
+    cur.execute(
+        """
+        INSERT INTO ingredients(name, unit_id, category_id, cost_per_unit,
+                                safety_stock_default, reorder_point_default)
+        SELECT (%(words)s::text[])[1 + g %% cardinality(%(words)s::text[])] || ' ' || lpad(g::text, 5, '0'),
+               u.id, c.id, round((1 + random() * 49)::numeric, 2), 0, 0
+        FROM generate_series(1, %(n)s) g
+        JOIN g_unit u ON u.n = g %% (SELECT count(*) FROM g_unit)
+        JOIN g_icat c ON c.n = g %% (SELECT count(*) FROM g_icat);
+
+        INSERT INTO menu_items(name, price, category_id, default_location_id, is_active)
+        SELECT (%(menus)s::text[])[1 + g %% cardinality(%(menus)s::text[])] || ' ' || lpad(g::text, 4, '0'),
+               (30 + floor(random() * 50)) * 100, c.id, l.id, TRUE
+        FROM generate_series(1, %(m)s) g
+        JOIN g_mcat c ON c.n = g %% (SELECT count(*) FROM g_mcat)
+        JOIN g_loc  l ON l.n = g %% (SELECT count(*) FROM g_loc);
+
+        CREATE TEMP TABLE g_ing ON COMMIT DROP AS
+            SELECT row_number() OVER (ORDER BY name) - 1 AS n, id FROM ingredients;
+        CREATE TEMP TABLE g_menu ON COMMIT DROP AS
+            SELECT row_number() OVER (ORDER BY name) - 1 AS n, id, price FROM menu_items WHERE is_active;
+        """,
+        {"words": ING_WORDS, "menus": MENU_WORDS, "n": args.ingredients, "m": args.menu_items},
+    )
+    # 메뉴당 3~8개 재료. 앞쪽 재료(우유/원두/컵 등)가 더 자주 쓰이도록 power(random(), 2)로 치우침
+    cur.execute(
+        """
+        INSERT INTO recipes(menu_item_id, ingredient_id, qty_required)
+        SELECT DISTINCT ON (p.menu_item_id, i.id) p.menu_item_id, i.id, round((1 + random() * 199)::numeric, 1)
+        FROM (
+            SELECT m.id AS menu_item_id,
+                   floor((SELECT count(*) FROM g_ing) * power(random(), 2))::int AS ix
+            FROM g_menu m,
+                 LATERAL generate_series(1, 3 + floor(random() * 6 + m.n * 0)::int) k
+        ) p
+        JOIN g_ing i ON i.n = p.ix;
+        """
+    )
+
+
+def _sales(cur, args):
+    # 판매 헤더: 매장/메뉴 인기도는 치우치게, 시간은 카페 피크 시간대로
+    cur.execute(
+        """
+        CREATE TEMP TABLE g_sale ON COMMIT DROP AS
+        SELECT gen_random_uuid() AS id,
+               floor((SELECT count(*) FROM g_loc) * power(random(), 1.5))::int AS li,
+               ((date_trunc('day', now() AT TIME ZONE %(tz)s) - make_interval(days => %(days)s))
+                 + make_interval(days => floor(random() * %(days)s)::int,
+                                 hours => (%(hours)s::int[])[1 + floor(random() * cardinality(%(hours)s::int[]))::int],
+                                 mins => floor(random() * 60)::int,
+                                 secs => floor(random() * 60)::int)) AT TIME ZONE %(tz)s AS ts,
+               (%(channels)s::text[])[1 + floor(random() * cardinality(%(channels)s::text[]))::int] AS channel
+        FROM generate_series(1, %(n)s) g;
+
+        CREATE TEMP TABLE g_item ON COMMIT DROP AS
+        SELECT gen_random_uuid() AS id, p.sale_id, p.li, p.ts, m.id AS menu_item_id, m.price, p.qty
+        FROM (
+            SELECT s.id AS sale_id, s.li, s.ts,
+                   floor((SELECT count(*) FROM g_menu) * power(random(), 3))::int AS mi,
+                   1 + floor(power(random(), 4) * 3)::int AS qty
+            FROM g_sale s,
+                 LATERAL generate_series(1, 1 + floor(power(random(), 2) * 3 + s.li * 0)::int) k
+        ) p
+        JOIN g_menu m ON m.n = p.mi;
+        """,
+        {"tz": ROLLUP_TZ, "days": args.days, "hours": HOURS, "channels": CHANNELS, "n": args.sales},
+    )
+    cur.execute(
+        """
+        INSERT INTO sales(id, location_id, channel, total_amount, status, created_at)
+        SELECT s.id, l.id, s.channel, t.total, 'paid', s.ts
+        FROM g_sale s
+        JOIN g_loc l ON l.n = s.li
+        JOIN (SELECT sale_id, sum(price * qty) AS total FROM g_item GROUP BY sale_id) t ON t.sale_id = s.id;
+
+        INSERT INTO sale_items(id, sale_id, menu_item_id, qty, unit_price)
+        SELECT id, sale_id, menu_item_id, qty, price FROM g_item;
+        """
+    )
+
+
+def _ledger(cur, args):
+    # 레시피 차감 (트리거가 하던 일을 집합 연산으로)
+    cur.execute(
+        """
+        CREATE TEMP TABLE g_consume ON COMMIT DROP AS
+        SELECT r.ingredient_id, l.id AS location_id, -(r.qty_required * gi.qty) AS qty_delta,
+               gi.id AS ref_id, gi.ts
+        FROM g_item gi
+        JOIN recipes r ON r.menu_item_id = gi.menu_item_id
+        JOIN g_loc l ON l.n = gi.li;
+
+        INSERT INTO inventory_tx(ingredient_id, location_id, tx_type, qty_delta, ref_table, ref_id, created_at)
+        SELECT ingredient_id, location_id, 'recipe_consume', qty_delta, 'sale_items', ref_id, ts
+        FROM g_consume;
+        """
+    )
+    # 기초 재고 + 주간 발주 입고(그 주 소비량의 110~130%) + 입고분 일부 폐기
+    cur.execute(
+        """
+        INSERT INTO inventory_tx(ingredient_id, location_id, tx_type, qty_delta, ref_table, note, created_at)
+        SELECT i.id, l.id, 'adjustment', round((random() * 500)::numeric, 1), 'datagen', '기초 재고',
+               (date_trunc('day', now() AT TIME ZONE %(tz)s) - make_interval(days => %(days)s + 1)) AT TIME ZONE %(tz)s
+        FROM g_ing i CROSS JOIN g_loc l;
+
+        CREATE TEMP TABLE g_purchase ON COMMIT DROP AS
+        SELECT ingredient_id, location_id,
+               ceil(-sum(qty_delta) * (1.1 + random() * 0.2)) AS qty,
+               date_trunc('week', min(ts)) + interval '6 hours' AS ts
+        FROM g_consume
+        GROUP BY ingredient_id, location_id, date_trunc('week', ts);
+
+        INSERT INTO inventory_tx(ingredient_id, location_id, tx_type, qty_delta, ref_table, note, created_at)
+        SELECT ingredient_id, location_id, 'purchase', qty, 'receipt_items', 'datagen', ts FROM g_purchase;
+
+        INSERT INTO inventory_tx(ingredient_id, location_id, tx_type, qty_delta, ref_table, note, created_at)
+        SELECT ingredient_id, location_id, 'waste', -ceil(qty * random() * 0.08), 'manual', '유통기한 경과', ts + interval '5 days'
+        FROM g_purchase
+        WHERE random() < 0.15 AND ts + interval '5 days' < now();
+        """,
+        {"tz": ROLLUP_TZ, "days": args.days},
+    )
+
+
+def _inventory(cur, args):
+    # 현재고 = 원장 합계. 발주점/안전재고는 일평균 소비량 기준
+    cur.execute(
+        """
+        INSERT INTO inventory(ingredient_id, location_id, qty_on_hand, reorder_point, safety_stock)
+        SELECT t.ingredient_id, t.location_id, t.qty,
+               round(coalesce(c.daily, 0) * 3, 1), round(coalesce(c.daily, 0) * 1.5, 1)
+        FROM (SELECT ingredient_id, location_id, sum(qty_delta) AS qty
+              FROM inventory_tx GROUP BY ingredient_id, location_id) t
+        LEFT JOIN (SELECT ingredient_id, location_id, -sum(qty_delta) / %(days)s AS daily
+                   FROM g_consume GROUP BY ingredient_id, location_id) c
+               USING (ingredient_id, location_id)
+        ON CONFLICT (ingredient_id, location_id)
+        DO UPDATE SET qty_on_hand = EXCLUDED.qty_on_hand,
+                      reorder_point = EXCLUDED.reorder_point,
+                      safety_stock = EXCLUDED.safety_stock;
+
+        -- 일부 품목은 발주점 아래로 (대시보드/알림용)
+        UPDATE inventory SET reorder_point = round(qty_on_hand * 1.2 + 1, 1)
+        WHERE random() < %(low)s;
+
+        INSERT INTO alerts(alert_type, severity, message, ingredient_id, location_id, created_at)
+        SELECT 'low_stock', CASE WHEN qty_on_hand <= safety_stock THEN 'critical' ELSE 'warning' END,
+               'low stock', ingredient_id, location_id, now() - random() * interval '3 days'
+        FROM inventory
+        WHERE qty_on_hand <= reorder_point;
+        """,
+        {"days": max(args.days, 1), "low": args.low_stock_ratio},
+    )
+
+
+def _audit(cur, args):
+    # audit 트리거가 남겼을 판매 INSERT 로그
+    cur.execute(
+        """
+        INSERT INTO audit_logs(table_name, record_id, action, after, created_at)
+        SELECT 'sales', s.id, 'INSERT',
+               jsonb_build_object('id', s.id, 'location_id', l.id, 'channel', s.channel, 'status', 'paid'),
+               s.ts
+        FROM g_sale s JOIN g_loc l ON l.n = s.li;
+        """
+    )
+
+
+def generate(args) -> dict:
+    counts = {}
+    with get_cursor(commit=True) as cur:
+        _prepare_session(cur, args.seed)
+        if args.reset:
+            with _step("reset"):
+                _reset(cur)
+        for name, fn in [("reference", _reference), ("catalog", _catalog), ("sales", _sales),
+                         ("ledger", _ledger), ("inventory", _inventory), ("audit", _audit)]:
+            with _step(name):
+                fn(cur, args)
+        for t in _existing(cur, ["locations", "ingredients", "menu_items", "recipes", "sales",
+                                 "sale_items", "inventory", "inventory_tx", "alerts", "audit_logs"]):
+            cur.execute(f"SELECT count(*) AS n FROM {t};")
+            counts[t] = cur.fetchone()["n"]
+    # ANALYZE는 커밋 후 (플래너 통계가 없으면 벤치 결과가 의미 없음)
+    with _step("analyze"), get_cursor(commit=True) as cur:
+        cur.execute("ANALYZE;")
+    return counts
+
+
+def main():
+    p = argparse.ArgumentParser(prog="python -m bench.datagen")
+    p.add_argument("--reset", action="store_true", help="앱 테이블을 비우고 생성 (units는 유지)")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--locations", type=int, default=10)
+    p.add_argument("--suppliers", type=int, default=30)
+    p.add_argument("--ingredients", type=int, default=2000)
+    p.add_argument("--menu-items", type=int, default=1000)
+    p.add_argument("--sales", type=int, default=1_000_000)
+    p.add_argument("--days", type=int, default=180)
+    p.add_argument("--low-stock-ratio", type=float, default=0.05)
+    p.add_argument("--small", action="store_true", help="빠른 확인용 (3매장, 판매 2만)")
+    args = p.parse_args()
+    if args.small:
+        args.locations, args.ingredients, args.menu_items, args.sales, args.days = 3, 200, 100, 20_000, 30
+
+    t0 = time.perf_counter()
+    counts = generate(args)
+    for t, n in counts.items():
+        logger.info("datagen: %-14s %12s rows", t, f"{n:,}")
+    logger.info("datagen: done in %.1fs", time.perf_counter() - t0)
+
+
+if __name__ == "__main__":
+    main()
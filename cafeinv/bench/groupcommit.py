@@ -0,0 +1,100 @@
+"""
+판매 group commit 처리량 비교. 같은 프로세스에서 스레드 N개가 create_sale을 계속 호출한다.
+
+    python -m bench.datagen --reset
+    python -m bench.groupcommit --threads 32 --duration 15 --windows 0,2,5 --batch 64
+
+window 0 = 기존 경로(판매마다 커밋), 그 외 = group commit (창 ms).
+인기 메뉴 몇 개에 판매를 몰아서(--hot) 같은 재고 행 잠금 경합을 재현한다.
+재고가 바닥나면 INSUFFICIENT_STOCK(409)이 늘어나므로 처리량은 성공한 판매(ok/s) 기준으로 본다.
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+
+from backend.core.db import get_pool
+from backend.core.logger import logger
+from backend.sales import service as sales_service
+from backend.sales.group_commit import SaleBatcher
+from bench.run import Ctx
+
+
+def run_mode(ctx: Ctx, window_ms: float, batch: int, threads: int, duration: float, hot: int, seed: int) -> dict:
+    sales_service.SALE_GROUP_COMMIT = window_ms > 0
+    if window_ms > 0:
+        sales_service.batcher = SaleBatcher(window_ms, batch)
+    menu = ctx.menu[:hot] if hot else ctx.menu
+    lat: list[float] = []
+    errors = {"insufficient": 0, "other": 0}
+    lock = threading.Lock()
+    stop = time.monotonic() + duration
+
+    def worker(n: int):
+        rnd = random.Random(seed + n)
+        mine, ins, oth = [], 0, 0
+        while time.monotonic() < stop:
+            lines = rnd.sample(menu, min(len(menu), rnd.randint(1, 3)))
+            data = {"items": [{"menu_item_id": m, "qty": 1, "unit_price": price, "discount": 0} for m, price in lines],
+                    "channel": "POS"}
+            t0 = time.perf_counter()
+            try:
+                sales_service.create_sale(data)
+            except Exception as e:
+                if "INSUFFICIENT_STOCK" in str(e):
+                    ins += 1
+                else:
+                    oth += 1
+                    logger.warning("sale failed: %s", e)
+            mine.append((time.perf_counter() - t0) * 1000)
+        with lock:
+            lat.extend(mine)
+            errors["insufficient"] += ins
+            errors["other"] += oth
+
+    t0 = time.perf_counter()
+    ts = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    # 직접 경로는 판매 1건 = 트랜잭션 1개
+    commits = sales_service.batcher.batches if window_ms > 0 else len(lat)
+    ok = len(lat) - errors["insufficient"] - errors["other"]
+    lat.sort()
+    q = lambda p: round(lat[min(len(lat) - 1, int(len(lat) * p))], 2) if lat else None
+    return {
+        "window_ms": window_ms, "batch": batch if window_ms > 0 else 1, "threads": threads,
+        "sales": len(lat), "ok_per_s": round(ok / elapsed, 1),
+        "p50_ms": q(0.5), "p99_ms": q(0.99), "mean_ms": round(statistics.fmean(lat), 2) if lat else None,
+        "commits": commits, "sales_per_commit": round(len(lat) / commits, 2) if commits > 0 else None,
+        **errors,
+    }
+
+
+def main():
+    p = argparse.ArgumentParser(prog="python -m bench.groupcommit")
+    p.add_argument("--threads", type=int, default=32)
+    p.add_argument("--duration", type=float, default=15)
+    p.add_argument("--windows", default="0,2,5", help="ms, 0 = group commit 끔")
+    p.add_argument("--batch", type=int, default=64)
+    p.add_argument("--hot", type=int, default=10, help="판매를 몰아줄 메뉴 수 (0 = 전체)")
+    p.add_argument("--seed", type=int, default=42)
+    args = p.parse_args()
+
+    ctx = Ctx(args.seed)
+    get_pool().warm(min(args.threads, 4))
+    rows = [run_mode(ctx, float(w), args.batch, args.threads, args.duration, args.hot, args.seed)
+            for w in args.windows.split(",")]
+
+    print(f"\n{'window':>7} {'batch':>6} {'ok/s':>9} {'p50':>8} {'p99':>8} {'commits':>8} {'s/commit':>9} "
+          f"{'409':>6} {'err':>5}")
+    for r in rows:
+        print(f"{r['window_ms']:>7} {r['batch']:>6} {r['ok_per_s']:>9} {r['p50_ms']:>8} {r['p99_ms']:>8} "
+              f"{r['commits']:>8} {r['sales_per_commit'] or '-':>9} {r['insufficient']:>6} {r['other']:>5}")
+
+
+if __name__ == "__main__":
+    main()
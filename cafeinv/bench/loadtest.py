@@ -0,0 +1,354 @@
+"""
+HTTP 부하 테스트 — 매장 오픈 전 용량 산정용. 실제 카페 트래픽 비율을 흉내 낸다.
+
+이미 떠 있는 API에 붙이기:
+    python -m bench.loadtest --url http://127.0.0.1:8000 --concurrency 32 --duration 60
+
+전부 로컬에서 (일회용 Postgres + 합성 데이터 + uvicorn 워커 N개):
+    python -m bench.loadtest --local --schema-file schema.sql --datagen-args "--small" \
+        --app-workers 4 --concurrency 64 --duration 120 --json out.json
+
+시나리오 비율은 --mix 로 조정 (기본 pos=60,dashboard=25,stock=8,po=4,transfer=3).
+closed-loop 방식: 가상 사용자(스레드)마다 시나리오 하나를 끝내고 --think-ms 쉰 뒤 다음 것을 고른다.
+409 INSUFFICIENT_STOCK 은 오류율과 별도로 집계한다 (재고 소진은 정상 업무 흐름이기도 함).
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Optional
+
+import requests
+
+from backend.core.logger import logger
+
+DEFAULT_MIX = "pos=60,dashboard=25,stock=8,po=4,transfer=3"
+
+
+class Stats:
+    """엔드포인트별 지연/상태코드. 스레드 여러 개가 같이 기록한다."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = defaultdict(list)          # name -> [ms]
+        self.status = defaultdict(lambda: defaultdict(int))
+        self.scenarios = defaultdict(int)
+        self.scenario_failures = defaultdict(int)
+        self.samples = defaultdict(list)          # name -> 오류 응답 본문 몇 개
+
+    def record(self, name: str, ms: float, status: int, body: Optional[str] = None):
+        with self.lock:
+            self.latency[name].append(ms)
+            self.status[name][status] += 1
+            if body is not None and len(self.samples[name]) < 3:
+                self.samples[name].append(f"{status}: {body[:300]}")
+
+    def scenario(self, name: str, ok: bool):
+        with self.lock:
+            self.scenarios[name] += 1
+            if not ok:
+                self.scenario_failures[name] += 1
+
+
+def _pct(values: list[float], p: int) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[p - 1]
+
+
+class Client:
+    def __init__(self, base: str, stats: Stats, timeout: float):
+        self.base = base.rstrip("/")
+        self.stats = stats
+        self.timeout = timeout
+        self.s = requests.Session()
+
+    def call(self, method: str, name: str, path: str, **kw):
+        t0 = time.perf_counter()
+        try:
+            r = self.s.request(method, self.base + path, timeout=self.timeout, **kw)
+            status = r.status_code
+        except requests.RequestException as e:
+            r, status = None, 0      # 0 = 연결 실패/타임아웃
+            body = str(e)
+        else:
+            body = r.text if status >= 400 and status != 409 else None
+        self.stats.record(name, (time.perf_counter() - t0) * 1000, status, body)
+        return r
+
+
+class Fixtures:
+    """API로만 id를 모은다 (DB 직접 접근 없음)."""
+
+    def __init__(self, base: str, seed: int):
+        get = lambda p, **params: requests.get(base.rstrip("/") + p, params=params, timeout=30).json()
+        self.rnd = random.Random(seed)
+        self.locations = [r["id"] for r in get("/ref/locations")]
+        self.menu = [(m["id"], float(m["price"])) for m in get("/menu_items", active_only=True)]
+        inv = get("/inventory")
+        self.ingredients = sorted({str(r["ingredient_id"]) for r in inv})
+        suppliers = get("/suppliers", active_only=True)
+        self.supplier = suppliers[0]["id"] if suppliers else None
+        if not self.locations or not self.menu or not self.ingredients:
+            raise SystemExit("픽스처가 비어 있습니다. bench.datagen으로 데이터를 먼저 채우세요.")
+        # 매장/메뉴 인기도 치우침 (앞쪽이 인기 매장/메뉴)
+        self.loc_weights = [1 / (i + 1) ** 0.7 for i in range(len(self.locations))]
+        self.menu_weights = [1 / (i + 1) for i in range(len(self.menu))]
+
+
+# ---------- 시나리오 ----------
+def pos_sale(c: Client, fx: Fixtures, rnd: random.Random) -> bool:
+    loc = rnd.choices(fx.locations, fx.loc_weights)[0]
+    lines = rnd.choices(fx.menu, fx.menu_weights, k=rnd.choice([1, 1, 1, 2, 2, 3]))
+    payload = {
+        "channel": rnd.choice(["POS", "POS", "POS", "kiosk"]),
+        "location_id": loc,
+        "items": [{"menu_item_id": m, "qty": rnd.choice([1, 1, 1, 2]), "unit_price": p, "discount": 0}
+                  for m, p in lines],
+    }
+    r = c.call("POST", "POST /sales", "/sales", json=payload)
+    return r is not None and r.status_code in (200, 409)
+
+
+def dashboard(c: Client, fx: Fixtures, rnd: random.Random) -> bool:
+    loc = rnd.choices(fx.locations, fx.loc_weights)[0]
+    rs = [
+        c.call("GET", "GET /inventory", "/inventory", params={"location_id": loc}),
+        c.call("GET", "GET /alerts", "/alerts"),
+        c.call("GET", "GET /inventory/inventory_tx", "/inventory/inventory_tx",
+               params={"location_id": loc, "limit": 50}),
+    ]
+    return all(r is not None and r.status_code == 200 for r in rs)
+
+
+def stock_change(c: Client, fx: Fixtures, rnd: random.Random) -> bool:
+    kind = rnd.choice(["waste", "adjustment", "adjustment"])
+    qty = -rnd.randint(1, 5) if kind == "waste" else rnd.choice([-1, 1]) * rnd.randint(1, 10)
+    r = c.call("POST", "POST /inventory/stock_change", "/inventory/stock_change", json={
+        "ingredient_id": rnd.choice(fx.ingredients), "location_id": rnd.choice(fx.locations),
+        "qty_delta": qty, "tx_type": kind, "note": "loadtest",
+    })
+    return r is not None and r.status_code in (200, 409)
+
+
+def po_receive(c: Client, fx: Fixtures, rnd: random.Random) -> bool:
+    r = c.call("POST", "POST /inventory/purchase_orders", "/inventory/purchase_orders",
+               json={"supplier_id": fx.supplier, "note": "loadtest"})
+    if r is None or r.status_code != 200:
+        return False
+    po_id = r.json()["id"]
+    items = [{"ingredient_id": i, "qty_received": rnd.randint(50, 500)}
+             for i in rnd.sample(fx.ingredients, min(len(fx.ingredients), rnd.randint(3, 12)))]
+    for it in items:
+        c.call("POST", "POST /inventory/po_items", "/inventory/po_items", json={
+            "purchase_order_id": po_id, "ingredient_id": it["ingredient_id"],
+            "qty_ordered": it["qty_received"], "unit_cost": 1,
+        })
+    r = c.call("POST", "POST /inventory/purchase_orders/{po_id}/receive",
+               f"/inventory/purchase_orders/{po_id}/receive",
+               json={"location_id": rnd.choice(fx.locations), "items": items})
+    return r is not None and r.status_code == 200
+
+
+def transfer(c: Client, fx: Fixtures, rnd: random.Random) -> bool:
+    if len(fx.locations) < 2:
+        return True
+    src, dst = rnd.sample(fx.locations, 2)
+    r = c.call("POST", "POST /transfers", "/transfers", json={"from_location_id": src, "to_location_id": dst})
+    if r is None or r.status_code != 200:
+        return False
+    tid = r.json()["id"]
+    for ing in rnd.sample(fx.ingredients, min(len(fx.ingredients), rnd.randint(1, 5))):
+        c.call("POST", "POST /transfer_items", "/transfer_items",
+               json={"transfer_id": tid, "ingredient_id": ing, "qty": rnd.randint(1, 5)})
+    r = c.call("POST", "POST /transfers/{id}/ship", f"/transfers/{tid}/ship", json={})
+    if r is None or r.status_code != 200:
+        return r is not None and r.status_code == 409
+    r = c.call("POST", "POST /transfers/{id}/receive", f"/transfers/{tid}/receive", json={})
+    return r is not None and r.status_code == 200
+
+
+SCENARIOS = {"pos": pos_sale, "dashboard": dashboard, "stock": stock_change, "po": po_receive, "transfer": transfer}
+
+
+def parse_mix(s: str) -> dict[str, float]:
+    mix = {}
+    for part in s.split(","):
+        k, _, v = part.partition("=")
+        if k.strip() not in SCENARIOS:
+            raise SystemExit(f"unknown scenario: {k} (choices: {', '.join(SCENARIOS)})")
+        mix[k.strip()] = float(v)
+    return mix
+
+
+# ---------- 실행 ----------
+def run(base: str, concurrency: int, duration: float, mix: dict[str, float], think_ms: float,
+        ramp: float, seed: int, timeout: float, report_every: float = 10) -> dict:
+    fx = Fixtures(base, seed)
+    stats = Stats()
+    stop = threading.Event()
+    names, weights = list(mix), list(mix.values())
+
+    def user(idx: int):
+        rnd = random.Random(seed * 1000 + idx)
+        c = Client(base, stats, timeout)
+        # 램프업: 사용자를 ramp 초에 걸쳐 고르게 투입
+        if ramp:
+            time.sleep(ramp * idx / concurrency)
+        while not stop.is_set():
+            name = rnd.choices(names, weights)[0]
+            try:
+                ok = SCENARIOS[name](c, fx, rnd)
+            except Exception:
+                ok = False
+            stats.scenario(name, ok)
+            if think_ms:
+                time.sleep(rnd.expovariate(1000 / think_ms))
+
+    threads = [threading.Thread(target=user, args=(i,), daemon=True) for i in range(concurrency)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    try:
+        while time.perf_counter() - t0 < duration:
+            time.sleep(min(report_every, max(duration - (time.perf_counter() - t0), 0.1)))
+            with stats.lock:
+                n = sum(len(v) for v in stats.latency.values())
+            logger.info("loadtest %5.0fs  %8d requests  %7.1f req/s", time.perf_counter() - t0, n,
+                        n / (time.perf_counter() - t0))
+    finally:
+        stop.set()
+        for t in threads:
+            t.join(timeout + 5)
+    elapsed = time.perf_counter() - t0
+    return summarize(stats, elapsed, concurrency, mix)
+
+
+def summarize(stats: Stats, elapsed: float, concurrency: int, mix: dict) -> dict:
+    endpoints = {}
+    all_ms, total, errors, conflicts = [], 0, 0, 0
+    for name, lat in sorted(stats.latency.items()):
+        codes = stats.status[name]
+        n = len(lat)
+        err = sum(v for k, v in codes.items() if k == 0 or k >= 500 or (400 <= k < 500 and k != 409))
+        c409 = codes.get(409, 0)
+        endpoints[name] = {
+            "requests": n,
+            "rps": round(n / elapsed, 2),
+            "p50_ms": round(_pct(lat, 50), 2),
+            "p90_ms": round(_pct(lat, 90), 2),
+            "p99_ms": round(_pct(lat, 99), 2),
+            "max_ms": round(max(lat), 2),
+            "error_rate": round(err / n, 4),
+            "insufficient_stock_409": c409,
+            "status": {str(k): v for k, v in sorted(codes.items())},
+            "error_samples": stats.samples.get(name, []),
+        }
+        all_ms += lat
+        total += n
+        errors += err
+        conflicts += c409
+    return {
+        "duration_s": round(elapsed, 1),
+        "concurrency": concurrency,
+        "mix": mix,
+        "requests": total,
+        "rps": round(total / elapsed, 2),
+        "p50_ms": round(_pct(all_ms, 50), 2),
+        "p90_ms": round(_pct(all_ms, 90), 2),
+        "p99_ms": round(_pct(all_ms, 99), 2),
+        "error_rate": round(errors / total, 4) if total else 0,
+        "insufficient_stock_409": conflicts,
+        "scenarios": {k: {"count": v, "failed": stats.scenario_failures.get(k, 0),
+                          "per_s": round(v / elapsed, 2)} for k, v in sorted(stats.scenarios.items())},
+        "endpoints": endpoints,
+    }
+
+
+def print_report(r: dict):
+    print(f"\n{r['requests']:,} requests in {r['duration_s']}s, concurrency {r['concurrency']}: "
+          f"{r['rps']} req/s  p50 {r['p50_ms']} ms  p90 {r['p90_ms']} ms  p99 {r['p99_ms']} ms  "
+          f"errors {r['error_rate'] * 100:.2f}%  409 INSUFFICIENT_STOCK {r['insufficient_stock_409']}")
+    print(f"\n{'endpoint':48} {'req':>8} {'rps':>8} {'p50':>8} {'p90':>8} {'p99':>8} {'err%':>7} {'409':>6}")
+    for name, e in r["endpoints"].items():
+        print(f"{name:48} {e['requests']:>8} {e['rps']:>8} {e['p50_ms']:>8} {e['p90_ms']:>8} "
+              f"{e['p99_ms']:>8} {e['error_rate'] * 100:>6.2f}% {e['insufficient_stock_409']:>6}")
+        for sample in e["error_samples"]:
+            print(f"    ! {sample}")
+    print(f"\n{'scenario':12} {'count':>8} {'per_s':>8} {'failed':>8}")
+    for name, s in r["scenarios"].items():
+        print(f"{name:12} {s['count']:>8} {s['per_s']:>8} {s['failed']:>8}")
+
+
+# ---------- 로컬 일괄 실행 ----------
+def _start_app(env: dict, port: int, workers: int) -> subprocess.Popen:
+    cmd = [sys.executable, "-m", "uvicorn", "backend.main:app", "--host", "127.0.0.1",
+           "--port", str(port), "--workers", str(workers), "--log-level", "warning"]
+    cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return subprocess.Popen(cmd, cwd=cwd, env={**os.environ, **env})
+
+
+def run_local(args) -> dict:
+    from bench.pgtmp import TempPostgres, _free_port, wait_http
+    with TempPostgres(schema_file=args.schema_file, pg_bin=args.pg_bin, durable=not args.fast,
+                      keep=args.keep) as pg:
+        env = pg.env()
+        subprocess.run([sys.executable, "-m", "bench.datagen", "--reset", *args.datagen_args.split()],
+                       check=True, env={**os.environ, **env},
+                       cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        port = _free_port()
+        app = _start_app(env, port, args.app_workers)
+        try:
+            base = f"http://127.0.0.1:{port}"
+            wait_http(base + "/health")
+            return run(base, args.concurrency, args.duration, parse_mix(args.mix), args.think_ms,
+                       args.ramp, args.seed, args.timeout)
+        finally:
+            app.terminate()
+            app.wait(30)
+
+
+def main():
+    p = argparse.ArgumentParser(prog="python -m bench.loadtest")
+    p.add_argument("--url", default="http://127.0.0.1:8000")
+    p.add_argument("--concurrency", type=int, default=16, help="가상 사용자(스레드) 수")
+    p.add_argument("--duration", type=float, default=60)
+    p.add_argument("--ramp", type=float, default=5, help="사용자 투입에 걸리는 시간(초)")
+    p.add_argument("--think-ms", type=float, default=0, help="시나리오 사이 평균 대기(지수분포)")
+    p.add_argument("--mix", default=DEFAULT_MIX)
+    p.add_argument("--timeout", type=float, default=10)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--json", default=None, help="결과 JSON 저장 경로")
+    lp = p.add_argument_group("local", "일회용 Postgres + uvicorn 을 띄워서 실행")
+    lp.add_argument("--local", action="store_true")
+    lp.add_argument("--schema-file", default=None, help="pg_dump --schema-only 결과")
+    lp.add_argument("--pg-bin", default=None)
+    lp.add_argument("--datagen-args", default="--small")
+    lp.add_argument("--app-workers", type=int, default=1)
+    lp.add_argument("--fast", action="store_true", help="fsync off (내구성 없는 빠른 반복용)")
+    lp.add_argument("--keep", action="store_true", help="종료 후 데이터 디렉터리 유지")
+    args = p.parse_args()
+
+    if args.local:
+        if not args.schema_file:
+            raise SystemExit("--local 에는 --schema-file 이 필요합니다")
+        result = run_local(args)
+    else:
+        result = run(args.url, args.concurrency, args.duration, parse_mix(args.mix), args.think_ms,
+                     args.ramp, args.seed, args.timeout)
+    print_report(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+로트 FEFO 반영이 판매 경로에 주는 영향. 스레드 N개가 create_sale을 계속 호출하는 동안
+off = 로트 반영 없음 / on = 별도 스레드가 --interval 초마다 refresh_lots() 를 돈다.
+
+    python -m bench.datagen --reset
+    python -m bench.lots --threads 16 --duration 15 --interval 5
+
+on 모드 뒤에는 로트 정합성(로트별 사용량 = 배분 합계, 로트 잔량 <= 재고 잔량)과
+지점별 유통기한 임박 조회 시간도 잰다.
+"""
+import argparse
+import os
+import random
+import statistics
+import threading
+import time
+
+# 판매 직후 tx까지 반영되도록 (config import 전에)
+os.environ.setdefault("LOT_LAG_SECONDS", "0")
+
+from backend.core.db import get_cursor, get_pool
+from backend.core.logger import logger
+from backend.lots.service import refresh_lots, expiring_lots
+from backend.sales.service import create_sale
+from backend.stripes.service import balance_sql
+from bench.run import Ctx
+
+
+def _sellers(ctx: Ctx, threads: int, duration: float, seed: int) -> dict:
+    lat: list[float] = []
+    errors = {"insufficient": 0, "other": 0}
+    lock = threading.Lock()
+    stop = time.monotonic() + duration
+
+    def worker(n: int):
+        rnd = random.Random(seed + n)
+        mine, ins, oth = [], 0, 0
+        while time.monotonic() < stop:
+            lines = rnd.sample(ctx.menu, min(len(ctx.menu), rnd.randint(1, 3)))
+            data = {"items": [{"menu_item_id": m, "qty": 1, "unit_price": price, "discount": 0} for m, price in lines],
+                    "channel": "POS"}
+            t0 = time.perf_counter()
+            try:
+                create_sale(data)
+            except Exception as e:
+                if "INSUFFICIENT_STOCK" in str(e):
+                    ins += 1
+                else:
+                    oth += 1
+                    logger.warning("sale failed: %s", e)
+            mine.append((time.perf_counter() - t0) * 1000)
+        with lock:
+            lat.extend(mine)
+            errors["insufficient"] += ins
+            errors["other"] += oth
+
+    t0 = time.perf_counter()
+    ts = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    ok = len(lat) - errors["insufficient"] - errors["other"]
+    lat.sort()
+    q = lambda p: round(lat[min(len(lat) - 1, int(len(lat) * p))], 2) if lat else None
+    return {"ok_per_s": round(ok / elapsed, 1), "p50_ms": q(0.5), "p99_ms": q(0.99),
+            "mean_ms": round(statistics.fmean(lat), 2) if lat else None, **errors}
+
+
+def _refresher(stop: threading.Event, interval: float, runs: list):
+    while not stop.wait(interval):
+        t0 = time.perf_counter()
+        r = refresh_lots()
+        runs.append(((time.perf_counter() - t0) * 1000, r["allocations"]))
+
+
+def _check() -> dict:
+    with get_cursor() as cur:
+        cur.execute(
+            f"""
+            WITH used AS (
+                SELECT l.id, l.qty_received - l.qty_remaining AS used, COALESCE(sum(a.qty), 0) AS alloc
+                FROM inventory_lots l LEFT JOIN inventory_lot_allocations a ON a.lot_id = l.id
+                GROUP BY l.id
+            ),
+            per_key AS (
+                SELECT ingredient_id, location_id, sum(qty_remaining) AS rem
+                FROM inventory_lots GROUP BY 1, 2
+            )
+            SELECT (SELECT count(*) FROM used WHERE used <> alloc) AS bad_lots,
+                   (SELECT count(*) FROM per_key k JOIN inventory i USING (ingredient_id, location_id)
+                     WHERE k.rem > {balance_sql("i")}) AS over_balance;
+            """
+        )
+        return cur.fetchone()
+
+
+def _expiring_ms(days: int) -> float:
+    with get_cursor() as cur:
+        cur.execute("SELECT id::text FROM locations;")
+        locs = [r["id"] for r in cur.fetchall()]
+    t0 = time.perf_counter()
+    for loc in locs:
+        expiring_lots(loc, days)
+    return round((time.perf_counter() - t0) * 1000 / max(1, len(locs)), 2)
+
+
+def main():
+    p = argparse.ArgumentParser(prog="python -m bench.lots")
+    p.add_argument("--threads", type=int, default=16)
+    p.add_argument("--duration", type=float, default=15)
+    p.add_argument("--interval", type=float, default=5.0, help="refresh_lots 주기(초)")
+    p.add_argument("--days", type=int, default=3)
+    p.add_argument("--seed", type=int, default=42)
+    args = p.parse_args()
+
+    ctx = Ctx(args.seed)
+    get_pool().warm(min(args.threads, 4))
+    rows = []
+    for mode in ("off", "on"):
+        stop, runs = threading.Event(), []
+        th = None
+        if mode == "on":
+            # 밀린 원장(off 구간 포함)을 먼저 따라잡아 on 구간에서는 증분만 반영하게 한다
+            t0 = time.perf_counter()
+            logger.info("lots catch-up: %s (%.1fs)", refresh_lots(), time.perf_counter() - t0)
+            th = threading.Thread(target=_refresher, args=(stop, args.interval, runs), daemon=True)
+            th.start()
+        r = _sellers(ctx, args.threads, args.duration, args.seed)
+        stop.set()
+        if th is not None:
+            th.join()
+            refresh_lots()
+        r["refresh_ms"] = round(statistics.fmean(x for x, _ in runs), 1) if runs else None
+        r["alloc_per_refresh"] = round(statistics.fmean(n for _, n in runs), 1) if runs else None
+        rows.append({"mode": mode, **r})
+        logger.info("lots bench %s: %s", mode, r)
+
+    chk = _check()
+    print(f"\n{'lots':>5} {'ok/s':>9} {'p50':>8} {'p99':>8} {'mean':>8} {'409':>6} {'err':>5} "
+          f"{'refresh':>9} {'alloc/run':>10}")
+    for r in rows:
+        print(f"{r['mode']:>5} {r['ok_per_s']:>9} {r['p50_ms']:>8} {r['p99_ms']:>8} {r['mean_ms']:>8} "
+              f"{r['insufficient']:>6} {r['other']:>5} {r['refresh_ms'] or '-':>9} {r['alloc_per_refresh'] or '-':>10}")
+    print(f"\nexpiring({args.days}d) per location: {_expiring_ms(args.days)} ms, "
+          f"bad lots: {chk['bad_lots']}, lots over balance: {chk['over_balance']}")
+
+
+if __name__ == "__main__":
+    main()
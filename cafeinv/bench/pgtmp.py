@@ -0,0 +1,168 @@
+"""
+일회용 로컬 Postgres 클러스터 (부하 테스트 / 벤치마크 전용).
+
+레포에는 DDL이 없으므로 운영 스키마 덤프를 넘겨준다:
+    pg_dump --schema-only --no-owner --no-privileges -h <prod> -U <user> cafeinven > schema.sql
+
+    with TempPostgres(schema_file="schema.sql") as pg:
+        env = pg.env()      # DB_HOST/DB_PORT/DB_USER/DB_NAME/DB_PASSWORD
+
+initdb / pg_ctl / psql 은 PATH 또는 PG_BIN(또는 pg_bin 인자)에서 찾는다.
+
+initdb 를 쓸 수 없으면 (root 로만 실행되는 CI 등) 이미 떠 있는 서버에 일회용 DB 만 만든다:
+    with TempDatabase("127.0.0.1", schema_file="schema.sql") as pg:
+        env = pg.env()
+"""
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+from typing import Optional
+
+from backend.core.logger import logger
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class TempPostgres:
+    def __init__(self, schema_file: Optional[str] = None, pg_bin: Optional[str] = None,
+                 dbname: str = "cafeinven", port: Optional[int] = None, durable: bool = True,
+                 settings: Optional[dict] = None, keep: bool = False):
+        self.schema_file = schema_file
+        self.pg_bin = pg_bin or os.getenv("PG_BIN")
+        self.dbname = dbname
+        self.port = port or _free_port()
+        self.durable = durable
+        self.settings = settings or {}
+        self.keep = keep
+        self.datadir: Optional[str] = None
+
+    def _bin(self, name: str) -> str:
+        path = os.path.join(self.pg_bin, name) if self.pg_bin else shutil.which(name)
+        if not path or not os.path.exists(path):
+            raise RuntimeError(f"{name} 를 찾을 수 없습니다 (PATH 또는 PG_BIN 지정)")
+        return path
+
+    def _run(self, *args, **kw):
+        return subprocess.run(args, check=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, **kw)
+
+    def start(self):
+        self.datadir = tempfile.mkdtemp(prefix="cafeinv-pg-")
+        self._run(self._bin("initdb"), "-D", self.datadir, "-U", "postgres", "-A", "trust",
+                  "-E", "UTF8", "--no-instructions")
+        conf = {
+            "listen_addresses": "'127.0.0.1'",
+            "port": self.port,
+            "max_connections": 300,
+            "shared_buffers": "'256MB'",
+            "unix_socket_directories": f"'{self.datadir}'",
+        }
+        if not self.durable:
+            # 용량 산정보다 빠른 반복이 목적일 때만
+            conf.update({"fsync": "off", "synchronous_commit": "off", "full_page_writes": "off"})
+        conf.update(self.settings)
+        with open(os.path.join(self.datadir, "postgresql.conf"), "a") as f:
+            for k, v in conf.items():
+                f.write(f"{k} = {v}\n")
+        self._run(self._bin("pg_ctl"), "-D", self.datadir, "-l", os.path.join(self.datadir, "server.log"),
+                  "-w", "start")
+        self._psql("postgres", "-c", f'CREATE DATABASE "{self.dbname}";')
+        if self.schema_file:
+            self._psql(self.dbname, "-v", "ON_ERROR_STOP=1", "-q", "-f", self.schema_file)
+        logger.info("temp postgres on 127.0.0.1:%s (%s)", self.port, self.datadir)
+        return self
+
+    def _psql(self, db: str, *args):
+        return self._run(self._bin("psql"), "-h", "127.0.0.1", "-p", str(self.port), "-U", "postgres", "-d", db, *args)
+
+    def stop(self):
+        if not self.datadir:
+            return
+        try:
+            self._run(self._bin("pg_ctl"), "-D", self.datadir, "-m", "fast", "-w", "stop")
+        except Exception as e:
+            logger.warning("temp postgres stop failed: %s", e)
+        if not self.keep:
+            shutil.rmtree(self.datadir, ignore_errors=True)
+        self.datadir = None
+
+    def env(self) -> dict:
+        return {
+            "DB_HOST": "127.0.0.1", "DB_PORT": str(self.port), "DB_NAME": self.dbname,
+            "DB_USER": "postgres", "DB_PASSWORD": "",
+        }
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class TempDatabase:
+    """이미 떠 있는 서버에 이름이 겹치지 않는 DB를 만들고 스키마를 올린다. 끝나면 지운다."""
+
+    def __init__(self, host: str, schema_file: Optional[str] = None, pg_bin: Optional[str] = None,
+                 port: int = 5432, user: str = "postgres", password: str = "", keep: bool = False):
+        self.host, self.port, self.user, self.password = host, port, user, password
+        self.schema_file = schema_file
+        self.pg_bin = pg_bin or os.getenv("PG_BIN")
+        self.dbname = f"cafeinv_tmp_{os.getpid()}_{int(time.time())}"
+        self.keep = keep
+        self._created = False
+
+    _bin = TempPostgres._bin
+    _run = TempPostgres._run
+
+    def _psql(self, db: str, *args):
+        env = {**os.environ, "PGPASSWORD": self.password}
+        return self._run(self._bin("psql"), "-h", self.host, "-p", str(self.port), "-U", self.user, "-d", db,
+                         *args, env=env)
+
+    def start(self):
+        self._psql("postgres", "-c", f'CREATE DATABASE "{self.dbname}";')
+        self._created = True
+        if self.schema_file:
+            self._psql(self.dbname, "-v", "ON_ERROR_STOP=1", "-q", "-f", self.schema_file)
+        logger.info("temp database %s on %s:%s", self.dbname, self.host, self.port)
+        return self
+
+    def stop(self):
+        if not self._created or self.keep:
+            return
+        try:
+            self._psql("postgres", "-c", f'DROP DATABASE IF EXISTS "{self.dbname}" WITH (FORCE);')
+        except Exception as e:
+            logger.warning("temp database drop failed: %s", e)
+        self._created = False
+
+    def env(self) -> dict:
+        return {
+            "DB_HOST": self.host, "DB_PORT": str(self.port), "DB_NAME": self.dbname,
+            "DB_USER": self.user, "DB_PASSWORD": self.password,
+        }
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def wait_http(url: str, timeout: float = 30):
+    import requests
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(url, timeout=2).status_code < 500:
+                return
+        except Exception:
+            pass
+        time.sleep(0.3)
+    raise RuntimeError(f"{url} 가 {timeout}s 안에 뜨지 않았습니다")
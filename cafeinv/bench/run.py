@@ -0,0 +1,298 @@
+"""
+서비스 함수 마이크로 벤치마크. datagen으로 채운 일회용 DB에서 실행한다 (쓰기 케이스는 실제로 데이터를 바꾼다).
+
+    python -m bench.run                                  # 전체, 결과 JSON은 bench/results/<commit>.json
+    python -m bench.run --only create_sale,list_inventory --repeat 100
+    python -m bench.run --compare bench/results/abc1234.json --fail-over 1.2
+
+케이스마다 setup(시간 측정 제외)으로 인자를 만들고 본 호출만 잰다.
+호출당 SQL 실행 수도 core.metrics의 요청 통계를 빌려 같이 기록한다 (N+1 회귀 확인용).
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from backend import service as legacy
+from backend.alerts import service as alerts_service
+from backend.core.db import get_cursor
+from backend.core.logger import logger
+from backend.core.metrics import RequestStats, _request_stats
+from backend.inventory import service as inventory_service
+from backend.models import (
+    SaleCreateIn, StockChangeIn, POCreateIn, POItemAddIn, POReceiveIn, POReceiveItem,
+    TransferCreate, TransferItemAdd, TransferAction,
+)
+
+CASES: dict[str, tuple[Callable, Optional[Callable]]] = {}
+
+
+def benchmark(name: str, setup: Optional[Callable] = None):
+    """fn(ctx, *setup(ctx)) 를 시간 측정. setup은 매 반복마다 호출되며 측정에서 빠진다."""
+    def deco(fn):
+        CASES[name] = (fn, setup)
+        return fn
+    return deco
+
+
+# ---------- 공용 픽스처 ----------
+class Ctx:
+    def __init__(self, seed: int):
+        self.rnd = random.Random(seed)
+        with get_cursor() as cur:
+            cur.execute("SELECT id::text AS id FROM locations ORDER BY name;")
+            self.locations = [r["id"] for r in cur.fetchall()]
+            # 재고가 넉넉한 재료 (쓰기 케이스가 INSUFFICIENT_STOCK에 걸리지 않도록)
+            cur.execute(
+                """
+                SELECT ingredient_id::text AS ingredient_id, location_id::text AS location_id
+                FROM inventory WHERE qty_on_hand > 1000 ORDER BY ingredient_id, location_id LIMIT 500;
+                """
+            )
+            self.stock = [(r["ingredient_id"], r["location_id"]) for r in cur.fetchall()]
+            cur.execute(
+                """
+                SELECT m.id::text AS id, m.price
+                FROM menu_items m
+                WHERE m.is_active AND EXISTS (SELECT 1 FROM recipes r WHERE r.menu_item_id = m.id)
+                  AND NOT EXISTS (
+                      SELECT 1 FROM recipes r
+                      JOIN inventory i ON i.ingredient_id = r.ingredient_id
+                                      AND i.location_id = m.default_location_id
+                      WHERE r.menu_item_id = m.id AND i.qty_on_hand < r.qty_required * 100)
+                ORDER BY m.id LIMIT 200;
+                """
+            )
+            self.menu = [(r["id"], float(r["price"])) for r in cur.fetchall()]
+            cur.execute("SELECT id::text AS id FROM suppliers ORDER BY name LIMIT 1;")
+            row = cur.fetchone()
+            self.supplier = row["id"] if row else None
+        if not self.locations or not self.stock or not self.menu:
+            raise SystemExit("데이터가 부족합니다. 먼저 `python -m bench.datagen --reset` 을 실행하세요.")
+
+    def location(self):
+        return self.rnd.choice(self.locations)
+
+    def stock_pair(self):
+        return self.rnd.choice(self.stock)
+
+    def ingredients_at(self, location_id: str, n: int):
+        pool = [i for i, loc in self.stock if loc == location_id] or [i for i, _ in self.stock]
+        return self.rnd.sample(pool, min(n, len(pool)))
+
+
+# ---------- 케이스 ----------
+
+@benchmark("list_inventory", setup=lambda c: (c.location(),))
+def _list_inventory(c, location_id):
+    legacy.list_inventory(location_id)
+
+
+@benchmark("list_inventory_all")
+def _list_inventory_all(c):
+    legacy.list_inventory(None)
+
+
+@benchmark("inventory.list_inventory", setup=lambda c: (c.location(),))
+def _api_list_inventory(c, location_id):
+    inventory_service.list_inventory(location_id)
+
+
+@benchmark("create_sale", setup=lambda c: (c.rnd.choice(c.menu),))
+def _create_sale(c, menu):
+    legacy.create_sale(SaleCreateIn(menu_item_id=menu[0], qty=1, unit_price=menu[1]))
+
+
+@benchmark("apply_stock_change_service", setup=lambda c: (c.stock_pair(), c.rnd.choice([-1, 1])))
+def _apply_stock_change(c, pair, sign):
+    legacy.apply_stock_change_service(StockChangeIn(
+        ingredient_id=pair[0], location_id=pair[1], qty_delta=sign, tx_type="adjustment", note="bench"))
+
+
+def _setup_po(c, lines: int = 10):
+    loc = c.location()
+    po = legacy.create_purchase_order(POCreateIn(supplier_id=c.supplier, note="bench"))
+    ings = c.ingredients_at(loc, lines)
+    for ing in ings:
+        legacy.add_po_item(POItemAddIn(purchase_order_id=po.id, ingredient_id=ing, qty_ordered=10, unit_cost=1))
+    return (POReceiveIn(purchase_order_id=po.id, location_id=loc,
+                        items=[POReceiveItem(ingredient_id=i, qty_received=10) for i in ings]),)
+
+
+@benchmark("receive_purchase_order", setup=_setup_po)
+def _receive_po(c, inp):
+    legacy.receive_purchase_order(inp)
+
+
+def _setup_transfer(c, lines: int = 10):
+    src = c.location()
+    dst = c.rnd.choice([l for l in c.locations if l != src] or [src])
+    tr = legacy.create_transfer(TransferCreate(from_location_id=src, to_location_id=dst))
+    for ing in c.ingredients_at(src, lines):
+        legacy.add_transfer_item(TransferItemAdd(transfer_id=str(tr.id), ingredient_id=ing, qty=1))
+    return (TransferAction(transfer_id=str(tr.id)),)
+
+
+@benchmark("ship_transfer", setup=_setup_transfer)
+def _ship_transfer(c, inp):
+    legacy.ship_transfer(inp)
+
+
+@benchmark("list_alerts")
+def _list_alerts(c):
+    legacy.list_alerts()
+
+
+@benchmark("alerts.list_alerts")
+def _api_list_alerts(c):
+    alerts_service.list_alerts()
+
+
+@benchmark("list_inventory_tx", setup=lambda c: (c.location(),))
+def _list_inventory_tx(c, location_id):
+    legacy.list_inventory_tx(None, location_id, None, 50)
+
+
+@benchmark("list_inventory_tx_ingredient_30d", setup=lambda c: (c.stock_pair(),))
+def _list_inventory_tx_30d(c, pair):
+    since = (datetime.now(timezone.utc) - timedelta(days=30)).isoformat()
+    legacy.list_inventory_tx(pair[0], None, since, 200)
+
+
+# ---------- 실행 ----------
+def _pct(values: list[float], p: float) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(p) - 1]
+
+
+def run_case(ctx: Ctx, name: str, repeat: int, warmup: int) -> dict:
+    fn, setup = CASES[name]
+    times, queries = [], []
+    for i in range(warmup + repeat):
+        args = setup(ctx) if setup else ()
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        t0 = time.perf_counter()
+        try:
+            fn(ctx, *args)
+        finally:
+            elapsed = time.perf_counter() - t0
+            _request_stats.reset(token)
+        if i >= warmup:
+            times.append(elapsed * 1000)
+            queries.append(stats.queries)
+    return {
+        "n": len(times),
+        "min_ms": round(min(times), 3),
+        "p50_ms": round(statistics.median(times), 3),
+        "p95_ms": round(_pct(times, 95), 3),
+        "p99_ms": round(_pct(times, 99), 3),
+        "mean_ms": round(statistics.fmean(times), 3),
+        "max_ms": round(max(times), 3),
+        "queries_per_call": round(statistics.fmean(queries), 2),
+    }
+
+
+def _git(*args) -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", *args], stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def _meta(args) -> dict:
+    with get_cursor() as cur:
+        cur.execute("SHOW server_version;")
+        server = cur.fetchone()["server_version"]
+        cur.execute(
+            """
+            SELECT c.relname, c.reltuples::bigint AS rows
+            FROM pg_class c
+            WHERE c.relname = ANY(%s) AND c.relkind IN ('r', 'p');
+            """,
+            (["inventory", "inventory_tx", "sales", "sale_items", "audit_logs", "ingredients", "menu_items"],),
+        )
+        dataset = {r["relname"]: r["rows"] for r in cur.fetchall()}
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "postgres": server,
+        "db_host": os.getenv("DB_HOST", "localhost"),
+        "dataset": dataset,
+        "repeat": args.repeat,
+        "warmup": args.warmup,
+        "seed": args.seed,
+    }
+
+
+def compare(base: dict, cur: dict, fail_over: Optional[float]) -> int:
+    regressions = 0
+    print(f"\n{'case':36} {'base p50':>10} {'now p50':>10} {'ratio':>7}  queries")
+    for name, r in cur["results"].items():
+        b = base.get("results", {}).get(name)
+        if not b:
+            print(f"{name:36} {'-':>10} {r['p50_ms']:>10.2f} {'new':>7}")
+            continue
+        ratio = r["p50_ms"] / b["p50_ms"] if b["p50_ms"] else float("inf")
+        flag = ""
+        if fail_over and ratio > fail_over:
+            regressions += 1
+            flag = "  <-- regression"
+        print(f"{name:36} {b['p50_ms']:>10.2f} {r['p50_ms']:>10.2f} {ratio:>6.2f}x  "
+              f"{b['queries_per_call']} -> {r['queries_per_call']}{flag}")
+    return regressions
+
+
+def main():
+    p = argparse.ArgumentParser(prog="python -m bench.run")
+    p.add_argument("--only", default="", help="쉼표로 구분한 케이스 이름")
+    p.add_argument("--repeat", type=int, default=30)
+    p.add_argument("--warmup", type=int, default=3)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--out", default=None, help="결과 JSON 경로 (기본 bench/results/<commit>.json)")
+    p.add_argument("--compare", default=None, help="비교할 이전 결과 JSON")
+    p.add_argument("--fail-over", type=float, default=None, help="p50 비율이 이 값을 넘으면 exit 1")
+    p.add_argument("--list", action="store_true")
+    args = p.parse_args()
+
+    if args.list:
+        print("\n".join(CASES))
+        return
+    names = [n for n in args.only.split(",") if n] or list(CASES)
+    unknown = [n for n in names if n not in CASES]
+    if unknown:
+        raise SystemExit(f"unknown case: {', '.join(unknown)}")
+
+    ctx = Ctx(args.seed)
+    out = {"meta": _meta(args), "results": {}}
+    for name in names:
+        r = run_case(ctx, name, args.repeat, args.warmup)
+        out["results"][name] = r
+        logger.info("bench %-34s p50 %8.2f ms  p95 %8.2f ms  %5.1f queries",
+                    name, r["p50_ms"], r["p95_ms"], r["queries_per_call"])
+
+    path = args.out or os.path.join(os.path.dirname(__file__), "results",
+                                    f"{out['meta']['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(out, f, ensure_ascii=False, indent=2)
+    logger.info("bench results -> %s", path)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            if compare(json.load(f), out, args.fail_over):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+워커 수(1 → N)에 따른 처리량 측정. 같은 DB/같은 부하로 워커 수만 바꿔 가며 bench.loadtest를 돌린다.
+
+    python -m bench.datagen --reset                 # 측정 전에 한 번
+    python -m bench.scaling --workers 1,2,4,8 --concurrency 64 --duration 60 --json scaling.json
+
+절차:
+1. API 서버와 Postgres는 가능하면 다른 머신(또는 코어를 나눠서)에 둔다. 같은 코어를 나눠 쓰면
+   워커를 늘려도 DB가 CPU를 뺏겨 처리량이 늘지 않는다.
+2. 각 단계는 gunicorn(preload, UvicornWorker) 으로 띄우고 /health 응답 후 측정한다.
+3. 동시 사용자(--concurrency)는 워커 수가 가장 많을 때 CPU를 채울 만큼 잡는다 (워커 수 x 8~16).
+4. 표에서 req/s가 더 이상 늘지 않거나 p99가 급격히 늘어나는 지점이 포화점.
+   그때 DB 쪽(pg_stat_activity의 wait_event, 커넥션 수)을 같이 본다.
+   WEB_WORKERS * DB_POOL_MAX 가 max_connections 를 넘지 않게 할 것.
+
+측정 결과: 아직 기록된 표가 없다. 이 스크립트를 만든 환경은 코어 1개짜리라 워커를 늘려도
+같은 코어를 나눠 쓸 뿐이어서 1 → N 배율을 잴 수 없었다. 코어가 (가장 큰 워커 수 + DB 몫) 이상인
+머신에서 돌려 아래에 표(--json 결과)를 붙일 것. 코어가 모자라면 실행 시 경고를 남긴다.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from backend.core.logger import logger
+from bench.loadtest import DEFAULT_MIX, parse_mix, run
+from bench.pgtmp import _free_port, wait_http
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _serve(workers: int, port: int) -> subprocess.Popen:
+    env = {**os.environ, "WEB_WORKERS": str(workers), "APP_HOST": "127.0.0.1", "APP_PORT": str(port)}
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "backend/gunicorn.conf.py", "backend.main:app"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+def main():
+    p = argparse.ArgumentParser(prog="python -m bench.scaling")
+    p.add_argument("--workers", default="1,2,4")
+    p.add_argument("--concurrency", type=int, default=32)
+    p.add_argument("--duration", type=float, default=30)
+    p.add_argument("--ramp", type=float, default=3)
+    p.add_argument("--mix", default=DEFAULT_MIX)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--json", default=None)
+    args = p.parse_args()
+
+    counts = [int(x) for x in args.workers.split(",")]
+    if (os.cpu_count() or 1) <= max(counts):
+        logger.warning("scaling: %d cores for up to %d workers - numbers will not show 1 -> N scaling",
+                       os.cpu_count() or 1, max(counts))
+    rows = []
+    for w in counts:
+        port = _free_port()
+        srv = _serve(w, port)
+        try:
+            wait_http(f"http://127.0.0.1:{port}/health", timeout=60)
+            r = run(f"http://127.0.0.1:{port}", args.concurrency, args.duration, parse_mix(args.mix),
+                    0, args.ramp, args.seed, timeout=10)
+        finally:
+            srv.terminate()
+            srv.wait(60)
+        rows.append({"workers": w, **{k: r[k] for k in ("rps", "p50_ms", "p90_ms", "p99_ms", "error_rate",
+                                                          "insufficient_stock_409")}})
+        logger.info("scaling: %d workers -> %.1f req/s p99 %.1f ms", w, r["rps"], r["p99_ms"])
+
+    base = rows[0]["rps"] or 1
+    print(f"\n{'workers':>7} {'req/s':>9} {'speedup':>8} {'p50':>8} {'p90':>8} {'p99':>8} {'err%':>6}")
+    for r in rows:
+        print(f"{r['workers']:>7} {r['rps']:>9} {r['rps'] / base:>7.2f}x {r['p50_ms']:>8} {r['p90_ms']:>8} "
+              f"{r['p99_ms']:>8} {r['error_rate'] * 100:>5.2f}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
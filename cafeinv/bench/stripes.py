@@ -0,0 +1,149 @@
+"""
+재고 스트라이프 vs 기존 경로. 인기 메뉴 몇 개를 동시 판매자 N명(스레드)이 계속 판다.
+
+    python -m bench.datagen --reset
+    STOCK_STRIPES=1 python -m bench.stripes --sellers 64 --duration 20 --hot 3 --stripes 8
+
+각 모드 전에 해당 메뉴 재료 재고를 넉넉히 채우고(INSUFFICIENT_STOCK 방지), 끝난 뒤
+재료별 inventory_tx 합계 변화량과 잔량 변화량이 같은지(잔량 정합성) 확인한다.
+판매자 수만큼 DB 커넥션을 쓰므로 DB_POOL_MAX 를 판매자 수 이상으로 올린다 (기본으로 자동 설정).
+"""
+import argparse
+import os
+import sys
+
+if __name__ == "__main__":
+    # 풀 크기는 config import 시점에 정해진다
+    _n = next((sys.argv[i + 1] for i, a in enumerate(sys.argv[:-1]) if a == "--sellers"), "64")
+    os.environ.setdefault("DB_POOL_MAX", str(int(_n) + 4))
+
+import random
+import threading
+import time
+
+from backend.core.config import STOCK_STRIPES
+from backend.core.db import get_cursor, get_pool
+from backend.core.logger import logger
+from backend.sales.service import create_sale
+from backend.stripes.service import balance_sql, enable_stripes, disable_stripes, compact
+from bench.run import Ctx
+
+
+def _keys_for(menu_ids: list[str]) -> list[tuple[str, str]]:
+    with get_cursor() as cur:
+        cur.execute(
+            """
+            SELECT DISTINCT r.ingredient_id::text AS ingredient_id, m.default_location_id::text AS location_id
+            FROM recipes r JOIN menu_items m ON m.id = r.menu_item_id
+            WHERE r.menu_item_id = ANY(%s::uuid[]) AND m.default_location_id IS NOT NULL
+            ORDER BY 1, 2;
+            """,
+            (menu_ids,),
+        )
+        return [(r["ingredient_id"], r["location_id"]) for r in cur.fetchall()]
+
+
+def _snapshot(keys) -> dict:
+    with get_cursor() as cur:
+        cur.execute(
+            f"""
+            SELECT inv.ingredient_id::text AS ingredient_id, inv.location_id::text AS location_id,
+                   {balance_sql("inv")} AS balance,
+                   (SELECT COALESCE(sum(t.qty_delta), 0) FROM inventory_tx t
+                     WHERE t.ingredient_id = inv.ingredient_id AND t.location_id = inv.location_id) AS ledger
+            FROM inventory inv
+            JOIN unnest(%s::uuid[], %s::uuid[]) AS k(ingredient_id, location_id)
+              ON k.ingredient_id = inv.ingredient_id AND k.location_id = inv.location_id;
+            """,
+            ([k[0] for k in keys], [k[1] for k in keys]),
+        )
+        return {(r["ingredient_id"], r["location_id"]): (r["balance"], r["ledger"]) for r in cur.fetchall()}
+
+
+def _restock(keys, qty: float = 1_000_000):
+    with get_cursor() as cur:
+        for ing, loc in keys:
+            cur.execute("SELECT apply_stock_change(%s, %s, %s, 'adjustment', 'bench', NULL, 'bench restock', NULL);",
+                        (ing, loc, qty))
+
+
+def run_mode(menu, keys, sellers: int, duration: float, seed: int) -> dict:
+    before = _snapshot(keys)
+    lat: list[float] = []
+    counts = {"ok": 0, "insufficient": 0, "other": 0}
+    lock = threading.Lock()
+    stop = time.monotonic() + duration
+
+    def seller(n: int):
+        rnd = random.Random(seed + n)
+        mine, c = [], {"ok": 0, "insufficient": 0, "other": 0}
+        while time.monotonic() < stop:
+            m, price = rnd.choice(menu)
+            t0 = time.perf_counter()
+            try:
+                create_sale({"items": [{"menu_item_id": m, "qty": 1, "unit_price": price, "discount": 0}],
+                             "channel": "POS"})
+                c["ok"] += 1
+            except Exception as e:
+                c["insufficient" if "INSUFFICIENT_STOCK" in str(e) else "other"] += 1
+                if "INSUFFICIENT_STOCK" not in str(e):
+                    logger.warning("sale failed: %s", e)
+            mine.append((time.perf_counter() - t0) * 1000)
+        with lock:
+            lat.extend(mine)
+            for k in counts:
+                counts[k] += c[k]
+
+    t0 = time.perf_counter()
+    ts = [threading.Thread(target=seller, args=(i,)) for i in range(sellers)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    after = _snapshot(keys)
+    drift = [k for k in keys if (after[k][0] - before[k][0]) != (after[k][1] - before[k][1]) or after[k][0] < 0]
+    lat.sort()
+    q = lambda p: round(lat[min(len(lat) - 1, int(len(lat) * p))], 2) if lat else None
+    return {"ok_per_s": round(counts["ok"] / elapsed, 1), "p50_ms": q(0.5), "p99_ms": q(0.99),
+            **counts, "inconsistent_keys": len(drift)}
+
+
+def main():
+    p = argparse.ArgumentParser(prog="python -m bench.stripes")
+    p.add_argument("--sellers", type=int, default=64)
+    p.add_argument("--duration", type=float, default=20)
+    p.add_argument("--hot", type=int, default=3, help="판매할 인기 메뉴 수")
+    p.add_argument("--stripes", type=int, default=8)
+    p.add_argument("--seed", type=int, default=42)
+    args = p.parse_args()
+    if not STOCK_STRIPES:
+        raise SystemExit("STOCK_STRIPES=1 로 실행하세요")
+
+    ctx = Ctx(args.seed)
+    menu = ctx.menu[:args.hot]
+    keys = _keys_for([m for m, _ in menu])
+    get_pool().warm(args.sellers)
+
+    rows = []
+    for mode in ("base", "striped"):
+        disable_stripes(keys)
+        _restock(keys)
+        if mode == "striped":
+            enable_stripes(keys, args.stripes)
+        r = run_mode(menu, keys, args.sellers, args.duration, args.seed)
+        if mode == "striped":
+            compact(keys)
+            disable_stripes(keys)
+        rows.append({"mode": mode, **r})
+        logger.info("stripes bench %s: %s", mode, r)
+
+    print(f"\n{'mode':>8} {'ok/s':>9} {'p50':>8} {'p99':>8} {'409':>6} {'err':>5} {'drift':>6}")
+    for r in rows:
+        print(f"{r['mode']:>8} {r['ok_per_s']:>9} {r['p50_ms']:>8} {r['p99_ms']:>8} {r['insufficient']:>6} "
+              f"{r['other']:>5} {r['inconsistent_keys']:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,24 @@
 import os
 import json
 import time
-from uuid import UUID
+from uuid import UUID, uuid4
 
 import streamlit as st
 import pandas as pd
 import requests
 from dotenv import load_dotenv
 
+from outbox import Outbox, start_sync_thread
+
 # -----------------------------
 # 환경설정
 # -----------------------------
 load_dotenv()
 API = os.getenv("API_URL", "http://127.0.0.1:8000")
+OUTBOX_PATH = os.getenv("OUTBOX_PATH", "pos_outbox.db")              # 매장 로컬 판매 버퍼 (SQLite)
+OUTBOX_SYNC_SECONDS = float(os.getenv("OUTBOX_SYNC_SECONDS", "5"))
+OUTBOX_BATCH = int(os.getenv("OUTBOX_BATCH", "50"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "20"))   # 서버가 같은 판매에서 이만큼 멈추면 dead
 
 st.set_page_config(page_title="Cafe Inventory", layout="wide")
 st.title("☕ Cafe Inventory Dashboard")
@@ -20,17 +26,20 @@ st.title("☕ Cafe Inventory Dashboard")
 # -----------------------------
 # 헬퍼
 # -----------------------------
+# 사용자 세션마다 하나: 서버가 주는 마지막 쓰기 쿠키를 유지해야 방금 쓴 내용을 바로 다시 읽을 수 있다 (복제본 사용 시)
+http = st.session_state.setdefault("http", requests.Session())
+
 def api_get(path: str, params: dict | None = None, timeout: int = 10):
     try:
-        r = requests.get(f"{API}{path}", params=params, timeout=timeout)
+        r = http.get(f"{API}{path}", params=params, timeout=timeout)
         r.raise_for_status()
         return r.json(), None
     except Exception as e:
         return None, str(e)
 
-def api_post(path: str, payload: dict, timeout: int = 15):
+def api_post(path: str, payload: dict, timeout: int = 15, headers: dict | None = None, method: str = "post"):
     try:
-        r = requests.post(f"{API}{path}", json=payload, timeout=timeout)
+        r = http.request(method.upper(), f"{API}{path}", json=payload, timeout=timeout, headers=headers)
         if r.status_code == 200:
             return r.json(), None
         # FastAPI 에러 통일 처리
@@ -42,12 +51,106 @@ def api_post(path: str, payload: dict, timeout: int = 15):
     except Exception as e:
         return None, str(e)
 
+def api_put(path: str, payload: dict, timeout: int = 15):
+    return api_post(path, payload, timeout, method="put")
+
+def idem_key(name: str, payload: dict) -> dict:
+    # 같은 내용을 다시 제출(타임아웃 후 재시도 등)하면 같은 키 → 서버에서 한 번만 반영
+    body = json.dumps(payload, sort_keys=True, default=str)
+    saved = st.session_state.get(f"idem_{name}")
+    if not saved or saved[0] != body:
+        saved = (body, str(uuid4()))
+        st.session_state[f"idem_{name}"] = saved
+    return {"Idempotency-Key": saved[1]}
+
+def idem_done(name: str):
+    st.session_state.pop(f"idem_{name}", None)
+
+def send_sales(batch: list[dict]) -> dict:
+    # 동기화 스레드에서도 부르므로 세션(http) 대신 매번 요청. 연결 실패/5xx 는 예외 → 그대로 pending
+    r = requests.post(f"{API}/sales/batch", json={"sales": batch}, timeout=15)
+    r.raise_for_status()
+    return r.json()
+
+@st.cache_resource
+def pos_outbox() -> Outbox:
+    # 프로세스당 하나 + 백그라운드 동기화 스레드
+    box = Outbox(OUTBOX_PATH, OUTBOX_MAX_ATTEMPTS)
+    start_sync_thread(box, send_sales, OUTBOX_SYNC_SECONDS, OUTBOX_BATCH)
+    return box
+
 def safe_uuid(s: str) -> str | None:
     try:
         return str(UUID(s))
     except Exception:
         return None
 
+def search_options(entity: str, key: str, label: str, page_size: int = 20) -> dict:
+    """
+    타입어헤드: 전체 목록 대신 검색어/페이지에 맞는 top-K만 받아 selectbox 옵션으로 쓴다. → {이름: id}
+    폼(st.form) 밖에서 호출해야 입력할 때마다 다시 검색된다.
+    """
+    q = st.text_input(f"{label} 검색", key=f"{key}_q", placeholder="이름 일부 또는 초성 (예: ㅇㄷ)")
+    if st.session_state.get(f"{key}_last_q") != q:
+        st.session_state[f"{key}_last_q"] = q
+        st.session_state[f"{key}_page"] = 0
+    page = st.session_state.get(f"{key}_page", 0)
+    res, e = api_get(f"/search/{entity}", params={"q": q, "limit": page_size, "offset": page * page_size})
+    if e:
+        st.error(e)
+        return {}
+    c1, c2, c3 = st.columns([1, 1, 4])
+    if c1.button("◀ 이전", key=f"{key}_prev", disabled=page == 0):
+        st.session_state[f"{key}_page"] = page - 1
+        st.rerun()
+    if c2.button("다음 ▶", key=f"{key}_next", disabled=not res["has_more"]):
+        st.session_state[f"{key}_page"] = page + 1
+        st.rerun()
+    c3.caption(f"{page + 1} 페이지 · {len(res['items'])}건")
+    return {r["name"]: r["id"] for r in res["items"]}
+
+def paged_table(path: str, key: str, params: dict | None = None, sorts: list[str] | None = None,
+                page_size: int = 50, search: bool = True, decorate=None, empty: str = "데이터 없음"):
+    """
+    서버 페이지 목록: 보이는 페이지만 받아서 그린다 (limit/offset/sort/q, 전체 건수는 X-Total-Count 헤더).
+    필터(params)/검색어/정렬이 바뀌면 첫 페이지로. 폼(st.form) 밖에서 호출.
+    """
+    c1, c2 = st.columns([3, 2])
+    q = c1.text_input("검색", key=f"{key}_q") if search else ""
+    sort = c2.selectbox("정렬", sorts, key=f"{key}_sort") if sorts else None
+    sig = json.dumps([params, q, sort], sort_keys=True, default=str)
+    if st.session_state.get(f"{key}_sig") != sig:
+        st.session_state[f"{key}_sig"] = sig
+        st.session_state[f"{key}_page"] = 0
+    page = st.session_state.get(f"{key}_page", 0)
+    qp = {**(params or {}), "limit": page_size, "offset": page * page_size}
+    if q:
+        qp["q"] = q
+    if sort:
+        qp["sort"] = sort
+    try:
+        r = http.get(f"{API}{path}", params=qp, timeout=10)
+        r.raise_for_status()
+    except Exception as e:
+        st.error(f"조회 실패: {e}")
+        return pd.DataFrame()
+    df = pd.DataFrame(r.json())
+    total = int(r.headers.get("X-Total-Count", len(df)))
+    about = "약 " if r.headers.get("X-Total-Count-Estimated") == "true" else ""
+    if df.empty:
+        st.info(empty)
+    else:
+        st.dataframe(decorate(df) if decorate else df, use_container_width=True)
+    n1, n2, n3 = st.columns([1, 1, 4])
+    if n1.button("◀ 이전", key=f"{key}_prev", disabled=page == 0):
+        st.session_state[f"{key}_page"] = page - 1
+        st.rerun()
+    if n2.button("다음 ▶", key=f"{key}_next", disabled=len(df) < page_size or (page + 1) * page_size >= total):
+        st.session_state[f"{key}_page"] = page + 1
+        st.rerun()
+    n3.caption(f"{page + 1} / {about}{max(1, -(-total // page_size)):,} 페이지 · {about}{total:,}건")
+    return df
+
 # -----------------------------
 # 레이아웃
 # -----------------------------
@@ -97,22 +200,17 @@ with tab_inventory:
             st.error("location_id가 UUID 형식이 아닙니다.")
         else:
             params["location_id"] = uuid_norm
-    data, err = api_get("/inventory", params=params if params else None)
-    if err:
-        st.error(f"Inventory 호출 실패: {err}")
-    else:
-        df = pd.DataFrame(data)
-        if df.empty:
-            st.info("데이터가 없습니다.")
-        else:
-            st.dataframe(df, use_container_width=True)
-            st.caption("※ inventory 스키마: ingredient_id, location_id, qty_on_hand")
+    paged_table("/inventory", "inv", params,
+                sorts=["ingredient_name", "location_name,ingredient_name", "qty_on_hand", "-qty_on_hand", "-updated_at"],
+                empty="데이터가 없습니다.")
+    st.caption("※ inventory 스키마: ingredient_id, location_id, qty_on_hand")
 
 # -----------------------------
 # 3) Make Sale (레시피 자동 차감)
 # -----------------------------
 with tab_sale:
     st.subheader("판매 등록 (트리거로 재고 자동 차감)")
+    box = pos_outbox()
 
     with st.expander("📌 사용 팁", expanded=False):
         st.markdown(
@@ -121,6 +219,9 @@ with tab_sale:
             - `menu_item_id`는 메뉴 UUID입니다. (예: `SELECT id FROM menu_items WHERE name='아메리카노';`)
             - 레시피(`recipes`)에 정의된 원재료가 판매수량 × 필요량 만큼 자동 차감됩니다.
             - 재고가 부족하면 **409 / INSUFFICIENT_STOCK** 에러가 납니다.
+            - 판매는 먼저 이 PC의 로컬 버퍼(`OUTBOX_PATH`)에 저장되고 서버로 올라갑니다.
+              서버가 느리거나 꺼져 있어도 판매는 남고, 연결되면 순서대로 자동 전송됩니다.
+            - 전송 뒤 재고 부족 등으로 거절되거나 계속 실패한 판매는 아래 **동기화 충돌**에서 다시 보내거나 폐기하세요.
             """
         )
 
@@ -201,15 +302,50 @@ with tab_sale:
                 payload["location_id"] = loc_norm
 
         if all_ok:
-            resp, err = api_post("/sales", payload)
-            if err:
-                if "INSUFFICIENT_STOCK" in err:
-                    st.error("❌ 재고 부족(INSUFFICIENT_STOCK)")
-                else:
-                    st.error(f"❌ 판매 등록 실패: {err}")
-            else:
-                st.success(f"✅ 판매 등록 완료! sale_id={resp.get('sale_id')}, total_amount={resp.get('total_amount')}")
-                st.balloons()
+            # 로컬에 커밋하고 바로 돌아온다. 전송은 백그라운드 동기화 스레드가 (enqueue 로 깨어나서) 한다
+            st.session_state.last_sale_key = box.enqueue(payload)
+            st.success("📥 판매를 저장했습니다. 서버로 자동 전송됩니다.")
+
+    # 마지막 판매의 전송 결과 (다시 그릴 때마다 로컬 버퍼에서 확인)
+    last = box.get(st.session_state["last_sale_key"]) if st.session_state.get("last_sale_key") else None
+    if last:
+        if last["status"] == "synced":
+            st.caption(f"✅ 마지막 판매 전송 완료: sale_id={last['sale_id']}, total_amount={last['total_amount']}")
+        elif last["status"] == "conflict":
+            st.error("❌ 마지막 판매: 재고 부족(INSUFFICIENT_STOCK) — 아래 동기화 충돌에서 확인하세요")
+        elif last["status"] in ("rejected", "dead"):
+            st.error(f"❌ 마지막 판매 등록 실패: {last['last_error']}")
+        elif last["status"] == "pending" and last["last_error"]:
+            st.warning(f"📥 마지막 판매 전송 대기 중 (로컬에 저장됨, 연결되면 자동 전송): {last['last_error']}")
+
+    # 로컬 버퍼 상태 / 충돌
+    counts = box.counts()
+    c1, c2, c3 = st.columns([1, 1, 2])
+    c1.metric("전송 대기", counts.get("pending", 0))
+    c2.metric("동기화 충돌", counts.get("conflict", 0) + counts.get("rejected", 0) + counts.get("dead", 0))
+    if c3.button("🔄 지금 동기화", disabled=not counts.get("pending")):
+        res = box.sync(send_sales, OUTBOX_BATCH)
+        if res["busy"]:
+            st.info("백그라운드 동기화가 진행 중입니다. 잠시 후 다시 확인하세요.")
+        elif res["error"]:
+            st.warning(f"일부 전송 실패: {res['error']}")
+        else:
+            st.rerun()
+
+    conflicts = box.conflicts()
+    if conflicts:
+        st.markdown("**동기화 충돌** (서버에서 거절된 판매, dead: 같은 판매에서 계속 실패해 전송을 멈춘 판매)")
+        for c in conflicts:
+            k1, k2, k3 = st.columns([5, 1, 1])
+            lines = ", ".join(f"{it['menu_item_id'][:8]}×{it['qty']:g}" for it in c["payload"]["items"])
+            k1.caption(f"#{c['seq']} {time.strftime('%m-%d %H:%M:%S', time.localtime(c['created_at']))} "
+                       f"[{c['status']}] {lines} — {c['last_error']}")
+            if k2.button("다시 보내기", key=f"ob_retry_{c['key']}"):
+                box.retry(c["key"])
+                st.rerun()
+            if k3.button("폐기", key=f"ob_dismiss_{c['key']}"):
+                box.dismiss(c["key"])
+                st.rerun()
 
 
 # -----------------------------
@@ -217,16 +353,9 @@ with tab_sale:
 # -----------------------------
 with tab_alerts:
     st.subheader("미해제 알림")
-    data, err = api_get("/alerts")
-    if err:
-        st.error(f"Alerts 호출 실패: {err}")
-    else:
-        df = pd.DataFrame(data)
-        if df.empty:
-            st.info("열린 알림이 없습니다.")
-        else:
-            st.dataframe(df, use_container_width=True)
-            st.caption("※ 임계치 이하(low_stock) 등 알림이 누적됩니다.")
+    paged_table("/alerts", "alerts", {"open_only": True}, sorts=["-severity,-created_at", "-created_at"],
+                empty="열린 알림이 없습니다.")
+    st.caption("※ 임계치 이하(low_stock) 등 알림이 누적됩니다.")
 
 # =========================================
 # STEP1: Stock Ops / Tx History / PO Tabs
@@ -252,10 +381,11 @@ with tab_stock:
             "tx_type": tx_type,
             "note": note.strip() or None
         }
-        resp, err = api_post("/stock_change", payload)
+        resp, err = api_post("/stock_change", payload, headers=idem_key("stock", payload))
         if err:
             st.error(f"실패: {err}")
         else:
+            idem_done("stock")
             st.success(f"OK. 현재고={resp.get('balance')}")
 
 # --- B) 재고 이력 ---
@@ -265,22 +395,12 @@ with tab_tx:
         ing = st.text_input("ingredient_id (옵션, UUID)")
         loc = st.text_input("location_id (옵션, UUID)")
         since = st.text_input("since (옵션, 예: 2025-09-01T00:00:00)")
-        limit = st.number_input("limit", min_value=1, max_value=500, value=50, step=1)
         submitted = st.form_submit_button("조회")
     params = {}
     if ing.strip(): params["ingredient_id"] = ing.strip()
     if loc.strip(): params["location_id"] = loc.strip()
     if since.strip(): params["since"] = since.strip()
-    params["limit"] = int(limit)
-    data, err = api_get("/inventory_tx", params=params)
-    if err:
-        st.error(f"조회 실패: {err}")
-    else:
-        df = pd.DataFrame(data)
-        if df.empty:
-            st.info("데이터 없음")
-        else:
-            st.dataframe(df, use_container_width=True)
+    paged_table("/inventory/inventory_tx", "tx", params, sorts=["-created_at", "created_at", "qty_delta", "-qty_delta"])
 
 # --- C) 발주 / 입고 ---
 with tab_po:
@@ -363,23 +483,12 @@ def opt_categories(cat_type="menu"):
 def opt_locations():
     d, e = api_get("/locations"); return d or []
 
-def opt_ingredients():
-    d, e = api_get("/ingredients", params={"active_only": True}); return d or []
-
-def opt_menu_items():
-    d, e = api_get("/menu_items", params={"active_only": True}); return d or []
-
 # ---- 메뉴 & 레시피 ----
 with tab_menu:
     st.subheader("메뉴 관리")
 
     # 목록
-    data, err = api_get("/menu_items", params={"active_only": False})
-    if err:
-        st.error(f"메뉴 목록 오류: {err}")
-        data = []
-    df_menu = pd.DataFrame(data)
-    st.dataframe(df_menu if not df_menu.empty else pd.DataFrame([{"info":"메뉴 없음"}]), use_container_width=True)
+    paged_table("/menu_items", "menu", {"active_only": False}, sorts=["name", "-price", "price"], empty="메뉴 없음")
 
     st.markdown("### 메뉴 생성")
     cats = opt_categories("menu"); cat_map = {c["name"]: c["id"] for c in cats}
@@ -404,8 +513,7 @@ with tab_menu:
 
     st.markdown("---")
     st.subheader("레시피 관리")
-    menus = opt_menu_items()
-    menu_name_map = {m["name"]: m["id"] for m in menus} if menus else {}
+    menu_name_map = search_options("menu_items", "recipe_menu", "메뉴")
     sel_menu = st.selectbox("메뉴 선택", options=list(menu_name_map.keys()) if menu_name_map else [])
     if sel_menu:
         mid = menu_name_map[sel_menu]
@@ -415,45 +523,36 @@ with tab_menu:
         df_rec = pd.DataFrame(rec)
         st.dataframe(df_rec if not df_rec.empty else pd.DataFrame([{"info":"레시피 없음"}]), use_container_width=True)
 
-        # 레시피 추가/수정
-        ings = opt_ingredients(); ing_name_map = {i["name"]: i["id"] for i in ings} if ings else {}
-        with st.form("recipe_upsert"):
-            ing_name = st.selectbox("원재료", options=list(ing_name_map.keys()) if ing_name_map else [])
-            qty_required = st.number_input("필요량", min_value=0.0, step=0.1, value=9.0)
-            subr = st.form_submit_button("추가/수정")
-        if subr and ing_name:
-            payload = {
-                "menu_item_id": mid,
-                "ingredient_id": ing_name_map[ing_name],
-                "qty_required": qty_required
-            }
-            resp, e3 = api_post("/recipes", payload)
+        # 레시피 편집: 표에서 추가/수정/삭제 후 한 번에 저장 (PUT /recipes/{menu_item_id})
+        # 선택지 = 현재 레시피 재료 + 검색 결과 (전체 재료 목록은 받지 않는다)
+        ing_name_map = {r["ingredient_name"]: r["ingredient_id"] for r in (rec or [])}
+        ing_name_map.update(search_options("ingredients", f"recipe_ing_{mid}", "추가할 원재료"))
+        cur_lines = pd.DataFrame(
+            [{"원재료": r["ingredient_name"], "필요량": float(r["qty_required"])} for r in (rec or [])],
+            columns=["원재료", "필요량"]
+        )
+        edited = st.data_editor(
+            cur_lines, num_rows="dynamic", use_container_width=True, key=f"recipe_editor_{mid}",
+            column_config={
+                "원재료": st.column_config.SelectboxColumn("원재료", options=list(ing_name_map.keys()), required=True),
+                "필요량": st.column_config.NumberColumn("필요량", min_value=0.0, step=0.1, required=True),
+            },
+        )
+        if st.button("레시피 저장", key=f"recipe_save_{mid}"):
+            rows = edited.dropna(subset=["원재료", "필요량"])
+            rows = rows[rows["필요량"] > 0]
+            payload = {"lines": [{"ingredient_id": ing_name_map[r["원재료"]], "qty_required": float(r["필요량"])}
+                                 for _, r in rows.iterrows()]}
+            resp, e3 = api_put(f"/recipes/{mid}", payload)
             if e3: st.error(e3)
-            else: st.success(f"업데이트 완료: {resp['ingredient_name']} = {resp['qty_required']}")
-
-        # 레시피 삭제
-        if not df_rec.empty:
-            with st.form("recipe_delete"):
-                del_idx = st.selectbox("삭제할 레시피 라인(Ingredient ID)", options=df_rec["ingredient_id"].tolist())
-                subd = st.form_submit_button("삭제")
-            if subd and del_idx:
-                # DELETE
-                try:
-                    r = requests.delete(f"{API}/recipes/{mid}/{del_idx}", timeout=10)
-                    if r.status_code == 200:
-                        st.success("삭제 완료")
-                    else:
-                        st.error(f"삭제 실패: {r.status_code} {r.text}")
-                except Exception as ex:
-                    st.error(str(ex))
+            else:
+                st.success(f"저장 완료: 추가 {resp['inserted']} · 수정 {resp['updated']} · 삭제 {resp['deleted']}")
+                st.rerun()
 
 # ---- 공급사 ----
 with tab_suppliers:
     st.subheader("공급사 목록")
-    sup, e = api_get("/suppliers", params={"active_only": False})
-    if e: st.error(e); sup = []
-    df_sup = pd.DataFrame(sup)
-    st.dataframe(df_sup if not df_sup.empty else pd.DataFrame([{"info":"공급사 없음"}]), use_container_width=True)
+    paged_table("/suppliers", "sup", {"active_only": False}, sorts=["name", "-name"], empty="공급사 없음")
 
     st.markdown("### 공급사 생성")
     with st.form("sup_create"):
@@ -473,9 +572,9 @@ with tab_suppliers:
         else: st.success(f"생성 완료: {resp['id']}")
 
     st.markdown("### 공급사 비활성화")
-    if not df_sup.empty:
+    opts = search_options("suppliers", "sup_deact", "공급사")
+    if opts:
         with st.form("sup_deact"):
-            opts = {f"{r['name']} ({r['id']})": r["id"] for _, r in df_sup.iterrows()}
             sel = st.selectbox("대상 선택", options=list(opts.keys()))
             subx = st.form_submit_button("비활성화")
         if subx and sel:
@@ -541,16 +640,11 @@ with tab_tr:
     st.markdown("### 4) 이동 목록 / 라인 조회")
     with st.form("tr_list"):
         stx = st.selectbox("상태 필터", ["(전체)","draft","shipped","received","canceled"])
-        limit = st.number_input("limit", min_value=1, max_value=500, value=100, step=1)
         sub_tl = st.form_submit_button("조회")
-    if sub_tl:
-        params = {"limit": int(limit)}
-        if stx != "(전체)":
-            params["status"] = stx
-        data, err = api_get("/transfers", params=params)
-        if err: st.error(err); data=[]
-        df = pd.DataFrame(data)
-        st.dataframe(df if not df.empty else pd.DataFrame([{"info":"데이터 없음"}]), use_container_width=True)
+    params = {}
+    if stx != "(전체)":
+        params["status"] = stx
+    paged_table("/transfers", "tr", params, sorts=["-created_at", "created_at", "status"], search=False)
 
     with st.form("tr_items_list"):
         trid = st.text_input("transfer_id (UUID) - 라인 조회")
@@ -567,16 +661,11 @@ with tab_audit:
     with st.form("audit_form"):
         tname = st.text_input("table_name (옵션, 예: 'inventory' / 'sale_items')")
         since = st.text_input("since (옵션, 예: 2025-09-01T00:00:00)")
-        limit = st.number_input("limit", min_value=1, max_value=500, value=100, step=1)
         sub_al = st.form_submit_button("조회")
-    if sub_al:
-        params = {"limit": int(limit)}
-        if tname.strip(): params["table_name"] = tname.strip()
-        if since.strip(): params["since"] = since.strip()
-        data, err = api_get("/audit_logs", params=params)
-        if err: st.error(err); data=[]
-        df = pd.DataFrame(data)
-        st.dataframe(df if not df.empty else pd.DataFrame([{"info":"로그 없음"}]), use_container_width=True)
+    params = {}
+    if tname.strip(): params["table_name"] = tname.strip()
+    if since.strip(): params["since"] = since.strip()
+    paged_table("/audit_logs", "audit", params, sorts=["-created_at", "created_at"], search=False, empty="로그 없음")
 
 # =========================
 # 등록 탭: 카테고리 / 품목 / 입고
@@ -600,9 +689,7 @@ with tab_reg_cat:
 
     st.divider()
     st.caption("기존 카테고리")
-    data, err = api_get("/categories")
-    if err: st.error(err); data=[]
-    st.dataframe(pd.DataFrame(data), use_container_width=True)
+    paged_table("/categories", "cats", sorts=["type,name", "name"])
 
 # --- 품목(원재료) 등록 ---
 with tab_reg_item:
@@ -657,13 +744,12 @@ with tab_receipt:
 
     # 참조 로드
     locs, _  = api_get("/ref/locations"); locs = locs or []
-    sups, _  = api_get("/ref/suppliers"); sups = sups or []
-    ings, _  = api_get("/ref/ingredients"); ings = ings or []
     users, _ = api_get("/ref/users"); users = users or []
 
     loc_map = {l["name"]: l["id"] for l in locs}
-    sup_map = {s["name"]: s["id"] for s in sups}
-    ing_map = {i["name"]: i["id"] for i in ings}
+    # 공급사/품목은 검색해서 고른다 (폼 밖에서 검색 → 폼 안 selectbox 선택지)
+    sup_map = search_options("suppliers", "rcp_sup", "공급사")
+    ing_map = search_options("ingredients", "rcp_ing", "품목")
     user_map = {u["name"]: u["id"] for u in users}
 
     with st.form("rcp_form", clear_on_submit=True):
@@ -740,8 +826,43 @@ menu = st.sidebar.radio(
     ["대시보드", "품목 마스터 조회", "재고 현황 조회", "입고 내역 조회"]
 )
 
+# 대시보드 (서버 집계 KPI 한 번 호출)
+if menu == "대시보드":
+    st.header("📈 대시보드")
+    try:
+        res = requests.get(f"{API_URL}/dashboard/kpis", timeout=10)
+        if res.status_code == 200:
+            k = res.json()
+            t = k["totals"]
+            c1, c2, c3, c4 = st.columns(4)
+            c1.metric("재고 금액", f"{t['stock_value']:,.0f}")
+            c2.metric("발주점 이하 / 안전재고 미만", f"{t['low_stock']} / {t['below_safety']}")
+            c3.metric(f"오늘 판매 ({k['day']})", f"{t['sales_amount']:,.0f}", f"{t['sales']}건", delta_color="off")
+            c4.metric("미해제 알림", sum(t["alerts"].values()),
+                      " · ".join(f"{s} {n}" for s, n in t["alerts"].items()) or None, delta_color="off")
+            c5, c6, c7, c8 = st.columns(4)
+            c5.metric("품절", t["out_of_stock"])
+            c6.metric("미입고 발주", k["purchase_orders"]["open"],
+                      f"지연 {k['purchase_orders']['overdue']}" if k["purchase_orders"]["overdue"] else None,
+                      delta_color="inverse")
+            c7.metric("출고 대기 이동", t["transfers_to_ship"])
+            c8.metric("입고 대기 이동", t["transfers_to_receive"])
+            df = pd.DataFrame(k["locations"])
+            if not df.empty:
+                df["alerts"] = df["alerts"].map(lambda a: sum(a.values()))
+                st.dataframe(df.drop(columns=["location_id"]), use_container_width=True)
+            # 판매 추이: 시간별 롤업에서 (기본 최근 90일)
+            unit = st.radio("판매 추이", ["일별", "시간별"], horizontal=True)
+            tr = requests.get(f"{API_URL}/sales/trends/{'daily' if unit == '일별' else 'hourly'}", timeout=10)
+            if tr.status_code == 200 and tr.json():
+                st.line_chart(pd.DataFrame(tr.json()).set_index("bucket")[["revenue"]])
+        else:
+            st.error("❌ 대시보드 정보를 불러올 수 없습니다.")
+    except Exception as e:
+        st.error(f"에러: {e}")
+
 # 품목 마스터 조회
-if menu == "품목 마스터 조회":
+elif menu == "품목 마스터 조회":
     st.header("📦 품목 마스터 조회")
     try:
         res = requests.get(f"{API_URL}/items")
@@ -757,19 +878,11 @@ if menu == "품목 마스터 조회":
 elif menu == "재고 현황 조회":
     st.header("📊 재고 현황 조회")
     try:
-        res = requests.get(f"{API_URL}/inventory")
-        if res.status_code == 200:
-            df = pd.DataFrame(res.json())
-            if not df.empty:
-                if "safe_stock" in df.columns:
-                    df["부족 여부"] = df.apply(
-                        lambda r: "⚠️ 부족" if r["qty"] < r["safe_stock"] else "✅ 정상", axis=1
-                    )
-                st.dataframe(df)
-            else:
-                st.info("데이터가 없습니다.")
-        else:
-            st.error("❌ 재고 정보를 불러올 수 없습니다.")
+        def low_flag(df):
+            low = pd.to_numeric(df["qty_on_hand"]) < pd.to_numeric(df["safety_stock"]).fillna(0)
+            return df.assign(**{"부족 여부": low.map({True: "⚠️ 부족", False: "✅ 정상"})})
+        paged_table("/inventory", "inv_status", sorts=["ingredient_name", "qty_on_hand", "-qty_on_hand"],
+                    decorate=low_flag, empty="데이터가 없습니다.")
     except Exception as e:
         st.error(f"에러: {e}")
 
@@ -0,0 +1,243 @@
+"""
+매장 쪽 판매 버퍼 (SQLite WAL).
+
+API/DB 가 느리거나 끊겨도 판매를 먼저 로컬 파일에 커밋하고, 백그라운드에서 POST /sales/batch 로 올린다.
+
+    box = Outbox("pos_outbox.db")
+    start_sync_thread(box, send)           # 백그라운드 전송 (enqueue 하면 바로 깨어난다)
+    key = box.enqueue(payload)             # 로컬 커밋 (수 ms) → 화면은 바로 다음 판매로
+    box.conflicts()                        # 서버에서 거절됐거나 전송을 포기한 판매
+
+- 판매마다 만들 때 정한 키(uuid)를 Idempotency-Key 로 쓰므로, 응답을 못 받아 다시 보내도 서버에는 한 번만 반영된다.
+  (서버 키 보관 기간 IDEMPOTENCY_TTL_HOURS 안에 다시 보내야 한다)
+- 순서: seq(로컬 기록 순) 대로 보내고, 서버는 보낸 순서대로 반영하다 장애가 나면 그 자리에서 멈춘다.
+  처리 안 된 판매는 pending 으로 남아 다음 동기화에서 같은 순서로 다시 간다.
+- 상태: pending → synced | conflict(INSUFFICIENT_STOCK) | rejected(검증/키 충돌/없는 메뉴 등) | dead.
+  dead: 서버가 같은 판매에서 max_attempts 번 멈추면 (그 판매만 계속 실패) 줄에서 빼서 뒤 판매를 막지 않게 한다.
+  연결 실패는 어느 판매 탓인지 모르므로 횟수에 넣지 않는다 (서버가 꺼져 있는 동안 dead 가 쌓이지 않게).
+  conflict/rejected/dead 는 화면에서 확인 후 다시 보내기(retry) 또는 폐기(dismiss).
+- 여러 Streamlit 세션/동기화 스레드가 같은 파일을 써도 되도록 호출마다 연결을 열고 BEGIN IMMEDIATE 로 쓴다.
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+from uuid import uuid4
+
+log = logging.getLogger(__name__)
+
+_DDL = """
+CREATE TABLE IF NOT EXISTS outbox (
+    seq           INTEGER PRIMARY KEY AUTOINCREMENT,
+    key           TEXT    NOT NULL UNIQUE,
+    payload       TEXT    NOT NULL,
+    status        TEXT    NOT NULL DEFAULT 'pending',
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    last_error    TEXT,
+    sale_id       TEXT,
+    total_amount  REAL,
+    created_at    REAL    NOT NULL,
+    synced_at     REAL
+);
+CREATE INDEX IF NOT EXISTS outbox_status_seq ON outbox (status, seq);
+"""
+
+_RESULT_STATUS = {"ok": "synced", "replayed": "synced", "conflict": "conflict", "rejected": "rejected"}
+_FAILED = ("conflict", "rejected", "dead")
+
+
+class Outbox:
+    def __init__(self, path: str, max_attempts: int = 20):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._sync_lock = threading.Lock()
+        self._wake = threading.Event()      # enqueue → 동기화 스레드를 바로 깨운다
+        db = self._conn()
+        try:
+            db.executescript(_DDL)
+        finally:
+            db.close()
+
+    def _conn(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA journal_mode=WAL;")
+        # WAL + FULL: 커밋마다 WAL fsync → 전원이 나가도 판매가 남는다
+        db.execute("PRAGMA synchronous=FULL;")
+        return db
+
+    def enqueue(self, payload: dict) -> str:
+        key = str(uuid4())
+        db = self._conn()
+        try:
+            db.execute("BEGIN IMMEDIATE;")
+            db.execute("INSERT INTO outbox (key, payload, created_at) VALUES (?, ?, ?);",
+                       (key, json.dumps(payload, ensure_ascii=False), time.time()))
+            db.execute("COMMIT;")
+        finally:
+            db.close()
+        self._wake.set()
+        return key
+
+    def get(self, key: str) -> dict | None:
+        db = self._conn()
+        try:
+            r = db.execute("SELECT * FROM outbox WHERE key = ?;", (key,)).fetchone()
+            return dict(r) if r else None
+        finally:
+            db.close()
+
+    def counts(self) -> dict:
+        db = self._conn()
+        try:
+            return {r["status"]: r["n"] for r in
+                    db.execute("SELECT status, count(*) AS n FROM outbox GROUP BY status;")}
+        finally:
+            db.close()
+
+    def _list(self, statuses: tuple, limit: int) -> list[dict]:
+        db = self._conn()
+        try:
+            rows = db.execute(
+                f"SELECT * FROM outbox WHERE status IN ({','.join('?' * len(statuses))}) ORDER BY seq LIMIT ?;",
+                (*statuses, limit)
+            ).fetchall()
+            return [{**dict(r), "payload": json.loads(r["payload"])} for r in rows]
+        finally:
+            db.close()
+
+    def pending(self, limit: int = 1000) -> list[dict]:
+        return self._list(("pending",), limit)
+
+    def conflicts(self, limit: int = 1000) -> list[dict]:
+        return self._list(_FAILED, limit)
+
+    def sync(self, send, batch: int = 50) -> dict:
+        """
+        send(list[{"key", "sale"}]) → POST /sales/batch 응답 dict. 연결 실패 등은 예외로 올린다.
+        다른 스레드가 동기화 중이면 바로 busy 로 돌아온다 (실패 아님).
+        """
+        if not self._sync_lock.acquire(blocking=False):
+            return {"sent": 0, "error": None, "busy": True, "dead": 0}
+        sent, dead, error = 0, 0, None
+        try:
+            while True:
+                rows = self.pending(batch)
+                if not rows:
+                    break
+                try:
+                    res = send([{"key": r["key"], "sale": r["payload"]} for r in rows])
+                except Exception as e:
+                    error = str(e)
+                    self._failed([r["key"] for r in rows], error)
+                    break
+                self._record(res["results"])
+                sent += res["processed"]
+                if res.get("error") or res["processed"] < len(rows):
+                    # 서버가 중간에 멈춤: 멈춘 판매만 횟수를 세고, 남은 건 pending 그대로 다음 동기화에서 같은 순서로
+                    error = res.get("error") or "partial batch"
+                    if res["processed"] < len(rows) and self._halted(rows[res["processed"]]["key"], error):
+                        dead += 1
+                        continue
+                    break
+        finally:
+            self._sync_lock.release()
+        return {"sent": sent, "error": error, "busy": False, "dead": dead}
+
+    def _failed(self, keys: list[str], error: str):
+        db = self._conn()
+        try:
+            db.execute("BEGIN IMMEDIATE;")
+            db.executemany("UPDATE outbox SET last_error = ? WHERE key = ? AND status = 'pending';",
+                           [(error, k) for k in keys])
+            db.execute("COMMIT;")
+        finally:
+            db.close()
+
+    def _halted(self, key: str, error: str) -> bool:
+        """서버가 이 판매에서 멈춤. max_attempts 번째면 dead 로 옮기고 True."""
+        db = self._conn()
+        try:
+            db.execute("BEGIN IMMEDIATE;")
+            db.execute(
+                """
+                UPDATE outbox SET attempts = attempts + 1, last_error = ?,
+                       status = CASE WHEN attempts + 1 >= ? THEN 'dead' ELSE status END
+                WHERE key = ? AND status = 'pending';
+                """,
+                (error, self.max_attempts, key)
+            )
+            row = db.execute("SELECT status FROM outbox WHERE key = ?;", (key,)).fetchone()
+            db.execute("COMMIT;")
+            return row is not None and row["status"] == "dead"
+        finally:
+            db.close()
+
+    def _record(self, results: list[dict]):
+        now = time.time()
+        db = self._conn()
+        try:
+            db.execute("BEGIN IMMEDIATE;")
+            db.executemany(
+                """
+                UPDATE outbox SET status = ?, attempts = attempts + 1, last_error = ?,
+                       sale_id = ?, total_amount = ?, synced_at = ?
+                WHERE key = ? AND status = 'pending';
+                """,
+                [(_RESULT_STATUS[r["status"]], r.get("error"), r.get("sale_id"), r.get("total_amount"),
+                  now if r["status"] in ("ok", "replayed") else None, r["key"]) for r in results]
+            )
+            db.execute("COMMIT;")
+        finally:
+            db.close()
+
+    def retry(self, key: str):
+        """conflict/rejected/dead 판매를 다시 대기시킨다 (입고 후 재시도 등). 실패한 키는 서버에 남지 않으므로 같은 키를 쓴다."""
+        db = self._conn()
+        try:
+            db.execute("UPDATE outbox SET status = 'pending', attempts = 0, last_error = NULL "
+                       "WHERE key = ? AND status IN ('conflict', 'rejected', 'dead');", (key,))
+        finally:
+            db.close()
+        self._wake.set()
+
+    def dismiss(self, key: str):
+        db = self._conn()
+        try:
+            db.execute("UPDATE outbox SET status = 'dismissed' "
+                       "WHERE key = ? AND status IN ('conflict', 'rejected', 'dead');", (key,))
+        finally:
+            db.close()
+
+    def purge(self, older_than_days: float = 7) -> int:
+        """동기화/폐기된 지 오래된 행 삭제 (pending/conflict/rejected/dead 는 남긴다)."""
+        db = self._conn()
+        try:
+            cur = db.execute("DELETE FROM outbox WHERE status IN ('synced', 'dismissed') AND created_at < ?;",
+                             (time.time() - older_than_days * 86400,))
+            return cur.rowcount
+        finally:
+            db.close()
+
+
+def start_sync_thread(box: Outbox, send, interval: float = 5.0, batch: int = 50) -> threading.Thread:
+    """interval 초마다 (또는 enqueue/retry 직후 바로) 대기 판매를 올리는 데몬 스레드."""
+    def loop():
+        while True:
+            box._wake.clear()
+            try:
+                if box.pending(1):
+                    box.sync(send, batch)
+            except Exception as e:
+                # 예상 못 한 응답/로컬 DB 오류: 스레드는 살려 두고, 화면에서 보이도록 대기 판매에 남긴다
+                log.exception("outbox sync failed")
+                try:
+                    box._failed([r["key"] for r in box.pending(batch)], f"{type(e).__name__}: {e}")
+                except Exception:
+                    log.exception("outbox: could not record sync error")
+            box._wake.wait(interval)
+
+    t = threading.Thread(target=loop, name="pos-outbox-sync", daemon=True)
+    t.start()
+    return t
@@ -0,0 +1,122 @@
+"""
+DB가 필요한 테스트는 운영 스키마 덤프로 만든 일회용 Postgres 에서 돈다 (bench/pgtmp.py).
+
+    pg_dump --schema-only --no-owner --no-privileges -h <prod> -U <user> cafeinven > schema.sql
+    TEST_SCHEMA_SQL=schema.sql PG_BIN=/usr/lib/postgresql/16/bin python -m pytest -q tests
+
+initdb 를 못 쓰면 (root 로 도는 CI 등) TEST_PG_HOST(+ TEST_PG_PORT/USER/PASSWORD) 서버에 일회용 DB만 만든다.
+TEST_SCHEMA_SQL 이 없으면 DB 테스트는 건너뛰고 outbox 처럼 DB 없는 테스트만 돈다.
+설정(backend.core.config)은 import 시점에 환경변수를 읽으므로 DB는 테스트 수집 전에 띄운다.
+"""
+import os
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+_pg = None
+
+
+def pytest_configure(config):
+    global _pg
+    schema = os.getenv("TEST_SCHEMA_SQL")
+    if not schema:
+        return
+    from bench.pgtmp import TempDatabase, TempPostgres
+    if os.getenv("TEST_PG_HOST"):
+        _pg = TempDatabase(os.environ["TEST_PG_HOST"], schema_file=schema,
+                           port=int(os.getenv("TEST_PG_PORT", "5432")),
+                           user=os.getenv("TEST_PG_USER", "postgres"),
+                           password=os.getenv("TEST_PG_PASSWORD", ""))
+    else:
+        _pg = TempPostgres(schema_file=schema, durable=False)
+    _pg.start()
+    os.environ.update(_pg.env())
+    os.environ.setdefault("DB_POOL_MAX", "40")
+    os.environ.setdefault("METRICS_ENABLED", "0")
+
+
+def pytest_unconfigure(config):
+    if _pg is not None:
+        from backend.core.db import close_pool
+        close_pool()
+        _pg.stop()
+
+
+@pytest.fixture(scope="session")
+def db():
+    if _pg is None:
+        pytest.skip("TEST_SCHEMA_SQL 이 없어 DB 테스트를 건너뜀")
+    return _pg
+
+
+def _name(prefix: str) -> str:
+    return f"{prefix}-{uuid.uuid4().hex[:8]}"
+
+
+@pytest.fixture
+def shop(db):
+    """
+    테스트마다 새 지점 1개 + 재료(우유, 원두, 컵) + 메뉴(라떼: 우유 200 + 원두 18 + 컵 1, 아메리카노: 원두 18 + 컵 1).
+    재고는 재료마다 stock(기본 10000). shop.restock(...) 으로 다시 맞출 수 있다.
+    """
+    from backend.core.db import get_cursor
+    from backend.stripes.service import balance_sql
+
+    with get_cursor() as cur:
+        cur.execute("INSERT INTO locations (name) VALUES (%s) RETURNING id::text AS id;", (_name("loc"),))
+        loc = cur.fetchone()["id"]
+        ing = {}
+        for k in ("milk", "beans", "cup"):
+            cur.execute("INSERT INTO ingredients (name) VALUES (%s) RETURNING id::text AS id;", (_name(k),))
+            ing[k] = cur.fetchone()["id"]
+        menu = {}
+        for k, price, recipe in (("latte", 5000, {"milk": 200, "beans": 18, "cup": 1}),
+                                 ("americano", 4500, {"beans": 18, "cup": 1})):
+            cur.execute(
+                "INSERT INTO menu_items (name, price, default_location_id) VALUES (%s, %s, %s) "
+                "RETURNING id::text AS id;",
+                (_name(k), price, loc),
+            )
+            menu[k] = cur.fetchone()["id"]
+            for i, q in recipe.items():
+                cur.execute("INSERT INTO recipes (menu_item_id, ingredient_id, qty_required) VALUES (%s, %s, %s);",
+                            (menu[k], ing[i], q))
+        for i in ing.values():
+            cur.execute("SELECT apply_stock_change(%s, %s, 10000, 'adjustment', 'test', NULL, NULL, NULL);",
+                        (i, loc))
+
+    def balance(key: str) -> float:
+        with get_cursor() as cur:
+            cur.execute(f"SELECT {balance_sql('inv')} AS q FROM inventory inv "
+                        "WHERE inv.ingredient_id = %s AND inv.location_id = %s;", (ing[key], loc))
+            return float(cur.fetchone()["q"])
+
+    def ledger(key: str) -> float:
+        with get_cursor() as cur:
+            cur.execute("SELECT COALESCE(sum(qty_delta), 0) AS q FROM inventory_tx "
+                        "WHERE ingredient_id = %s AND location_id = %s;", (ing[key], loc))
+            return float(cur.fetchone()["q"])
+
+    def tx_count(key: str) -> int:
+        with get_cursor() as cur:
+            cur.execute("SELECT count(*) AS n FROM inventory_tx "
+                        "WHERE ingredient_id = %s AND location_id = %s AND qty_delta < 0;", (ing[key], loc))
+            return cur.fetchone()["n"]
+
+    def restock(key: str, qty: float):
+        with get_cursor() as cur:
+            cur.execute("SELECT apply_stock_change(%s, %s, %s, 'adjustment', 'test', NULL, NULL, NULL);",
+                        (ing[key], loc, qty - balance(key)))
+
+    def sale(item: str = "latte", qty: float = 1, **kw) -> dict:
+        return {"items": [{"menu_item_id": menu[item], "qty": qty, "unit_price": 5000, "discount": 0}],
+                "channel": "POS", "location_id": kw.get("location_id", loc)}
+
+    def sales_count() -> int:
+        with get_cursor() as cur:
+            cur.execute("SELECT count(*) AS n FROM sales WHERE location_id = %s;", (loc,))
+            return cur.fetchone()["n"]
+
+    return SimpleNamespace(location_id=loc, ingredients=ing, menu=menu, balance=balance, ledger=ledger,
+                           tx_count=tx_count, restock=restock, sale=sale, sales_count=sales_count)
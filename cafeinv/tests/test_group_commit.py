@@ -0,0 +1,137 @@
+import threading
+import time
+
+import pytest
+
+from backend.core.db import get_cursor
+from backend.core.idempotency import IdempotencyConflict
+from backend.sales.group_commit import (
+    SaleBatcher, SaleQueueTimeout, SaleRejected, guard_trigger, trigger_guarded,
+)
+
+pytestmark = pytest.mark.usefixtures("db")
+
+
+@pytest.fixture(scope="module", autouse=True)
+def guarded(db):
+    guard_trigger()
+    yield
+    guard_trigger(remove=True)
+
+
+def _submit_all(batcher, sales):
+    out = [None] * len(sales)
+
+    def run(n, data, key):
+        try:
+            out[n] = batcher.submit(data, key)
+        except Exception as e:
+            out[n] = e
+
+    threads = [threading.Thread(target=run, args=(n, d, k)) for n, (d, k) in enumerate(sales)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return out
+
+
+def test_guard_installed():
+    with get_cursor() as cur:
+        assert trigger_guarded(cur)
+    assert guard_trigger() == []        # 두 번 걸어도 그대로
+
+
+def test_batch_deducts_once_per_key(shop):
+    b = SaleBatcher(window_ms=200, max_batch=64)
+    before = {k: shop.balance(k) for k in shop.ingredients}
+    out = _submit_all(b, [(shop.sale("latte"), None) for _ in range(20)])
+
+    assert all(isinstance(r, tuple) for r in out), out
+    assert b.sales == 20 and b.batches < 20
+    assert shop.sales_count() == 20
+    assert shop.balance("milk") == before["milk"] - 20 * 200
+    assert shop.balance("beans") == before["beans"] - 20 * 18
+    # 트리거 대신 배치마다 키당 한 번 → 원장 차감 줄 수 = 배치 수
+    assert shop.tx_count("milk") == b.batches
+    for k in shop.ingredients:
+        assert shop.ledger(k) == shop.balance(k)
+
+
+def test_insufficient_stock_rejects_only_short_sales(shop):
+    shop.restock("milk", 500)           # 라떼 2잔분
+    b = SaleBatcher(window_ms=200, max_batch=64)
+    out = _submit_all(b, [(shop.sale("latte"), None) for _ in range(3)] +
+                         [(shop.sale("americano"), None)])
+
+    ok = [r for r in out if isinstance(r, tuple)]
+    rejected = [r for r in out if isinstance(r, SaleRejected)]
+    assert len(ok) == 3 and len(rejected) == 1
+    assert "INSUFFICIENT_STOCK" in str(rejected[0])
+    assert shop.balance("milk") == 100
+    assert shop.ledger("milk") == shop.balance("milk")
+
+
+def test_idempotency_key_in_batch(shop):
+    b = SaleBatcher(window_ms=100, max_batch=64)
+    first, replayed = b.submit(shop.sale("latte"), "gc-key-1")
+    assert not replayed
+
+    # 같은 키 → 저장된 응답, 판매는 한 번만
+    again, replayed = b.submit(shop.sale("latte"), "gc-key-1")
+    assert replayed and again == first
+    assert shop.sales_count() == 1
+    with pytest.raises(IdempotencyConflict):
+        b.submit(shop.sale("latte", qty=2), "gc-key-1")
+
+    # 같은 배치 안에서 같은 키가 두 번 와도 한 번만
+    out = _submit_all(b, [(shop.sale("americano"), "gc-key-2"), (shop.sale("americano"), "gc-key-2")])
+    assert out[0][0] == out[1][0]
+    assert shop.sales_count() == 2
+
+
+def test_failed_sale_does_not_keep_key(shop):
+    shop.restock("cup", 0)
+    b = SaleBatcher(window_ms=10, max_batch=64)
+    with pytest.raises(SaleRejected):
+        b.submit(shop.sale("americano"), "gc-key-3")
+    shop.restock("cup", 10)
+    res, replayed = b.submit(shop.sale("americano"), "gc-key-3")
+    assert not replayed and res["sale_id"]
+
+
+def _hold_row(shop, key: str, seconds: float):
+    """다른 트랜잭션이 재고 행을 잠깐 잡고 있게 해서 배치를 멈춰 둔다."""
+    locked = threading.Event()
+
+    def run():
+        with get_cursor() as cur:
+            cur.execute("SELECT 1 FROM inventory WHERE ingredient_id = %s AND location_id = %s FOR UPDATE;",
+                        (shop.ingredients[key], shop.location_id))
+            locked.set()
+            time.sleep(seconds)
+
+    t = threading.Thread(target=run)
+    t.start()
+    locked.wait()
+    return t
+
+
+def test_queued_sale_times_out_without_commit(shop):
+    b = SaleBatcher(window_ms=1, max_batch=1, timeout=0.3)
+    holder = _hold_row(shop, "milk", 1.0)
+    first = []
+    t = threading.Thread(target=lambda: first.append(b.submit(shop.sale("latte"))))
+    t.start()
+    time.sleep(0.1)                     # 첫 판매가 배치에 들어가 잠금에서 기다리는 중
+
+    with pytest.raises(SaleQueueTimeout):
+        b.submit(shop.sale("americano"))
+    holder.join()
+    t.join()
+
+    # 첫 판매는 타임아웃을 넘겨도 결과를 끝까지 기다려 받고, 취소된 판매는 반영되지 않는다
+    assert first and first[0][0]["sale_id"]
+    time.sleep(0.1)
+    assert shop.sales_count() == 1
+    assert b.sales == 1
@@ -0,0 +1,148 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "frontend"))
+
+from outbox import Outbox, start_sync_thread  # noqa: E402
+
+
+@pytest.fixture
+def box(tmp_path):
+    return Outbox(str(tmp_path / "outbox.db"), max_attempts=3)
+
+
+class Server:
+    """POST /sales/batch 흉내. outcome(key, n) → "ok" | "conflict" | "rejected" | "halt" | 예외."""
+
+    def __init__(self, outcome=lambda key, n: "ok"):
+        self.outcome = outcome
+        self.calls = []
+        self.n = 0
+
+    def __call__(self, batch: list[dict]) -> dict:
+        self.calls.append([it["key"] for it in batch])
+        results = []
+        for it in batch:
+            status = self.outcome(it["key"], self.n)
+            self.n += 1
+            if isinstance(status, Exception):
+                raise status
+            if status == "halt":
+                return {"results": results, "processed": len(results), "error": "db down"}
+            row = {"key": it["key"], "status": status}
+            if status == "ok":
+                row.update(sale_id=f"sale-{it['key'][:4]}", total_amount=5000)
+            else:
+                row["error"] = status.upper()
+            results.append(row)
+        return {"results": results, "processed": len(results), "error": None}
+
+
+def _enqueue(box, n):
+    return [box.enqueue({"items": [{"menu_item_id": f"m{i}", "qty": 1}]}) for i in range(n)]
+
+
+def test_sync_records_each_result(box):
+    keys = _enqueue(box, 4)
+    outcome = {keys[1]: "conflict", keys[2]: "rejected"}
+    res = box.sync(Server(lambda k, n: outcome.get(k, "ok")))
+
+    assert res == {"sent": 4, "error": None, "busy": False, "dead": 0}
+    assert [box.get(k)["status"] for k in keys] == ["synced", "conflict", "rejected", "synced"]
+    assert box.get(keys[0])["sale_id"]
+    assert [c["key"] for c in box.conflicts()] == keys[1:3]
+
+
+def test_halt_keeps_order_and_rest_pending(box):
+    keys = _enqueue(box, 3)
+    res = box.sync(Server(lambda k, n: "halt" if k == keys[1] else "ok"))
+
+    assert res["sent"] == 1 and res["error"] == "db down"
+    assert [box.get(k)["status"] for k in keys] == ["synced", "pending", "pending"]
+    assert box.get(keys[1])["attempts"] == 1          # 멈춘 판매만 센다
+    assert box.get(keys[2])["attempts"] == 0
+
+
+def test_connection_error_is_not_counted(box):
+    keys = _enqueue(box, 2)
+    for _ in range(5):
+        res = box.sync(Server(lambda k, n: ConnectionError("refused")))
+        assert res["error"] == "refused" and not res["busy"]
+    assert all(box.get(k)["status"] == "pending" and box.get(k)["attempts"] == 0 for k in keys)
+    assert box.get(keys[0])["last_error"] == "refused"
+
+
+def test_poison_sale_goes_dead_and_unblocks_queue(box):
+    keys = _enqueue(box, 3)
+    server = Server(lambda k, n: "halt" if k == keys[0] else "ok")
+    for _ in range(2):
+        assert box.sync(server)["dead"] == 0
+    res = box.sync(server)                             # 세 번째 멈춤 → dead, 뒤 판매는 같은 동기화에서 전송
+
+    assert res["dead"] == 1 and res["sent"] == 2
+    assert [box.get(k)["status"] for k in keys] == ["dead", "synced", "synced"]
+    assert [c["key"] for c in box.conflicts()] == [keys[0]]
+
+    box.retry(keys[0])
+    assert box.get(keys[0])["status"] == "pending" and box.get(keys[0])["attempts"] == 0
+    box.dismiss(keys[0])                               # pending 은 폐기하지 않는다
+    assert box.get(keys[0])["status"] == "pending"
+
+
+def test_concurrent_sync_is_busy(box):
+    _enqueue(box, 1)
+    entered, release = threading.Event(), threading.Event()
+
+    def slow(batch):
+        entered.set()
+        release.wait()
+        return Server()(batch)
+
+    t = threading.Thread(target=box.sync, args=(slow,))
+    t.start()
+    entered.wait()
+    assert box.sync(Server()) == {"sent": 0, "error": None, "busy": True, "dead": 0}
+    release.set()
+    t.join()
+    assert box.counts() == {"synced": 1}
+
+
+def test_sync_thread_wakes_on_enqueue(box):
+    sent = threading.Event()
+    server = Server()
+
+    def send(batch):
+        out = server(batch)
+        sent.set()
+        return out
+
+    start_sync_thread(box, send, interval=60)
+    key = box.enqueue({"items": []})
+    assert sent.wait(5)                                # interval(60s)을 기다리지 않고 바로 전송
+    for _ in range(50):
+        if box.get(key)["status"] == "synced":
+            break
+        time.sleep(0.05)
+    assert box.get(key)["status"] == "synced"
+
+
+def test_sync_thread_records_unexpected_error(box, caplog):
+    calls = []
+
+    def broken(batch):
+        calls.append(batch)
+        return {"unexpected": True}                    # results 없는 응답 → sync 안에서 KeyError
+
+    start_sync_thread(box, broken, interval=60)
+    key = box.enqueue({"items": []})
+    for _ in range(50):
+        if box.get(key)["last_error"]:
+            break
+        time.sleep(0.05)
+    assert calls
+    assert box.get(key)["status"] == "pending" and "KeyError" in box.get(key)["last_error"]
+    assert "outbox sync failed" in caplog.text
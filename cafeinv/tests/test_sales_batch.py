@@ -0,0 +1,70 @@
+import uuid
+
+import psycopg2
+import pytest
+from fastapi.testclient import TestClient
+
+import backend.sales.service as sales_service
+
+pytestmark = pytest.mark.usefixtures("db")
+
+
+@pytest.fixture(scope="module")
+def client(db):
+    from backend.main import app
+    return TestClient(app)              # with 없이 → lifespan(워밍업) 없이 라우터만
+
+
+def _key():
+    return str(uuid.uuid4())
+
+
+def _post(client, sales):
+    r = client.post("/sales/batch", json={"sales": [{"key": k, "sale": s} for k, s in sales]})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def test_batch_classifies_each_sale(client, shop):
+    shop.restock("milk", 200)           # 라떼 1잔분
+    bad_uuid = shop.sale("latte")
+    bad_uuid["items"][0]["menu_item_id"] = "not-a-uuid"
+    unknown_menu = shop.sale("latte")
+    unknown_menu["items"][0]["menu_item_id"] = str(uuid.uuid4())
+    invalid = shop.sale("latte", qty=0)
+    keys = [_key() for _ in range(6)]
+    sales = [shop.sale("latte"), shop.sale("latte"), bad_uuid, unknown_menu, invalid, shop.sale("americano")]
+
+    out = _post(client, zip(keys, sales))
+    assert out["error"] is None and out["processed"] == 6
+    assert [r["status"] for r in out["results"]] == ["ok", "conflict", "rejected", "rejected", "rejected", "ok"]
+    assert "INSUFFICIENT_STOCK" in out["results"][1]["error"]
+    assert "qty" in out["results"][4]["error"]
+    assert shop.sales_count() == 2
+
+    # 같은 키로 다시 보내면 반영된 판매는 replayed, 나머지는 같은 분류
+    again = _post(client, zip(keys, sales))
+    assert [r["status"] for r in again["results"]] == ["replayed", "conflict", "rejected", "rejected", "rejected",
+                                                      "replayed"]
+    assert again["results"][0]["sale_id"] == out["results"][0]["sale_id"]
+    assert shop.sales_count() == 2
+
+
+def test_batch_halts_on_server_error(client, shop, monkeypatch):
+    calls = []
+    real = sales_service.create_sale
+
+    def flaky(data, *a, **kw):
+        calls.append(data)
+        if len(calls) == 2:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+        return real(data, *a, **kw)
+
+    monkeypatch.setattr(sales_service, "create_sale", flaky)
+    keys = [_key() for _ in range(3)]
+    out = _post(client, [(k, shop.sale("americano")) for k in keys])
+
+    # 두 번째에서 멈춤: 첫 판매만 결과에 있고, 나머지는 클라이언트가 같은 순서로 다시 보낸다
+    assert out["processed"] == 1 and [r["key"] for r in out["results"]] == keys[:1]
+    assert "server closed" in out["error"]
+    assert shop.sales_count() == 1
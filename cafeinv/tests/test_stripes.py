@@ -0,0 +1,137 @@
+import importlib
+import threading
+
+import pytest
+
+import backend.ledgercheck.service as ledger_service
+import backend.sales.service as sales_service
+import backend.stripes.service as stripes_service
+from backend.core.config import STOCK_STRIPE_SHARE
+from backend.core.db import get_cursor
+from backend.sales.service import create_sale
+from backend.stripes.service import compact, disable_stripes, enable_stripes
+
+STRIPES = 4
+
+
+@pytest.fixture
+def striped(shop, monkeypatch):
+    """우유만 스트라이프 4개로 나눈 지점 (잔량 10000, 할당은 STOCK_STRIPE_SHARE 만큼)."""
+    monkeypatch.setattr(stripes_service, "STOCK_STRIPES", True)
+    monkeypatch.setattr(sales_service, "STOCK_STRIPES", True)
+    key = (shop.ingredients["milk"], shop.location_id)
+    assert enable_stripes([key], STRIPES)["enabled"] == 1
+    shop.key = key
+    yield shop
+    disable_stripes([key])
+
+
+def _stripes(shop) -> list[dict]:
+    with get_cursor() as cur:
+        cur.execute("SELECT stripe, allot, used FROM inventory_stripes "
+                    "WHERE ingredient_id = %s AND location_id = %s ORDER BY stripe;", shop.key)
+        return cur.fetchall()
+
+
+def _base(shop) -> float:
+    with get_cursor() as cur:
+        cur.execute("SELECT qty_on_hand FROM inventory WHERE ingredient_id = %s AND location_id = %s;", shop.key)
+        return float(cur.fetchone()["qty_on_hand"])
+
+
+def _check(shop):
+    rows = _stripes(shop)
+    assert len(rows) == STRIPES
+    assert all(r["used"] <= r["allot"] for r in rows)
+    assert shop.balance("milk") >= 0
+    assert shop.ledger("milk") == shop.balance("milk")
+
+
+def test_dispatcher_installed(striped):
+    with get_cursor() as cur:
+        cur.execute("SELECT proname FROM pg_proc WHERE proname IN ('apply_stock_change', 'apply_stock_change_base');")
+        assert {r["proname"] for r in cur.fetchall()} == {"apply_stock_change", "apply_stock_change_base"}
+    # 다시 켜도 이름을 또 바꾸거나 스트라이프를 늘리지 않는다
+    enable_stripes([striped.key], STRIPES)
+    assert len(_stripes(striped)) == STRIPES
+
+
+def test_fast_path_leaves_base_row(striped):
+    base = _base(striped)
+    for _ in range(3):
+        create_sale(striped.sale("latte"))
+    assert _base(striped) == base                       # 본 행은 그대로, 스트라이프 사용량만 늘었다
+    assert sum(r["used"] for r in _stripes(striped)) == 600
+    assert striped.balance("milk") == base - 600
+    _check(striped)
+
+    compact([striped.key])                              # 접으면 본 행이 실제 잔량과 같아진다
+    assert _base(striped) == striped.balance("milk") == base - 600
+    _check(striped)
+
+
+def test_concurrent_sales_fast_and_slow_path(striped):
+    # 48잔 x 200 = 9600: 할당(10000 x 0.8)을 넘기므로 빠른 경로와 느린 경로(접기 + 재할당)를 모두 탄다
+    errors = []
+
+    def run():
+        for _ in range(6):
+            try:
+                create_sale(striped.sale("latte"))
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert striped.sales_count() == 48
+    assert striped.balance("milk") == 10000 - 48 * 200
+    assert _base(striped) < 10000                       # 느린 경로에서 사용량이 본 행에 접혔다
+    _check(striped)
+
+
+def test_exhausted_stripes_fall_back_to_insufficient_stock(striped):
+    striped.restock("milk", 700)                        # 라떼 3잔분
+    ok, short = 0, 0
+    for _ in range(5):
+        try:
+            create_sale(striped.sale("latte"))
+            ok += 1
+        except Exception as e:
+            assert "INSUFFICIENT_STOCK" in str(e)
+            short += 1
+    assert (ok, short) == (3, 2)
+    assert striped.balance("milk") == 100
+    _check(striped)
+
+
+@pytest.fixture
+def ledger(striped, monkeypatch):
+    """잔량식(balance_sql)은 import 때 박히므로 스트라이프를 켠 채로 다시 읽는다 (spawn 되는 검사 프로세스는 환경변수로)."""
+    monkeypatch.setenv("STOCK_STRIPES", "1")
+    yield importlib.reload(ledger_service)
+    with monkeypatch.context() as m:
+        m.setattr(stripes_service, "STOCK_STRIPES", False)
+        importlib.reload(ledger_service)
+
+
+def test_ledger_repair_folds_and_reallots(striped, ledger):
+    # 원장 없이 본 행만 늘린 뒤 할당을 그 기준으로 나눠 둔다 → 수정이 본 행을 줄여도 할당이 잔량을 넘지 않아야 한다
+    with get_cursor() as cur:
+        cur.execute("UPDATE inventory SET qty_on_hand = qty_on_hand + 3000 "
+                    "WHERE ingredient_id = %s AND location_id = %s;", striped.key)
+    compact([striped.key])
+    create_sale(striped.sale("latte"))
+
+    ledger.run_check(workers=1, location_id=striped.location_id)
+    assert ledger.apply_repairs(location_id=striped.location_id)["applied"] == 1
+
+    rows = _stripes(striped)
+    assert all(r["used"] == 0 for r in rows)            # 사용량은 본 행에 접혔다
+    assert _base(striped) == striped.balance("milk") == 10000 - 200
+    assert sum(r["allot"] for r in rows) <= striped.balance("milk") * STOCK_STRIPE_SHARE
+    _check(striped)